@@ -0,0 +1,159 @@
+"""論文の補完（Unpaywall・arXiv）のワーカープールと、論文ごとのタスク作成の比較ベンチマーク。
+
+ネットワークに接続せずに（`benchmarks.offline`）、合成した論文を補完し、次の値を計測します。
+
+- 経過時間と1秒あたりのリクエスト数
+- 同時に存在したタスク数の最大値
+- 補完中に増えたピークメモリ（最大RSSの増分。論文自体のメモリは含まない）
+
+各モードはそれぞれ新しいプロセスで実行します。
+
+    uv run python -m benchmarks.enrich_pool
+    uv run python -m benchmarks.enrich_pool --papers 10000 --modes pool
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Literal
+
+import httpx
+from aiolimiter import AsyncLimiter
+from loguru import logger
+
+from benchmarks.offline import DOI_PREFIX, OfflineScholarlyApi
+from crawler.domain.paper import Paper
+from crawler.repository import ArxivRepository, UnpaywallRepository
+
+# 実質的に制限しないレートリミッター（リミッターの処理コスト自体は計測に含める）
+UNLIMITED_RATE = 1_000_000_000
+# タスク数を記録する間隔(秒)
+SAMPLE_INTERVAL = 0.01
+
+Mode = Literal["pool", "fanout"]
+
+
+def max_rss_mb() -> float:
+    """このプロセスの最大RSS(MB)を返します。"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOSはバイト、Linuxはキロバイト単位
+    return max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
+
+
+def synthetic_papers(num_papers: int) -> list[Paper]:
+    """DOI付きの合成論文を作成します。"""
+    return [
+        Paper(
+            title=f"Offline Paper {i}",
+            authors=[f"Author {i}"],
+            year=2024,
+            venue="RecSys",
+            doi=f"{DOI_PREFIX}.{i}",
+        )
+        for i in range(num_papers)
+    ]
+
+
+async def fanout(
+    repo: UnpaywallRepository | ArxivRepository, papers: list[Paper], sem: asyncio.Semaphore
+) -> None:
+    """以前の実装と同じく、論文ごとにタスクを作成して補完します。"""
+    async with asyncio.TaskGroup() as tg:
+        for paper in papers:
+            tg.create_task(repo._enrich_single_paper(paper, sem, overwrite=False))
+
+
+async def bench_enrich(
+    mode: Mode, num_papers: int, concurrency: int, latency: float
+) -> dict[str, Any]:
+    """合成論文をUnpaywall・arXivで補完し、計測結果を返します。"""
+    api = OfflineScholarlyApi(num_papers, latency=latency)
+    papers = synthetic_papers(num_papers)
+    peak_tasks = 0
+    done = asyncio.Event()
+
+    async def sample_tasks() -> None:
+        nonlocal peak_tasks
+        while not done.is_set():
+            peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+    async with httpx.AsyncClient(transport=api.transport()) as client:
+        repos: list[UnpaywallRepository | ArxivRepository] = [
+            UnpaywallRepository(client, AsyncLimiter(UNLIMITED_RATE, 1), num_workers=concurrency),
+            ArxivRepository(client, AsyncLimiter(UNLIMITED_RATE, 1), num_workers=concurrency),
+        ]
+        sem = asyncio.Semaphore(concurrency)
+        sampler = asyncio.create_task(sample_tasks())
+        baseline = max_rss_mb()
+        started = time.perf_counter()
+        for repo in repos:
+            if mode == "pool":
+                await repo.enrich_papers(papers, sem)
+            else:
+                await fanout(repo, papers, sem)
+        elapsed = time.perf_counter() - started
+        done.set()
+        await sampler
+
+    assert all(p.pdf_url is not None for p in papers)
+    return {
+        "mode": mode,
+        "papers": num_papers,
+        "seconds": elapsed,
+        "requests_per_second": api.total_requests / elapsed,
+        "peak_tasks": peak_tasks,
+        "peak_memory_mb": max_rss_mb() - baseline,
+    }
+
+
+def run_benchmark(mode: Mode, num_papers: int, concurrency: int, latency: float) -> dict[str, Any]:
+    """ワーカープロセスでベンチマークを実行します。"""
+    # リクエストごとのログ出力のコストを計測に含めない
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    return asyncio.run(bench_enrich(mode, num_papers, concurrency, latency))
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument(
+        "--modes", nargs="+", choices=("pool", "fanout"), default=["pool", "fanout"]
+    )
+    parser.add_argument("--papers", type=int, default=100_000, help="論文数")
+    parser.add_argument(
+        "--concurrency", type=int, default=100, help="セマフォの同時実行数・ワーカー数"
+    )
+    parser.add_argument("--latency", type=float, default=0.001, help="擬似APIの応答時間(秒)")
+    parser.add_argument("--json", help="結果をJSONで書き込むパス")
+    args = parser.parse_args(argv)
+
+    results = []
+    for mode in args.modes:
+        # 最大RSSがモード間で混ざらないよう、モードごとに新しいプロセスで実行する
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(
+                run_benchmark, mode, args.papers, args.concurrency, args.latency
+            )
+            results.append(future.result())
+
+    print(
+        f"{'mode':<8} {'papers':>8} {'time (s)':>9} {'req/s':>8} {'peak tasks':>11} {'peak MB':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['mode']:<8} {r['papers']:>8} {r['seconds']:>9.1f} {r['requests_per_second']:>8.0f} "
+            f"{r['peak_tasks']:>11} {r['peak_memory_mb']:>8.1f}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
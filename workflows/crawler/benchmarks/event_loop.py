@@ -0,0 +1,131 @@
+"""イベントループ（asyncio / uvloop）の比較ベンチマーク。
+
+ネットワークに接続せずに（`benchmarks.offline`）、次の2つを各イベントループで計測します。
+
+- scheduler: セマフォとレートリミッターを取り合う多数のタスクの、1タスクあたりのオーバーヘッド
+- crawl: DBLPの論文一覧をUnpaywall・arXivで補完するクロールの、1秒あたりのリクエスト数
+
+    uv run --extra uvloop python -m benchmarks.event_loop
+    uv run --extra uvloop python -m benchmarks.event_loop --papers 5000 --json result.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections.abc import Sequence
+from typing import Any
+
+import httpx
+from aiolimiter import AsyncLimiter
+from loguru import logger
+
+from benchmarks.offline import OfflineScholarlyApi
+from crawler.repository import ArxivRepository, DBLPRepository, UnpaywallRepository
+from crawler.usecase.fetch_papers import FetchRecSysPapers
+from crawler.utils.event_loop import EventLoopName, loop_factory
+
+# 実質的に制限しないレートリミッター（リミッターの処理コスト自体は計測に含める）
+UNLIMITED_RATE = 1_000_000_000
+
+
+async def bench_scheduler(num_tasks: int, concurrency: int) -> float:
+    """セマフォとレートリミッターを取り合うタスクを実行し、1タスクあたりの時間(秒)を返します。"""
+    sem = asyncio.Semaphore(concurrency)
+    limiter = AsyncLimiter(UNLIMITED_RATE, 1)
+
+    async def task() -> None:
+        async with sem, limiter:
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(num_tasks):
+            tg.create_task(task())
+    return (time.perf_counter() - started) / num_tasks
+
+
+async def bench_crawl(num_papers: int, concurrency: int, latency: float) -> tuple[float, int]:
+    """擬似APIに対してクロールを実行し、(経過時間(秒), リクエスト数) を返します。"""
+    api = OfflineScholarlyApi(num_papers, latency=latency)
+    async with httpx.AsyncClient(transport=api.transport()) as client:
+        dblp = DBLPRepository(client, limiter=AsyncLimiter(UNLIMITED_RATE, 1))
+        await dblp.setup()
+        usecase = FetchRecSysPapers(
+            dblp,
+            [
+                UnpaywallRepository(client, limiter=AsyncLimiter(UNLIMITED_RATE, 1)),
+                ArxivRepository(client, limiter=AsyncLimiter(UNLIMITED_RATE, 1)),
+            ],
+        )
+        started = time.perf_counter()
+        papers = await usecase.execute(2024, asyncio.Semaphore(concurrency))
+        elapsed = time.perf_counter() - started
+    assert len(papers) == num_papers
+    return elapsed, api.total_requests
+
+
+def run_benchmark(loop: EventLoopName, args: argparse.Namespace) -> dict[str, Any] | None:
+    """イベントループごとにベンチマークを繰り返し、中央値を返します。"""
+    factory = loop_factory(loop)
+    if loop == "uvloop" and factory is None:
+        return None
+
+    overheads, elapsed, rates = [], [], []
+    for _ in range(args.repeat):
+        overheads.append(
+            asyncio.run(bench_scheduler(args.tasks, args.concurrency), loop_factory=factory)
+        )
+        seconds, requests = asyncio.run(
+            bench_crawl(args.papers, args.concurrency, args.latency), loop_factory=factory
+        )
+        elapsed.append(seconds)
+        rates.append(requests / seconds)
+    return {
+        "loop": loop,
+        "scheduler_us_per_task": statistics.median(overheads) * 1_000_000,
+        "crawl_seconds": statistics.median(elapsed),
+        "crawl_requests_per_second": statistics.median(rates),
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument(
+        "--loops", nargs="+", choices=("asyncio", "uvloop"), default=["asyncio", "uvloop"]
+    )
+    parser.add_argument("--tasks", type=int, default=100_000, help="schedulerのタスク数")
+    parser.add_argument("--papers", type=int, default=2_000, help="crawlの論文数")
+    parser.add_argument("--concurrency", type=int, default=100, help="セマフォの同時実行数")
+    parser.add_argument("--latency", type=float, default=0.005, help="擬似APIの応答時間(秒)")
+    parser.add_argument("--repeat", type=int, default=3, help="繰り返し回数（中央値を出力）")
+    parser.add_argument("--json", help="結果をJSONで書き込むパス")
+    args = parser.parse_args(argv)
+
+    # リクエストごとのログ出力のコストを計測に含めない
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results = []
+    for loop in args.loops:
+        result = run_benchmark(loop, args)
+        if result is None:
+            print(f"{loop}: not installed, skipped", file=sys.stderr)
+            continue
+        results.append(result)
+
+    print(f"{'loop':<8} {'scheduler (us/task)':>20} {'crawl (s)':>10} {'crawl (req/s)':>14}")
+    for r in results:
+        print(
+            f"{r['loop']:<8} {r['scheduler_us_per_task']:>20.2f} "
+            f"{r['crawl_seconds']:>10.2f} {r['crawl_requests_per_second']:>14.0f}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
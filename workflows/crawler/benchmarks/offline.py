@@ -0,0 +1,122 @@
+"""ネットワークに接続せずにクロールを再現するための擬似API。
+
+DBLP・Semantic Scholar・Unpaywall・arXivのレスポンスを `httpx.MockTransport` で返します。
+`latency` 秒待ってから応答するため、実際のクロールと同様に多数のリクエストが
+イベントループ上で同時に待機します。
+"""
+
+import asyncio
+import json
+from collections import Counter
+from typing import Any
+
+import httpx
+
+DOI_PREFIX = "10.1145/bench"
+
+
+class OfflineScholarlyApi:
+    """DBLP・Semantic Scholar・Unpaywall・arXivを模した `httpx.MockTransport` 用のハンドラー。
+
+    - DBLP: `num_papers` 件のDOI付きの論文を返す
+    - Semantic Scholar: バッチ検索で、`fields` に指定されたフィールドだけを含む論文を返す
+    - Unpaywall: 全てのDOIにPDFのURLを返す
+    - arXiv: DOI検索は偶数番目の論文だけヒットし、それ以外はタイトル検索にフォールバックする
+    """
+
+    def __init__(self, num_papers: int, latency: float = 0.0) -> None:
+        """OfflineScholarlyApiインスタンスを初期化します。
+
+        Args:
+            num_papers: DBLPが返す論文数
+            latency: 1リクエストあたりの応答時間(秒)
+        """
+        self.num_papers = num_papers
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+
+    @property
+    def total_requests(self) -> int:
+        """受け付けたリクエスト数（robots.txtを除く）。"""
+        return sum(self.requests.values())
+
+    def transport(self) -> httpx.MockTransport:
+        """このAPIに接続する `httpx.MockTransport` を返します。"""
+        return httpx.MockTransport(self)
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(200, text="User-agent: *\nAllow: /\n")
+        self.requests[request.url.host] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        match request.url.host:
+            case "dblp.org":
+                return httpx.Response(200, json=self._dblp())
+            case "api.semanticscholar.org":
+                ids = json.loads(request.content)["ids"]
+                fields = request.url.params["fields"].split(",")
+                return httpx.Response(200, json=[self._semantic_scholar(i, fields) for i in ids])
+            case "api.unpaywall.org":
+                doi = request.url.path.removeprefix("/v2/")
+                return httpx.Response(200, json=self._unpaywall(doi))
+            case "export.arxiv.org":
+                return httpx.Response(200, text=self._arxiv(request.url.params["search_query"]))
+        return httpx.Response(404)
+
+    def _dblp(self) -> dict[str, Any]:
+        hits = [
+            {
+                "info": {
+                    "title": f"Offline Paper {i}",
+                    "authors": {"author": [{"text": f"Author {i}"}]},
+                    "year": "2024",
+                    "venue": "RecSys",
+                    "doi": f"{DOI_PREFIX}.{i}",
+                    "type": "Conference and Workshop Papers",
+                }
+            }
+            for i in range(self.num_papers)
+        ]
+        return {"result": {"hits": {"@total": str(self.num_papers), "hit": hits}}}
+
+    @staticmethod
+    def _semantic_scholar(paper_id: str, fields: list[str]) -> dict[str, Any]:
+        doi = paper_id.removeprefix("DOI:")
+        index = doi.rsplit(".", 1)[-1]
+        # 実際のレスポンスと同程度の大きさになるよう、要約と著者を埋める
+        item: dict[str, Any] = {
+            "paperId": f"{index:0>40}",
+            "externalIds": {"DOI": doi, "CorpusId": index, "DBLP": f"conf/recsys/{index}"},
+            "abstract": f"Abstract of offline paper {index}. " * 30,
+            "openAccessPdf": {"url": f"https://s2.example.org/{doi}.pdf", "status": "GREEN"},
+            "title": f"Offline Paper {index}",
+            "year": 2024,
+            "venue": "ACM Conference on Recommender Systems",
+            "authors": [
+                {"authorId": f"{index}{a}", "name": f"Author {index}-{a}"} for a in range(6)
+            ],
+            "url": f"https://www.semanticscholar.org/paper/{index:0>40}",
+        }
+        return {"paperId": item["paperId"]} | {f: item[f] for f in fields if f in item}
+
+    @staticmethod
+    def _unpaywall(doi: str) -> dict[str, Any]:
+        location = {"url_for_pdf": f"https://oa.example.org/{doi}.pdf"}
+        return {"doi": doi, "title": doi, "best_oa_location": location, "oa_locations": [location]}
+
+    @staticmethod
+    def _arxiv(query: str) -> str:
+        entry = ""
+        # "doi:10.1145/bench.<i>" または 'ti:"Offline Paper <i>"'
+        index = int(query.rstrip('"').rsplit(".", 1)[-1].rsplit(" ", 1)[-1])
+        if query.startswith("ti:") or index % 2 == 0:
+            entry = f"""<entry>
+<title>Offline Paper {index}</title>
+<summary>Abstract of {index}</summary>
+<published>2024-01-01T00:00:00Z</published>
+<author><name>Author {index}</name></author>
+<link title="pdf" href="https://arxiv.org/pdf/{index}" />
+</entry>"""
+        return f'<feed xmlns="http://www.w3.org/2005/Atom">{entry}</feed>'
@@ -0,0 +1,72 @@
+"""Semantic Scholarのバッチ検索で要求するフィールドの比較ベンチマーク。
+
+ネットワークに接続せずに（`benchmarks.offline`）、合成した論文をSemantic Scholarで補完し、
+全フィールド（`SemanticScholarRepository.FIELDS`）を要求する場合と、論文に欠けている項目の
+フィールドだけを要求する場合のレスポンスの大きさと処理時間を比較します。
+
+- all: 全フィールドを要求する（以前の実装）
+- missing: 要約とPDFのURLが欠けている論文（補完チェーンの先頭）
+- missing-pdf: 要約は既にあり、PDFのURLだけが欠けている論文
+
+    uv run python -m benchmarks.s2_fields
+    uv run python -m benchmarks.s2_fields --papers 50000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections.abc import Sequence
+from typing import Literal
+
+import httpx
+from aiolimiter import AsyncLimiter
+from loguru import logger
+
+from benchmarks.enrich_pool import UNLIMITED_RATE, synthetic_papers
+from benchmarks.offline import OfflineScholarlyApi
+from crawler.repository import SemanticScholarRepository
+
+Scenario = Literal["all", "missing", "missing-pdf"]
+SCENARIOS: tuple[Scenario, ...] = ("all", "missing", "missing-pdf")
+
+
+async def bench_fields(scenario: Scenario, num_papers: int) -> tuple[int, int, float]:
+    """補完を実行し、(バッチ数, レスポンスの合計バイト数, 経過秒数) を返します。"""
+    api = OfflineScholarlyApi(num_papers)
+    papers = synthetic_papers(num_papers)
+    if scenario == "missing-pdf":
+        for paper in papers:
+            paper.abstract = "Known abstract"
+
+    async with httpx.AsyncClient(transport=api.transport()) as client:
+        repo = SemanticScholarRepository(client, AsyncLimiter(UNLIMITED_RATE, 1))
+        sem = asyncio.Semaphore(100)
+        started = time.perf_counter()
+        if scenario == "all":
+            dois = [p.doi for p in papers if p.doi]
+            await repo.fetch_papers_batch(dois, sem)
+        else:
+            await repo.enrich_papers(papers, sem)
+        elapsed = time.perf_counter() - started
+    return repo.batches, repo.response_bytes, elapsed
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--papers", type=int, default=20_000, help="論文数")
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    print(f"{'scenario':<12} {'batches':>8} {'KiB/batch':>10} {'total MiB':>10} {'time (s)':>9}")
+    for scenario in SCENARIOS:
+        batches, response_bytes, elapsed = asyncio.run(bench_fields(scenario, args.papers))
+        print(
+            f"{scenario:<12} {batches:>8} {response_bytes / batches / 1024:>10.1f} "
+            f"{response_bytes / 1024 / 1024:>10.1f} {elapsed:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
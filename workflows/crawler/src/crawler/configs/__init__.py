@@ -2,3 +2,5 @@ import os
 
 EMAIL = os.getenv("EMAIL", "crawler@haru256.dev")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+DATA_DIR = os.getenv("DATA_DIR", "data")
+CONFIG_PATH = os.getenv("CONFIG_PATH", "config.toml")
@@ -0,0 +1,259 @@
+"""config.tomlからクロールプランを読み込むモジュール。
+
+config.tomlの構成:
+
+- `[crawl]`: 全プランで共有する設定（User-Agent、出力先、レート制限、キャッシュ、タイムアウト、サーキットブレーカー、リトライ）
+- `[plans.<name>]`: 実行するプラン。`kind = "papers"`（論文）または `kind = "blogs"`（技術ブログ）
+- `[sites.<name>]`: 技術ブログのサイト設定（`crawler.configs.sites`）
+"""
+
+import tomllib
+from pathlib import Path
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+from crawler.configs import CONFIG_PATH, DATA_DIR
+from crawler.configs.sites import SiteConfig, parse_sites
+from crawler.usecase.dedup_papers import DedupMode
+from crawler.utils.event_loop import EventLoopName
+
+Conference = Literal["recsys", "kdd", "wsdm", "www", "sigir", "cikm"]
+EnricherName = Literal["semantic_scholar", "unpaywall", "arxiv", "pdf_link_checker"]
+SinkName = Literal["parquet", "sqlite"]
+
+# 各APIのリポジトリに割り当てるレート制限のキー（それ以外のキーはホスト名として扱う）
+SERVICE_NAMES = frozenset({"dblp", "semantic_scholar", "unpaywall", "arxiv"})
+
+
+class RateLimit(BaseModel):
+    """`time_period` 秒あたり `max_rate` 回のレート制限。"""
+
+    max_rate: float = Field(gt=0)
+    time_period: float = Field(default=1.0, gt=0)
+
+
+class CachePolicy(BaseModel):
+    """キャッシュの有効期間(秒)。
+
+    Attributes:
+        robots_ttl: robots.txtを再取得するまでの秒数
+        pdf_link_alive_ttl: 生きていたPDFリンクを再確認するまでの秒数
+        pdf_link_dead_ttl: リンク切れだったPDFリンクを再確認するまでの秒数
+        negative_ttl: 補完で見つからなかった論文を再確認するまでの秒数。連続して見つからない
+            たびに2倍に延ばす
+        negative_max_ttl: 見つからなかった論文を再確認するまでの秒数の上限
+    """
+
+    robots_ttl: float = 24 * 60 * 60
+    pdf_link_alive_ttl: float = 7 * 24 * 60 * 60
+    pdf_link_dead_ttl: float = 24 * 60 * 60
+    negative_ttl: float = 7 * 24 * 60 * 60
+    negative_max_ttl: float = 90 * 24 * 60 * 60
+
+
+class TimeoutPolicy(BaseModel):
+    """HTTPリクエストのタイムアウトの設定（`crawler.utils.adaptive_timeout`）。
+
+    Attributes:
+        connect: 接続のタイムアウト(秒)
+        read: 読み取りのタイムアウト(秒)。`adaptive` の場合は上限
+        adaptive: ホストごとのレイテンシのパーセンタイルから読み取りのタイムアウトを調整するかどうか
+        min_read: 調整した読み取りのタイムアウトの下限(秒)
+        percentile: 基準にするレイテンシのパーセンタイル（0から1）
+        multiplier: パーセンタイルに掛ける倍率
+        min_samples: 調整を始めるのに必要なホストごとのレスポンス数
+    """
+
+    connect: float = Field(default=5.0, gt=0)
+    read: float = Field(default=30.0, gt=0)
+    adaptive: bool = True
+    min_read: float = Field(default=2.0, gt=0)
+    percentile: float = Field(default=0.99, gt=0, le=1)
+    multiplier: float = Field(default=3.0, ge=1)
+    min_samples: int = Field(default=20, gt=0)
+
+
+class CircuitBreakerPolicy(BaseModel):
+    """ホストごとのサーキットブレーカーの設定（`crawler.utils.circuit_breaker`）。
+
+    Attributes:
+        failure_rate_threshold: サーキットを開く直近のリクエストの失敗率
+        slow_call_seconds: これより時間のかかったレスポンスは失敗として数える秒数
+        window_size: 失敗率の計算に使う直近のリクエスト数
+        min_calls: 失敗率を判定するのに必要な最小のリクエスト数
+        open_seconds: サーキットを開いてから試行リクエストを送るまでの秒数
+    """
+
+    failure_rate_threshold: float = Field(default=0.5, gt=0, le=1)
+    slow_call_seconds: float = Field(default=10.0, gt=0)
+    window_size: int = Field(default=20, gt=0)
+    min_calls: int = Field(default=10, gt=0)
+    open_seconds: float = Field(default=60.0, gt=0)
+
+
+class RetryPolicy(BaseModel):
+    """ホストごとのリトライ予算の設定（`crawler.utils.host_backoff`）。
+
+    Attributes:
+        budget_ratio: 成功したリクエスト1件あたりに許可するリトライの回数
+        min_retries: 成功したリクエストがなくても許可するリトライの回数
+    """
+
+    budget_ratio: float = Field(default=0.2, ge=0)
+    min_retries: int = Field(default=10, ge=0)
+
+
+class PaperPlan(BaseModel):
+    """カンファレンス論文を収集するプラン。
+
+    Attributes:
+        conferences: 対象のカンファレンス
+        years: 対象年の範囲 [開始, 終了]（両端を含む）
+        enrichers: 論文情報を補完する順序
+        sinks: 取得結果の書き込み先
+        concurrency: プラン全体の同時リクエスト数
+        download_pdfs: PDFをダウンロードするかどうか
+        extract_pdf_texts: ダウンロードしたPDFからテキストを抽出するかどうか
+        dedup: 補完の前に同じ論文（DOI・タイトルが同じ）をまとめる方法（memory、数百万件規模の
+            バックフィル向けにインデックスのメモリを抑えるbloom、まとめないoff）
+        enricher_order: Enricherの実行順序（`enrichers` の順に全ての論文を補完するfixed、
+            過去の実績から1秒あたりに埋める項目数が多い順に並べ、後のEnricherには埋まらなかった
+            論文だけを渡すyield）。yieldはリクエスト数を減らせる一方、PDFリンクが既にある論文の
+            代替候補（`pdf_url_candidates`）を後のEnricherから集めないため、既定はfixed
+        job_queue: 取得・補完を `<data_dir>/jobs/<プラン名>.db` の永続ジョブキュー経由で実行するか
+            どうか。同じファイルを共有する複数プロセスで分担でき、締め切りや異常終了で残ったジョブは
+            次回の実行で再開する（重複の除去・Enricherの並べ替えは行わない）
+        job_workers: ジョブキュー経由の場合に同時に処理するジョブ数
+    """
+
+    kind: Literal["papers"] = "papers"
+    conferences: list[Conference] = ["recsys"]
+    years: tuple[int, int]
+    enrichers: list[EnricherName] = ["semantic_scholar", "unpaywall", "arxiv", "pdf_link_checker"]
+    sinks: list[SinkName] = ["parquet", "sqlite"]
+    concurrency: int = Field(default=100, gt=0)
+    download_pdfs: bool = True
+    extract_pdf_texts: bool = True
+    dedup: DedupMode = "memory"
+    enricher_order: Literal["fixed", "yield"] = "fixed"
+    job_queue: bool = False
+    job_workers: int = Field(default=4, gt=0)
+
+    @model_validator(mode="after")
+    def _check_years(self) -> "PaperPlan":
+        if self.years[0] > self.years[1]:
+            raise ValueError(f"invalid year range: {self.years}")
+        if self.extract_pdf_texts and not self.download_pdfs:
+            raise ValueError("extract_pdf_texts requires download_pdfs")
+        return self
+
+    @property
+    def year_range(self) -> range:
+        """対象年の範囲。"""
+        return range(self.years[0], self.years[1] + 1)
+
+
+class BlogPlan(BaseModel):
+    """技術ブログの新規・更新記事を収集するプラン。
+
+    Attributes:
+        sites: 対象のサイト名（`[sites.<name>]`）。空の場合は全てのサイト
+        concurrency: プラン全体の同時リクエスト数
+        num_workers: フィードの記事を取得するワーカー数（同時に巡回するホスト数の上限）
+        extract_articles: 取得したページから記事本文を抽出するかどうか
+    """
+
+    kind: Literal["blogs"]
+    sites: list[str] = []
+    concurrency: int = Field(default=20, gt=0)
+    num_workers: int = Field(default=50, gt=0)
+    extract_articles: bool = True
+
+
+Plan = Annotated[PaperPlan | BlogPlan, Field(discriminator="kind")]
+
+
+class CrawlConfig(BaseModel):
+    """クロール全体の設定。
+
+    Attributes:
+        user_agent: リクエストに使用するUser-Agent
+        data_dir: 出力先のディレクトリ
+        max_connections: HTTPクライアントの最大同時接続数
+        event_loop: イベントループの種類（asyncio・uvloop）
+        rate_limits: レート制限。キーはAPI名（dblp, semantic_scholar, unpaywall, arxiv）またはホスト名
+        cache: キャッシュの有効期間
+        timeouts: HTTPリクエストのタイムアウトの設定
+        circuit_breaker: ホストごとのサーキットブレーカーの設定
+        retry: ホストごとのリトライ予算の設定
+        plans: プラン名をキーとするプラン
+        sites: サイト名をキーとする技術ブログのサイト設定
+    """
+
+    user_agent: str = "ArchilogBot/1.0"
+    data_dir: str = DATA_DIR
+    max_connections: int = Field(default=100, gt=0)
+    event_loop: EventLoopName = "asyncio"
+    rate_limits: dict[str, RateLimit] = {}
+    cache: CachePolicy = CachePolicy()
+    timeouts: TimeoutPolicy = TimeoutPolicy()
+    circuit_breaker: CircuitBreakerPolicy = CircuitBreakerPolicy()
+    retry: RetryPolicy = RetryPolicy()
+    plans: dict[str, Plan] = {}
+    sites: dict[str, SiteConfig] = {}
+
+    @model_validator(mode="after")
+    def _check_sites(self) -> "CrawlConfig":
+        for name, plan in self.plans.items():
+            if isinstance(plan, BlogPlan):
+                unknown = set(plan.sites) - set(self.sites)
+                if unknown:
+                    raise ValueError(f"plan {name!r} refers to unknown sites: {sorted(unknown)}")
+        return self
+
+    def select_plans(self, names: list[str] | None = None) -> dict[str, PaperPlan | BlogPlan]:
+        """実行するプランを選びます。
+
+        Args:
+            names: プラン名のリスト。空またはNoneの場合は全てのプラン
+
+        Returns:
+            プラン名をキーとするプラン
+
+        Raises:
+            KeyError: 存在しないプラン名が指定された場合
+        """
+        if not names:
+            return dict(self.plans)
+        unknown = [name for name in names if name not in self.plans]
+        if unknown:
+            raise KeyError(f"unknown plans: {unknown} (available: {sorted(self.plans)})")
+        return {name: self.plans[name] for name in names}
+
+    def plan_sites(self, plan: BlogPlan) -> list[SiteConfig]:
+        """ブログプランの対象サイトを返します。"""
+        return [self.sites[name] for name in plan.sites or self.sites]
+
+
+def load_config(path: str | Path = CONFIG_PATH) -> CrawlConfig:
+    """config.tomlからクロールの設定を読み込みます。
+
+    Args:
+        path: 設定ファイルのパス
+
+    Returns:
+        クロールの設定
+
+    Raises:
+        FileNotFoundError: 設定ファイルが存在しない場合
+        tomllib.TOMLDecodeError: TOMLとして不正な場合
+        pydantic.ValidationError: 設定の値が不正な場合
+    """
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    return CrawlConfig(
+        **config.get("crawl", {}),
+        plans=config.get("plans", {}),
+        sites=parse_sites(config.get("sites", {})),
+    )
@@ -0,0 +1,56 @@
+"""config.tomlの `[sites]` セクションを読み込むモジュール。"""
+
+import tomllib
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from crawler.configs import CONFIG_PATH
+
+
+class SiteConfig(BaseModel):
+    """クロール対象のサイト（技術ブログなど）の設定。
+
+    Attributes:
+        name: サイト名（`[sites.<name>]` のキー）
+        sitemap_url: サイトマップ（またはサイトマップインデックス）のURL
+        start_urls: サイトのURL。`sitemap_url` がない場合、robots.txtに記載されたサイトマップを使用する
+        feed_urls: RSS/AtomフィードのURL
+    """
+
+    name: str
+    sitemap_url: str | None = None
+    start_urls: list[str] = []
+    feed_urls: list[str] = []
+
+
+def load_sites(path: str | Path = CONFIG_PATH) -> dict[str, SiteConfig]:
+    """config.tomlからサイトの設定を読み込みます。
+
+    Args:
+        path: 設定ファイルのパス
+
+    Returns:
+        サイト名をキーとするサイト設定の辞書
+
+    Raises:
+        FileNotFoundError: 設定ファイルが存在しない場合
+        tomllib.TOMLDecodeError: TOMLとして不正な場合
+        pydantic.ValidationError: 設定の値が不正な場合
+    """
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    return parse_sites(config.get("sites", {}))
+
+
+def parse_sites(sites: dict[str, Any]) -> dict[str, SiteConfig]:
+    """`[sites]` テーブルをサイト設定に変換します。
+
+    Args:
+        sites: `[sites]` テーブルの内容
+
+    Returns:
+        サイト名をキーとするサイト設定の辞書
+    """
+    return {name: SiteConfig(name=name, **values) for name, values in sites.items()}
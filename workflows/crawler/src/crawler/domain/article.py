@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class Article(BaseModel):
+    """技術ブログのページから抽出した記事本文を表すドメインモデル（RAG取り込み用）。
+
+    Attributes:
+        url: 記事のURL
+        content_hash: 抽出元のHTMLのSHA-256（内容が変わらない限り再抽出しない）
+        site: 取得元のサイト名
+        title: 記事のタイトル
+        published: 公開日時(UTCのISO 8601形式)
+        text: ナビゲーション等を除いた本文
+        code_blocks: 本文中のコードブロック（`<pre>` の内容）
+        error: 抽出に失敗した場合のエラー内容
+    """
+
+    url: str
+    content_hash: str
+    site: str | None = None
+    title: str | None = None
+    published: str | None = None
+    text: str = ""
+    code_blocks: list[str] = []
+    error: str | None = None
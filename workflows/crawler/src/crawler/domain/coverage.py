@@ -0,0 +1,62 @@
+from pydantic import BaseModel
+
+
+class PlanCoverage(BaseModel):
+    """1つのクロールプランが実行時間の予算内に終えた作業を表すドメインモデル。
+
+    Attributes:
+        plan: プラン名
+        units: 対象の作業単位の数（論文: カンファレンス・年、技術ブログ: フロンティアのURL）
+        completed: 終えた作業単位の数
+        deferred: 次回の実行に持ち越した作業単位
+        papers: 取得した論文数
+        abstracts: 要約のある論文数
+        pdfs: PDFリンクのある論文数
+    """
+
+    plan: str
+    units: int = 0
+    completed: int = 0
+    deferred: list[str] = []
+    papers: int = 0
+    abstracts: int = 0
+    pdfs: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """終えた作業単位の割合。作業単位がない場合は1.0。"""
+        return self.completed / self.units if self.units else 1.0
+
+
+class CoverageReport(BaseModel):
+    """1回の実行で各プランが終えた作業を、実行時間の予算と合わせて表すドメインモデル。
+
+    Attributes:
+        budget: 実行時間の予算(秒)。予算を指定しない場合はNone
+        elapsed: 実行にかかった秒数
+        plans: プラン名をキーとする達成状況
+    """
+
+    budget: float | None = None
+    elapsed: float = 0.0
+    plans: dict[str, PlanCoverage] = {}
+
+    def plan(self, name: str) -> PlanCoverage:
+        """プランの達成状況を返します（なければ作成します）。"""
+        return self.plans.setdefault(name, PlanCoverage(plan=name))
+
+    def summary(self) -> list[str]:
+        """ログに出力する行を返します。"""
+        budget = f"{self.budget:.0f}s" if self.budget is not None else "none"
+        lines = [f"Coverage: elapsed {self.elapsed:.0f}s, budget {budget}"]
+        for name, plan in self.plans.items():
+            line = f"  {name}: {plan.completed}/{plan.units} units ({plan.ratio:.1%})"
+            if plan.papers:
+                line += (
+                    f", papers {plan.papers}, abstracts {plan.abstracts / plan.papers:.1%}, "
+                    f"PDFs {plan.pdfs / plan.papers:.1%}"
+                )
+            if plan.deferred:
+                line += f", deferred: {', '.join(plan.deferred)}"
+            lines.append(line)
+        return lines
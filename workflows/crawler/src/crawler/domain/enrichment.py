@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+
+
+class EnricherStats(BaseModel):
+    """Enricherの補完の実績（コストと収量）を、掲載会場・年ごとに集計したドメインモデル。
+
+    補完の順序を決めるために使います。1秒あたりに埋めた項目数が多いEnricherほど先に実行します。
+
+    Attributes:
+        enricher: Enricherの名前（クラス名）
+        venue: 論文の掲載会場
+        year: 論文の出版年
+        papers: 補完を試みた論文数
+        requests: 送信したリクエスト数
+        seconds: 補完にかかった秒数
+        filled: 埋めた項目（要約・PDFリンク）の数
+    """
+
+    enricher: str
+    venue: str
+    year: int
+    papers: int = 0
+    requests: int = 0
+    seconds: float = 0.0
+    filled: int = 0
+
+    @property
+    def fields_per_second(self) -> float | None:
+        """1秒あたりに埋めた項目数。計測時間がない場合はNone。"""
+        return self.filled / self.seconds if self.seconds > 0 else None
@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+
+
+class FeedEntry(BaseModel):
+    """RSS/Atomフィードの1エントリ（技術ブログの記事）を表すドメインモデル。
+
+    Attributes:
+        url: 記事のURL
+        title: 記事のタイトル
+        published: 公開（更新）日時(UTCのISO 8601形式)
+        summary: 記事の概要
+        feed_url: 取得元のフィードのURL
+        site: 取得元のサイト名（config.tomlの `[sites.<name>]`）
+    """
+
+    url: str
+    title: str | None = None
+    published: str | None = None
+    summary: str | None = None
+    feed_url: str | None = None
+    site: str | None = None
+
+
+class FeedSchedule(BaseModel):
+    """フィードごとのポーリングの状態を表すドメインモデル。
+
+    Attributes:
+        url: フィードのURL
+        site: サイト名
+        etag: 前回取得時のETag
+        last_modified: 前回取得時のLast-Modified
+        interval: ポーリング間隔(秒)。フィードの更新頻度から推定する
+        next_poll_at: 次回のポーリング日時(UNIX時間)
+        last_polled_at: 前回のポーリング日時(UNIX時間)。未取得の場合はNone
+    """
+
+    url: str
+    site: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    interval: float
+    next_poll_at: float = 0.0
+    last_polled_at: float | None = None
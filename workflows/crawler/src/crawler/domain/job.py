@@ -0,0 +1,82 @@
+"""クロールの作業単位(ジョブ)を表すドメインモデル。"""
+
+from enum import StrEnum
+from typing import Any
+
+from pydantic import BaseModel
+
+from .paper import Paper
+
+
+class JobKind(StrEnum):
+    """ジョブの種類。"""
+
+    RETRIEVE = "retrieve"
+    ENRICH = "enrich"
+
+
+class JobStatus(StrEnum):
+    """ジョブの状態。
+
+    - PENDING: 実行待ち（リトライ待ちを含む）
+    - LEASED: ワーカーが実行中（可視性タイムアウトまで他ワーカーから見えない）
+    - DONE: 完了
+    - FAILED: 最大試行回数を超えて失敗（デッドレター）
+    """
+
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    """ジョブキューから取り出された作業単位。
+
+    Attributes:
+        id: ジョブID
+        kind: ジョブの種類
+        key: 冪等性キー。同じキーのジョブは一度しか登録されない
+        payload: ジョブ固有のデータ（RetrieveJobPayload / EnrichJobPayload のdict表現）
+        priority: 優先度（大きいほど先に実行される）
+        attempts: これまでの試行回数（今回のリースを含む）
+        lease_token: リース所有者を識別するトークン
+    """
+
+    id: int
+    kind: JobKind
+    key: str
+    payload: dict[str, Any]
+    priority: int = 0
+    attempts: int = 0
+    lease_token: str | None = None
+
+
+class RetrieveJobPayload(BaseModel):
+    """(カンファレンス, 年, ページ) 単位の論文取得ジョブ。
+
+    Attributes:
+        conf: 対象カンファレンス名
+        year: 対象年
+        page: ページ番号（0始まり）
+        page_size: 1ページあたりの取得件数
+    """
+
+    conf: str
+    year: int
+    page: int = 0
+    page_size: int = 1000
+
+
+class EnrichJobPayload(BaseModel):
+    """(Enricher, DOIバッチ) 単位の論文補完ジョブ。
+
+    Attributes:
+        enricher: 補完に使用するEnricher名
+        papers: 補完対象の論文リスト（DOIを持つもののみ）
+        next_enrichers: このジョブの後に続けて適用するEnricher名のリスト
+    """
+
+    enricher: str
+    papers: list[Paper]
+    next_enrichers: list[str] = []
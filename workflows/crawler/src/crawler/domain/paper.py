@@ -1,3 +1,6 @@
+import hashlib
+from collections.abc import Iterable
+
 from pydantic import BaseModel
 
 
@@ -18,6 +21,9 @@ class Paper(BaseModel):
         ee: 電子版へのリンク（オプション）
         pdf_url: PDF版へのリンク（オプション）
         abstract: 論文の要約（オプション）
+        pdf_url_candidates: `pdf_url` 以外のPDFリンクの候補。`pdf_url` がリンク切れの場合に使用
+        pdf_url_checked: `pdf_url` のリンク切れを確認済みかどうか。確認済みで `pdf_url` がNoneの
+            場合は、有効なPDFリンクがないことを表す
     """
 
     title: str
@@ -29,3 +35,91 @@ class Paper(BaseModel):
     ee: str | None = None
     pdf_url: str | None = None
     abstract: str | None = None
+    pdf_url_candidates: list[str] = []
+    pdf_url_checked: bool = False
+
+    def add_pdf_urls(self, urls: Iterable[str | None], overwrite: bool = False) -> None:
+        """補完元から得たPDFリンクを追加します。
+
+        先頭のURLは `pdf_url` が未設定（または `overwrite` が真）の場合に `pdf_url` に設定し、
+        それ以外は重複を除いて `pdf_url_candidates` に追加します。
+
+        Args:
+            urls: 優先度順のPDFリンク
+            overwrite: 既存の `pdf_url` を上書きするかどうか（上書きされたURLは候補に残る）
+        """
+        for url in urls:
+            if not url or url == self.pdf_url:
+                continue
+            if not self.pdf_url or overwrite:
+                if self.pdf_url:
+                    self.pdf_url_candidates.insert(0, self.pdf_url)
+                self.pdf_url = url
+                # 新しいリンクはまだ確認していない
+                self.pdf_url_checked = False
+                overwrite = False
+                if url in self.pdf_url_candidates:
+                    self.pdf_url_candidates.remove(url)
+            elif url not in self.pdf_url_candidates:
+                self.pdf_url_candidates.append(url)
+
+
+class PaperPage(BaseModel):
+    """論文一覧の検索結果の1ページ。
+
+    パースできなかったヒット（タイトル・掲載会場のない記録など）は `papers` に含まれないため、
+    次のページの有無は `papers` の件数ではなく `offset`・`hits`・`total` で判断します。
+
+    Attributes:
+        papers: パースできた論文
+        offset: このページの先頭のヒット位置（0始まり）
+        hits: このページで返されたヒット数（パースできなかったものを含む）
+        total: 検索条件にヒットした総数
+    """
+
+    papers: list[Paper]
+    offset: int = 0
+    hits: int = 0
+    total: int = 0
+
+    @property
+    def has_next(self) -> bool:
+        """次のページが存在するかどうか。"""
+        return self.hits > 0 and self.offset + self.hits < self.total
+
+
+_DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/")
+
+
+def normalize_doi(doi: str) -> str:
+    """DOIを比較・キー用に正規化します。
+
+    DOIは大文字小文字を区別しないため小文字化し、URL形式や "doi:" 接頭辞を取り除きます。
+
+    Args:
+        doi: 正規化するDOI
+
+    Returns:
+        正規化されたDOI(例: "10.1145/3523227.3546757")
+    """
+    normalized = doi.strip().lower()
+    for prefix in _DOI_PREFIXES:
+        if normalized.startswith(prefix):
+            normalized = normalized[len(prefix) :]
+            break
+    return normalized.removeprefix("doi:").strip()
+
+
+def title_hash(title: str) -> str:
+    """タイトルを正規化してハッシュ化した値を返します。
+
+    大文字小文字・空白・記号の違いを無視するため、英数字のみを残して比較します。
+
+    Args:
+        title: 論文タイトル
+
+    Returns:
+        正規化したタイトルのSHA-1(16進数)
+    """
+    normalized = "".join(ch for ch in title.casefold() if ch.isalnum())
+    return hashlib.sha1(normalized.encode(), usedforsecurity=False).hexdigest()
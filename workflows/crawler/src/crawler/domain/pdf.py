@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from pydantic import BaseModel
+
+
+class PdfFile(BaseModel):
+    """ダウンロード済みのPDFファイルを表すドメインモデル。
+
+    ファイルは内容のSHA-256で一意に識別されます（コンテンツアドレス方式）。
+    同じ内容のPDFが複数のURLから取得された場合も、ファイルは1つだけ保存されます。
+
+    Attributes:
+        url: 取得元のURL
+        sha256: ファイル内容のSHA-256(16進数)
+        path: 保存先のパス
+        size: ファイルサイズ(バイト)
+        content_type: レスポンスのContent-Type
+        downloaded_bytes: 今回の取得で実際に転送したバイト数（キャッシュヒット時は0）
+        elapsed_seconds: 今回の取得にかかった時間(秒)
+    """
+
+    url: str
+    sha256: str
+    path: Path
+    size: int
+    content_type: str | None = None
+    downloaded_bytes: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def throughput_mb_per_s(self) -> float:
+        """今回の取得のスループット(MB/s)。"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.downloaded_bytes / 1_000_000 / self.elapsed_seconds
+
+
+class PdfText(BaseModel):
+    """PDFから抽出したテキストを表すドメインモデル。
+
+    テキストはPDFの内容(SHA-256)ごとに1つだけ保存され、同じPDFを参照する論文で共有されます。
+
+    Attributes:
+        sha256: 抽出元PDFのSHA-256
+        text: 全ページのテキストを改行で連結したもの
+        page_offsets: 各ページの先頭が `text` の何文字目から始まるか
+        dois: このPDFを参照する論文のDOIリスト
+        error: 抽出に失敗した場合のエラー内容（失敗したPDFも再処理しないよう記録する）
+    """
+
+    sha256: str
+    text: str = ""
+    page_offsets: list[int] = []
+    dois: list[str] = []
+    error: str | None = None
+
+    @property
+    def num_pages(self) -> int:
+        """ページ数。"""
+        return len(self.page_offsets)
+
+    def page(self, index: int) -> str:
+        """指定したページ(0始まり)のテキストを返します。"""
+        start = self.page_offsets[index]
+        end = (
+            self.page_offsets[index + 1] - 1
+            if index + 1 < len(self.page_offsets)
+            else len(self.text)
+        )
+        return self.text[start:end]
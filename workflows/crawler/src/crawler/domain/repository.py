@@ -1,13 +1,17 @@
 """ドメイン層のリポジトリインターフェース定義。
 
 このモジュールは、インフラストラクチャ層(APIなど)へのアクセスのための
-抽象インターフェースを提供します。入出力はドメインモデル(Paper)で行います。
+抽象インターフェースを提供します。入出力はドメインモデル(Paper, WebPage)で行います。
 """
 
 import asyncio
-from typing import Literal, Protocol
+from typing import TYPE_CHECKING, ClassVar, Literal, Protocol, runtime_checkable
 
-from .paper import Paper
+from .paper import Paper, PaperPage
+from .web_page import WebPage
+
+if TYPE_CHECKING:
+    from aiolimiter import AsyncLimiter
 
 
 class PaperRetriever(Protocol):
@@ -19,8 +23,18 @@ class PaperRetriever(Protocol):
         year: int,
         semaphore: asyncio.Semaphore,
         h: int = 1000,
+        f: int = 0,
     ) -> list[Paper]: ...
 
+    async def fetch_page(
+        self,
+        conf: Literal["recsys", "kdd", "wsdm", "www", "sigir", "cikm"],
+        year: int,
+        semaphore: asyncio.Semaphore,
+        h: int = 1000,
+        f: int = 0,
+    ) -> PaperPage: ...
+
 
 class PaperEnricher(Protocol):
     """論文データを補完するリポジトリのプロトコル。"""
@@ -31,3 +45,35 @@ class PaperEnricher(Protocol):
         semaphore: asyncio.Semaphore,
         overwrite: bool = False,
     ) -> list[Paper]: ...
+
+
+@runtime_checkable
+class MeteredPaperEnricher(PaperEnricher, Protocol):
+    """補完する項目・送信したリクエスト数・レート制限を公開するEnricherのプロトコル。
+
+    このプロトコルを満たすEnricherは、補完の実績に応じて実行順序が入れ替わり、
+    `FILLED_FIELDS` のいずれかが欠けている論文だけを受け取ります。
+
+    Attributes:
+        FILLED_FIELDS: 補完するPaperの項目名
+        requests: これまでに送信したリクエスト数
+        limiter: リクエストのレート制限（実行時間の見積もりに使う）
+    """
+
+    FILLED_FIELDS: ClassVar[tuple[str, ...]]
+    requests: int
+    limiter: "AsyncLimiter"
+
+
+class PaperSink(Protocol):
+    """論文データを永続化する出力先のプロトコル。"""
+
+    async def write_papers(self, papers: list[Paper]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class WebPageSink(Protocol):
+    """取得したWebページを受け取る出力先のプロトコル。"""
+
+    async def write_pages(self, pages: list[WebPage]) -> None: ...
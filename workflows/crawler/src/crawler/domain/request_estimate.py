@@ -0,0 +1,63 @@
+from pydantic import BaseModel
+
+
+class ServiceEstimate(BaseModel):
+    """1つのサービス（ホスト）へのリクエスト数と、レート制限に従って送り終えるまでの時間の見積もり。
+
+    Attributes:
+        service: サービス名（`[crawl.rate_limits]` のキー）
+        items: 問い合わせ対象の論文・検索クエリの数
+        cached: ネガティブキャッシュにより問い合わせない数
+        requests: 送るリクエスト数（arXivはタイトル検索へのフォールバックを全て含む上限）
+        max_rate: `time_period` 秒あたりのリクエスト数の上限
+        time_period: レート制限の期間(秒)
+    """
+
+    service: str
+    items: int = 0
+    cached: int = 0
+    requests: int = 0
+    max_rate: float
+    time_period: float = 1.0
+
+    @property
+    def seconds(self) -> float:
+        """レート制限に従って全てのリクエストを送るのにかかる秒数。"""
+        return self.requests * self.time_period / self.max_rate
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """問い合わせ対象のうちネガティブキャッシュで省略する割合。"""
+        return self.cached / self.items if self.items else 0.0
+
+
+class RequestEstimate(BaseModel):
+    """クロールを始める前に見積もった、論文のプランが各サービスに送るリクエスト数と時間。
+
+    プランの各段階（論文一覧の取得、Enricherごとの補完）は順に実行されるため、
+    全体の時間はサービスごとの時間の合計で見積もります。
+
+    Attributes:
+        units: 作業単位（カンファレンス, 年）の数
+        papers: 補完する論文数（重複を除く。実績のない作業単位は仮定した論文数）
+        assumed: 論文数の実績がなく、論文数を仮定した作業単位
+        warnings: 見積もりの前提に関する注意
+        services: サービス名をキーとする見積もり
+    """
+
+    units: int = 0
+    papers: int = 0
+    assumed: list[str] = []
+    warnings: list[str] = []
+    services: dict[str, ServiceEstimate] = {}
+
+    @property
+    def seconds(self) -> float:
+        """全てのサービスのリクエストを送り終えるまでの秒数。"""
+        return sum(s.seconds for s in self.services.values())
+
+    @property
+    def bottleneck(self) -> ServiceEstimate | None:
+        """最も時間のかかるサービス。リクエストがない場合はNone。"""
+        busy = [s for s in self.services.values() if s.requests]
+        return max(busy, key=lambda s: s.seconds) if busy else None
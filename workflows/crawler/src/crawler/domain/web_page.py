@@ -0,0 +1,80 @@
+from pydantic import BaseModel
+
+
+class WebPage(BaseModel):
+    """取得したWebページ（技術ブログの記事など）を表すドメインモデル。
+
+    Attributes:
+        url: ページのURL
+        text: レスポンスボディ(HTML)
+        status_code: レスポンスのステータスコード
+        content_type: レスポンスのContent-Type
+        etag: レスポンスのETag（次回の条件付きGETに使用）
+        last_modified: レスポンスのLast-Modified（次回の条件付きGETに使用）
+        site: 取得元のサイト名（config.tomlの `[sites.<name>]`）
+        lastmod: サイトマップ・フィードに記載された更新日時(UTCのISO 8601形式)
+        fetched_at: 取得日時(UNIX時間)
+    """
+
+    url: str
+    text: str
+    status_code: int = 200
+    content_type: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    site: str | None = None
+    lastmod: str | None = None
+    fetched_at: float = 0.0
+
+
+class UrlState(BaseModel):
+    """クロール対象のURLごとの状態（増分クロール用）を表すドメインモデル。
+
+    Attributes:
+        url: URL
+        kind: URLの種類（"sitemap", "feed", "page"）
+        parent: このURLを記載していたサイトマップ・フィードのURL
+        site: サイト名
+        lastmod: サイトマップ・フィードに記載された最新の更新日時
+        etag: 前回取得時のETag
+        last_modified: 前回取得時のLast-Modified
+        synced_lastmod: 前回取得した時点の `lastmod`
+        synced_at: 前回取得した日時(UNIX時間)。未取得の場合はNone
+    """
+
+    url: str
+    kind: str = "page"
+    parent: str | None = None
+    site: str | None = None
+    lastmod: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    synced_lastmod: str | None = None
+    synced_at: float | None = None
+
+    def conditional_headers(self) -> dict[str, str]:
+        """前回取得時の検証子から条件付きGETのヘッダーを作成します。"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class FrontierUrl(BaseModel):
+    """URLフロンティア（クロール待ちのキュー）に登録するURLを表すドメインモデル。
+
+    Attributes:
+        url: URL（登録時に正規化される）
+        priority: 優先度。小さいほど先に取得する
+        site: サイト名
+        parent: このURLを見つけたサイトマップ・フィード・ページのURL
+        lastmod: サイトマップ・フィードに記載された更新日時。前回より新しい場合は再登録できる
+    """
+
+    url: str
+    priority: int = 0
+    site: str | None = None
+    parent: str | None = None
+    lastmod: str | None = None
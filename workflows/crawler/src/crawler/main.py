@@ -1,23 +1,72 @@
-"""DBLPクローラーのメインエントリーポイント。
+"""クローラーのメインエントリーポイント。
 
-このモジュールは、DBLP APIを使用して学術論文情報を収集するクローラーの
-実行エントリーポイントを提供します。
+config.tomlのクロールプラン（`[plans.<name>]`）を読み込み、論文・技術ブログの収集を実行します。
+複数のプランは1つのプロセス内で並行に実行され、HTTPクライアント・レートリミッター・
+robots.txt・出力先を共有します。
+
+    uv run python -m crawler.main               # 全てのプランを実行
+    uv run python -m crawler.main recsys blogs  # 指定したプランのみ実行
+    uv run python -m crawler.main --profile cpu # プロファイリングしながら実行
+    uv run python -m crawler.main --loop uvloop # uvloopで実行（なければasyncio）
+    uv run python -m crawler.main --time-budget 6h # 6時間で終わる分だけ実行し、残りは次回に持ち越す
+    uv run python -m crawler.main --plan        # リクエストを送らずにリクエスト数と時間を見積もる
 """
 
+from __future__ import annotations
+
+import argparse
 import asyncio
+import functools
+import time
+from collections.abc import Callable, Iterable, Sequence
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from loguru import logger
 
-from crawler.domain.paper import Paper
-from crawler.repository import (
-    ArxivRepository,
-    DBLPRepository,
-    SemanticScholarRepository,
-    UnpaywallRepository,
+from crawler.configs import CONFIG_PATH
+from crawler.configs.plan import (
+    SERVICE_NAMES,
+    BlogPlan,
+    Conference,
+    CrawlConfig,
+    EnricherName,
+    PaperPlan,
+    SinkName,
+    load_config,
 )
-from crawler.usecase.fetch_papers import FetchRecSysPapers
-from crawler.utils.http_client import create_http_client
+from crawler.utils.deadline import Deadline, format_duration, parse_duration, within
+from crawler.utils.event_loop import EVENT_LOOPS, run_with_loop
 from crawler.utils.log import setup_logger
+from crawler.utils.profiling import PROFILE_MODES, Profiler, create_profiler
+
+# リポジトリ・ユースケースとその依存関係（httpx・pyarrow・feedparserなど）は、
+# プランが使う分だけを各ファクトリーの中で読み込む（CLIの起動を速くするため）
+if TYPE_CHECKING:
+    import httpx
+    from aiolimiter import AsyncLimiter
+
+    from crawler.domain.coverage import CoverageReport
+    from crawler.domain.feed import FeedEntry
+    from crawler.domain.paper import Paper
+    from crawler.domain.repository import PaperEnricher, PaperSink
+    from crawler.domain.request_estimate import RequestEstimate
+    from crawler.repository import (
+        CarryOverStore,
+        CrawlStateStore,
+        DBLPRepository,
+        EnricherStatsStore,
+        NegativeCache,
+        PaperStore,
+        ParquetPaperSink,
+        SQLiteJobQueue,
+        UrlFrontier,
+    )
+    from crawler.usecase.download_pdfs import DownloadPaperPdfs
+    from crawler.usecase.extract_articles import ExtractArticles
+    from crawler.usecase.extract_pdf_texts import ExtractPdfTexts
+    from crawler.utils.adaptive_timeout import AdaptiveTimeouts
 
 LIMITER_KEY_DBLP = "dblp"
 LIMITER_KEY_SEMANTIC_SCHOLAR = "semantic_scholar"
@@ -25,22 +74,378 @@ LIMITER_KEY_UNPAYWALL = "unpaywall"
 LIMITER_KEY_ARXIV = "arxiv"
 
 
-async def run_crawl_task(
-    usecase: FetchRecSysPapers,
+def service_limiter(
+    config: CrawlConfig, key: str, create_limiter: Callable[[], AsyncLimiter]
+) -> AsyncLimiter:
+    """サービスのレートリミッターを作成します。
+
+    Args:
+        config: クロール全体の設定
+        key: サービス名（`[crawl.rate_limits]` のキー）
+        create_limiter: 設定がない場合に使うリポジトリのデフォルトのリミッターを作成する関数
+
+    Returns:
+        `[crawl.rate_limits]` の設定、なければリポジトリのデフォルトのレートリミッター
+    """
+    from aiolimiter import AsyncLimiter
+
+    limit = config.rate_limits.get(key)
+    return AsyncLimiter(limit.max_rate, limit.time_period) if limit else create_limiter()
+
+
+class CrawlRuntime:
+    """複数のプランで共有するリポジトリ・リミッター・出力先を保持するクラス。
+
+    リポジトリや出力先はプランが最初に必要とした時点で作成し、以降は同じインスタンスを共有します。
+    そのため、並行に実行するプランのリクエストは同じレート制限・robots.txtのキャッシュに従います。
+    作成したリソースは `exit_stack` の終了時に閉じられます。
+
+    Attributes:
+        deadline: 実行時間の予算から決まる締め切り。予算を指定しない場合はNone
+        coverage: 各プランが終えた作業の記録
+    """
+
+    def __init__(
+        self,
+        config: CrawlConfig,
+        client: httpx.AsyncClient,
+        exit_stack: AsyncExitStack,
+        profiler: Profiler | None = None,
+        deadline: Deadline | None = None,
+    ) -> None:
+        """CrawlRuntimeインスタンスを初期化します。
+
+        Args:
+            config: クロール全体の設定
+            client: 共有するHTTPクライアント
+            exit_stack: 作成したリソースを閉じるためのスタック
+            profiler: プランのステージを記録するプロファイラー。省略時は記録しない
+            deadline: 実行時間の予算から決まる締め切り。省略時は全ての作業を終えるまで実行する
+        """
+        from aiolimiter import AsyncLimiter
+
+        from crawler.domain.coverage import CoverageReport
+        from crawler.utils.circuit_breaker import CircuitBreaker, CircuitBreakers
+        from crawler.utils.host_backoff import HostBackoff
+        from crawler.utils.host_limiter import HostLimiters
+        from crawler.utils.robots import RobotsRegistry
+
+        self.config = config
+        self.client = client
+        self.exit_stack = exit_stack
+        self.profiler = profiler or Profiler()
+        self.data_dir = Path(config.data_dir)
+        self.deadline = deadline
+        self.coverage = CoverageReport(budget=deadline.budget if deadline is not None else None)
+
+        # PDFの配信元・技術ブログのホストへのリクエストは全てのプランでレート制限を共有する
+        self.host_limiters = HostLimiters()
+        for host, limit in config.rate_limits.items():
+            if host not in SERVICE_NAMES:
+                self.host_limiters.set(host, AsyncLimiter(limit.max_rate, limit.time_period))
+
+        self.robots = RobotsRegistry(
+            self.data_dir / "robots.db",
+            user_agent=config.user_agent.split("/")[0],
+            ttl=config.cache.robots_ttl,
+        )
+        exit_stack.callback(self.robots.close)
+
+        # 障害中のホストへのリクエストを即座に失敗させ、タイムアウト待ちでクロールが停滞しないようにする
+        policy = config.circuit_breaker
+        self.circuit_breakers = CircuitBreakers(
+            functools.partial(
+                CircuitBreaker,
+                failure_rate_threshold=policy.failure_rate_threshold,
+                slow_call_seconds=policy.slow_call_seconds,
+                window_size=policy.window_size,
+                min_calls=policy.min_calls,
+                open_seconds=policy.open_seconds,
+            )
+        )
+        # 429による一時停止とリトライ予算はホスト単位で全てのプランが共有する
+        self.host_backoff = HostBackoff(
+            budget_ratio=config.retry.budget_ratio, min_retries=config.retry.min_retries
+        )
+
+        self._lock = asyncio.Lock()
+        self._dblp: DBLPRepository | None = None
+        self._paper_store: PaperStore | None = None
+        self._parquet_sinks: dict[bool, ParquetPaperSink] = {}
+        self._enrichers: dict[str, PaperEnricher] = {}
+        self._negative_cache: NegativeCache | None = None
+        self._enricher_stats: EnricherStatsStore | None = None
+        self._carry_over: CarryOverStore | None = None
+        self._job_queues: dict[str, SQLiteJobQueue] = {}
+        self._pdf_downloader: DownloadPaperPdfs | None = None
+        self._pdf_text_extractor: ExtractPdfTexts | None = None
+        self._state_store: CrawlStateStore | None = None
+        self._frontier: UrlFrontier | None = None
+        self._article_extractor: ExtractArticles | None = None
+
+    def limiter(self, key: str, create_limiter: Callable[[], AsyncLimiter]) -> AsyncLimiter:
+        """サービスのレートリミッターを返します。
+
+        Args:
+            key: サービス名（`[crawl.rate_limits]` のキー）
+            create_limiter: 設定がない場合に使うリポジトリのデフォルトのリミッターを作成する関数
+
+        Returns:
+            レートリミッター
+        """
+        return service_limiter(self.config, key, create_limiter)
+
+    async def dblp(self) -> DBLPRepository:
+        """初期化済みのDBLPRepositoryを返します。"""
+        from crawler.repository import DBLPRepository
+
+        async with self._lock:
+            if self._dblp is None:
+                dblp_repo = DBLPRepository(
+                    self.client,
+                    limiter=self.limiter(LIMITER_KEY_DBLP, DBLPRepository.create_limiter),
+                )
+                await dblp_repo.setup()
+                self._dblp = dblp_repo
+        return self._dblp
+
+    async def paper_store(self) -> PaperStore:
+        """論文・PDFテキスト・記事を保存するストアを返します。"""
+        from crawler.repository import PaperStore
+
+        async with self._lock:
+            if self._paper_store is None:
+                self._paper_store = await self.exit_stack.enter_async_context(
+                    PaperStore(self.data_dir / "papers.db")
+                )
+        return self._paper_store
+
+    async def parquet_sink(self, overwrite_partitions: bool = True) -> ParquetPaperSink:
+        """論文をParquetに書き込む出力先を返します。
+
+        Args:
+            overwrite_partitions: 書き込んだパーティションの過去のファイルを置き換えるかどうか。
+                パーティションの一部の論文だけを書き込む場合はFalseにする
+        """
+        from crawler.repository import ParquetPaperSink
+
+        async with self._lock:
+            if overwrite_partitions not in self._parquet_sinks:
+                self._parquet_sinks[
+                    overwrite_partitions
+                ] = await self.exit_stack.enter_async_context(
+                    ParquetPaperSink(
+                        self.data_dir / "papers", overwrite_partitions=overwrite_partitions
+                    )
+                )
+        return self._parquet_sinks[overwrite_partitions]
+
+    async def sinks(
+        self, names: Sequence[SinkName], overwrite_partitions: bool = True
+    ) -> list[PaperSink]:
+        """名前に対応する論文の書き込み先を返します。
+
+        Args:
+            names: 書き込み先の名前
+            overwrite_partitions: Parquetの書き込み先で、書き込んだパーティションの過去のファイルを
+                置き換えるかどうか
+        """
+        sinks: list[PaperSink] = []
+        for name in names:
+            if name == "parquet":
+                sinks.append(await self.parquet_sink(overwrite_partitions))
+            else:
+                sinks.append(await self.paper_store())
+        return sinks
+
+    def enricher(self, name: EnricherName) -> PaperEnricher:
+        """名前に対応するEnricherを返します。"""
+        if name not in self._enrichers:
+            self._enrichers[name] = self._create_enricher(name)
+        return self._enrichers[name]
+
+    def negative_cache(self) -> NegativeCache:
+        """補完で見つからなかった論文を記録するキャッシュを返します。"""
+        from crawler.repository import NegativeCache
+
+        if self._negative_cache is None:
+            self._negative_cache = NegativeCache(
+                self.data_dir / "negative_cache.db",
+                ttl=self.config.cache.negative_ttl,
+                max_ttl=self.config.cache.negative_max_ttl,
+            )
+            self.exit_stack.callback(self._negative_cache.close)
+        return self._negative_cache
+
+    def enricher_stats(self) -> EnricherStatsStore:
+        """Enricherの補完の実績を記録するストアを返します。"""
+        from crawler.repository import EnricherStatsStore
+
+        if self._enricher_stats is None:
+            self._enricher_stats = EnricherStatsStore(self.data_dir / "enricher_stats.db")
+            self.exit_stack.callback(self._enricher_stats.close)
+        return self._enricher_stats
+
+    def carry_over(self) -> CarryOverStore:
+        """実行時間の予算内に終わらなかった作業単位を記録するストアを返します。"""
+        from crawler.repository import CarryOverStore
+
+        if self._carry_over is None:
+            self._carry_over = CarryOverStore(self.data_dir / "carry_over.db")
+            self.exit_stack.callback(self._carry_over.close)
+        return self._carry_over
+
+    def job_queue(self, plan_name: str) -> SQLiteJobQueue:
+        """プランの取得・補完ジョブを登録する永続ジョブキューを返します。"""
+        from crawler.repository import SQLiteJobQueue
+
+        if plan_name not in self._job_queues:
+            queue = SQLiteJobQueue(self.data_dir / "jobs" / f"{plan_name}.db")
+            self.exit_stack.callback(queue.close)
+            self._job_queues[plan_name] = queue
+        return self._job_queues[plan_name]
+
+    def _create_enricher(self, name: EnricherName) -> PaperEnricher:
+        match name:
+            case "semantic_scholar":
+                from crawler.repository import SemanticScholarRepository
+
+                return SemanticScholarRepository(
+                    self.client,
+                    limiter=self.limiter(
+                        LIMITER_KEY_SEMANTIC_SCHOLAR, SemanticScholarRepository.create_limiter
+                    ),
+                    negative_cache=self.negative_cache(),
+                )
+            case "unpaywall":
+                from crawler.repository import UnpaywallRepository
+
+                return UnpaywallRepository(
+                    self.client,
+                    limiter=self.limiter(LIMITER_KEY_UNPAYWALL, UnpaywallRepository.create_limiter),
+                    negative_cache=self.negative_cache(),
+                )
+            case "arxiv":
+                from crawler.repository import ArxivRepository
+
+                return ArxivRepository(
+                    self.client,
+                    limiter=self.limiter(LIMITER_KEY_ARXIV, ArxivRepository.create_limiter),
+                    negative_cache=self.negative_cache(),
+                )
+            case "pdf_link_checker":
+                from crawler.repository import PdfLinkChecker
+
+                checker = PdfLinkChecker(
+                    self.client,
+                    self.data_dir / "pdf_links.db",
+                    host_limiters=self.host_limiters,
+                    alive_ttl=self.config.cache.pdf_link_alive_ttl,
+                    dead_ttl=self.config.cache.pdf_link_dead_ttl,
+                    robots=self.robots,
+                )
+                self.exit_stack.callback(checker.close)
+                return checker
+
+    def pdf_downloader(self) -> DownloadPaperPdfs:
+        """PDFをダウンロードするユースケースを返します。"""
+        from crawler.repository import PdfRepository
+        from crawler.usecase.download_pdfs import DownloadPaperPdfs
+
+        if self._pdf_downloader is None:
+            pdf_repo = PdfRepository(
+                self.client,
+                self.data_dir / "pdfs",
+                host_limiters=self.host_limiters,
+                robots=self.robots,
+            )
+            self.exit_stack.callback(pdf_repo.close)
+            self._pdf_downloader = DownloadPaperPdfs(pdf_repo)
+        return self._pdf_downloader
+
+    async def pdf_text_extractor(self) -> ExtractPdfTexts:
+        """PDFからテキストを抽出するユースケースを返します。"""
+        from crawler.usecase.extract_pdf_texts import ExtractPdfTexts
+
+        paper_store = await self.paper_store()
+        if self._pdf_text_extractor is None:
+            self._pdf_text_extractor = ExtractPdfTexts(paper_store)
+            self.exit_stack.callback(self._pdf_text_extractor.close)
+        return self._pdf_text_extractor
+
+    def state_store(self) -> CrawlStateStore:
+        """URLごとのクロール状態を保存するストアを返します。"""
+        from crawler.repository import CrawlStateStore
+
+        if self._state_store is None:
+            self._state_store = CrawlStateStore(self.data_dir / "crawl_state.db")
+            self.exit_stack.callback(self._state_store.close)
+        return self._state_store
+
+    def frontier(self) -> UrlFrontier:
+        """技術ブログの記事を巡回するURLフロンティアを返します。"""
+        from crawler.repository import UrlFrontier
+
+        if self._frontier is None:
+            self._frontier = UrlFrontier(
+                self.data_dir / "frontier.db", self.client, robots=self.robots
+            )
+            self.exit_stack.callback(self._frontier.close)
+        return self._frontier
+
+    async def article_extractor(self) -> ExtractArticles:
+        """記事本文を抽出するユースケースを返します。"""
+        from crawler.usecase.extract_articles import ExtractArticles
+
+        paper_store = await self.paper_store()
+        if self._article_extractor is None:
+            self._article_extractor = ExtractArticles(paper_store)
+            self.exit_stack.callback(self._article_extractor.close)
+        return self._article_extractor
+
+
+async def publish_papers(
+    conf: str,
     year: int,
+    enriched_papers: list[Paper],
     semaphore: asyncio.Semaphore,
-) -> list[Paper]:
-    """指定された年のクロールタスクを実行し、結果をログ出力します。
+    sinks: Sequence[PaperSink] = (),
+    pdf_downloader: DownloadPaperPdfs | None = None,
+    pdf_text_extractor: ExtractPdfTexts | None = None,
+    deadline: Deadline | None = None,
+) -> bool:
+    """補完済みのカンファレンス・年の論文を書き込み、PDFを取得して、結果をログ出力します。
+
+    論文の書き込みは締め切りを過ぎていても行い、PDFの取得とテキストの抽出は締め切りで中断します。
+    ダウンロード途中のPDFは次回の実行で続きから取得されます。
 
     Args:
-        usecase: 実行するユースケース
+        conf: カンファレンス名
         year: 対象年
+        enriched_papers: 補完済みの論文リスト
         semaphore: 並列実行制限用セマフォ
+        sinks: 取得結果の書き込み先のリスト
+        pdf_downloader: 指定した場合、`pdf_url` のPDFをダウンロードするユースケース
+        pdf_text_extractor: 指定した場合、ダウンロードしたPDFからテキストを抽出するユースケース
+        deadline: 実行時間の予算から決まる締め切り。省略時はPDFを全て取得する
 
     Returns:
-        取得・補完された論文リスト
+        PDFの取得とテキストの抽出を締め切りまでに終えた場合はTrue
     """
-    enriched_papers = await usecase.execute(year, semaphore)
+    completed = True
+    for sink in sinks:
+        await sink.write_papers(enriched_papers)
+    if pdf_downloader is not None:
+        try:
+            async with within(deadline):
+                pdfs = await pdf_downloader.execute(enriched_papers, semaphore)
+                if pdf_text_extractor is not None:
+                    await pdf_text_extractor.execute(pdfs)
+        except TimeoutError:
+            if deadline is None:
+                raise
+            logger.info(f"{conf} {year}: time budget exhausted, deferring PDFs to the next run")
+            completed = False
 
     # 統計情報のログ出力
     total_papers_count = len(enriched_papers)
@@ -48,57 +453,649 @@ async def run_crawl_task(
         abs_pass_cnt = sum(p.abstract is not None for p in enriched_papers)
         pdf_pass_cnt = sum(p.pdf_url is not None for p in enriched_papers)
         logger.info(
-            f"RecSys {year}, Total papers: {total_papers_count}, "
+            f"{conf} {year}, Total papers: {total_papers_count}, "
             f"Abstract pass rate: {abs_pass_cnt / total_papers_count:.4f} ({abs_pass_cnt}/{total_papers_count}), "
             f"PDF pass rate: {pdf_pass_cnt / total_papers_count:.4f} ({pdf_pass_cnt}/{total_papers_count})"
         )
 
-    return enriched_papers
+    return completed
+
+
+def prioritize_units[U: tuple[str, int]](
+    units: Sequence[U], carried: Iterable[tuple[str, int]]
+) -> list[U]:
+    """論文のプランの作業単位（カンファレンス, 年）を、実行時間の予算内に処理する順に並べます。
+
+    前回の実行から持ち越した作業単位を持ち越した順に先に処理し、残りは新しい年から処理します。
+
+    Args:
+        units: プランの作業単位
+        carried: 前回の実行から持ち越した作業単位
+
+    Returns:
+        処理する順に並べた作業単位
+    """
+    order: dict[tuple[str, int], int] = {}
+    for i, unit in enumerate(carried):
+        order.setdefault(unit, i)
+    first = sorted((unit for unit in units if unit in order), key=lambda unit: order[unit])
+    rest = sorted((unit for unit in units if unit not in order), key=lambda unit: -unit[1])
+    return first + rest
+
+
+async def restore_papers(paper_store: PaperStore, papers: Sequence[Paper]) -> int:
+    """前回までの実行で保存した補完結果（要約・PDFリンクなど）を、取得し直した論文に反映します。
+
+    持ち越した作業単位の論文は前回の実行で一部の補完を終えているため、保存済みの項目を
+    先に埋めておき、欠けている項目だけを補完し直します。
+
+    Args:
+        paper_store: 論文を保存したストア
+        papers: DBLPから取得し直した論文（その場で更新する）
+
+    Returns:
+        保存済みの項目を反映した論文数
+    """
+    from crawler.domain.paper import normalize_doi
+
+    stored = await paper_store.get_many(p.doi for p in papers if p.doi)
+    restored = 0
+    for paper in papers:
+        saved = stored.get(normalize_doi(paper.doi)) if paper.doi else None
+        if saved is None:
+            continue
+        updates = {
+            field: getattr(saved, field)
+            for field in ("type", "ee", "abstract")
+            if getattr(paper, field) is None and getattr(saved, field) is not None
+        }
+        # リンク切れを確認済みの論文は、PDFリンクがない状態も含めて確認結果ごと復元する
+        if paper.pdf_url is None and (saved.pdf_url is not None or saved.pdf_url_checked):
+            updates |= {
+                "pdf_url": saved.pdf_url,
+                "pdf_url_candidates": saved.pdf_url_candidates,
+                "pdf_url_checked": saved.pdf_url_checked,
+            }
+        for field, value in updates.items():
+            setattr(paper, field, value)
+        restored += bool(updates)
+    return restored
+
+
+async def run_paper_plan(runtime: CrawlRuntime, name: str, plan: PaperPlan) -> list[Paper]:
+    """論文のクロールプランを実行します。
+
+    実行時間の予算がある場合は、前回から持ち越した作業単位・新しい年の順に処理し、
+    締め切りまでに終わらなかった作業単位を次回の実行に持ち越します。
+
+    Args:
+        runtime: 共有リソース
+        name: プラン名
+        plan: 実行するプラン
+
+    Returns:
+        取得・補完された論文リスト
+    """
+    from crawler.usecase.dedup_papers import DeduplicatePapers
+    from crawler.usecase.fetch_papers import FetchRecSysPapers
+
+    if plan.job_queue:
+        return await run_paper_plan_jobs(runtime, name, plan)
+
+    sem = asyncio.Semaphore(plan.concurrency)
+    dblp_repo = await runtime.dblp()
+    # リンク切れのPDF URLを除くため、リンク確認はプランの順序に関わらず最後に行う
+    enricher_names = sorted(plan.enrichers, key=lambda e: e == "pdf_link_checker")
+    enrichers = [runtime.enricher(e) for e in enricher_names]
+    sinks = await runtime.sinks(plan.sinks)
+    pdf_downloader = runtime.pdf_downloader() if plan.download_pdfs else None
+    pdf_text_extractor = await runtime.pdf_text_extractor() if plan.extract_pdf_texts else None
+
+    deadline = runtime.deadline
+    units = [(conf, year) for conf in plan.conferences for year in plan.year_range]
+    carry_over = runtime.carry_over() if deadline is not None else None
+    carried: list[tuple[str, int]] = []
+    if carry_over is not None:
+        carried = await asyncio.to_thread(carry_over.load, name)
+        units = prioritize_units(units, carried)
+
+    async def fetch(conf: Conference, year: int) -> list[Paper] | None:
+        try:
+            async with within(deadline):
+                return await FetchRecSysPapers(dblp_repo, enrichers, conf=conf).fetch(year, sem)
+        except TimeoutError:
+            if deadline is None:
+                raise
+            return None
+
+    logger.info(f"Starting plan {name}: {plan.conferences} {plan.years[0]}-{plan.years[1]}")
+    with runtime.profiler.stage(name):
+        # 1. 全てのカンファレンス・年の論文一覧を取得する
+        async with asyncio.TaskGroup() as tg:
+            fetches = {(conf, year): tg.create_task(fetch(conf, year)) for conf, year in units}
+        fetched = {
+            key: papers for key, task in fetches.items() if (papers := task.result()) is not None
+        }
+        deferred = {key for key in units if key not in fetched}
+        if "sqlite" in plan.sinks:
+            # 持ち越した作業単位は、前回の実行で保存した補完結果から続ける
+            restarted = [p for key in carried if key in fetched for p in fetched[key]]
+            if restarted:
+                restored = await restore_papers(await runtime.paper_store(), restarted)
+                logger.info(f"Plan {name}: restored {restored} papers from the previous run")
+
+        # 2. 複数のカンファレンス・年に現れる同じ論文は1回だけ補完し、結果を全ての出現に反映する
+        groups = DeduplicatePapers(plan.dedup).execute(
+            [paper for papers in fetched.values() for paper in papers]
+        )
+        unit_of = {id(paper): key for key, papers in fetched.items() for paper in papers}
+        if deadline is not None:
+            # 予算内に補完しきれない場合に、優先する作業単位の論文から補完する
+            rank = {key: i for i, key in enumerate(units)}
+            groups.groups.sort(key=lambda group: min(rank[unit_of[id(p)]] for p in group))
+        stats_store = runtime.enricher_stats() if plan.enricher_order == "yield" else None
+        fetch_papers = FetchRecSysPapers(dblp_repo, enrichers, stats_store=stats_store)
+        await fetch_papers.enrich(groups.unique, sem, deadline)
+        groups.fan_out()
+        deferred_ids = {id(paper) for paper in fetch_papers.deferred}
+        for group in groups.groups:
+            if id(group[0]) in deferred_ids:
+                deferred.update(unit_of[id(paper)] for paper in group)
+
+        # 3. カンファレンス・年ごとに書き込み、PDFを取得する
+        async with asyncio.TaskGroup() as tg:
+            publishes = {
+                (conf, year): tg.create_task(
+                    publish_papers(
+                        conf,
+                        year,
+                        papers,
+                        sem,
+                        sinks,
+                        pdf_downloader,
+                        pdf_text_extractor,
+                        deadline,
+                    )
+                )
+                for (conf, year), papers in fetched.items()
+                if papers
+            }
+        deferred.update(key for key, task in publishes.items() if not task.result())
+
+    papers = [paper for key in publishes for paper in fetched[key]]
+    coverage = runtime.coverage.plan(name)
+    coverage.units = len(units)
+    coverage.completed = len(units) - len(deferred)
+    coverage.deferred = [f"{conf} {year}" for conf, year in units if (conf, year) in deferred]
+    coverage.papers = len(papers)
+    coverage.abstracts = sum(p.abstract is not None for p in papers)
+    coverage.pdfs = sum(p.pdf_url is not None for p in papers)
+    if carry_over is not None:
+        await asyncio.to_thread(
+            carry_over.replace, name, [unit for unit in units if unit in deferred]
+        )
+        if deferred:
+            logger.info(f"Plan {name}: deferred {len(deferred)} units to the next run")
+    logger.info(f"Plan {name}: total enriched papers: {len(papers)}")
+    return papers
 
 
-async def main() -> None:
-    """クローラーの非同期エントリーポイント。
+async def run_paper_plan_jobs(runtime: CrawlRuntime, name: str, plan: PaperPlan) -> list[Paper]:
+    """論文のクロールプランを永続ジョブキュー経由で実行します（`job_queue = true`）。
+
+    (カンファレンス, 年, ページ) の取得ジョブを登録し、補完を終えた論文から順に書き込んで
+    PDFを取得します。キューを共有する他のプロセスも同じジョブを分担できます。
+    補完ジョブはキューを使わない実行と同じく、重複をまとめてから `enricher_order` の順序で補完します。
+    締め切りまでに終わらなかったジョブはキューに残り、次回の実行で新しい作業単位より先に再開します。
+
+    Args:
+        runtime: 共有リソース
+        name: プラン名
+        plan: 実行するプラン
 
-    ログメッセージを出力後、RecSysのクロール処理を実行します。
+    Returns:
+        このプロセスで取得・補完した論文リスト
     """
-    headers = {"User-Agent": "ArchilogBot/1.0"}
-    sem = asyncio.Semaphore(100)
-    years = range(2010, 2026)
-    # years = range(2025, 2026)
+    from crawler.domain.job import JobStatus
+    from crawler.usecase.crawl_jobs import CrawlJobWorker, DedupEnricher
+    from crawler.usecase.fetch_papers import FetchRecSysPapers
+
+    sem = asyncio.Semaphore(plan.concurrency)
+    dblp_repo = await runtime.dblp()
+    # リンク切れのPDF URLを除くため、リンク確認はプランの順序に関わらず最後に行う
+    enricher_names = sorted(plan.enrichers, key=lambda e: e == "pdf_link_checker")
+    enrichers = [runtime.enricher(e) for e in enricher_names]
+    # 1回の実行はリースしたジョブの論文（パーティションの一部）だけを書き込むため、
+    # 過去の実行や他のプロセスが書いたParquetファイルは置き換えずに追記する
+    sinks = await runtime.sinks(plan.sinks, overwrite_partitions=False)
+    pdf_downloader = runtime.pdf_downloader() if plan.download_pdfs else None
+    pdf_text_extractor = await runtime.pdf_text_extractor() if plan.extract_pdf_texts else None
+    deadline = runtime.deadline
+    papers: list[Paper] = []
 
-    # 各サービスのレートリミッターを作成（全体で共有）
+    async def on_papers(batch: list[Paper]) -> None:
+        papers.extend(batch)
+        await publish_papers(
+            batch[0].venue,
+            batch[0].year,
+            batch,
+            sem,
+            sinks,
+            pdf_downloader,
+            pdf_text_extractor,
+            deadline,
+        )
+
+    queue = runtime.job_queue(name)
+    stats_store = runtime.enricher_stats() if plan.enricher_order == "yield" else None
+    fetch_papers = FetchRecSysPapers(dblp_repo, enrichers, stats_store=stats_store)
+    worker = CrawlJobWorker(
+        queue,
+        dblp_repo,
+        {"enrich": DedupEnricher(fetch_papers, plan.dedup)} if enrichers else {},
+        on_papers=on_papers,
+    )
+    # キューに残った作業単位を先に、残りは新しい年から処理する（キューを使わない実行と同じ順序）
+    units = [(conf, year) for conf in plan.conferences for year in plan.year_range]
+    units = prioritize_units(units, await worker.unfinished_units())
+    priorities: dict[tuple[str, int], int] = {unit: len(units) - i for i, unit in enumerate(units)}
+    await worker.prioritize_units(priorities)
+    for conf in plan.conferences:
+        await worker.enqueue_retrieval(
+            conf,
+            plan.year_range,
+            FetchRecSysPapers.DBLP_PAGE_SIZE,
+            priorities={year: priorities[(conf, year)] for year in plan.year_range},
+        )
+
+    logger.info(f"Starting plan {name} with job queue {queue.path}")
+    with runtime.profiler.stage(name):
+        try:
+            async with within(deadline):
+                await worker.run(sem, concurrency=plan.job_workers)
+        except TimeoutError:
+            if deadline is None:
+                raise
+            logger.info(f"Plan {name}: time budget exhausted, remaining jobs stay in the queue")
+
+    counts = await queue.counts()
+    remaining = counts[JobStatus.PENDING] + counts[JobStatus.LEASED]
+    coverage = runtime.coverage.plan(name)
+    coverage.units = sum(counts.values())
+    coverage.completed = counts[JobStatus.DONE]
+    if remaining:
+        coverage.deferred.append(f"{remaining} jobs in queue")
+    coverage.papers = len(papers)
+    coverage.abstracts = sum(p.abstract is not None for p in papers)
+    coverage.pdfs = sum(p.pdf_url is not None for p in papers)
+    logger.info(f"Plan {name}: total enriched papers: {len(papers)}")
+    return papers
+
+
+async def run_blog_plan(runtime: CrawlRuntime, name: str, plan: BlogPlan) -> int:
+    """技術ブログのクロールプランを実行します。
+
+    サイトマップの差分で更新された記事を取得し、フィードの新着記事はURLフロンティア経由で取得します。
+    実行時間の予算がある場合は、締め切りを過ぎたステージを省略し、フロンティアに残ったURLは
+    次回の実行で取得します。
+
+    Args:
+        runtime: 共有リソース
+        name: プラン名
+        plan: 実行するプラン
+
+    Returns:
+        取得したページ数
+    """
+    from crawler.domain.web_page import FrontierUrl
+    from crawler.repository import FeedRepository, SitemapRepository, WebPageRepository
+    from crawler.usecase.crawl_frontier import CrawlFrontier
+    from crawler.usecase.poll_feeds import PollFeeds
+    from crawler.usecase.sync_blogs import SyncBlogSitemaps
+
+    sem = asyncio.Semaphore(plan.concurrency)
+    sites = runtime.config.plan_sites(plan)
+    state_store = runtime.state_store()
+    page_repo = WebPageRepository(
+        runtime.client, host_limiters=runtime.host_limiters, robots=runtime.robots
+    )
+    extractor = await runtime.article_extractor() if plan.extract_articles else None
+
+    deadline = runtime.deadline
+    coverage = runtime.coverage.plan(name)
+    logger.info(f"Starting plan {name}: {[site.name for site in sites]}")
+    sinks = [extractor] if extractor is not None else []
+    sitemap_sync = SyncBlogSitemaps(
+        SitemapRepository(
+            runtime.client, state_store, host_limiters=runtime.host_limiters, robots=runtime.robots
+        ),
+        page_repo,
+        state_store,
+        sinks=sinks,
+    )
+    pages = []
+    if deadline is not None and deadline.expired:
+        coverage.deferred.append("sitemaps")
+    else:
+        with runtime.profiler.stage(f"{name}/sitemaps"):
+            try:
+                async with within(deadline):
+                    pages = await sitemap_sync.execute(sites, sem)
+            except TimeoutError:
+                if deadline is None:
+                    raise
+                # 書き込みを終えたサイトは取得済み、残りのサイトは次回の実行で取得する
+                coverage.deferred.append("sitemaps")
+
+    poll_feeds = PollFeeds(
+        FeedRepository(
+            runtime.client, state_store, host_limiters=runtime.host_limiters, robots=runtime.robots
+        )
+    )
+    frontier = runtime.frontier()
+    if deadline is not None and deadline.expired:
+        coverage.deferred.append("feeds")
+    else:
+
+        async def add_entries(entries: list[FeedEntry]) -> None:
+            await frontier.add(
+                FrontierUrl(url=e.url, site=e.site, parent=e.feed_url, lastmod=e.published)
+                for e in entries
+            )
+
+        with runtime.profiler.stage(f"{name}/feeds"):
+            try:
+                async with within(deadline):
+                    await poll_feeds.execute(sites, sem, on_entries=add_entries)
+            except TimeoutError:
+                if deadline is None:
+                    raise
+                coverage.deferred.append("feeds")
+    crawler = CrawlFrontier(frontier, page_repo, state_store, sinks=sinks)
+    queued = len(frontier)
+    with runtime.profiler.stage(f"{name}/frontier"):
+        fetched = await crawler.execute(sem, num_workers=plan.num_workers, deadline=deadline)
+
+    remaining = len(frontier)
+    coverage.units = queued
+    coverage.completed = queued - remaining
+    if remaining:
+        coverage.deferred.append(f"{remaining} URLs in frontier")
+    logger.info(f"Plan {name}: fetched {len(pages) + fetched} pages")
+    return len(pages) + fetched
+
+
+def log_latency_stats(adaptive_timeouts: AdaptiveTimeouts) -> None:
+    """ホストごとのレイテンシと調整後の読み取りのタイムアウトをログに出力します。
+
+    Args:
+        adaptive_timeouts: 実行中に記録したレイテンシ
+    """
+    for host, stats in sorted(adaptive_timeouts.stats().items()):
+        read_timeout = f"{stats.read_timeout:.1f}s" if stats.read_timeout is not None else "-"
+        logger.info(
+            f"Latency {host}: n={stats.samples}, p50={stats.p50:.2f}s, p99={stats.p99:.2f}s, "
+            f"read timeout={read_timeout}"
+        )
+
+
+def report_coverage(coverage: CoverageReport, output_dir: Path | None = None) -> None:
+    """各プランが終えた作業をログに出力し、`output_dir` を指定した場合はJSONでも書き込みます。
+
+    Args:
+        coverage: 実行中に記録した各プランの達成状況
+        output_dir: レポートの出力先ディレクトリ。Noneの場合はログのみ
+    """
+    for line in coverage.summary():
+        logger.info(line)
+    if output_dir is not None:
+        path = output_dir / f"coverage-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(coverage.model_dump_json(indent=2))
+        logger.info(f"Wrote coverage report to {path}")
+
+
+def report_request_estimate(estimate: RequestEstimate) -> None:
+    """リクエスト数の見積もりと、最も時間のかかるサービスをログに出力します。
+
+    Args:
+        estimate: 論文のプランのリクエスト数の見積もり
+    """
+    logger.info(f"Plan estimate: {estimate.units} units, {estimate.papers} papers to enrich")
+    for service in estimate.services.values():
+        if not service.items:
+            continue
+        rate = service.max_rate / service.time_period
+        logger.info(
+            f"  {service.service}: {service.requests} requests "
+            f"(cache hit {service.cache_hit_rate:.0%}) at {rate:g} req/s "
+            f"-> {format_duration(service.seconds)}"
+        )
+    logger.info(f"  total: {format_duration(estimate.seconds)}")
+    bottleneck = estimate.bottleneck
+    if bottleneck is not None:
+        share = bottleneck.seconds / estimate.seconds if estimate.seconds else 0.0
+        logger.info(f"  bottleneck: {bottleneck.service} ({share:.0%} of the total)")
+    if estimate.assumed:
+        logger.info(
+            f"  no previous papers for {len(estimate.assumed)} units, their paper counts are assumed"
+        )
+    for warning in estimate.warnings:
+        logger.warning(warning)
+
+
+async def estimate_requests(
+    config: CrawlConfig, plan_names: Sequence[str] | None = None
+) -> RequestEstimate | None:
+    """リクエストを送らずに、論文のプランが各サービスに送るリクエスト数と時間を見積もります。
+
+    前回までの実行で保存した論文とネガティブキャッシュ、設定またはリポジトリのデフォルトの
+    レート制限から見積もります。技術ブログのプランは見積もりません。
+
+    Args:
+        config: クロール全体の設定
+        plan_names: 見積もるプラン名。省略時は全てのプラン
+
+    Returns:
+        論文のプランのリクエスト数の見積もり。論文のプランがない場合はNone
+    """
+    plans = {
+        name: plan
+        for name, plan in config.select_plans(list(plan_names or [])).items()
+        if isinstance(plan, PaperPlan)
+    }
+    if not plans:
+        logger.warning("No paper plans to estimate")
+        return None
+
+    from crawler.repository import (
+        ArxivRepository,
+        DBLPRepository,
+        NegativeCache,
+        PaperStore,
+        SemanticScholarRepository,
+        UnpaywallRepository,
+    )
+    from crawler.usecase.estimate_requests import EstimateRequests
+
+    data_dir = Path(config.data_dir)
+    papers_path = data_dir / "papers.db"
     limiters = {
-        LIMITER_KEY_DBLP: DBLPRepository.create_limiter(),
-        LIMITER_KEY_SEMANTIC_SCHOLAR: SemanticScholarRepository.create_limiter(),
-        LIMITER_KEY_UNPAYWALL: UnpaywallRepository.create_limiter(),
-        LIMITER_KEY_ARXIV: ArxivRepository.create_limiter(),
+        LIMITER_KEY_DBLP: service_limiter(config, LIMITER_KEY_DBLP, DBLPRepository.create_limiter),
+        LIMITER_KEY_SEMANTIC_SCHOLAR: service_limiter(
+            config, LIMITER_KEY_SEMANTIC_SCHOLAR, SemanticScholarRepository.create_limiter
+        ),
+        LIMITER_KEY_UNPAYWALL: service_limiter(
+            config, LIMITER_KEY_UNPAYWALL, UnpaywallRepository.create_limiter
+        ),
+        LIMITER_KEY_ARXIV: service_limiter(
+            config, LIMITER_KEY_ARXIV, ArxivRepository.create_limiter
+        ),
     }
+    negative_path = data_dir / "negative_cache.db"
+    # 見積もりではファイルを作らないよう、既存のストアだけを開く（論文は読み取り専用で開く）
+    async with AsyncExitStack() as stack:
+        paper_store = None
+        if papers_path.exists():
+            paper_store = await stack.enter_async_context(PaperStore(papers_path, read_only=True))
+        negative_cache = None
+        if negative_path.exists():
+            negative_cache = NegativeCache(
+                negative_path,
+                ttl=config.cache.negative_ttl,
+                max_ttl=config.cache.negative_max_ttl,
+            )
+            stack.callback(negative_cache.close)
+        estimate = await EstimateRequests(paper_store, negative_cache, limiters).execute(plans)
+    report_request_estimate(estimate)
+    return estimate
 
-    logger.info(f"Starting crawl for years: {years}")
-
-    # 共有HTTPクライアントを作成
-    async with create_http_client(headers=headers) as client:
-        # 各リポジトリを初期化
-        dblp_repo = DBLPRepository(client, limiter=limiters[LIMITER_KEY_DBLP])
-        await dblp_repo.setup()
-        ss_repo = SemanticScholarRepository(client, limiter=limiters[LIMITER_KEY_SEMANTIC_SCHOLAR])
-        unpaywall_repo = UnpaywallRepository(client, limiter=limiters[LIMITER_KEY_UNPAYWALL])
-        arxiv_repo = ArxivRepository(client, limiter=limiters[LIMITER_KEY_ARXIV])
-        # ユースケースの初期化
-        usecase = FetchRecSysPapers(
-            paper_retriever=dblp_repo,
-            paper_enrichers=[ss_repo, unpaywall_repo, arxiv_repo],
-        )
 
-        tasks = []
+async def run(
+    config: CrawlConfig,
+    plan_names: Sequence[str] | None = None,
+    client: httpx.AsyncClient | None = None,
+    profiler: Profiler | None = None,
+    time_budget: float | None = None,
+) -> CoverageReport | None:
+    """クロールプランを並行に実行します。
+
+    Args:
+        config: クロール全体の設定
+        plan_names: 実行するプラン名。省略時は全てのプラン
+        client: 使用するHTTPクライアント。省略時は設定に基づいて作成する
+        profiler: 実行全体を計測するプロファイラー。省略時は計測しない
+        time_budget: 実行時間の予算(秒)。指定した場合、締め切りまでに終わる作業だけを行い、
+            残りを次回の実行に持ち越す。カバレッジのレポートを `<data_dir>/coverage` に書き込む
+
+    Returns:
+        各プランが終えた作業のレポート。実行するプランがない場合はNone
+    """
+    plans = config.select_plans(list(plan_names or []))
+    if not plans:
+        logger.warning("No crawl plans to run")
+        return None
+
+    deadline = Deadline(time_budget) if time_budget is not None else None
+    started = time.perf_counter()
+
+    from crawler.utils.adaptive_timeout import AdaptiveTimeouts
+    from crawler.utils.circuit_breaker import set_circuit_breakers
+    from crawler.utils.host_backoff import set_host_backoff
+    from crawler.utils.http_client import create_http_client
+    from crawler.utils.robots import set_robots_registry
+
+    profiler = profiler or Profiler()
+    async with profiler, AsyncExitStack() as stack:
+        if client is None:
+            timeouts = config.timeouts
+            adaptive_timeouts = None
+            if timeouts.adaptive:
+                # 応答しなくなったリクエストがセマフォの枠を占有し続けないよう、
+                # 読み取りのタイムアウトをホストごとの普段のレイテンシに合わせて短くする
+                adaptive_timeouts = AdaptiveTimeouts(
+                    percentile=timeouts.percentile,
+                    multiplier=timeouts.multiplier,
+                    min_read_timeout=timeouts.min_read,
+                    max_read_timeout=timeouts.read,
+                    min_samples=timeouts.min_samples,
+                )
+                stack.callback(log_latency_stats, adaptive_timeouts)
+            client = await stack.enter_async_context(
+                create_http_client(
+                    headers={"User-Agent": config.user_agent},
+                    timeout=timeouts.read,
+                    max_connections=config.max_connections,
+                    connect_timeout=timeouts.connect,
+                    adaptive_timeouts=adaptive_timeouts,
+                )
+            )
+        runtime = CrawlRuntime(config, client, stack, profiler, deadline)
+        # robots.txtはプロセス全体で共有し、ディスクにキャッシュして実行をまたいで再利用する
+        set_robots_registry(runtime.robots)
+        stack.callback(set_robots_registry, None)
+        set_circuit_breakers(runtime.circuit_breakers)
+        stack.callback(set_circuit_breakers, None)
+        set_host_backoff(runtime.host_backoff)
+        stack.callback(set_host_backoff, None)
+
         async with asyncio.TaskGroup() as tg:
-            for year in years:
-                tasks.append(tg.create_task(run_crawl_task(usecase, year, sem)))
-        enriched_papers = [paper for task in tasks for paper in task.result()]
+            for name, plan in plans.items():
+                if isinstance(plan, PaperPlan):
+                    tg.create_task(run_paper_plan(runtime, name, plan))
+                else:
+                    tg.create_task(run_blog_plan(runtime, name, plan))
 
-    logger.info(f"Total enriched papers: {len(enriched_papers)}")
+    runtime.coverage.elapsed = time.perf_counter() - started
+    report_coverage(
+        runtime.coverage, runtime.data_dir / "coverage" if deadline is not None else None
+    )
+    return runtime.coverage
 
 
-if __name__ == "__main__":
+def build_parser() -> argparse.ArgumentParser:
+    """コマンドライン引数のパーサーを作成します。"""
+    parser = argparse.ArgumentParser(
+        prog="crawler", description="config.tomlのクロールプランを実行します。"
+    )
+    parser.add_argument("plans", nargs="*", help="実行するプラン名（省略時は全てのプラン）")
+    parser.add_argument("--config", default=CONFIG_PATH, help="設定ファイルのパス")
+    parser.add_argument(
+        "--loop",
+        choices=EVENT_LOOPS,
+        help="イベントループの種類（省略時は設定ファイルの event_loop、既定は asyncio）",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        help=(
+            "プロファイリングのモード。cpu: スタックのサンプリング（flamegraph用のfolded形式）、"
+            "memory: ステージごとのtracemalloc、loop: イベントループの遅延と遅いコールバック"
+        ),
+    )
+    parser.add_argument(
+        "--profile-dir", help="プロファイルのレポートの出力先（省略時は <data_dir>/profiles）"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=parse_duration,
+        metavar="DURATION",
+        help=(
+            "実行時間の予算（例: 6h、90m、1h30m、3600）。締め切りまでに終わる作業を優先順に行い、"
+            "残りは次回の実行に持ち越す"
+        ),
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "リクエストを送らずに、論文のプランがサービスごとに送るリクエスト数と"
+            "レート制限に従ってかかる時間を見積もる"
+        ),
+    )
+    return parser
+
+
+def cli(argv: Sequence[str] | None = None) -> None:
+    """コマンドラインのエントリーポイント。"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    config = load_config(args.config)
+    try:
+        config.select_plans(args.plans)
+    except KeyError as e:
+        parser.error(str(e.args[0]))
+
     setup_logger()
-    asyncio.run(main())
+    if args.plan:
+        asyncio.run(estimate_requests(config, args.plans))
+        return
+    profiler = create_profiler(args.profile, args.profile_dir or Path(config.data_dir) / "profiles")
+    run_with_loop(
+        run(config, args.plans, profiler=profiler, time_budget=args.time_budget),
+        args.loop or config.event_loop,
+    )
+
+
+if __name__ == "__main__":
+    cli()
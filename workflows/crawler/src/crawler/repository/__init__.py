@@ -1,11 +1,82 @@
-from .arxiv_repository import ArxivRepository
-from .dblp_repository import DBLPRepository
-from .semantic_scholar_repository import SemanticScholarRepository
-from .unpaywall_repository import UnpaywallRepository
+"""リポジトリ層。
+
+各リポジトリは初回アクセス時にモジュールごと読み込みます。httpx・pyarrow・feedparserなどの
+依存関係は、プランが実際に使うリポジトリの分だけ読み込まれます。
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .arxiv_repository import ArxivRepository
+    from .carry_over_store import CarryOverStore
+    from .crawl_state_store import CrawlStateStore
+    from .dblp_repository import DBLPRepository
+    from .enricher_stats_store import EnricherStatsStore
+    from .feed_repository import FeedRepository
+    from .job_queue import SQLiteJobQueue
+    from .negative_cache import NegativeCache
+    from .paper_store import PaperStore
+    from .parquet_sink import ParquetPaperSink
+    from .pdf_link_checker import PdfLinkChecker
+    from .pdf_repository import PdfRepository
+    from .semantic_scholar_repository import SemanticScholarRepository
+    from .sitemap_repository import SitemapRepository
+    from .unpaywall_repository import UnpaywallRepository
+    from .url_frontier import UrlFrontier
+    from .web_page_repository import WebPageRepository
+
+# 公開するクラス名 -> 定義しているモジュール
+_MODULES = {
+    "ArxivRepository": "arxiv_repository",
+    "CarryOverStore": "carry_over_store",
+    "CrawlStateStore": "crawl_state_store",
+    "DBLPRepository": "dblp_repository",
+    "EnricherStatsStore": "enricher_stats_store",
+    "FeedRepository": "feed_repository",
+    "NegativeCache": "negative_cache",
+    "PaperStore": "paper_store",
+    "ParquetPaperSink": "parquet_sink",
+    "PdfLinkChecker": "pdf_link_checker",
+    "PdfRepository": "pdf_repository",
+    "SQLiteJobQueue": "job_queue",
+    "SemanticScholarRepository": "semantic_scholar_repository",
+    "SitemapRepository": "sitemap_repository",
+    "UnpaywallRepository": "unpaywall_repository",
+    "UrlFrontier": "url_frontier",
+    "WebPageRepository": "web_page_repository",
+}
 
 __all__ = [
     "ArxivRepository",
+    "CarryOverStore",
+    "CrawlStateStore",
     "DBLPRepository",
+    "EnricherStatsStore",
+    "FeedRepository",
+    "NegativeCache",
+    "PaperStore",
+    "ParquetPaperSink",
+    "PdfLinkChecker",
+    "PdfRepository",
+    "SQLiteJobQueue",
     "SemanticScholarRepository",
+    "SitemapRepository",
     "UnpaywallRepository",
+    "UrlFrontier",
+    "WebPageRepository",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    # 2回目以降は通常の属性として参照される
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -6,7 +6,10 @@ from aiolimiter import AsyncLimiter
 from loguru import logger
 
 from crawler.domain.paper import Paper
+from crawler.repository.negative_cache import NegativeCache, NegativeLookup
+from crawler.utils.circuit_breaker import CircuitOpenError, is_circuit_open
 from crawler.utils.http_utils import get_with_retry
+from crawler.utils.worker_pool import run_in_pool
 
 
 class ArxivRepository:
@@ -21,15 +24,33 @@ class ArxivRepository:
     }
 
     DEFAULT_SLEEP_SECONDS = 1.0
-
-    def __init__(self, client: httpx.AsyncClient, limiter: AsyncLimiter | None = None) -> None:
+    # 論文ごとの取得を並行に行うワーカー数（arXivはレート制限が厳しいため少なくてよい）
+    DEFAULT_NUM_WORKERS = 8
+    # ネガティブキャッシュ上のサービス名
+    NEGATIVE_CACHE_SOURCE = "arxiv"
+    # 補完するPaperの項目
+    FILLED_FIELDS = ("abstract", "pdf_url")
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        limiter: AsyncLimiter | None = None,
+        num_workers: int = DEFAULT_NUM_WORKERS,
+        negative_cache: NegativeCache | None = None,
+    ) -> None:
         """ArxivRepositoryインスタンスを初期化します。
 
         Args:
             client: HTTPリクエストに使用するAsyncClientインスタンス
             limiter: レート制限を行うAsyncLimiterインスタンス。省略時はデフォルト設定を使用。
+            num_workers: `enrich_papers` で論文を並行に処理するワーカー数
+            negative_cache: 0件だった検索クエリを記録するキャッシュ。省略時は毎回問い合わせる。
         """
         self.client = client
+        self.num_workers = num_workers
+        self.negative_cache = negative_cache
+        # 送信したリクエスト数
+        self.requests = 0
         # arXivのレート制限（1リクエスト/秒）を管理するリミッター
         if limiter:
             self.limiter = limiter
@@ -44,7 +65,9 @@ class ArxivRepository:
     ) -> list[Paper]:
         """論文リストにarXivのデータ（Abstract, PDF URL）を付与します。
 
-        DOI検索を試し、失敗した場合はタイトル検索を試みます。
+        DOI検索を試し、失敗した場合はタイトル検索を試みます。ネガティブキャッシュに0件だったことが
+        記録されている検索クエリは、レート制限の枠を使わずにスキップします（DOI検索がスキップされた
+        場合はタイトル検索のみ、両方がスキップされた場合はリクエストを送りません）。
 
         Args:
             papers: 更新対象の論文リスト
@@ -54,79 +77,146 @@ class ArxivRepository:
         Returns:
             更新された論文リスト
         """
-        async with asyncio.TaskGroup() as tg:
-            for paper in papers:
-                tg.create_task(self._enrich_single_paper(paper, semaphore, overwrite))
+        lookup = NegativeLookup(self.NEGATIVE_CACHE_SOURCE)
+        if self.negative_cache:
+            queries = [q for p in papers for q in self.search_queries(p)]
+            lookup = await self.negative_cache.lookup(self.NEGATIVE_CACHE_SOURCE, queries)
+            if lookup.known:
+                logger.info(f"Skip {len(lookup.known)} arXiv queries known to have no results")
+
+        await run_in_pool(
+            papers,
+            lambda paper: self._enrich_single_paper(paper, semaphore, overwrite, lookup),
+            self.num_workers,
+        )
+        if self.negative_cache:
+            await self.negative_cache.update(lookup)
+        if is_circuit_open(self.BASE_URL):
+            logger.warning(f"arXiv enrichment was cut short: circuit for {self.BASE_URL} is open")
         return papers
 
     async def _enrich_single_paper(
-        self, paper: Paper, sem: asyncio.Semaphore, overwrite: bool
+        self,
+        paper: Paper,
+        sem: asyncio.Semaphore,
+        overwrite: bool,
+        lookup: NegativeLookup | None = None,
     ) -> None:
         """単一の論文をarXivデータで更新します。"""
         # 1. DOIで検索、ヒットしなければタイトルで検索を試みる
         fetched_paper = None
         if paper.doi:
-            fetched_paper = await self.fetch_by_doi(paper.doi, sem)
+            fetched_paper = await self.fetch_by_doi(paper.doi, sem, lookup)
 
         if not fetched_paper and paper.title:
-            fetched_paper = await self.fetch_by_title(paper.title, sem)
+            fetched_paper = await self.fetch_by_title(paper.title, sem, lookup)
 
         if fetched_paper:
             # Abstract
             if fetched_paper.abstract and (not paper.abstract or overwrite):
                 paper.abstract = fetched_paper.abstract
-            # PDF URL
-            if fetched_paper.pdf_url and (not paper.pdf_url or overwrite):
-                paper.pdf_url = fetched_paper.pdf_url
+            # PDF URL（既にある場合は代替候補として残す）
+            paper.add_pdf_urls([fetched_paper.pdf_url], overwrite=overwrite)
 
-    async def fetch_by_doi(self, doi: str, sem: asyncio.Semaphore) -> Paper | None:
+    async def fetch_by_doi(
+        self, doi: str, sem: asyncio.Semaphore, lookup: NegativeLookup | None = None
+    ) -> Paper | None:
         """DOIを使用してarXiv APIから論文データを取得します。
 
         Args:
             doi: 論文のDOI
             sem: 並列実行数を制限するセマフォ
+            lookup: ネガティブキャッシュの検索結果。0件だったことが分かっている場合は問い合わせない
 
         Returns:
             Paperオブジェクト（pdf_url, abstractなどの詳細を含む）。取得失敗時はNone。
         """
-        return await self._fetch(f"doi:{doi}", sem)
+        return await self._fetch(self._doi_query(doi), sem, lookup)
 
-    async def fetch_by_title(self, title: str, sem: asyncio.Semaphore) -> Paper | None:
+    async def fetch_by_title(
+        self, title: str, sem: asyncio.Semaphore, lookup: NegativeLookup | None = None
+    ) -> Paper | None:
         """タイトルを使用してarXiv APIから論文データを取得します。
 
         Args:
             title: 論文のタイトル
             sem: 並列実行数を制限するセマフォ
+            lookup: ネガティブキャッシュの検索結果。0件だったことが分かっている場合は問い合わせない
 
         Returns:
             Paperオブジェクト（pdf_url, abstractなどの詳細を含む）。取得失敗時はNone。
         """
+        return await self._fetch(self._title_query(title), sem, lookup)
+
+    @staticmethod
+    def _doi_query(doi: str) -> str:
+        return f"doi:{doi}"
+
+    @staticmethod
+    def _title_query(title: str) -> str:
         # タイトルに含まれるダブルクォートをエスケープ
         escaped_title = title.replace('"', "")
-        return await self._fetch(f'ti:"{escaped_title}"', sem)
+        return f'ti:"{escaped_title}"'
 
-    async def _fetch(self, query: str, sem: asyncio.Semaphore) -> Paper | None:
+    @classmethod
+    def search_queries(cls, paper: Paper) -> list[str]:
+        """論文の補完で送る可能性のある検索クエリを返します。
+
+        DOIの検索で見つからなかった場合に限り、タイトルで検索します。
+        """
+        queries = []
+        if paper.doi:
+            queries.append(cls._doi_query(paper.doi))
+        if paper.title:
+            queries.append(cls._title_query(paper.title))
+        return queries
+
+    async def _fetch(
+        self, query: str, sem: asyncio.Semaphore, lookup: NegativeLookup | None = None
+    ) -> Paper | None:
         """arXiv APIを叩き、最初のヒット結果を返します。
 
+        `lookup` を指定した場合、0件だったクエリをミス、ヒットしたクエリをヒットとして記録します。
+
         Args:
             query: arXiv APIクエリ文字列
             sem: セマフォ
+            lookup: ネガティブキャッシュの検索結果
 
         Returns:
             パースされたPaperオブジェクト。取得失敗やヒットなしの場合はNone。
 
         """
+        # サーキットが開いている間は残りの論文をスキップする（セマフォ・リミッターも待たない）
+        if is_circuit_open(self.BASE_URL):
+            return None
+        # 0件だったことが分かっているクエリはレート制限の枠を使わない
+        if lookup is not None and lookup.is_known(query):
+            return None
         params = {"search_query": query, "start": 0, "max_results": 1}
         try:
-            async with sem, self.limiter:
-                resp = await get_with_retry(
-                    self.client,
-                    f"{self.BASE_URL}/api/query",
-                    params=params,
-                    headers={"Accept": "application/atom+xml"},
-                )
+            # セマフォは送信の間だけ取得し、429による一時停止の間は他のホストに譲る。
+            # リミッターの枠は再送を含む試行ごとに一時停止の解除後に取得する
+            self.requests += 1
+            resp = await get_with_retry(
+                self.client,
+                f"{self.BASE_URL}/api/query",
+                params=params,
+                headers={"Accept": "application/atom+xml"},
+                semaphore=sem,
+                limiter=self.limiter,
+            )
             resp.raise_for_status()
-            return self._parse_xml(resp.text)
+            paper = self._parse_xml(resp.text)
+            if lookup is not None:
+                if paper is None:
+                    lookup.add_miss(query)
+                else:
+                    lookup.add_hit(query)
+            return paper
+        except CircuitOpenError as e:
+            logger.debug(f"Skip arXiv fetch for {query}: {e}")
+            return None
         except Exception as e:
             logger.warning(f"arXiv fetch error for {query}: {e}")
             return None
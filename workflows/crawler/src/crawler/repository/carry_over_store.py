@@ -0,0 +1,85 @@
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from crawler.utils.sqlite import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS carry_over (
+    plan TEXT NOT NULL,
+    conf TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    deferred_at REAL NOT NULL,
+    PRIMARY KEY (plan, conf, year)
+) WITHOUT ROWID;
+"""
+
+
+class CarryOverStore:
+    """実行時間の予算内に終わらなかった論文のプランの作業単位（カンファレンス, 年）を記録するSQLiteのストア。
+
+    次回の実行は、持ち越した作業単位を新しい年より先に処理します。
+    SQLiteへのアクセスはブロッキングです。asyncioのコードからは `asyncio.to_thread` で呼び出してください。
+    """
+
+    def __init__(self, path: str | Path, clock: Callable[[], float] = time.time) -> None:
+        """CarryOverStoreインスタンスを初期化します。
+
+        Args:
+            path: SQLiteファイルのパス
+            clock: 現在時刻(UNIX時間)を返す関数（テスト用）
+        """
+        self.path = Path(path)
+        self.clock = clock
+        self._conn = connect(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """接続を閉じます。"""
+        self._conn.close()
+
+    def load(self, plan: str) -> list[tuple[str, int]]:
+        """プランの持ち越した作業単位を、持ち越した順（同時に持ち越した場合は処理する予定だった順）に返します。"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT conf, year FROM carry_over WHERE plan = ? ORDER BY deferred_at, rank",
+                (plan,),
+            ).fetchall()
+        return [(row["conf"], row["year"]) for row in rows]
+
+    def replace(self, plan: str, units: Iterable[tuple[str, int]]) -> None:
+        """プランの持ち越す作業単位を置き換えます。
+
+        以前から持ち越している作業単位は、持ち越した日時を維持します。
+
+        Args:
+            plan: プラン名
+            units: 今回の実行で終わらなかった作業単位（カンファレンス, 年）。処理する予定だった順に並べる
+        """
+        now = self.clock()
+        units = list(dict.fromkeys(units))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = {
+                    (row["conf"], row["year"]): row["deferred_at"]
+                    for row in self._conn.execute(
+                        "SELECT conf, year, deferred_at FROM carry_over WHERE plan = ?", (plan,)
+                    )
+                }
+                self._conn.execute("DELETE FROM carry_over WHERE plan = ?", (plan,))
+                self._conn.executemany(
+                    "INSERT INTO carry_over (plan, conf, year, rank, deferred_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (plan, conf, year, rank, previous.get((conf, year), now))
+                        for rank, (conf, year) in enumerate(units)
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
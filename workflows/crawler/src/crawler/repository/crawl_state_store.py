@@ -0,0 +1,209 @@
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+from crawler.domain.feed import FeedSchedule
+from crawler.domain.web_page import UrlState
+from crawler.utils.sqlite import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS url_states (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    parent TEXT,
+    site TEXT,
+    lastmod TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    synced_lastmod TEXT,
+    synced_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_url_states_parent ON url_states (parent, kind);
+CREATE TABLE IF NOT EXISTS feed_schedules (
+    url TEXT PRIMARY KEY,
+    site TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    interval REAL NOT NULL,
+    next_poll_at REAL NOT NULL,
+    last_polled_at REAL
+) WITHOUT ROWID;
+"""
+
+# 発見時は更新日時と親のみを更新し、前回の取得状態(synced_*, 検証子)は保持する
+_DISCOVER = """
+INSERT INTO url_states (url, kind, parent, site, lastmod) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    kind = excluded.kind,
+    parent = excluded.parent,
+    site = COALESCE(excluded.site, url_states.site),
+    lastmod = COALESCE(excluded.lastmod, url_states.lastmod)
+"""
+
+_SYNCED = """
+INSERT INTO url_states
+    (url, kind, parent, site, lastmod, etag, last_modified, synced_lastmod, synced_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    site = COALESCE(excluded.site, url_states.site),
+    lastmod = COALESCE(excluded.lastmod, url_states.lastmod),
+    etag = excluded.etag,
+    last_modified = excluded.last_modified,
+    synced_lastmod = COALESCE(excluded.synced_lastmod, url_states.lastmod),
+    synced_at = excluded.synced_at
+"""
+
+_SAVE_SCHEDULE = """
+INSERT OR REPLACE INTO feed_schedules
+    (url, site, etag, last_modified, interval, next_poll_at, last_polled_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# 未取得、またはサイトマップ上の更新日時が前回取得時より新しいページ
+_PENDING = """
+SELECT * FROM url_states
+WHERE parent = ? AND kind = 'page'
+  AND (synced_at IS NULL OR (lastmod IS NOT NULL AND
+       (synced_lastmod IS NULL OR lastmod > synced_lastmod)))
+ORDER BY lastmod DESC
+"""
+
+
+class CrawlStateStore:
+    """サイトマップ・フィード・ページのURLごとのクロール状態をSQLiteに保存するストア。
+
+    サイトマップに記載された `<lastmod>` と、前回取得した時点の `<lastmod>`・ETag・
+    Last-Modifiedを記録し、次回の実行で新規・更新されたページだけを取得できるようにします。
+    フィードについては、更新頻度から推定したポーリング間隔と次回のポーリング日時も記録します。
+
+    SQLiteへのアクセスはブロッキングです。asyncioのコードからは `asyncio.to_thread`
+    経由で呼び出してください（サイトマップの解析スレッドからは直接呼び出せます）。
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """CrawlStateStoreインスタンスを初期化します。
+
+        Args:
+            path: SQLiteファイルのパス
+        """
+        self.path = Path(path)
+        self._conn = connect(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """接続を閉じます。"""
+        self._conn.close()
+
+    def get(self, url: str) -> UrlState | None:
+        """URLの状態を返します。未登録の場合はNone。"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM url_states WHERE url = ?", (url,)).fetchone()
+        return UrlState(**dict(row)) if row else None
+
+    def children(self, parent: str, kind: str) -> list[UrlState]:
+        """サイトマップ・フィードに記載されていたURLの状態を返します。
+
+        Args:
+            parent: 親のサイトマップ・フィードのURL
+            kind: URLの種類
+
+        Returns:
+            URLの状態のリスト
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM url_states WHERE parent = ? AND kind = ? ORDER BY url",
+                (parent, kind),
+            ).fetchall()
+        return [UrlState(**dict(row)) for row in rows]
+
+    def pending_pages(self, parent: str) -> list[UrlState]:
+        """親のサイトマップ・フィードに記載されたページのうち、未取得または更新されたものを返します。
+
+        Args:
+            parent: 親のサイトマップ・フィードのURL
+
+        Returns:
+            取得が必要なページの状態のリスト（更新日時の新しい順）
+        """
+        with self._lock:
+            rows = self._conn.execute(_PENDING, (parent,)).fetchall()
+        return [UrlState(**dict(row)) for row in rows]
+
+    def discover(self, states: Iterable[UrlState]) -> None:
+        """サイトマップ・フィードで見つけたURLと更新日時を記録します。
+
+        前回の取得状態は変更しません。
+
+        Args:
+            states: 見つけたURLの状態
+        """
+        rows = [(s.url, s.kind, s.parent, s.site, s.lastmod) for s in states]
+        self._executemany(_DISCOVER, rows)
+
+    def mark_synced(self, states: Iterable[UrlState]) -> None:
+        """URLを取得済みとして記録します。
+
+        取得時点の更新日時には `lastmod`（省略した場合は記録済みの `lastmod`）を記録します。
+
+        Args:
+            states: 取得したURLの状態（検証子を含む）
+        """
+        now = time.time()
+        rows = [
+            (
+                s.url,
+                s.kind,
+                s.parent,
+                s.site,
+                s.lastmod,
+                s.etag,
+                s.last_modified,
+                s.lastmod,
+                now,
+            )
+            for s in states
+        ]
+        self._executemany(_SYNCED, rows)
+
+    def feed_schedule(self, url: str) -> FeedSchedule | None:
+        """フィードのポーリングの状態を返します。未登録の場合はNone。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM feed_schedules WHERE url = ?", (url,)
+            ).fetchone()
+        return FeedSchedule(**dict(row)) if row else None
+
+    def save_feed_schedules(self, schedules: Iterable[FeedSchedule]) -> None:
+        """フィードのポーリングの状態を保存します。
+
+        Args:
+            schedules: 保存する状態
+        """
+        rows = [
+            (
+                s.url,
+                s.site,
+                s.etag,
+                s.last_modified,
+                s.interval,
+                s.next_poll_at,
+                s.last_polled_at,
+            )
+            for s in schedules
+        ]
+        self._executemany(_SAVE_SCHEDULE, rows)
+
+    def _executemany(self, sql: str, rows: Sequence[tuple[object, ...]]) -> None:
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
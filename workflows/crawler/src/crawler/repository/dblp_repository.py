@@ -5,9 +5,10 @@ import httpx
 from aiolimiter import AsyncLimiter
 from loguru import logger
 
-from crawler.domain.paper import Paper
-from crawler.utils import RobotGuard
+from crawler.domain.paper import Paper, PaperPage
 from crawler.utils.http_utils import get_with_retry
+from crawler.utils.robot_guard import RobotGuard
+from crawler.utils.robots import get_robots_registry
 
 
 class DBLPRepository:
@@ -35,8 +36,13 @@ class DBLPRepository:
         """リポジトリの初期化処理を実行します。
 
         robots.txtをロードします。この関数は使用前に一度呼び出す必要があります。
+        RobotsRegistryが登録されている場合は、そのキャッシュ済みのrobots.txtを使用します。
         """
-        await self.robot_guard.load(client=self.client)
+        registry = get_robots_registry()
+        if registry is not None:
+            self.robot_guard = await registry.guard(self.client, self.BASE_URL)
+        else:
+            await self.robot_guard.load(client=self.client)
 
     async def fetch_papers(
         self,
@@ -44,25 +50,57 @@ class DBLPRepository:
         year: int,
         semaphore: asyncio.Semaphore,
         h: int = 1000,
+        f: int = 0,
     ) -> list[Paper]:
         """指定されたカンファレンスと年度の論文情報を取得します。
 
+        次のページの有無を判断する場合は、ヒット数を返す `fetch_page` を使ってください。
+
         Args:
             conf: 対象カンファレンス名
             year: 対象年度
             semaphore: 並列実行数を制限するセマフォ
             h: 取得する最大論文数（デフォルト: 1000）
+            f: 取得を開始するヒット位置（0始まり、ページングに使用）
 
         Returns:
             Paperオブジェクトのリスト
 
+        Raises:
+            RuntimeError: クライアントが初期化されていない場合
+            PermissionError: robots.txtでクロールが拒否されている場合
+            httpx.HTTPStatusError: APIリクエストが失敗した場合
+        """
+        page = await self.fetch_page(conf, year, semaphore, h=h, f=f)
+        return page.papers
+
+    async def fetch_page(
+        self,
+        conf: Literal["recsys", "kdd", "wsdm", "www", "sigir", "cikm"],
+        year: int,
+        semaphore: asyncio.Semaphore,
+        h: int = 1000,
+        f: int = 0,
+    ) -> PaperPage:
+        """指定されたカンファレンスと年度の論文一覧の1ページを、ヒット数とともに取得します。
+
+        Args:
+            conf: 対象カンファレンス名
+            year: 対象年度
+            semaphore: 並列実行数を制限するセマフォ
+            h: 取得する最大論文数（デフォルト: 1000）
+            f: 取得を開始するヒット位置（0始まり、ページングに使用）
+
+        Returns:
+            パースできた論文と、DBLPの `@sent`・`@total` から得たヒット数
+
         Raises:
             RuntimeError: クライアントが初期化されていない場合
             PermissionError: robots.txtでクロールが拒否されている場合
             httpx.HTTPStatusError: APIリクエストが失敗した場合
         """
         if not self.robot_guard.loaded:
-            await self.robot_guard.load(client=self.client)
+            await self.setup()
 
         # robots.txtのチェック
         if not self.robot_guard.can_fetch(self.SEARCH_API):
@@ -75,15 +113,23 @@ class DBLPRepository:
             "format": "json",
             "h": h,
         }
+        if f:
+            params["f"] = f
 
         try:
-            # セマフォを使用してリクエスト並列数を制御
-            async with semaphore, self.limiter:
-                resp = await get_with_retry(self.client, self.SEARCH_API, params=params)
+            # セマフォを使用してリクエスト並列数を制御（429による一時停止の間は保持しない）。
+            # リミッターの枠は再送を含む試行ごとに一時停止の解除後に取得する
+            resp = await get_with_retry(
+                self.client,
+                self.SEARCH_API,
+                params=params,
+                semaphore=semaphore,
+                limiter=self.limiter,
+            )
 
             resp.raise_for_status()
             data = resp.json()
-            return self._parse_papers(data)
+            return self._parse_page(data, offset=f)
 
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error occurred: {e.response.status_code} - {e.response.text}")
@@ -92,6 +138,18 @@ class DBLPRepository:
             logger.error(f"Request error occurred: {e}")
             raise
 
+    def _parse_page(self, data: dict[str, Any], offset: int = 0) -> PaperPage:
+        """APIレスポンスから論文と、このページ・全体のヒット数を取り出します。"""
+        papers = self._parse_papers(data)
+        try:
+            hits_container = data["result"]["hits"]
+            total = int(hits_container["@total"])
+            hits = int(hits_container.get("@sent", len(hits_container.get("hit", []))))
+        except (KeyError, ValueError, TypeError):
+            # 解析できないレスポンスでは次のページを要求しない
+            return PaperPage(papers=papers, offset=offset, hits=len(papers), total=0)
+        return PaperPage(papers=papers, offset=offset, hits=hits, total=total)
+
     def _parse_papers(self, data: dict[str, Any]) -> list[Paper]:
         """APIレスポンスからPaperオブジェクトのリストを生成します。"""
         try:
@@ -0,0 +1,74 @@
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from crawler.domain.enrichment import EnricherStats
+from crawler.utils.sqlite import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enricher_stats (
+    enricher TEXT NOT NULL,
+    venue TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    papers INTEGER NOT NULL,
+    requests INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    filled INTEGER NOT NULL,
+    PRIMARY KEY (enricher, venue, year)
+) WITHOUT ROWID;
+"""
+
+# 実行ごとの実績を累積する
+_ADD = """
+INSERT INTO enricher_stats (enricher, venue, year, papers, requests, seconds, filled)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (enricher, venue, year) DO UPDATE SET
+    papers = enricher_stats.papers + excluded.papers,
+    requests = enricher_stats.requests + excluded.requests,
+    seconds = enricher_stats.seconds + excluded.seconds,
+    filled = enricher_stats.filled + excluded.filled
+"""
+
+
+class EnricherStatsStore:
+    """Enricherの補完の実績（`EnricherStats`）を、Enricher・掲載会場・年ごとに累積するSQLiteのストア。
+
+    SQLiteへのアクセスはブロッキングです。asyncioのコードからは `asyncio.to_thread` で呼び出してください。
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """EnricherStatsStoreインスタンスを初期化します。
+
+        Args:
+            path: SQLiteファイルのパス
+        """
+        self.path = Path(path)
+        self._conn = connect(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """接続を閉じます。"""
+        self._conn.close()
+
+    def load(self) -> list[EnricherStats]:
+        """記録済みの全ての実績を返します。"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM enricher_stats").fetchall()
+        return [EnricherStats(**dict(row)) for row in rows]
+
+    def add(self, stats: Iterable[EnricherStats]) -> None:
+        """実績を既存の値に加算して保存します。"""
+        rows = [
+            (s.enricher, s.venue, s.year, s.papers, s.requests, s.seconds, s.filled) for s in stats
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(_ADD, rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
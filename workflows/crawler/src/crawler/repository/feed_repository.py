@@ -0,0 +1,165 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+import httpx
+from loguru import logger
+
+from crawler.domain.feed import FeedEntry, FeedSchedule
+from crawler.domain.web_page import UrlState
+from crawler.repository.crawl_state_store import CrawlStateStore
+from crawler.utils.feed import estimate_interval, parse_feed
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry, get_robots_registry
+
+
+class FeedTooLargeError(Exception):
+    """フィードがサイズ上限を超えた場合の例外。"""
+
+
+class FeedRepository:
+    """RSS/Atomフィードをポーリングし、新規・更新された記事を返すリポジトリクラス。
+
+    - ETag/Last-Modifiedによる条件付きGETで取得し、変更がなければ304で済ませます
+    - 解析はスレッドで実行し、イベントループをブロックしません
+    - 次回のポーリング日時を、エントリの公開日時から推定した更新頻度で決めます
+      （更新がなければ間隔を徐々に延ばします）
+    """
+
+    DEFAULT_INTERVAL_SECONDS = 60 * 60
+    MIN_INTERVAL_SECONDS = 15 * 60
+    MAX_INTERVAL_SECONDS = 24 * 60 * 60
+    # 更新がなかった場合に間隔を延ばす倍率
+    BACKOFF_FACTOR = 1.5
+    MAX_BYTES = 10 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        state_store: CrawlStateStore,
+        host_limiters: HostLimiters | None = None,
+        robots: RobotsRegistry | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """FeedRepositoryインスタンスを初期化します。
+
+        Args:
+            client: HTTPリクエストに使用するAsyncClientインスタンス
+            state_store: フィードのポーリング状態と記事の取得状態を保存するストア
+            host_limiters: ホストごとのレートリミッター。省略時はデフォルト設定を使用。
+            robots: robots.txtのレジストリ。省略時は登録済みのもの（なければメモリ上のみのもの）を使用。
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.client = client
+        self.state_store = state_store
+        self.host_limiters = host_limiters or HostLimiters()
+        self.robots = robots or get_robots_registry() or RobotsRegistry()
+        self.clock = clock
+
+    async def is_due(self, feed_url: str) -> bool:
+        """フィードが次回のポーリング日時を過ぎているかを返します。"""
+        schedule = await asyncio.to_thread(self.state_store.feed_schedule, feed_url)
+        return schedule is None or schedule.next_poll_at <= self.clock()
+
+    async def poll(
+        self, feed_url: str, sem: asyncio.Semaphore, site: str | None = None
+    ) -> list[FeedEntry] | None:
+        """フィードを取得し、新規・更新された記事を返します。
+
+        返された記事を取得した後、`CrawlStateStore.mark_synced` で取得済みとして
+        記録してください。記録されなかった記事は、フィードに残っている間は次回も返されます。
+
+        Args:
+            feed_url: フィードのURL
+            sem: 並列実行数を制限するセマフォ
+            site: サイト名
+
+        Returns:
+            新規・更新された記事のリスト。取得・解析に失敗した場合はNone
+        """
+        schedule = await asyncio.to_thread(self.state_store.feed_schedule, feed_url)
+        if schedule is None:
+            schedule = FeedSchedule(url=feed_url, site=site, interval=self.DEFAULT_INTERVAL_SECONDS)
+        now = self.clock()
+        # 失敗した場合は間隔を変えずに次回のポーリングを予約する
+        next_schedule = schedule.model_copy(
+            update={"next_poll_at": now + schedule.interval, "last_polled_at": now}
+        )
+
+        try:
+            entries = await self._fetch(schedule, sem, next_schedule)
+        except (httpx.HTTPError, FeedTooLargeError, ValueError, PermissionError) as e:
+            logger.warning(f"Failed to poll feed {feed_url}: {e!r}")
+            await asyncio.to_thread(self.state_store.save_feed_schedules, [next_schedule])
+            return None
+
+        if entries is None:
+            # 304: 更新なし
+            changed: list[FeedEntry] = []
+        else:
+            parsed, timestamps = entries
+            changed = await asyncio.to_thread(self._ingest, feed_url, site, parsed)
+            if changed:
+                next_schedule.interval = estimate_interval(
+                    timestamps,
+                    default=self.DEFAULT_INTERVAL_SECONDS,
+                    min_interval=self.MIN_INTERVAL_SECONDS,
+                    max_interval=self.MAX_INTERVAL_SECONDS,
+                )
+        if not changed:
+            next_schedule.interval = min(
+                schedule.interval * self.BACKOFF_FACTOR, self.MAX_INTERVAL_SECONDS
+            )
+        next_schedule.next_poll_at = now + next_schedule.interval
+        await asyncio.to_thread(self.state_store.save_feed_schedules, [next_schedule])
+
+        logger.debug(
+            f"Polled feed {feed_url}: {len(changed)} new or updated entries, "
+            f"next poll in {next_schedule.interval / 60:.0f} min"
+        )
+        return changed
+
+    async def _fetch(
+        self, schedule: FeedSchedule, sem: asyncio.Semaphore, next_schedule: FeedSchedule
+    ) -> tuple[list[FeedEntry], list[float]] | None:
+        """フィードを条件付きGETで取得・解析します。304の場合はNone。
+
+        取得に成功した場合、`next_schedule` の検証子を更新します。
+        """
+        url = schedule.url
+        if not await self.robots.can_fetch(self.client, url):
+            raise PermissionError(f"disallowed by robots.txt: {url}")
+
+        headers = UrlState(
+            url=url, etag=schedule.etag, last_modified=schedule.last_modified
+        ).conditional_headers()
+        async with (
+            sem,
+            self.host_limiters.get(url),
+            self.robots.delay_limiter(url),
+            self.client.stream("GET", url, headers=headers, follow_redirects=True) as resp,
+        ):
+            if resp.status_code == 304:
+                return None
+            resp.raise_for_status()
+
+            body = bytearray()
+            async for chunk in resp.aiter_bytes(self.CHUNK_SIZE):
+                body += chunk
+                if len(body) > self.MAX_BYTES:
+                    raise FeedTooLargeError(f"{url} exceeded {self.MAX_BYTES} bytes")
+
+        result = await asyncio.to_thread(parse_feed, bytes(body), url, schedule.site)
+        next_schedule.etag = resp.headers.get("ETag")
+        next_schedule.last_modified = resp.headers.get("Last-Modified")
+        return result
+
+    def _ingest(self, feed_url: str, site: str | None, entries: list[FeedEntry]) -> list[FeedEntry]:
+        """エントリをストアに記録し、未取得・更新されたものを返します（スレッドで実行）。"""
+        self.state_store.discover(
+            UrlState(url=e.url, kind="page", parent=feed_url, site=site, lastmod=e.published)
+            for e in entries
+        )
+        pending = {s.url for s in self.state_store.pending_pages(feed_url)}
+        return [e for e in entries if e.url in pending]
@@ -0,0 +1,398 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from crawler.domain.job import Job, JobKind, JobStatus
+from crawler.utils.sqlite import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_token TEXT,
+    lease_expires_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority DESC, available_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires_at);
+"""
+
+
+class SQLiteJobQueue:
+    """SQLiteをバックエンドとする永続ジョブキュー。
+
+    ジョブは冪等性キーで一意に管理され、同じキーの再登録は無視されます。ただし完了してから
+    `done_ttl` 秒を過ぎたジョブは再登録でき、次回の実行（翌日のクロールなど）で再び実行されます。
+    ワーカーはジョブをリース(可視性タイムアウト付きで取得)し、完了時に `complete`、
+    失敗時に `fail` を呼び出します。リース期限が切れたジョブは再び取得可能になるため、
+    ワーカーが異常終了してもジョブは失われません。失敗したジョブは指数バックオフ後に
+    再実行され、`max_attempts` を超えると FAILED（デッドレター）になります。
+
+    SQLiteへのアクセスは `asyncio.to_thread` で別スレッドから行うため、
+    イベントループをブロックしません。
+    """
+
+    DEFAULT_VISIBILITY_TIMEOUT = 300.0
+    DEFAULT_MAX_ATTEMPTS = 5
+    BACKOFF_BASE_SECONDS = 2.0
+    BACKOFF_MAX_SECONDS = 600.0
+    DEFAULT_DONE_TTL = 12 * 60 * 60
+
+    def __init__(
+        self,
+        path: str | Path,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        done_ttl: float = DEFAULT_DONE_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """SQLiteJobQueueインスタンスを初期化します。
+
+        Args:
+            path: SQLiteファイルのパス
+            visibility_timeout: リースの有効期間(秒)。期限切れのジョブは他ワーカーが再取得できる
+            max_attempts: 最大試行回数。超えたジョブはFAILEDになる
+            done_ttl: 完了したジョブの冪等性キーの有効期間(秒)。過ぎると同じキーで再登録できる
+            clock: 現在時刻(UNIX秒)を返す関数。テスト用に差し替え可能
+        """
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.done_ttl = done_ttl
+        self.clock = clock
+        self.path = Path(path)
+        self._conn = connect(self.path)
+        self._conn.executescript(_SCHEMA)
+        # 同一接続を複数スレッドから使うため、ステートメント単位で排他する
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """データベース接続を閉じます。"""
+        self._conn.close()
+
+    async def enqueue(
+        self,
+        kind: JobKind,
+        key: str,
+        payload: dict[str, Any],
+        priority: int = 0,
+    ) -> bool:
+        """ジョブを登録します。
+
+        Args:
+            kind: ジョブの種類
+            key: 冪等性キー
+            payload: ジョブ固有のデータ
+            priority: 優先度（大きいほど先に実行される）
+
+        Returns:
+            新規に登録された（期限切れの完了ジョブを再登録した）場合はTrue、
+            同じキーのジョブが既に存在した場合はFalse
+        """
+        inserted = await self.enqueue_many([(kind, key, payload, priority)])
+        return inserted == 1
+
+    async def enqueue_many(self, jobs: list[tuple[JobKind, str, dict[str, Any], int]]) -> int:
+        """複数のジョブを1トランザクションで登録します。
+
+        Args:
+            jobs: (kind, key, payload, priority) のリスト
+
+        Returns:
+            新規に登録された（期限切れの完了ジョブを再登録した）ジョブ数
+        """
+        if not jobs:
+            return 0
+        return await asyncio.to_thread(self._enqueue_many, jobs)
+
+    def _enqueue_many(self, jobs: list[tuple[JobKind, str, dict[str, Any], int]]) -> int:
+        now = self.clock()
+        expired = now - self.done_ttl
+        rows = [
+            (
+                str(kind),
+                key,
+                json.dumps(payload),
+                priority,
+                JobStatus.PENDING.value,
+                now,
+                now,
+                now,
+                JobStatus.DONE.value,
+                expired,
+            )
+            for kind, key, payload, priority in jobs
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                # 完了から `done_ttl` を過ぎたジョブだけを実行待ちに戻し、それ以外の重複は無視する
+                self._conn.executemany(
+                    "INSERT INTO jobs"
+                    " (kind, key, payload, priority, status, available_at, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE SET kind = excluded.kind,"
+                    " payload = excluded.payload, priority = excluded.priority,"
+                    " status = excluded.status, attempts = 0,"
+                    " available_at = excluded.available_at, lease_token = NULL,"
+                    " lease_expires_at = NULL, last_error = NULL,"
+                    " created_at = excluded.created_at, updated_at = excluded.updated_at"
+                    " WHERE jobs.status = ? AND jobs.updated_at <= ?",
+                    rows,
+                )
+                inserted = self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    async def lease(self, limit: int = 1, kind: JobKind | None = None) -> list[Job]:
+        """実行可能なジョブを優先度順にリースします。
+
+        PENDINGで実行可能時刻を過ぎたジョブと、リース期限切れのLEASEDジョブが対象です。
+
+        Args:
+            limit: 取得する最大件数
+            kind: 指定した場合、その種類のジョブのみを取得する
+
+        Returns:
+            リースしたジョブのリスト。実行可能なジョブがない場合は空リスト
+        """
+        return await asyncio.to_thread(self._lease, limit, kind)
+
+    def _lease(self, limit: int, kind: JobKind | None) -> list[Job]:
+        now = self.clock()
+        kind_clause = "AND kind = ?" if kind else ""
+        params: list[Any] = [JobStatus.PENDING.value, now, JobStatus.LEASED.value, now]
+        if kind:
+            params.append(str(kind))
+        params.append(limit)
+
+        with self._lock:
+            # BEGIN IMMEDIATEで書き込みロックを先に取り、複数プロセス間での二重リースを防ぐ
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, kind, key, payload, priority, attempts FROM jobs"
+                    " WHERE ((status = ? AND available_at <= ?)"
+                    " OR (status = ? AND lease_expires_at <= ?))"
+                    f" {kind_clause}"
+                    " ORDER BY priority DESC, available_at, id LIMIT ?",
+                    params,
+                ).fetchall()
+                jobs = []
+                for row in rows:
+                    token = uuid.uuid4().hex
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_token = ?,"
+                        " lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                        (
+                            JobStatus.LEASED.value,
+                            token,
+                            now + self.visibility_timeout,
+                            now,
+                            row["id"],
+                        ),
+                    )
+                    jobs.append(
+                        Job(
+                            id=row["id"],
+                            kind=JobKind(row["kind"]),
+                            key=row["key"],
+                            payload=json.loads(row["payload"]),
+                            priority=row["priority"],
+                            attempts=row["attempts"] + 1,
+                            lease_token=token,
+                        )
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return jobs
+
+    async def complete(self, job: Job) -> bool:
+        """リース中のジョブを完了にします。
+
+        Args:
+            job: `lease` で取得したジョブ
+
+        Returns:
+            完了にできた場合はTrue。リースが既に失効し他ワーカーに再取得されていた場合はFalse
+        """
+        return await asyncio.to_thread(self._complete, job)
+
+    def _complete(self, job: Job) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, lease_token = NULL, lease_expires_at = NULL,"
+                " updated_at = ? WHERE id = ? AND lease_token = ?",
+                (JobStatus.DONE.value, self.clock(), job.id, job.lease_token),
+            )
+        if cur.rowcount == 0:
+            logger.warning(f"Lease for job {job.key} was lost before completion")
+            return False
+        return True
+
+    async def fail(self, job: Job, error: str) -> JobStatus | None:
+        """リース中のジョブを失敗として記録します。
+
+        最大試行回数に達していなければ指数バックオフ後に再実行されるようPENDINGに戻し、
+        達していればFAILEDにします。
+
+        Args:
+            job: `lease` で取得したジョブ
+            error: 失敗理由
+
+        Returns:
+            更新後のステータス。リースが既に失効していた場合はNone
+        """
+        return await asyncio.to_thread(self._fail, job, error)
+
+    def _fail(self, job: Job, error: str) -> JobStatus | None:
+        now = self.clock()
+        if job.attempts >= self.max_attempts:
+            status = JobStatus.FAILED
+            available_at = now
+        else:
+            status = JobStatus.PENDING
+            available_at = now + self._backoff(job.attempts)
+
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, last_error = ?,"
+                " lease_token = NULL, lease_expires_at = NULL, updated_at = ?"
+                " WHERE id = ? AND lease_token = ?",
+                (status.value, available_at, error, now, job.id, job.lease_token),
+            )
+        if cur.rowcount == 0:
+            logger.warning(f"Lease for job {job.key} was lost before failure was recorded")
+            return None
+        return status
+
+    def _backoff(self, attempts: int) -> float:
+        """試行回数に応じた待機時間(Full Jitter付き指数バックオフ)を計算します。"""
+        ceiling = min(self.BACKOFF_MAX_SECONDS, self.BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+    async def extend_lease(self, job: Job, seconds: float | None = None) -> bool:
+        """長時間かかるジョブのリース期限を延長します。
+
+        Args:
+            job: `lease` で取得したジョブ
+            seconds: 現在時刻からの延長秒数。省略時は `visibility_timeout`
+
+        Returns:
+            延長できた場合はTrue。リースが既に失効していた場合はFalse
+        """
+        extend = self.visibility_timeout if seconds is None else seconds
+
+        def _extend() -> bool:
+            now = self.clock()
+            with self._lock:
+                cur = self._conn.execute(
+                    "UPDATE jobs SET lease_expires_at = ?, updated_at = ?"
+                    " WHERE id = ? AND lease_token = ? AND status = ?",
+                    (now + extend, now, job.id, job.lease_token, JobStatus.LEASED.value),
+                )
+            return cur.rowcount == 1
+
+        return await asyncio.to_thread(_extend)
+
+    async def unfinished(self, kind: JobKind | None = None) -> list[Job]:
+        """実行待ち・実行中のジョブを、リースされる順に返します（リースはしません）。
+
+        Args:
+            kind: 指定した場合、その種類のジョブのみを返す
+
+        Returns:
+            実行待ち・実行中のジョブのリスト
+        """
+
+        def _unfinished() -> list[Job]:
+            kind_clause = "AND kind = ?" if kind else ""
+            params: list[Any] = [JobStatus.PENDING.value, JobStatus.LEASED.value]
+            if kind:
+                params.append(str(kind))
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, kind, key, payload, priority, attempts FROM jobs"
+                    f" WHERE status IN (?, ?) {kind_clause}"
+                    " ORDER BY priority DESC, available_at, id",
+                    params,
+                ).fetchall()
+            return [
+                Job(
+                    id=row["id"],
+                    kind=JobKind(row["kind"]),
+                    key=row["key"],
+                    payload=json.loads(row["payload"]),
+                    priority=row["priority"],
+                    attempts=row["attempts"],
+                )
+                for row in rows
+            ]
+
+        return await asyncio.to_thread(_unfinished)
+
+    async def set_priorities(self, priorities: Mapping[str, int]) -> int:
+        """実行待ち・実行中のジョブの優先度を変更します（持ち越したジョブを先に実行する場合など）。
+
+        Args:
+            priorities: 冪等性キーをキーとする新しい優先度
+
+        Returns:
+            優先度を変更したジョブ数
+        """
+
+        def _set() -> int:
+            rows = [
+                (priority, key, JobStatus.PENDING.value, JobStatus.LEASED.value)
+                for key, priority in priorities.items()
+            ]
+            with self._lock:
+                before = self._conn.total_changes
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany(
+                        "UPDATE jobs SET priority = ? WHERE key = ? AND status IN (?, ?)", rows
+                    )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                return self._conn.total_changes - before
+
+        return await asyncio.to_thread(_set)
+
+    async def counts(self) -> dict[JobStatus, int]:
+        """ステータスごとのジョブ数を返します。"""
+
+        def _counts() -> dict[JobStatus, int]:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+                ).fetchall()
+            result = dict.fromkeys(JobStatus, 0)
+            for row in rows:
+                result[JobStatus(row["status"])] = row["n"]
+            return result
+
+        return await asyncio.to_thread(_counts)
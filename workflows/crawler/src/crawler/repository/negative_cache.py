@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from crawler.utils.sqlite import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS negative_results (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    misses INTEGER NOT NULL,
+    missed_at REAL NOT NULL,
+    PRIMARY KEY (source, key)
+) WITHOUT ROWID;
+"""
+
+# 見つからなかった回数を加算し、確認日時を更新する
+_RECORD_MISS = """
+INSERT INTO negative_results (source, key, misses, missed_at) VALUES (?, ?, 1, ?)
+ON CONFLICT (source, key) DO UPDATE SET
+    misses = negative_results.misses + 1,
+    missed_at = excluded.missed_at
+"""
+
+
+def normalize_identifier(identifier: str) -> str:
+    """キャッシュのキーにするため、識別子（DOI・タイトル・検索クエリ）を正規化します。
+
+    DOIは大文字・小文字を区別しないため、空白をまとめたうえで小文字（casefold）に揃えます。
+    """
+    return " ".join(identifier.split()).casefold()
+
+
+@dataclass
+class NegativeLookup:
+    """1回の補完で参照したネガティブキャッシュの結果と、新たに判明したヒット・ミスの記録。
+
+    Enricherは `is_known` が真の識別子についてはリクエストを送らず、レスポンスの結果を
+    `add_miss` / `add_hit` で記録します。記録は `NegativeCache.update` でまとめて保存します。
+
+    Attributes:
+        source: 問い合わせ先のサービス名
+        known: TTL内に見つからなかったことが記録されている識別子（正規化済み）
+        misses: 今回見つからなかった識別子
+        hits: 今回見つかった識別子
+    """
+
+    source: str
+    known: set[str] = field(default_factory=set)
+    misses: list[str] = field(default_factory=list)
+    hits: list[str] = field(default_factory=list)
+
+    def is_known(self, identifier: str) -> bool:
+        """識別子が見つからないことが分かっている場合はTrueを返します。"""
+        return normalize_identifier(identifier) in self.known
+
+    def add_miss(self, identifier: str) -> None:
+        """問い合わせ先で見つからなかった識別子を記録します。"""
+        self.misses.append(identifier)
+
+    def add_hit(self, identifier: str) -> None:
+        """問い合わせ先で見つかった識別子を記録します。"""
+        self.hits.append(identifier)
+
+
+class NegativeCache:
+    """補完で見つからなかった識別子を、(サービス名, 正規化した識別子) をキーとしてSQLiteに保存するキャッシュ。
+
+    Semantic Scholarのnull、Unpaywallの404、arXivの0件のように、見つからなかった論文は実行の
+    たびに問い合わせても結果が変わらないことが多いため、TTLの間はリクエストを送らずにスキップします。
+
+    - TTLは連続して見つからなかった回数に応じて `ttl`, `2 * ttl`, `4 * ttl`, ... と延ばし、
+      `max_ttl` で打ち切ります（後から登録される論文もあるため、いずれは再確認します）
+    - 見つかった識別子の記録は削除し、回数をリセットします
+    - 通信エラー等の一時的な失敗は記録しません（呼び出し側が `add_miss` しない）
+
+    SQLiteへのアクセスはブロッキングのため、非同期のメソッドは `asyncio.to_thread` で実行します。
+    """
+
+    DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+    DEFAULT_MAX_TTL_SECONDS = 90 * 24 * 60 * 60
+    # 1回のクエリで検索するキーの数（SQLiteの変数の上限より十分小さい値）
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        cache_path: str | Path,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_ttl: float = DEFAULT_MAX_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """NegativeCacheインスタンスを初期化します。
+
+        Args:
+            cache_path: SQLiteファイルのパス
+            ttl: 初めて見つからなかった識別子を再確認するまでの秒数
+            max_ttl: 再確認するまでの秒数の上限
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.clock = clock
+        self._conn = connect(cache_path)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """キャッシュの接続を閉じます。"""
+        self._conn.close()
+
+    def ttl_for(self, misses: int) -> float:
+        """`misses` 回連続で見つからなかった識別子のTTL(秒)を返します。"""
+        return min(self.max_ttl, self.ttl * 2 ** max(0, misses - 1))
+
+    async def lookup(self, source: str, identifiers: Iterable[str]) -> NegativeLookup:
+        """TTL内に見つからなかったことが記録されている識別子を検索します。
+
+        Args:
+            source: 問い合わせ先のサービス名
+            identifiers: 問い合わせる予定の識別子
+
+        Returns:
+            検索結果。ヒット・ミスの記録にも使う
+        """
+        keys = list(dict.fromkeys(normalize_identifier(i) for i in identifiers))
+        known = await asyncio.to_thread(self._lookup, source, keys)
+        return NegativeLookup(source, known=known)
+
+    async def update(self, lookup: NegativeLookup) -> None:
+        """`lookup` に記録したミスを保存し、ヒットした識別子の記録を削除します。"""
+        if lookup.misses or lookup.hits:
+            await asyncio.to_thread(self._update, lookup.source, lookup.misses, lookup.hits)
+
+    def _lookup(self, source: str, keys: list[str]) -> set[str]:
+        now = self.clock()
+        known: set[str] = set()
+        with self._lock:
+            for i in range(0, len(keys), self.LOOKUP_CHUNK_SIZE):
+                chunk = keys[i : i + self.LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT key, misses, missed_at FROM negative_results"
+                    f" WHERE source = ? AND key IN ({placeholders})",
+                    [source, *chunk],
+                ).fetchall()
+                for row in rows:
+                    if now - row["missed_at"] < self.ttl_for(row["misses"]):
+                        known.add(row["key"])
+        return known
+
+    def _update(self, source: str, misses: list[str], hits: list[str]) -> None:
+        now = self.clock()
+        # 1回の補完で同じ識別子を複数回問い合わせても、回数は1回分だけ加算する
+        miss_keys = dict.fromkeys(normalize_identifier(i) for i in misses)
+        hit_keys = dict.fromkeys(normalize_identifier(i) for i in hits)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    _RECORD_MISS, [(source, key, now) for key in miss_keys if key not in hit_keys]
+                )
+                self._conn.executemany(
+                    "DELETE FROM negative_results WHERE source = ? AND key = ?",
+                    [(source, key) for key in hit_keys],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
@@ -0,0 +1,576 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+from loguru import logger
+
+from crawler.domain.article import Article
+from crawler.domain.paper import Paper, normalize_doi, title_hash
+from crawler.domain.pdf import PdfText
+from crawler.utils.sqlite import add_missing_columns, connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    doi TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_hash TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    venue TEXT NOT NULL,
+    type TEXT,
+    ee TEXT,
+    pdf_url TEXT,
+    abstract TEXT,
+    updated_at REAL NOT NULL,
+    pdf_url_candidates TEXT NOT NULL DEFAULT '[]',
+    pdf_url_checked INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_papers_venue_year ON papers (venue, year);
+CREATE INDEX IF NOT EXISTS idx_papers_title_hash ON papers (title_hash);
+CREATE TABLE IF NOT EXISTS pdf_texts (
+    sha256 TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    page_offsets TEXT NOT NULL,
+    error TEXT,
+    extracted_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS paper_pdfs (
+    doi TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_paper_pdfs_sha256 ON paper_pdfs (sha256);
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    site TEXT,
+    title TEXT,
+    published TEXT,
+    text TEXT NOT NULL,
+    code_blocks TEXT NOT NULL,
+    error TEXT,
+    extracted_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_articles_site_published ON articles (site, published);
+"""
+
+# 以前のバージョンで作成したファイルに追加する列
+_ADDED_COLUMNS = {
+    "pdf_url_candidates": "TEXT NOT NULL DEFAULT '[]'",
+    "pdf_url_checked": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# 既存の値をNoneで上書きしないよう、オプションフィールドはCOALESCEでマージする。
+# ただしリンク切れを確認したPDFリンクは、Noneになった場合も含めてそのまま保存する
+_UPSERT = """
+INSERT INTO papers
+    (doi, title, title_hash, authors, year, venue, type, ee, pdf_url, abstract, updated_at,
+     pdf_url_candidates, pdf_url_checked)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (doi) DO UPDATE SET
+    title = excluded.title,
+    title_hash = excluded.title_hash,
+    authors = excluded.authors,
+    year = excluded.year,
+    venue = excluded.venue,
+    type = COALESCE(excluded.type, papers.type),
+    ee = COALESCE(excluded.ee, papers.ee),
+    pdf_url = CASE WHEN excluded.pdf_url_checked THEN excluded.pdf_url
+        ELSE COALESCE(excluded.pdf_url, papers.pdf_url) END,
+    abstract = COALESCE(excluded.abstract, papers.abstract),
+    updated_at = excluded.updated_at,
+    pdf_url_candidates = CASE WHEN excluded.pdf_url_checked OR excluded.pdf_url_candidates != '[]'
+        THEN excluded.pdf_url_candidates ELSE papers.pdf_url_candidates END,
+    pdf_url_checked = CASE WHEN excluded.pdf_url_checked THEN 1
+        WHEN excluded.pdf_url IS NULL OR excluded.pdf_url = papers.pdf_url
+        THEN papers.pdf_url_checked ELSE 0 END
+"""
+
+_UPSERT_PDF_TEXT = """
+INSERT OR REPLACE INTO pdf_texts (sha256, text, page_offsets, error, extracted_at)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+_UPSERT_PAPER_PDF = "INSERT OR REPLACE INTO paper_pdfs (doi, sha256) VALUES (?, ?)"
+
+_UPSERT_ARTICLE = """
+INSERT OR REPLACE INTO articles
+    (url, content_hash, site, title, published, text, code_blocks, error, extracted_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_COLUMNS = (
+    "doi, title, authors, year, venue, type, ee, pdf_url, abstract, "
+    "pdf_url_candidates, pdf_url_checked"
+)
+
+
+class PaperStoreWriteError(Exception):
+    """ライタータスクがキューに積まれたデータを書き込めなかった場合の例外。"""
+
+
+class PaperStore:
+    """論文データを正規化DOIをキーとしてSQLiteに永続化するストア。
+
+    書き込みは単一のライタータスクに集約されます。`write_papers` はキューに積むだけで戻り、
+    ライタータスクがキューから最大 `max_batch_size` 件をまとめて `executemany` でUPSERTし、
+    1トランザクションでコミットします（グループコミット）。SQLiteへのアクセスは
+    `asyncio.to_thread` 経由で行うため、イベントループはブロックされません。
+
+    読み取りは書き込みとは別の接続で行います。WALモードのため、書き込み中でも
+    読み取りはブロックされず、他プロセスからの参照も可能です。
+
+    DOIを持たない論文は保存されません。
+
+    一時的なエラー（他プロセスによるロックなど）はリトライし、それでも書き込めなかった場合は
+    ライタータスクは次のバッチの書き込みを続け、次の `flush`（`close`）で `PaperStoreWriteError`
+    を送出して呼び出し元に失敗を伝えます。
+
+    PDFから抽出したテキストも同じライタータスク経由で `pdf_texts` テーブルに保存され、
+    論文とはDOI→SHA-256の対応表 (`paper_pdfs`) で紐付けられます。
+    技術ブログから抽出した記事も同様に `articles` テーブル（URLがキー）に保存されます。
+    """
+
+    DEFAULT_MAX_BATCH_SIZE = 1000
+    DEFAULT_QUEUE_SIZE = 10_000
+    WRITE_RETRIES = 3
+    RETRY_DELAY_SECONDS = 0.5
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        read_only: bool = False,
+    ) -> None:
+        """PaperStoreインスタンスを初期化します。
+
+        Args:
+            path: SQLiteファイルのパス
+            max_batch_size: 1回のコミットでまとめて書き込む最大件数
+            queue_size: 書き込みキューの最大件数（超えると `write_papers` が待機する）
+            read_only: 参照専用で開くかどうか（下流サービスなど、書き込みを行わない読み手向け）
+        """
+        self.path = Path(path)
+        self.max_batch_size = max_batch_size
+        self.read_only = read_only
+        self._write_conn: sqlite3.Connection | None = None
+        if not read_only:
+            self._write_conn = connect(self.path)
+            self._write_conn.executescript(_SCHEMA)
+            add_missing_columns(self._write_conn, "papers", _ADDED_COLUMNS)
+        self._read_conn = connect(self.path, read_only=read_only)
+        self._read_lock = threading.Lock()
+        self._queue: asyncio.Queue[Paper | PdfText | Article] = asyncio.Queue(maxsize=queue_size)
+        self._writer: asyncio.Task[None] | None = None
+        self._write_errors: list[str] = []
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """ライタータスクを起動します。実行中のイベントループ内で呼び出す必要があります。"""
+        if self._writer is None and not self.read_only:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def write_papers(self, papers: list[Paper]) -> None:
+        """論文を書き込みキューに追加します。
+
+        コミットは非同期に行われます。書き込み完了を待つ場合は `flush` を呼び出してください。
+
+        Args:
+            papers: 書き込む論文リスト
+
+        Raises:
+            RuntimeError: 参照専用で開かれている場合
+        """
+        if self.read_only:
+            raise RuntimeError("PaperStore is opened in read-only mode")
+        self.start()
+        for paper in papers:
+            if paper.doi:
+                await self._queue.put(paper)
+
+    async def write_pdf_texts(self, texts: list[PdfText]) -> None:
+        """PDFから抽出したテキストを書き込みキューに追加します。
+
+        Args:
+            texts: 書き込むテキストのリスト
+
+        Raises:
+            RuntimeError: 参照専用で開かれている場合
+        """
+        if self.read_only:
+            raise RuntimeError("PaperStore is opened in read-only mode")
+        self.start()
+        for text in texts:
+            await self._queue.put(text)
+
+    async def write_articles(self, articles: list[Article]) -> None:
+        """技術ブログのページから抽出した記事を書き込みキューに追加します。
+
+        Args:
+            articles: 書き込む記事のリスト
+
+        Raises:
+            RuntimeError: 参照専用で開かれている場合
+        """
+        if self.read_only:
+            raise RuntimeError("PaperStore is opened in read-only mode")
+        self.start()
+        for article in articles:
+            await self._queue.put(article)
+
+    async def flush(self) -> None:
+        """キューに積まれた論文が全てコミットされるまで待機します。
+
+        Raises:
+            PaperStoreWriteError: 前回の `flush` 以降に書き込めなかったバッチがある場合、
+                またはライタータスクが異常終了した場合
+        """
+        if self._writer is not None:
+            join = asyncio.ensure_future(self._queue.join())
+            try:
+                # ライタータスクが終了した場合はキューが空にならないため、どちらかを待つ
+                await asyncio.wait({join, self._writer}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                join.cancel()
+            if self._writer.done():
+                error = None if self._writer.cancelled() else self._writer.exception()
+                self._writer = None
+                raise PaperStoreWriteError(f"Writer for {self.path} stopped: {error!r}") from error
+        if self._write_errors:
+            errors, self._write_errors = self._write_errors, []
+            raise PaperStoreWriteError(
+                f"Failed to write {len(errors)} batches to {self.path}: {errors[0]}"
+            )
+
+    async def close(self) -> None:
+        """残りの論文をコミットし、ライタータスクと接続を終了します。
+
+        Raises:
+            PaperStoreWriteError: 書き込めなかったバッチがある場合（接続は終了する）
+        """
+        try:
+            await self.flush()
+        finally:
+            if self._writer is not None:
+                self._writer.cancel()
+                try:
+                    await self._writer
+                except asyncio.CancelledError:
+                    pass
+                self._writer = None
+            if self._write_conn is not None:
+                self._write_conn.close()
+            self._read_conn.close()
+
+    async def _write_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # 既にキューに溜まっている分をまとめて取り出す
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: list[Paper | PdfText | Article]) -> None:
+        """バッチを書き込みます。失敗した場合は記録して次の `flush` で送出します。"""
+        for attempt in range(self.WRITE_RETRIES + 1):
+            try:
+                await asyncio.to_thread(self._upsert, batch)
+                return
+            except sqlite3.OperationalError as e:
+                # ロック待ちのタイムアウトなどの一時的なエラーはリトライする
+                if attempt == self.WRITE_RETRIES:
+                    error: Exception = e
+                    break
+                logger.warning(f"Retrying write of {len(batch)} records to {self.path}: {e}")
+                await asyncio.sleep(self.RETRY_DELAY_SECONDS * 2**attempt)
+            except Exception as e:
+                error = e
+                break
+        logger.error(f"Failed to write {len(batch)} records to {self.path}: {error!r}")
+        self._write_errors.append(repr(error))
+
+    def _upsert(self, batch: list[Paper | PdfText | Article]) -> None:
+        if self._write_conn is None:
+            raise RuntimeError("PaperStore is opened in read-only mode")
+        papers = [item for item in batch if isinstance(item, Paper)]
+        texts = [item for item in batch if isinstance(item, PdfText)]
+        articles = [item for item in batch if isinstance(item, Article)]
+        now = time.time()
+        rows = [
+            (
+                normalize_doi(p.doi),
+                p.title,
+                title_hash(p.title),
+                json.dumps(p.authors, ensure_ascii=False),
+                p.year,
+                p.venue,
+                p.type,
+                p.ee,
+                p.pdf_url,
+                p.abstract,
+                now,
+                json.dumps(p.pdf_url_candidates, ensure_ascii=False),
+                int(p.pdf_url_checked),
+            )
+            for p in papers
+            if p.doi
+        ]
+        text_rows = [(t.sha256, t.text, json.dumps(t.page_offsets), t.error, now) for t in texts]
+        link_rows = [(normalize_doi(doi), t.sha256) for t in texts for doi in t.dois]
+        article_rows = [
+            (
+                a.url,
+                a.content_hash,
+                a.site,
+                a.title,
+                a.published,
+                a.text,
+                json.dumps(a.code_blocks, ensure_ascii=False),
+                a.error,
+                now,
+            )
+            for a in articles
+        ]
+        self._write_conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_conn.executemany(_UPSERT, rows)
+            self._write_conn.executemany(_UPSERT_PDF_TEXT, text_rows)
+            self._write_conn.executemany(_UPSERT_PAPER_PDF, link_rows)
+            self._write_conn.executemany(_UPSERT_ARTICLE, article_rows)
+            self._write_conn.execute("COMMIT")
+        except BaseException:
+            self._write_conn.execute("ROLLBACK")
+            raise
+
+    async def _query(self, sql: str, params: Iterable[Any] = ()) -> list[sqlite3.Row]:
+        def _run() -> list[sqlite3.Row]:
+            with self._read_lock:
+                return self._read_conn.execute(sql, tuple(params)).fetchall()
+
+        return await asyncio.to_thread(_run)
+
+    @staticmethod
+    def _to_paper(row: sqlite3.Row) -> Paper:
+        data = dict(row)
+        data["authors"] = json.loads(data["authors"])
+        data["pdf_url_candidates"] = json.loads(data["pdf_url_candidates"])
+        return Paper(**data)
+
+    async def get(self, doi: str) -> Paper | None:
+        """DOIで論文を取得します。
+
+        Args:
+            doi: 論文のDOI（正規化前でもよい）
+
+        Returns:
+            論文。存在しない場合はNone
+        """
+        rows = await self._query(
+            f"SELECT {_COLUMNS} FROM papers WHERE doi = ?", (normalize_doi(doi),)
+        )
+        return self._to_paper(rows[0]) if rows else None
+
+    async def find_by_venue_year(self, venue: str, year: int) -> list[Paper]:
+        """venueと年で論文を検索します。
+
+        Args:
+            venue: 掲載会場
+            year: 出版年
+
+        Returns:
+            該当する論文のリスト
+        """
+        rows = await self._query(
+            f"SELECT {_COLUMNS} FROM papers WHERE venue = ? AND year = ? ORDER BY doi",
+            (venue, year),
+        )
+        return [self._to_paper(row) for row in rows]
+
+    async def find_by_year(self, year: int) -> list[Paper]:
+        """出版年で論文を検索します（全ての掲載会場）。
+
+        Args:
+            year: 出版年
+
+        Returns:
+            該当する論文のリスト
+        """
+        rows = await self._query(
+            f"SELECT {_COLUMNS} FROM papers WHERE year = ? ORDER BY doi", (year,)
+        )
+        return [self._to_paper(row) for row in rows]
+
+    async def find_by_title(self, title: str) -> list[Paper]:
+        """正規化したタイトルが一致する論文を検索します。
+
+        Args:
+            title: 論文タイトル
+
+        Returns:
+            該当する論文のリスト
+        """
+        rows = await self._query(
+            f"SELECT {_COLUMNS} FROM papers WHERE title_hash = ?", (title_hash(title),)
+        )
+        return [self._to_paper(row) for row in rows]
+
+    async def get_many(self, dois: Iterable[str]) -> dict[str, Paper]:
+        """複数のDOIで論文をまとめて取得します。
+
+        Args:
+            dois: 論文のDOI（正規化前でもよい）
+
+        Returns:
+            正規化DOIをキーとする保存済みの論文の辞書
+        """
+        normalized = list({normalize_doi(d) for d in dois})
+        found: dict[str, Paper] = {}
+        # SQLiteのバインド変数の上限を超えないように分割する
+        for i in range(0, len(normalized), 500):
+            chunk = normalized[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = await self._query(
+                f"SELECT {_COLUMNS} FROM papers WHERE doi IN ({placeholders})", chunk
+            )
+            found.update((row["doi"], self._to_paper(row)) for row in rows)
+        return found
+
+    async def existing_dois(self, dois: Iterable[str]) -> set[str]:
+        """保存済みのDOIを返します（増分クロールで取得済みの論文を除外するために使用）。
+
+        Args:
+            dois: 確認するDOI
+
+        Returns:
+            保存済みの正規化DOIの集合
+        """
+        normalized = list({normalize_doi(d) for d in dois})
+        found: set[str] = set()
+        # SQLiteのバインド変数の上限を超えないように分割する
+        for i in range(0, len(normalized), 500):
+            chunk = normalized[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = await self._query(f"SELECT doi FROM papers WHERE doi IN ({placeholders})", chunk)
+            found.update(row["doi"] for row in rows)
+        return found
+
+    async def count(self) -> int:
+        """保存されている論文数を返します。"""
+        rows = await self._query("SELECT COUNT(*) AS n FROM papers")
+        return int(rows[0]["n"])
+
+    async def processed_pdf_hashes(self, hashes: Iterable[str]) -> set[str]:
+        """テキスト抽出済み（失敗を含む）のPDFのSHA-256を返します。
+
+        Args:
+            hashes: 確認するSHA-256
+
+        Returns:
+            処理済みのSHA-256の集合
+        """
+        unique = list(set(hashes))
+        found: set[str] = set()
+        for i in range(0, len(unique), 500):
+            chunk = unique[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = await self._query(
+                f"SELECT sha256 FROM pdf_texts WHERE sha256 IN ({placeholders})", chunk
+            )
+            found.update(row["sha256"] for row in rows)
+        return found
+
+    async def get_pdf_text(self, sha256: str) -> PdfText | None:
+        """PDFのSHA-256で抽出済みテキストを取得します。
+
+        Args:
+            sha256: PDFのSHA-256
+
+        Returns:
+            抽出済みテキスト。存在しない場合はNone
+        """
+        rows = await self._query(
+            "SELECT sha256, text, page_offsets, error FROM pdf_texts WHERE sha256 = ?", (sha256,)
+        )
+        if not rows:
+            return None
+        dois = await self._query(
+            "SELECT doi FROM paper_pdfs WHERE sha256 = ? ORDER BY doi", (sha256,)
+        )
+        data = dict(rows[0])
+        data["page_offsets"] = json.loads(data["page_offsets"])
+        return PdfText(**data, dois=[row["doi"] for row in dois])
+
+    async def get_paper_text(self, doi: str) -> PdfText | None:
+        """論文のDOIで、そのPDFから抽出したテキストを取得します。
+
+        Args:
+            doi: 論文のDOI（正規化前でもよい）
+
+        Returns:
+            抽出済みテキスト。存在しない場合はNone
+        """
+        rows = await self._query(
+            "SELECT sha256 FROM paper_pdfs WHERE doi = ?", (normalize_doi(doi),)
+        )
+        return await self.get_pdf_text(rows[0]["sha256"]) if rows else None
+
+    async def article_hashes(self, urls: Iterable[str]) -> dict[str, str]:
+        """記事を抽出した時点のHTMLのSHA-256を返します（内容が変わっていないページの再抽出を避けるために使用）。
+
+        Args:
+            urls: 確認する記事のURL
+
+        Returns:
+            URLをキーとする抽出済み（失敗を含む）のSHA-256の辞書
+        """
+        unique = list(set(urls))
+        found: dict[str, str] = {}
+        for i in range(0, len(unique), 500):
+            chunk = unique[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = await self._query(
+                f"SELECT url, content_hash FROM articles WHERE url IN ({placeholders})", chunk
+            )
+            found.update((row["url"], row["content_hash"]) for row in rows)
+        return found
+
+    async def get_article(self, url: str) -> Article | None:
+        """URLで抽出済みの記事を取得します。
+
+        Args:
+            url: 記事のURL
+
+        Returns:
+            記事。存在しない場合はNone
+        """
+        rows = await self._query(
+            "SELECT url, content_hash, site, title, published, text, code_blocks, error"
+            " FROM articles WHERE url = ?",
+            (url,),
+        )
+        if not rows:
+            return None
+        data = dict(rows[0])
+        data["code_blocks"] = json.loads(data["code_blocks"])
+        return Article(**data)
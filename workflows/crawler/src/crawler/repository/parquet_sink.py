@@ -0,0 +1,206 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from loguru import logger
+
+from crawler.domain.paper import Paper
+
+PAPER_SCHEMA = pa.schema(
+    [
+        pa.field("title", pa.string(), nullable=False),
+        pa.field("authors", pa.list_(pa.string()), nullable=False),
+        pa.field("year", pa.int32(), nullable=False),
+        pa.field("venue", pa.string(), nullable=False),
+        pa.field("doi", pa.string()),
+        pa.field("type", pa.string()),
+        pa.field("ee", pa.string()),
+        pa.field("pdf_url", pa.string()),
+        pa.field("abstract", pa.string()),
+    ]
+)
+
+Partition = tuple[str, int]
+
+
+def papers_to_table(papers: list[Paper]) -> pa.Table:
+    """Paperのリストを列指向のArrowテーブルに変換します。
+
+    pydanticモデルを経由したJSONシリアライズを行わず、列ごとに値を集めて変換します。
+    """
+    return pa.Table.from_pydict(
+        {
+            "title": [p.title for p in papers],
+            "authors": [p.authors for p in papers],
+            "year": [p.year for p in papers],
+            "venue": [p.venue for p in papers],
+            "doi": [p.doi for p in papers],
+            "type": [p.type for p in papers],
+            "ee": [p.ee for p in papers],
+            "pdf_url": [p.pdf_url for p in papers],
+            "abstract": [p.abstract for p in papers],
+        },
+        schema=PAPER_SCHEMA,
+    )
+
+
+def open_paper_dataset(root_dir: str | Path) -> ds.Dataset:
+    """ParquetPaperSinkが出力したデータセットを開きます。
+
+    Hiveパーティション(venue=.../year=...)を解釈するため、
+    `ds.field("year") == 2025` のようなフィルタでディレクトリ単位の読み飛ばしが効きます。
+
+    Args:
+        root_dir: データセットのルートディレクトリ
+
+    Returns:
+        pyarrowのDatasetオブジェクト
+    """
+    return ds.dataset(root_dir, format="parquet", schema=PAPER_SCHEMA, partitioning="hive")
+
+
+class ParquetPaperSink:
+    """論文データをvenue・year単位でパーティション分割したParquetデータセットに書き込むクラス。
+
+    書き込まれた論文はパーティションごとにバッファされ、`row_group_size` 件たまるごとに
+    1つのRow Groupとして書き出されます。venue・type・authorsは辞書エンコーディングされます。
+
+    ファイルは書き込み中は一時ファイル(ドット始まりのためデータセットからは見えない)として作成され、
+    `close` 時にリネームで公開されます。`overwrite_partitions=True` の場合、公開後に同じ
+    パーティション内の過去の実行で書かれたファイルを削除するため、再実行しても重複しません。
+    異常終了した実行が残した一時ファイルは、開始時（`async with`）に削除します。
+
+    Parquetの書き込みは `asyncio.to_thread` で行うため、イベントループをブロックしません。
+    """
+
+    DEFAULT_ROW_GROUP_SIZE = 10_000
+    DEFAULT_COMPRESSION = "zstd"
+    # authorsはlist<string>のため、要素のカラムパスを指定する
+    DICTIONARY_COLUMNS = ("venue", "type", "authors.list.element")
+    # 並行して実行中の別プロセスの一時ファイルを消さないよう、更新が止まってから十分経ったものだけ削除する
+    STALE_TMP_SECONDS = 24 * 60 * 60
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = DEFAULT_COMPRESSION,
+        overwrite_partitions: bool = True,
+    ) -> None:
+        """ParquetPaperSinkインスタンスを初期化します。
+
+        Args:
+            root_dir: データセットのルートディレクトリ
+            row_group_size: 1つのRow Groupに含める最大行数
+            compression: 圧縮コーデック
+            overwrite_partitions: 書き込んだパーティションの過去のファイルを置き換えるかどうか
+        """
+        self.root_dir = Path(root_dir)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.overwrite_partitions = overwrite_partitions
+        self.run_id = uuid.uuid4().hex
+        self._buffers: dict[Partition, list[Paper]] = defaultdict(list)
+        self._writers: dict[Partition, pq.ParquetWriter] = {}
+        self._rows_written = 0
+        # ParquetWriterはスレッドセーフではないため書き込みを直列化する
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> Self:
+        await asyncio.to_thread(self._remove_stale_tmp_files)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def write_papers(self, papers: list[Paper]) -> None:
+        """論文をバッファに追加し、Row Group分たまったパーティションを書き出します。
+
+        Args:
+            papers: 書き込む論文リスト
+        """
+        async with self._lock:
+            full: list[tuple[Partition, list[Paper]]] = []
+            for paper in papers:
+                partition = (paper.venue, paper.year)
+                buffer = self._buffers[partition]
+                buffer.append(paper)
+                if len(buffer) >= self.row_group_size:
+                    full.append((partition, buffer))
+                    self._buffers[partition] = []
+            if full:
+                await asyncio.to_thread(self._write_row_groups, full)
+
+    async def close(self) -> None:
+        """残りのバッファを書き出し、全てのファイルを確定します。"""
+        async with self._lock:
+            pending = [(partition, buf) for partition, buf in self._buffers.items() if buf]
+            self._buffers.clear()
+            await asyncio.to_thread(self._write_row_groups, pending)
+            await asyncio.to_thread(self._commit)
+        logger.info(f"Wrote {self._rows_written} papers to {self.root_dir}")
+
+    def _partition_dir(self, partition: Partition) -> Path:
+        venue, year = partition
+        # venueにはスペースやスラッシュが含まれ得るため、URIエンコードしてディレクトリ名にする
+        return self.root_dir / f"venue={quote(venue, safe='')}" / f"year={year}"
+
+    def _tmp_path(self, partition: Partition) -> Path:
+        return self._partition_dir(partition) / f".part-{self.run_id}.parquet.tmp"
+
+    def _final_path(self, partition: Partition) -> Path:
+        return self._partition_dir(partition) / f"part-{self.run_id}.parquet"
+
+    def _remove_stale_tmp_files(self) -> None:
+        if not self.root_dir.exists():
+            return
+        threshold = time.time() - self.STALE_TMP_SECONDS
+        for path in self.root_dir.glob("venue=*/year=*/.part-*.parquet.tmp"):
+            try:
+                if path.stat().st_mtime < threshold:
+                    path.unlink()
+                    logger.info(f"Removed stale temporary file {path}")
+            except FileNotFoundError:
+                continue
+
+    def _write_row_groups(self, batches: list[tuple[Partition, list[Paper]]]) -> None:
+        for partition, papers in batches:
+            writer = self._writers.get(partition)
+            if writer is None:
+                tmp_path = self._tmp_path(partition)
+                tmp_path.parent.mkdir(parents=True, exist_ok=True)
+                writer = pq.ParquetWriter(
+                    tmp_path,
+                    PAPER_SCHEMA,
+                    compression=self.compression,
+                    use_dictionary=list(self.DICTIONARY_COLUMNS),
+                )
+                self._writers[partition] = writer
+            writer.write_table(papers_to_table(papers), row_group_size=self.row_group_size)
+            self._rows_written += len(papers)
+
+    def _commit(self) -> None:
+        for partition, writer in self._writers.items():
+            writer.close()
+            final_path = self._final_path(partition)
+            # 同一ファイルシステム内のリネームはアトミックなので、読み手が書きかけのファイルを見ることはない
+            os.replace(self._tmp_path(partition), final_path)
+            if self.overwrite_partitions:
+                for old in final_path.parent.glob("part-*.parquet"):
+                    if old != final_path:
+                        old.unlink(missing_ok=True)
+        self._writers.clear()
@@ -0,0 +1,267 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import httpx
+from loguru import logger
+
+from crawler.domain.paper import Paper
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry, get_robots_registry
+from crawler.utils.sqlite import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_link_checks (
+    url TEXT PRIMARY KEY,
+    alive INTEGER NOT NULL,
+    status INTEGER,
+    checked_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class PdfLinkChecker:
+    """PDFリンクが実際にPDFを返すかを確認し、リンク切れの場合は代替候補に切り替えるクラス。
+
+    `PaperEnricher` として補完チェーンの最後に置くことで、リンク切れの `pdf_url` が
+    下流に渡らないようにします。
+
+    - まずHEADで確認し、判定できない場合（HEAD非対応・Content-TypeがPDFでない等）は
+      先頭1KiBのRange GETでマジックバイトを確認します
+    - リンク切れとみなすのは404・410と、取得した先頭がPDFでなかった場合だけです。403・429・5xx・
+      通信エラー・robots.txtでの拒否は判定できない（一時的な失敗の可能性がある）ため、
+      そのリンクをそのまま残します
+    - 確認結果はSQLiteにキャッシュし、有効なリンクは `alive_ttl`、無効なリンクは `dead_ttl`
+      の間は再確認しません（判定できなかったリンクはキャッシュしません）
+    - リンク切れの場合は `pdf_url_candidates`（Unpaywallのoa_locations等）を順に確認します。
+      各ラウンドで全論文の候補をまとめて並列に確認するため、ラウンド数は候補数で抑えられます
+    - ホストごとのレート制限（`HostLimiters`）とrobots.txt（Crawl-delayを含む）に従います
+    """
+
+    DEFAULT_ALIVE_TTL_SECONDS = 7 * 24 * 60 * 60
+    DEFAULT_DEAD_TTL_SECONDS = 24 * 60 * 60
+    DEFAULT_TIMEOUT_SECONDS = 10.0
+    PROBE_BYTES = 1024
+    PDF_MAGIC = b"%PDF-"
+    PDF_CONTENT_TYPES = frozenset({"application/pdf", "application/x-pdf"})
+    DEAD_STATUS_CODES = frozenset({404, 410})
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        cache_path: str | Path,
+        host_limiters: HostLimiters | None = None,
+        alive_ttl: float = DEFAULT_ALIVE_TTL_SECONDS,
+        dead_ttl: float = DEFAULT_DEAD_TTL_SECONDS,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.time,
+        robots: RobotsRegistry | None = None,
+    ) -> None:
+        """PdfLinkCheckerインスタンスを初期化します。
+
+        Args:
+            client: HTTPリクエストに使用するAsyncClientインスタンス
+            cache_path: 確認結果をキャッシュするSQLiteファイルのパス
+            host_limiters: ホストごとのレートリミッター。省略時はデフォルト設定を使用。
+            alive_ttl: 有効だったリンクを再確認するまでの秒数
+            dead_ttl: 無効だったリンクを再確認するまでの秒数
+            timeout: 1リクエストあたりのタイムアウト(秒)
+            clock: 現在時刻を返す関数（テスト用）
+            robots: robots.txtのレジストリ。省略時は登録済みのもの（なければメモリ上のみのもの）を使用。
+        """
+        self.client = client
+        self.host_limiters = host_limiters or HostLimiters()
+        self.alive_ttl = alive_ttl
+        self.dead_ttl = dead_ttl
+        self.timeout = timeout
+        self.clock = clock
+        self.robots = robots or get_robots_registry() or RobotsRegistry()
+        self._conn = connect(cache_path)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """キャッシュの接続を閉じます。"""
+        self._conn.close()
+
+    async def enrich_papers(
+        self,
+        papers: list[Paper],
+        semaphore: asyncio.Semaphore,
+        overwrite: bool = False,
+    ) -> list[Paper]:
+        """各論文の `pdf_url` を検証し、リンク切れの場合は有効な代替候補に置き換えます。
+
+        候補を順に確認し、リンク切れでない最初の候補（判定できなかった候補を含む）を `pdf_url` にします。
+        全ての候補がリンク切れの場合、`pdf_url` はNoneになります。確認した論文は `pdf_url_checked` を
+        真にするため、ストアはNoneになった `pdf_url` を保存済みのリンクで補いません。
+
+        Args:
+            papers: 対象の論文リスト
+            semaphore: 並列実行数を制限するセマフォ
+            overwrite: 未使用（PaperEnricherプロトコルとの互換性のため）
+
+        Returns:
+            更新された論文リスト
+        """
+        remaining = {
+            id(p): [url for url in [p.pdf_url, *p.pdf_url_candidates] if url]
+            for p in papers
+            if p.pdf_url or p.pdf_url_candidates
+        }
+        pending = [p for p in papers if id(p) in remaining]
+        replaced = dropped = unknown = 0
+
+        while pending:
+            urls = [remaining[id(p)][0] for p in pending]
+            alive = await self.check_urls(urls, semaphore)
+            next_pending = []
+            for paper in pending:
+                candidates = remaining[id(paper)]
+                url = candidates.pop(0)
+                if alive[url] is not False:
+                    # 判定できなかったリンクはリンク切れと確認できるまで使い続ける
+                    unknown += alive[url] is None
+                    replaced += url != paper.pdf_url
+                    paper.pdf_url = url
+                    paper.pdf_url_candidates = candidates
+                    paper.pdf_url_checked = True
+                elif candidates:
+                    next_pending.append(paper)
+                else:
+                    dropped += 1
+                    paper.pdf_url = None
+                    paper.pdf_url_candidates = []
+                    paper.pdf_url_checked = True
+            pending = next_pending
+
+        logger.info(
+            f"Verified PDF links for {len(remaining)} papers: "
+            f"{replaced} replaced by alternatives, {dropped} without a live link, "
+            f"{unknown} kept unverified"
+        )
+        return papers
+
+    async def check_urls(
+        self, urls: Iterable[str], sem: asyncio.Semaphore
+    ) -> dict[str, bool | None]:
+        """複数のURLがPDFを返すかをまとめて確認します。
+
+        Args:
+            urls: 確認するURL
+            sem: 並列実行数を制限するセマフォ
+
+        Returns:
+            URLをキーとする確認結果の辞書（PDFを返す場合はTrue、リンク切れの場合はFalse、
+            判定できなかった場合はNone）
+        """
+        unique = list(dict.fromkeys(urls))
+        results: dict[str, bool | None] = dict(await asyncio.to_thread(self._lookup, unique))
+        unchecked = [url for url in unique if url not in results]
+        if not unchecked:
+            return results
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = {url: tg.create_task(self._probe(url, sem)) for url in unchecked}
+
+        rows = []
+        now = self.clock()
+        for url, task in tasks.items():
+            alive, status = task.result()
+            results[url] = alive
+            if alive is not None and status is not None:
+                rows.append((url, int(alive), status, now))
+        await asyncio.to_thread(self._store, rows)
+        return results
+
+    async def is_alive(self, url: str, sem: asyncio.Semaphore) -> bool | None:
+        """URLがPDFを返すかを確認します。
+
+        Args:
+            url: 確認するURL
+            sem: 並列実行数を制限するセマフォ
+
+        Returns:
+            PDFを取得できる場合はTrue、リンク切れの場合はFalse、判定できなかった場合はNone
+        """
+        return (await self.check_urls([url], sem))[url]
+
+    async def _probe(self, url: str, sem: asyncio.Semaphore) -> tuple[bool | None, int | None]:
+        """URLを確認し、(有効かどうか, ステータスコード) を返します。
+
+        有効かどうかは、PDFを返す場合はTrue、404・410または取得した先頭がPDFでない場合はFalse、
+        それ以外のステータス（403・429・5xxなど）・通信エラー・robots.txtで拒否された場合はNoneです。
+        """
+        try:
+            if not await self.robots.can_fetch(self.client, url):
+                logger.debug(f"Skip checking PDF link {url}: disallowed by robots.txt")
+                return None, None
+            async with sem, self.host_limiters.get(url), self.robots.delay_limiter(url):
+                resp = await self.client.head(url, follow_redirects=True, timeout=self.timeout)
+            if resp.status_code in self.DEAD_STATUS_CODES:
+                return False, resp.status_code
+            media_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if resp.status_code == 200 and media_type in self.PDF_CONTENT_TYPES:
+                return True, resp.status_code
+
+            # HEAD非対応、またはContent-Typeで判定できない場合は先頭だけ取得して確認する
+            headers = {"Range": f"bytes=0-{self.PROBE_BYTES - 1}"}
+            async with (
+                sem,
+                self.host_limiters.get(url),
+                self.robots.delay_limiter(url),
+                self.client.stream(
+                    "GET", url, headers=headers, follow_redirects=True, timeout=self.timeout
+                ) as resp,
+            ):
+                if resp.status_code in self.DEAD_STATUS_CODES:
+                    return False, resp.status_code
+                if resp.status_code not in (200, 206):
+                    logger.debug(f"Could not verify PDF link {url}: HTTP {resp.status_code}")
+                    return None, resp.status_code
+                head = b""
+                async for chunk in resp.aiter_bytes():
+                    head += chunk
+                    if len(head) >= len(self.PDF_MAGIC):
+                        break
+                return head.startswith(self.PDF_MAGIC), resp.status_code
+        except httpx.HTTPError as e:
+            logger.debug(f"Failed to check PDF link {url}: {e!r}")
+            return None, None
+
+    def _lookup(self, urls: list[str]) -> dict[str, bool]:
+        """TTL内のキャッシュ済みの確認結果を返します。"""
+        now = self.clock()
+        results: dict[str, bool] = {}
+        with self._lock:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT url, alive, checked_at FROM pdf_link_checks"
+                    f" WHERE url IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for row in rows:
+                    ttl = self.alive_ttl if row["alive"] else self.dead_ttl
+                    if now - row["checked_at"] < ttl:
+                        results[row["url"]] = bool(row["alive"])
+        return results
+
+    def _store(self, rows: list[tuple[str, int, int, float]]) -> None:
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pdf_link_checks (url, alive, status, checked_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
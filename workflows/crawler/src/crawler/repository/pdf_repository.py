@@ -0,0 +1,277 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import httpx
+from loguru import logger
+
+from crawler.domain.pdf import PdfFile
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry, get_robots_registry
+from crawler.utils.sqlite import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pdf_urls_sha256 ON pdf_urls (sha256);
+"""
+
+
+class PdfRejectedError(Exception):
+    """PDFとして受け入れられないレスポンスを受け取った場合の例外。"""
+
+
+class _RestartDownload(Exception):
+    """途中まで取得したデータを破棄して最初から取得し直す必要がある場合の例外。"""
+
+
+class PdfRepository:
+    """PDFをストリーミングでダウンロードし、SHA-256をキーに保存するリポジトリクラス。
+
+    - レスポンスボディは `CHUNK_SIZE` ずつディスクに書き込むため、メモリ使用量はファイルサイズに依存しません
+    - 途中で切断された場合は取得済みの部分を残し、次回は `Range` リクエストで続きから取得します
+      （`If-Range` でETag/Last-Modifiedを検証し、内容が変わっていれば最初から取得し直します）
+    - Content-Type・先頭のマジックバイト・サイズ上限を検証し、PDF以外は保存しません
+    - 保存先は `objects/<sha256の先頭2文字>/<sha256>.pdf` で、同じ内容のPDFは1つだけ保存されます
+    - 取得済みのURLはインデックスに記録され、再度ダウンロードされることはありません
+    - ホストごとのレート制限とrobots.txt（Crawl-delayを含む）に従います
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+    MAX_RESUME_ATTEMPTS = 3
+    PDF_MAGIC = b"%PDF-"
+    # PDFを application/octet-stream で返すサーバーも多いため許可し、マジックバイトで判定する
+    ALLOWED_CONTENT_TYPES = frozenset(
+        {"application/pdf", "application/x-pdf", "application/octet-stream", "binary/octet-stream"}
+    )
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        storage_dir: str | Path,
+        host_limiters: HostLimiters | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        robots: RobotsRegistry | None = None,
+    ) -> None:
+        """PdfRepositoryインスタンスを初期化します。
+
+        Args:
+            client: HTTPリクエストに使用するAsyncClientインスタンス
+            storage_dir: PDFの保存先ディレクトリ
+            host_limiters: ホストごとのレートリミッター。省略時はデフォルト設定を使用。
+            max_bytes: 1ファイルあたりの最大サイズ(バイト)
+            robots: robots.txtのレジストリ。省略時は登録済みのもの（なければメモリ上のみのもの）を使用。
+        """
+        self.client = client
+        self.storage_dir = Path(storage_dir)
+        self.objects_dir = self.storage_dir / "objects"
+        self.partial_dir = self.storage_dir / "partial"
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.host_limiters = host_limiters or HostLimiters()
+        self.max_bytes = max_bytes
+        self.robots = robots or get_robots_registry() or RobotsRegistry()
+        self._index = connect(self.storage_dir / "index.db")
+        self._index.executescript(_SCHEMA)
+        self._index_lock = threading.Lock()
+        self.total_downloaded_bytes = 0
+        self.total_download_seconds = 0.0
+
+    @property
+    def throughput_mb_per_s(self) -> float:
+        """これまでのダウンロード全体のスループット(MB/s)。"""
+        if self.total_download_seconds <= 0:
+            return 0.0
+        return self.total_downloaded_bytes / 1_000_000 / self.total_download_seconds
+
+    def close(self) -> None:
+        """インデックスの接続を閉じます。"""
+        self._index.close()
+
+    async def download(self, url: str, sem: asyncio.Semaphore) -> PdfFile | None:
+        """PDFをダウンロードして保存します。
+
+        Args:
+            url: PDFのURL
+            sem: 並列実行数を制限するセマフォ
+
+        Returns:
+            保存したPDFファイル。取得失敗・PDF以外・robots.txtで拒否された場合はNone
+        """
+        try:
+            return await self._download(url, sem)
+        except (httpx.InvalidURL, ValueError, OSError) as e:
+            # 不正なURL・壊れた部分ファイルのメタデータ・ディスクの書き込み失敗は論文ごとに記録し、
+            # 他の論文のダウンロードを止めない。壊れた部分ファイルは次の実行で最初から取得する
+            logger.warning(f"Failed to download PDF {url}: {e!r}")
+            self._discard(self._partial_path(url))
+            return None
+
+    async def _download(self, url: str, sem: asyncio.Semaphore) -> PdfFile | None:
+        cached = await asyncio.to_thread(self._lookup, url)
+        if cached is not None:
+            return cached
+
+        if not await self.robots.can_fetch(self.client, url):
+            logger.info(f"Skip downloading {url}: disallowed by robots.txt")
+            return None
+
+        partial = self._partial_path(url)
+        for attempt in range(1, self.MAX_RESUME_ATTEMPTS + 1):
+            start = time.monotonic()
+            try:
+                async with sem, self.host_limiters.get(url), self.robots.delay_limiter(url):
+                    content_type, digest, downloaded = await self._stream(url, partial)
+            except _RestartDownload:
+                self._discard(partial)
+                continue
+            except PdfRejectedError as e:
+                logger.info(f"Rejected PDF {url}: {e}")
+                self._discard(partial)
+                return None
+            except httpx.HTTPError as e:
+                # 取得済みの部分は残し、次の試行でRangeリクエストにより再開する
+                logger.warning(f"PDF download interrupted ({attempt}): {url}: {e!r}")
+                continue
+
+            elapsed = time.monotonic() - start
+            pdf = await asyncio.to_thread(self._commit, url, partial, digest, content_type)
+            pdf.downloaded_bytes = downloaded
+            pdf.elapsed_seconds = elapsed
+            self.total_downloaded_bytes += downloaded
+            self.total_download_seconds += elapsed
+            logger.debug(
+                f"Downloaded {url} ({pdf.size / 1_000_000:.2f} MB, "
+                f"{pdf.throughput_mb_per_s:.2f} MB/s)"
+            )
+            return pdf
+
+        logger.warning(f"Gave up downloading {url} after {self.MAX_RESUME_ATTEMPTS} attempts")
+        return None
+
+    async def _stream(self, url: str, partial: Path) -> tuple[str | None, str, int]:
+        """URLのボディを部分ファイルに追記し、(Content-Type, SHA-256, 転送バイト数)を返します。"""
+        meta_path = partial.with_suffix(".json")
+        offset = partial.stat().st_size if partial.exists() else 0
+        meta: dict[str, str] = {}
+        if offset and meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+
+        headers = {"Accept": "application/pdf"}
+        validator = meta.get("etag") or meta.get("last_modified")
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        else:
+            offset = 0
+
+        async with self.client.stream("GET", url, headers=headers, follow_redirects=True) as resp:
+            if resp.status_code == 416:
+                raise _RestartDownload()
+            if resp.status_code == 206:
+                if not resp.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+                    raise _RestartDownload()
+            elif resp.status_code == 200:
+                # Rangeが無視された、またはIf-Rangeの検証に失敗したため最初から取得する
+                offset = 0
+            else:
+                raise PdfRejectedError(f"unexpected status {resp.status_code}")
+
+            content_type = resp.headers.get("Content-Type")
+            media_type = (content_type or "").split(";")[0].strip().lower()
+            if media_type not in self.ALLOWED_CONTENT_TYPES:
+                raise PdfRejectedError(f"unexpected content type {content_type!r}")
+
+            content_length = resp.headers.get("Content-Length")
+            if content_length and offset + int(content_length) > self.max_bytes:
+                raise PdfRejectedError(f"too large ({offset + int(content_length)} bytes)")
+
+            meta = {
+                "etag": resp.headers.get("ETag", meta.get("etag", "")),
+                "last_modified": resp.headers.get("Last-Modified", meta.get("last_modified", "")),
+            }
+            meta_path.write_text(json.dumps(meta))
+
+            hasher = hashlib.sha256()
+            if offset:
+                await asyncio.to_thread(_hash_file, partial, hasher)
+
+            downloaded = 0
+            with partial.open("ab" if offset else "wb") as f:
+                async for chunk in resp.aiter_bytes(self.CHUNK_SIZE):
+                    if offset == 0 and downloaded == 0 and not chunk.startswith(self.PDF_MAGIC):
+                        raise PdfRejectedError("body is not a PDF")
+                    downloaded += len(chunk)
+                    if offset + downloaded > self.max_bytes:
+                        raise PdfRejectedError(f"exceeded {self.max_bytes} bytes")
+                    hasher.update(chunk)
+                    f.write(chunk)
+
+        return content_type, hasher.hexdigest(), downloaded
+
+    def _commit(self, url: str, partial: Path, digest: str, content_type: str | None) -> PdfFile:
+        """部分ファイルをSHA-256のパスに移動し、インデックスに登録します。"""
+        path = self.object_path(digest)
+        size = partial.stat().st_size
+        if path.exists():
+            # 同じ内容のPDFが保存済みのため、今回のファイルは破棄する
+            partial.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(partial, path)
+        partial.with_suffix(".json").unlink(missing_ok=True)
+
+        with self._index_lock:
+            self._index.execute(
+                "INSERT OR REPLACE INTO pdf_urls (url, sha256, size, content_type, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (url, digest, size, content_type, time.time()),
+            )
+        return PdfFile(url=url, sha256=digest, path=path, size=size, content_type=content_type)
+
+    def _lookup(self, url: str) -> PdfFile | None:
+        with self._index_lock:
+            row = self._index.execute(
+                "SELECT sha256, size, content_type FROM pdf_urls WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        path = self.object_path(row["sha256"])
+        if not path.exists():
+            return None
+        return PdfFile(
+            url=url,
+            sha256=row["sha256"],
+            path=path,
+            size=row["size"],
+            content_type=row["content_type"],
+        )
+
+    def object_path(self, digest: str) -> Path:
+        """SHA-256に対応する保存先のパスを返します。"""
+        return self.objects_dir / digest[:2] / f"{digest}.pdf"
+
+    def _partial_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.partial_dir / f"{key}.part"
+
+    @staticmethod
+    def _discard(partial: Path) -> None:
+        partial.unlink(missing_ok=True)
+        partial.with_suffix(".json").unlink(missing_ok=True)
+
+
+def _hash_file(path: Path, hasher: "hashlib._Hash") -> None:
+    """ファイルを少しずつ読み込んでハッシュを更新します（メモリ使用量を一定に保つため）。"""
+    with path.open("rb") as f:
+        while chunk := f.read(PdfRepository.CHUNK_SIZE):
+            hasher.update(chunk)
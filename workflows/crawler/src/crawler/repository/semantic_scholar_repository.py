@@ -6,6 +6,8 @@ from aiolimiter import AsyncLimiter
 from loguru import logger
 
 from crawler.domain.paper import Paper
+from crawler.repository.negative_cache import NegativeCache, NegativeLookup
+from crawler.utils.circuit_breaker import CircuitOpenError, is_circuit_open
 from crawler.utils.http_utils import post_with_retry
 
 
@@ -15,18 +17,36 @@ class SemanticScholarRepository:
     # Semantic Scholar APIは最大500件までバッチで取得可能
     BATCH_SIZE = 500
     FIELDS = "externalIds,abstract,openAccessPdf,title,year,venue,authors,url"
+    # 補完で埋めるPaperの項目 -> その値を返すAPIのフィールド
+    ENRICH_FIELDS = {"abstract": "abstract", "pdf_url": "openAccessPdf"}
+    FILLED_FIELDS = tuple(ENRICH_FIELDS)
+    # 取得結果を元の論文と結び付けるためのフィールド（DOIを含む）
+    JOIN_FIELD = "externalIds"
     BASE_URL = "https://api.semanticscholar.org"
     PAPER_BATCH_SEARCH_PATH = "graph/v1/paper/batch"
     DEFAULT_SLEEP_SECONDS = 0.1
+    # ネガティブキャッシュ上のサービス名
+    NEGATIVE_CACHE_SOURCE = "semantic_scholar"
 
-    def __init__(self, client: httpx.AsyncClient, limiter: AsyncLimiter | None = None) -> None:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        limiter: AsyncLimiter | None = None,
+        negative_cache: NegativeCache | None = None,
+    ) -> None:
         """SemanticScholarRepositoryインスタンスを初期化します。
 
         Args:
             client: HTTPリクエストに使用するAsyncClientインスタンス
             limiter: レート制限を行うAsyncLimiterインスタンス。省略時はデフォルト設定を使用。
+            negative_cache: 見つからなかった（null）DOIを記録するキャッシュ。省略時は毎回問い合わせる。
         """
         self.client = client
+        self.negative_cache = negative_cache
+        # 送信したリクエスト数、取得したバッチ数とレスポンスボディの合計バイト数
+        self.requests = 0
+        self.batches = 0
+        self.response_bytes = 0
         if limiter:
             self.limiter = limiter
         else:
@@ -40,7 +60,10 @@ class SemanticScholarRepository:
     ) -> list[Paper]:
         """論文リストにSemantic Scholarのデータ（Abstract と PDF URL）を付与します。
 
-        DOIを持つ論文のみが処理対象となります。
+        DOIを持つ論文のみが処理対象となります。全ての論文を1つのバッチの列で問い合わせ、APIには
+        結合用の `externalIds` と、いずれかの論文に欠けている項目（`overwrite` の場合は全ての補完項目）
+        のフィールドの和集合だけを要求します。PDFリンクは既にある論文でも代替候補として集めるため、
+        常に要求します。ネガティブキャッシュに見つからなかったことが記録されているDOIはバッチに含めません。
 
         Args:
             papers: 更新対象の論文リスト
@@ -52,11 +75,34 @@ class SemanticScholarRepository:
         """
         # DOIを持つ論文を抽出
         doi_map = {p.doi: p for p in papers if p.doi}
-        if not doi_map:
+        dois = list(doi_map)
+        if not dois:
             return papers
 
-        dois = list(doi_map.keys())
-        fetched_papers = await self.fetch_papers_batch(dois, sem=semaphore)
+        lookup = NegativeLookup(self.NEGATIVE_CACHE_SOURCE)
+        if self.negative_cache:
+            lookup = await self.negative_cache.lookup(self.NEGATIVE_CACHE_SOURCE, dois)
+            if lookup.known:
+                dois = [doi for doi in dois if not lookup.is_known(doi)]
+                logger.info(
+                    f"Skip {len(lookup.known)} DOIs known to be missing on Semantic Scholar"
+                )
+
+        fields = self._requested_fields([doi_map[doi] for doi in dois], overwrite)
+        batches, response_bytes = self.batches, self.response_bytes
+        fetched_papers = await self.fetch_papers_batch(
+            dois, sem=semaphore, lookup=lookup, fields=self._projection(fields)
+        )
+        if self.negative_cache:
+            await self.negative_cache.update(lookup)
+        if self.batches > batches:
+            num_batches = self.batches - batches
+            num_bytes = self.response_bytes - response_bytes
+            logger.info(
+                f"Fetched {len(fetched_papers)} papers from Semantic Scholar in {num_batches} "
+                f"batches ({num_bytes / 1024:.1f} KiB, {num_bytes / num_batches / 1024:.1f} KiB/batch)"
+            )
+
         fetched_map = {p.doi: p for p in fetched_papers if p.doi}
 
         for doi, paper in doi_map.items():
@@ -68,18 +114,40 @@ class SemanticScholarRepository:
             if fetched_paper.abstract and (not paper.abstract or overwrite):
                 paper.abstract = fetched_paper.abstract
 
-            # PDF URL
-            if fetched_paper.pdf_url and (not paper.pdf_url or overwrite):
-                paper.pdf_url = fetched_paper.pdf_url
+            # PDF URL（既にある場合は代替候補として残す）
+            paper.add_pdf_urls([fetched_paper.pdf_url], overwrite=overwrite)
 
         return papers
 
-    async def fetch_papers_batch(self, dois: list[str], sem: asyncio.Semaphore) -> list[Paper]:
+    def _requested_fields(self, papers: list[Paper], overwrite: bool) -> tuple[str, ...]:
+        """論文の補完に必要なAPIのフィールドを返します（全ての論文で値がある項目は除く）。
+
+        PDFリンクは既にある論文でも代替候補（`pdf_url_candidates`）として使うため、常に要求します。
+        """
+        return tuple(
+            field
+            for attr, field in self.ENRICH_FIELDS.items()
+            if overwrite or attr == "pdf_url" or any(not getattr(p, attr) for p in papers)
+        )
+
+    def _projection(self, fields: tuple[str, ...]) -> str:
+        """APIに要求する `fields` パラメータを返します。"""
+        return ",".join((self.JOIN_FIELD, *fields))
+
+    async def fetch_papers_batch(
+        self,
+        dois: list[str],
+        sem: asyncio.Semaphore,
+        lookup: NegativeLookup | None = None,
+        fields: str = FIELDS,
+    ) -> list[Paper]:
         """Semantic Scholar APIからバッチで論文データを取得します。
 
         Args:
             dois: DOIのリスト
             sem: 並列実行数を制限するセマフォ
+            lookup: 見つからなかった（null）DOIと見つかったDOIを記録するネガティブキャッシュの検索結果
+            fields: APIに要求するフィールド（カンマ区切り）。返されないフィールドのPaperの項目は空になる
 
         Returns:
             Paperオブジェクトのリスト（取得できたもののみ）
@@ -94,7 +162,7 @@ class SemanticScholarRepository:
         async with asyncio.TaskGroup() as tg:
             for i in range(0, len(dois), self.BATCH_SIZE):
                 batch = dois[i : i + self.BATCH_SIZE]
-                tasks.append(tg.create_task(self._fetch_single_batch(batch, _sem)))
+                tasks.append(tg.create_task(self._fetch_single_batch(batch, _sem, lookup, fields)))
 
         # 結果をフラット化
         papers: list[Paper] = []
@@ -105,33 +173,60 @@ class SemanticScholarRepository:
         return papers
 
     async def _fetch_single_batch(
-        self, batch_dois: list[str], sem: asyncio.Semaphore
+        self,
+        batch_dois: list[str],
+        sem: asyncio.Semaphore,
+        lookup: NegativeLookup | None = None,
+        fields: str = FIELDS,
     ) -> list[Paper] | None:
         """Semantic Scholar APIから単一バッチでデータを取得します。
 
         Args:
             batch_dois: DOIのリスト
             sem: 並行実行数を制限するセマフォ
+            lookup: 見つからなかった（null）DOIと見つかったDOIを記録するネガティブキャッシュの検索結果
+            fields: APIに要求するフィールド（カンマ区切り）
 
         Returns:
             Paperオブジェクトのリスト。取得エラー時はNone。
         """
+        # サーキットが開いている間は残りのバッチをスキップする（セマフォ・リミッターも待たない）
+        if is_circuit_open(self.BASE_URL):
+            return None
 
         try:
-            async with sem, self.limiter:
-                payload = {"ids": [f"DOI:{doi}" for doi in batch_dois]}
-                params = {"fields": self.FIELDS}
-                resp = await post_with_retry(
-                    self.client,
-                    f"{self.BASE_URL}/{self.PAPER_BATCH_SEARCH_PATH}",
-                    params=params,
-                    json=payload,
-                )
+            # セマフォは送信の間だけ取得し、429による一時停止の間は他のホストに譲る。
+            # リミッターの枠は再送を含む試行ごとに一時停止の解除後に取得する
+            self.requests += 1
+            payload = {"ids": [f"DOI:{doi}" for doi in batch_dois]}
+            params = {"fields": fields}
+            resp = await post_with_retry(
+                self.client,
+                f"{self.BASE_URL}/{self.PAPER_BATCH_SEARCH_PATH}",
+                params=params,
+                json=payload,
+                # バッチ検索は副作用がないため、一時的な障害でも再送してよい
+                idempotent=True,
+                semaphore=sem,
+                limiter=self.limiter,
+            )
             resp.raise_for_status()
+            self.batches += 1
+            self.response_bytes += len(resp.content)
+            logger.debug(
+                f"S2 batch of {len(batch_dois)} DOIs ({fields}): {len(resp.content)} bytes"
+            )
             data = resp.json()
 
             # レスポンスのパース
             papers = []
+            # レスポンスはリクエストしたIDと同じ順序で返り、見つからないIDはnullになる
+            if lookup is not None and len(data) == len(batch_dois):
+                for doi, item in zip(batch_dois, data, strict=True):
+                    if item:
+                        lookup.add_hit(doi)
+                    else:
+                        lookup.add_miss(doi)
             for item in data:
                 if item:  # item自体がNoneの場合がある（API仕様）
                     paper = self._parse_single_paper(item)
@@ -146,6 +241,9 @@ class SemanticScholarRepository:
             else:
                 logger.warning(f"Failed to fetch paper for DOIs {batch_dois}: {e}")
             return None
+        except CircuitOpenError as e:
+            logger.debug(f"Skip S2 batch of {len(batch_dois)} DOIs: {e}")
+            return None
         except Exception as e:
             logger.warning(f"Unexpected error fetching S2 batch: {e}")
             return None
@@ -189,15 +287,6 @@ class SemanticScholarRepository:
             pdf_url=pdf_url,
         )
 
-    async def check_url_exists(self, url: str) -> bool:
-        """指定されたURLが存在するか確認します。"""
-
-        try:
-            resp = await self.client.head(url)
-            return resp.status_code == 200
-        except Exception:
-            return False
-
     @staticmethod
     def create_limiter() -> AsyncLimiter:
         return AsyncLimiter(1, SemanticScholarRepository.DEFAULT_SLEEP_SECONDS)
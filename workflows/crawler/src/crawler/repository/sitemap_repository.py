@@ -0,0 +1,198 @@
+import asyncio
+import tempfile
+from typing import IO
+
+import httpx
+from loguru import logger
+
+from crawler.domain.web_page import UrlState
+from crawler.repository.crawl_state_store import CrawlStateStore
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry, get_robots_registry
+from crawler.utils.sitemap import iter_sitemap
+
+
+class SitemapTooLargeError(Exception):
+    """サイトマップがサイズ上限を超えた場合の例外。"""
+
+
+class SitemapRepository:
+    """サイトマップを巡回し、新規・更新されたページを列挙するリポジトリクラス。
+
+    - サイトマップインデックスと子サイトマップ（gzip圧縮を含む）を再帰的に辿ります
+    - ボディは一時ファイルにストリーミングで書き込み、`iterparse` で解析するため、
+      メモリ使用量はサイトマップのサイズに依存しません
+    - サイトマップはETag/Last-Modifiedによる条件付きGETで取得し、304の場合は前回の内容を使います
+    - インデックスに記載された `<lastmod>` が前回と同じ子サイトマップは取得しません
+    - ページごとの `<lastmod>` を `CrawlStateStore` に記録し、前回の取得以降に
+      追加・更新されたページだけを返します
+
+    そのため、定期実行のコストはサイトの規模ではなく更新件数に比例します。
+    """
+
+    MAX_BYTES = 100 * 1024 * 1024
+    MAX_DEPTH = 3
+    CHUNK_SIZE = 64 * 1024
+    # 解析結果をストアに書き込む単位
+    DISCOVER_BATCH_SIZE = 1000
+    # 一時ファイルをメモリ上に保持する上限（超えるとディスクに書き出される）
+    SPOOL_MAX_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        state_store: CrawlStateStore,
+        host_limiters: HostLimiters | None = None,
+        robots: RobotsRegistry | None = None,
+    ) -> None:
+        """SitemapRepositoryインスタンスを初期化します。
+
+        Args:
+            client: HTTPリクエストに使用するAsyncClientインスタンス
+            state_store: URLごとのクロール状態を保存するストア
+            host_limiters: ホストごとのレートリミッター。省略時はデフォルト設定を使用。
+            robots: robots.txtのレジストリ。省略時は登録済みのもの（なければメモリ上のみのもの）を使用。
+        """
+        self.client = client
+        self.state_store = state_store
+        self.host_limiters = host_limiters or HostLimiters()
+        self.robots = robots or get_robots_registry() or RobotsRegistry()
+
+    async def discover_sitemaps(self, site_url: str) -> list[str]:
+        """サイトのrobots.txtに記載されたサイトマップのURLを返します。
+
+        Args:
+            site_url: サイトのURL
+
+        Returns:
+            サイトマップのURLリスト
+        """
+        guard = await self.robots.guard(self.client, site_url)
+        return guard.get_sitemaps() or []
+
+    async def changed_pages(
+        self, sitemap_url: str, sem: asyncio.Semaphore, site: str | None = None
+    ) -> list[UrlState]:
+        """前回の取得以降に追加・更新されたページを返します。
+
+        返されたページを取得した後、`CrawlStateStore.mark_synced` で取得済みとして
+        記録してください。記録されなかったページは次回も返されます。
+
+        Args:
+            sitemap_url: サイトマップ（またはサイトマップインデックス）のURL
+            sem: 並列実行数を制限するセマフォ
+            site: サイト名
+
+        Returns:
+            取得が必要なページの状態のリスト
+        """
+        pages: list[UrlState] = []
+        await self._visit(sitemap_url, sem, site, 0, pages)
+        logger.info(f"Found {len(pages)} new or updated pages in {sitemap_url}")
+        return pages
+
+    async def _visit(
+        self,
+        url: str,
+        sem: asyncio.Semaphore,
+        site: str | None,
+        depth: int,
+        pages: list[UrlState],
+    ) -> None:
+        if depth > self.MAX_DEPTH:
+            logger.warning(f"Skip sitemap {url}: nested too deeply")
+            return
+        if not await self.robots.can_fetch(self.client, url):
+            logger.info(f"Skip sitemap {url}: disallowed by robots.txt")
+            return
+
+        state = await asyncio.to_thread(self.state_store.get, url)
+        try:
+            downloaded = await self._download(url, state, sem)
+        except (httpx.HTTPError, SitemapTooLargeError) as e:
+            # 取得に失敗した場合も、前回までに見つけた未取得のページは返す
+            logger.warning(f"Failed to fetch sitemap {url}: {e!r}")
+            downloaded = None
+
+        if downloaded is not None:
+            body, synced = downloaded
+            with body:
+                try:
+                    await asyncio.to_thread(self._ingest, body, url, site)
+                except Exception as e:
+                    logger.warning(f"Failed to parse sitemap {url}: {e!r}")
+                    return
+            # 解析に成功した場合のみ検証子を記録する（失敗した場合は次回も全体を取得する）
+            await asyncio.to_thread(self.state_store.mark_synced, [synced])
+
+        children = await asyncio.to_thread(self.state_store.children, url, "sitemap")
+        for child in children:
+            if child.synced_at and child.lastmod and child.lastmod == child.synced_lastmod:
+                # インデックス上の更新日時が前回と同じ子サイトマップは取得しない
+                await asyncio.to_thread(self._collect_pending, child.url, pages)
+            else:
+                await self._visit(child.url, sem, site, depth + 1, pages)
+
+        pages.extend(await asyncio.to_thread(self.state_store.pending_pages, url))
+
+    async def _download(
+        self, url: str, state: UrlState | None, sem: asyncio.Semaphore
+    ) -> tuple[IO[bytes], UrlState] | None:
+        """サイトマップを条件付きGETで一時ファイルに取得します。
+
+        Returns:
+            (ボディの一時ファイル, 取得後に記録する状態) のタプル。304の場合はNone
+        """
+        headers = state.conditional_headers() if state else {}
+        async with (
+            sem,
+            self.host_limiters.get(url),
+            self.robots.delay_limiter(url),
+            self.client.stream("GET", url, headers=headers, follow_redirects=True) as resp,
+        ):
+            if resp.status_code == 304:
+                logger.debug(f"Sitemap not modified: {url}")
+                return None
+            resp.raise_for_status()
+
+            body = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE)
+            size = 0
+            try:
+                async for chunk in resp.aiter_bytes(self.CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.MAX_BYTES:
+                        raise SitemapTooLargeError(f"{url} exceeded {self.MAX_BYTES} bytes")
+                    body.write(chunk)
+            except BaseException:
+                body.close()
+                raise
+            body.seek(0)
+
+        synced = UrlState(
+            url=url,
+            kind="sitemap",
+            parent=state.parent if state else None,
+            lastmod=state.lastmod if state else None,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+        return body, synced
+
+    def _ingest(self, body: IO[bytes], url: str, site: str | None) -> None:
+        """サイトマップを解析し、見つけたURLを一定件数ずつストアに記録します（スレッドで実行）。"""
+        batch: list[UrlState] = []
+        for item in iter_sitemap(body):
+            kind = "sitemap" if item.kind == "sitemap" else "page"
+            batch.append(
+                UrlState(url=item.loc, kind=kind, parent=url, site=site, lastmod=item.lastmod)
+            )
+            if len(batch) >= self.DISCOVER_BATCH_SIZE:
+                self.state_store.discover(batch)
+                batch = []
+        self.state_store.discover(batch)
+
+    def _collect_pending(self, url: str, pages: list[UrlState]) -> None:
+        """取得せずに、前回までに記録した子サイトマップ配下の未取得のページを集めます。"""
+        pages.extend(self.state_store.pending_pages(url))
+        for child in self.state_store.children(url, "sitemap"):
+            self._collect_pending(child.url, pages)
@@ -7,7 +7,10 @@ from loguru import logger
 
 from crawler.configs import EMAIL
 from crawler.domain.paper import Paper
+from crawler.repository.negative_cache import NegativeCache, NegativeLookup
+from crawler.utils.circuit_breaker import CircuitOpenError, is_circuit_open
 from crawler.utils.http_utils import get_with_retry
+from crawler.utils.worker_pool import run_in_pool
 
 
 class UnpaywallRepository:
@@ -16,15 +19,33 @@ class UnpaywallRepository:
     BASE_URL = "https://api.unpaywall.org"
     PAPER_SEARCH_PATH = "v2"
     DEFAULT_SLEEP_SECONDS = 0.1
-
-    def __init__(self, client: httpx.AsyncClient, limiter: AsyncLimiter | None = None) -> None:
+    # 論文ごとの取得を並行に行うワーカー数（同時に存在するコルーチン数の上限）
+    DEFAULT_NUM_WORKERS = 32
+    # ネガティブキャッシュ上のサービス名
+    NEGATIVE_CACHE_SOURCE = "unpaywall"
+    # 補完するPaperの項目
+    FILLED_FIELDS = ("pdf_url",)
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        limiter: AsyncLimiter | None = None,
+        num_workers: int = DEFAULT_NUM_WORKERS,
+        negative_cache: NegativeCache | None = None,
+    ) -> None:
         """UnpaywallRepositoryインスタンスを初期化します。
 
         Args:
             client: HTTPリクエストに使用するAsyncClientインスタンス
             limiter: レート制限を行うAsyncLimiterインスタンス。省略時はデフォルト設定を使用。
+            num_workers: `enrich_papers` で論文を並行に処理するワーカー数
+            negative_cache: 見つからなかった（404）DOIを記録するキャッシュ。省略時は毎回問い合わせる。
         """
         self.client = client
+        self.num_workers = num_workers
+        self.negative_cache = negative_cache
+        # 送信したリクエスト数
+        self.requests = 0
         if limiter:
             self.limiter = limiter
         else:
@@ -38,7 +59,8 @@ class UnpaywallRepository:
     ) -> list[Paper]:
         """論文リストにUnpaywallのデータを付与します。
 
-        DOIを持つ論文のみが処理対象となります。
+        DOIを持つ論文のみが処理対象となります。ネガティブキャッシュに見つからなかったことが
+        記録されているDOIは、レート制限の枠を使わずにスキップします。
 
         Args:
             papers: 更新対象の論文リスト
@@ -53,34 +75,59 @@ class UnpaywallRepository:
         if not target_papers:
             return papers
 
-        sem = semaphore
-
-        async with asyncio.TaskGroup() as tg:
-            for paper in target_papers:
-                tg.create_task(self._enrich_single_paper(paper, sem, overwrite))
+        lookup = NegativeLookup(self.NEGATIVE_CACHE_SOURCE)
+        if self.negative_cache:
+            lookup = await self.negative_cache.lookup(
+                self.NEGATIVE_CACHE_SOURCE, [p.doi for p in target_papers if p.doi]
+            )
+            if lookup.known:
+                target_papers = [p for p in target_papers if p.doi and not lookup.is_known(p.doi)]
+                logger.info(f"Skip {len(lookup.known)} DOIs known to be missing on Unpaywall")
+
+        await run_in_pool(
+            target_papers,
+            lambda paper: self._enrich_single_paper(paper, semaphore, overwrite, lookup),
+            self.num_workers,
+        )
+        if self.negative_cache:
+            await self.negative_cache.update(lookup)
 
+        if is_circuit_open(self.BASE_URL):
+            logger.warning(
+                f"Unpaywall enrichment was cut short: circuit for {self.BASE_URL} is open"
+            )
         return papers
 
     async def _enrich_single_paper(
-        self, paper: Paper, sem: asyncio.Semaphore, overwrite: bool
+        self,
+        paper: Paper,
+        sem: asyncio.Semaphore,
+        overwrite: bool,
+        lookup: NegativeLookup | None = None,
     ) -> None:
         """単一の論文をUnpaywallデータで更新します。"""
         if not paper.doi:
             return
+        # サーキットが開いている間は残りの論文をスキップする（セマフォ・リミッターも待たない）
+        if is_circuit_open(self.BASE_URL):
+            return
 
-        fetched_paper = await self.fetch_by_doi(paper.doi, sem)
+        fetched_paper = await self.fetch_by_doi(paper.doi, sem, lookup)
         if not fetched_paper:
             return
 
-        # PDF URLの更新
-        new_url = fetched_paper.pdf_url
-        if new_url:
-            if not paper.pdf_url or overwrite:
-                paper.pdf_url = new_url
+        # PDF URLの更新（best_oa_location以外のoa_locationsも代替候補として残す）
+        paper.add_pdf_urls(
+            [fetched_paper.pdf_url, *fetched_paper.pdf_url_candidates], overwrite=overwrite
+        )
 
-    async def fetch_by_doi(self, doi: str, sem: asyncio.Semaphore) -> Paper | None:
+    async def fetch_by_doi(
+        self, doi: str, sem: asyncio.Semaphore, lookup: NegativeLookup | None = None
+    ) -> Paper | None:
         """DOIを使用して論文データを取得します。
 
+        `lookup` を指定した場合、404のDOIをミス、取得できたDOIをヒットとして記録します。
+
         Note:
             PaperEnricherプロトコルからは削除されましたが、内部ヘルパーとして維持、
             または個別のテスト用にpublicのままにしておきます。
@@ -89,37 +136,48 @@ class UnpaywallRepository:
         url = f"{self.BASE_URL}/{self.PAPER_SEARCH_PATH}/{doi}"
 
         try:
-            async with sem, self.limiter:
-                resp = await get_with_retry(self.client, url, params={"email": EMAIL})
+            # セマフォは送信の間だけ取得し、429による一時停止の間は他のホストに譲る。
+            # リミッターの枠は再送を含む試行ごとに一時停止の解除後に取得する
+            self.requests += 1
+            resp = await get_with_retry(
+                self.client, url, params={"email": EMAIL}, semaphore=sem, limiter=self.limiter
+            )
             resp.raise_for_status()
             data = resp.json()
+            if lookup is not None:
+                lookup.add_hit(doi)
             return self._parse_paper(data)
         except httpx.HTTPStatusError as e:
             # 404 Not Foundは論文が存在しないケースとして扱う
             if e.response.status_code == 404:
                 logger.debug(f"No paper found for DOI {doi} on Unpaywall (404).")
+                if lookup is not None:
+                    lookup.add_miss(doi)
             else:
                 logger.warning(f"Failed to fetch paper for DOI {doi}: {e}")
             return None
+        except PermissionError as e:
+            logger.warning(f"Skip fetching paper for DOI {doi}: {e}")
+            return None
+        except CircuitOpenError as e:
+            logger.debug(f"Skip fetching paper for DOI {doi}: {e}")
+            return None
+        except httpx.TransportError as e:
+            logger.warning(f"Request error for DOI {doi}: {e!r}")
+            return None
 
     def _parse_paper(self, data: dict[str, Any]) -> Paper | None:
         """APIレスポンスからPaperオブジェクトを生成します。"""
         if not data:
             return None
 
-        # PDF URLの取得ロジック
-        pdf_url = None
-        best_oa_location = data.get("best_oa_location")
-        if best_oa_location:
-            pdf_url = best_oa_location.get("url_for_pdf")
-
-        if not pdf_url:
-            oa_locations = data.get("oa_locations", [])
-            for loc in oa_locations:
-                url = loc.get("url_for_pdf")
-                if url:
-                    pdf_url = url
-                    break
+        # PDF URLの取得ロジック: best_oa_locationを優先し、oa_locationsの残りは代替候補とする
+        pdf_urls: list[str] = []
+        locations = [data.get("best_oa_location"), *(data.get("oa_locations") or [])]
+        for loc in locations:
+            url = loc.get("url_for_pdf") if loc else None
+            if url and url not in pdf_urls:
+                pdf_urls.append(url)
 
         # Paperオブジェクトの生成 (部分データ)
         doi = data.get("doi")
@@ -134,7 +192,8 @@ class UnpaywallRepository:
             year=0,  # yearも取得可能だが省略
             venue="",  # venueも取得可能だが省略
             doi=doi,
-            pdf_url=pdf_url,
+            pdf_url=pdf_urls[0] if pdf_urls else None,
+            pdf_url_candidates=pdf_urls[1:],
         )
 
     @staticmethod
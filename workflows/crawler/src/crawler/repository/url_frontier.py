@@ -0,0 +1,334 @@
+import asyncio
+import heapq
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import httpx
+from loguru import logger
+
+from crawler.domain.web_page import FrontierUrl
+from crawler.utils.host_limiter import host_of
+from crawler.utils.robots import RobotsRegistry, get_robots_registry
+from crawler.utils.sqlite import add_missing_columns, connect
+from crawler.utils.url import canonicalize_url
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    site TEXT,
+    parent TEXT,
+    lastmod TEXT,
+    enqueued_at REAL NOT NULL,
+    leased INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_frontier_host ON frontier (host, leased, priority, enqueued_at);
+CREATE TABLE IF NOT EXISTS frontier_seen (
+    url TEXT PRIMARY KEY,
+    lastmod TEXT
+) WITHOUT ROWID;
+"""
+
+# 未登録のURL、またはlastmodが前回より新しいURLの場合のみ行が変更される
+_SEE = """
+INSERT INTO frontier_seen (url, lastmod) VALUES (?, ?)
+ON CONFLICT (url) DO UPDATE SET lastmod = excluded.lastmod
+WHERE excluded.lastmod IS NOT NULL
+  AND (frontier_seen.lastmod IS NULL OR excluded.lastmod > frontier_seen.lastmod)
+"""
+
+_ENQUEUE = """
+INSERT INTO frontier (url, host, priority, site, parent, lastmod, enqueued_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# キューに残っているURLが更新された場合は、優先度と更新日時だけを更新する
+_REQUEUE = """
+UPDATE frontier SET priority = MIN(priority, ?), lastmod = ? WHERE url = ?
+"""
+
+# 一時的な失敗で再試行を待っている(not_beforeが未来の)URLは払い出さない
+_NEXT = """
+SELECT url, priority, site, parent, lastmod FROM frontier
+WHERE host = ? AND leased = 0 AND not_before <= ?
+ORDER BY priority, enqueued_at
+LIMIT 1
+"""
+
+_NEXT_RETRY_AT = """
+SELECT MIN(not_before) FROM frontier WHERE host = ? AND leased = 0
+"""
+
+_RETRY = """
+UPDATE frontier SET leased = 0, attempts = attempts + 1 WHERE url = ? RETURNING attempts
+"""
+
+
+class UrlFrontier:
+    """ドメインごとの行儀のよさ(politeness)を守ってURLを払い出す永続URLフロンティア。
+
+    - URLはSQLiteに保存し、メモリ上にはホストごとの次回リクエスト可能時刻のヒープと
+      件数だけを保持するため、数百万件のURLを登録してもメモリ使用量はホスト数に比例します
+    - 登録時にURLを正規化し、既に見たURL(seen-set)は登録しません。
+      ただし、サイトマップ・フィードの更新日時が前回より新しい場合は再登録します
+    - 同じホストのURLは同時に1件だけ払い出し、完了後、robots.txtの `Crawl-delay` /
+      `Request-rate`（なければ `min_delay`）の間隔を空けてから次のURLを払い出します
+    - robots.txtで拒否されたURLは払い出さずに破棄します
+    - 一時的な失敗（5xx・タイムアウトなど）のURLは破棄せず、指数バックオフの後に再び払い出します。
+      `MAX_ATTEMPTS` 回失敗したURLは破棄し、seen-setからも消して次のサイトマップ・フィードで再登録できるようにします
+
+    ワーカーは `lease` で取得したURLを処理し、完了後に必ず `release` を呼び出してください
+    （失敗した場合は `failed=True`）。払い出し中にプロセスが終了したURLは、次回の起動時に再び払い出されます。
+    """
+
+    DEFAULT_MIN_DELAY_SECONDS = 1.0
+    # robots.txtの指定が極端に長い場合でもクロールが止まらないようにする上限
+    MAX_DELAY_SECONDS = 60.0
+    DEFAULT_RETRY_DELAY_SECONDS = 30.0
+    MAX_RETRY_DELAY_SECONDS = 10 * 60.0
+    MAX_ATTEMPTS = 4
+
+    def __init__(
+        self,
+        path: str | Path,
+        client: httpx.AsyncClient,
+        robots: RobotsRegistry | None = None,
+        min_delay: float = DEFAULT_MIN_DELAY_SECONDS,
+        retry_delay: float = DEFAULT_RETRY_DELAY_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """UrlFrontierインスタンスを初期化します。
+
+        Args:
+            path: SQLiteファイルのパス
+            client: robots.txtの取得に使用するAsyncClientインスタンス
+            robots: robots.txtのレジストリ。省略時は登録済みのもの（なければメモリ上のみのもの）を使用。
+            min_delay: 同じホストへのリクエストの最小間隔(秒)
+            retry_delay: 一時的な失敗の後、同じURLを再び払い出すまでの最初の待機時間(秒)。
+                失敗するたびに2倍にする（上限 `MAX_RETRY_DELAY_SECONDS`）
+            clock: 現在時刻(UNIX秒)を返す関数（テスト用）
+        """
+        self.client = client
+        self.robots = robots or get_robots_registry() or RobotsRegistry()
+        self.min_delay = min_delay
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self._conn = connect(path)
+        self._conn.executescript(_SCHEMA)
+        add_missing_columns(
+            self._conn,
+            "frontier",
+            {"attempts": "INTEGER NOT NULL DEFAULT 0", "not_before": "REAL NOT NULL DEFAULT 0"},
+        )
+        self._lock = threading.Lock()
+
+        # ホストごとの未払い出しのURL数、次回リクエスト可能時刻、払い出し可能なホストのヒープ
+        self._pending: dict[str, int] = {}
+        self._ready_at: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._scheduled: set[str] = set()
+        self._inflight: set[str] = set()
+        self._cond = asyncio.Condition()
+
+        # 前回の実行で払い出し中だったURLを戻す
+        self._conn.execute("UPDATE frontier SET leased = 0 WHERE leased = 1")
+        for row in self._conn.execute("SELECT host, COUNT(*) FROM frontier GROUP BY host"):
+            self._pending[row[0]] = row[1]
+            self._schedule(row[0], 0.0)
+
+    def close(self) -> None:
+        """データベース接続を閉じます。"""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        """未処理（払い出し中を含む）のURL数を返します。"""
+        return sum(self._pending.values())
+
+    async def add(self, urls: Iterable[FrontierUrl]) -> int:
+        """URLをフロンティアに登録します。
+
+        Args:
+            urls: 登録するURL
+
+        Returns:
+            新たに登録したURL数（既に見たURL・不正なURLは含まない）
+        """
+        added = await asyncio.to_thread(self._add, list(urls))
+        async with self._cond:
+            for host, count in added.items():
+                self._pending[host] = self._pending.get(host, 0) + count
+                if host not in self._inflight:
+                    self._schedule(host, self._ready_at.get(host, 0.0))
+            self._cond.notify_all()
+        return sum(added.values())
+
+    async def lease(self) -> FrontierUrl | None:
+        """次に取得してよいURLを払い出します。
+
+        全てのホストが待機中の場合は、いずれかのホストが取得可能になるまで待ちます。
+
+        Returns:
+            取得するURL。フロンティアが空で、払い出し中のURLもない場合はNone
+        """
+        while True:
+            async with self._cond:
+                host = await self._wait_ready_host()
+                if host is None:
+                    return None
+                self._inflight.add(host)
+
+            # 払い出さずに抜ける場合（例外・キャンセルを含む）は、必ずホストを払い出し中から戻す
+            item: FrontierUrl | None = None
+            retry_at: float | None = None
+            leased = False
+            consumed = 0
+            try:
+                item, retry_at = await asyncio.to_thread(self._lease_next, host)
+                if item is None:
+                    continue
+                if not await self.robots.can_fetch(self.client, item.url):
+                    logger.info(f"Drop {item.url}: disallowed by robots.txt")
+                    consumed = await asyncio.to_thread(self._delete, item.url)
+                    continue
+                leased = True
+                return item
+            finally:
+                if not leased:
+                    if item is not None and not consumed:
+                        await asyncio.to_thread(self._unlease, item.url)
+                    # 再試行を待っているURLだけが残るホストは、最も早い再試行の時刻に再スケジュールする
+                    delay = 0.0 if retry_at is None else max(0.0, retry_at - self.clock())
+                    exhausted = item is None and retry_at is None
+                    await self._finish(host, delay, consumed=consumed, exhausted=exhausted)
+
+    async def release(self, item: FrontierUrl, failed: bool = False) -> None:
+        """払い出したURLの処理が完了したことを記録し、ホストの次のURLを払い出せるようにします。
+
+        成功した場合（304・恒久的な4xxを含む）はURLをキューから削除します。一時的な失敗の場合は
+        削除せず、指数バックオフの後に再び払い出します（`MAX_ATTEMPTS` 回失敗したら破棄）。
+
+        Args:
+            item: `lease` で払い出したURL
+            failed: 一時的な失敗で、後で再試行するかどうか
+        """
+        deleted = 0
+        delay = self.min_delay
+        try:
+            if failed:
+                deleted = await asyncio.to_thread(self._retry, item.url)
+            else:
+                deleted = await asyncio.to_thread(self._delete, item.url)
+            interval = await self.robots.crawl_interval(self.client, item.url)
+            delay = min(max(interval or 0.0, self.min_delay), self.MAX_DELAY_SECONDS)
+        finally:
+            await self._finish(host_of(item.url), delay, consumed=deleted)
+
+    async def _wait_ready_host(self) -> str | None:
+        """次回リクエスト可能時刻を過ぎたホストを待って取り出します（`_cond` を保持して呼び出すこと）。"""
+        while True:
+            if not self._heap:
+                if not self._inflight:
+                    return None
+                await self._cond.wait()
+                continue
+            ready_at, host = self._heap[0]
+            wait = ready_at - self.clock()
+            if wait > 0:
+                # 待機中に他のホストが登録・解放された場合は起こされる
+                try:
+                    await asyncio.wait_for(self._cond.wait(), wait)
+                except TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            self._scheduled.discard(host)
+            return host
+
+    async def _finish(
+        self, host: str, delay: float, consumed: int = 0, exhausted: bool = False
+    ) -> None:
+        """ホストの払い出しを終え、未払い出しのURLが残っていれば `delay` 秒後に再スケジュールします。"""
+        async with self._cond:
+            self._inflight.discard(host)
+            self._pending[host] = 0 if exhausted else self._pending.get(host, 0) - consumed
+            self._ready_at[host] = self.clock() + delay
+            if self._pending.get(host, 0) > 0:
+                self._schedule(host, self._ready_at[host])
+            else:
+                self._pending.pop(host, None)
+                self._ready_at.pop(host, None)
+            self._cond.notify_all()
+
+    def _schedule(self, host: str, ready_at: float) -> None:
+        if host not in self._scheduled:
+            heapq.heappush(self._heap, (ready_at, host))
+            self._scheduled.add(host)
+
+    def _add(self, urls: list[FrontierUrl]) -> dict[str, int]:
+        """seen-setに未登録(または更新された)URLをキューに登録します（スレッドで実行）。"""
+        now = self.clock()
+        added: dict[str, int] = {}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for item in urls:
+                    try:
+                        url = canonicalize_url(item.url)
+                    except ValueError:
+                        logger.debug(f"Skip invalid URL: {item.url!r}")
+                        continue
+                    if self._conn.execute(_SEE, (url, item.lastmod)).rowcount == 0:
+                        continue
+                    if self._conn.execute(_REQUEUE, (item.priority, item.lastmod, url)).rowcount:
+                        continue
+                    host = host_of(url)
+                    self._conn.execute(
+                        _ENQUEUE,
+                        (url, host, item.priority, item.site, item.parent, item.lastmod, now),
+                    )
+                    added[host] = added.get(host, 0) + 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def _lease_next(self, host: str) -> tuple[FrontierUrl | None, float | None]:
+        """ホストの次のURLを払い出し中にし、(URL, 再試行を待っているURLの最も早い時刻)を返します。"""
+        with self._lock:
+            row = self._conn.execute(_NEXT, (host, self.clock())).fetchone()
+            if row is None:
+                return None, self._conn.execute(_NEXT_RETRY_AT, (host,)).fetchone()[0]
+            self._conn.execute("UPDATE frontier SET leased = 1 WHERE url = ?", (row["url"],))
+        return FrontierUrl(**dict(row)), None
+
+    def _retry(self, url: str) -> int:
+        """失敗したURLの再試行を予約し、破棄した場合は1を返します。"""
+        with self._lock:
+            rows = self._conn.execute(_RETRY, (url,)).fetchall()
+            if not rows:
+                return 0
+            attempts = rows[0][0]
+            if attempts >= self.MAX_ATTEMPTS:
+                logger.warning(f"Give up {url} after {attempts} failed attempts")
+                self._conn.execute("DELETE FROM frontier_seen WHERE url = ?", (url,))
+                return self._conn.execute("DELETE FROM frontier WHERE url = ?", (url,)).rowcount
+            delay = min(self.retry_delay * 2 ** (attempts - 1), self.MAX_RETRY_DELAY_SECONDS)
+            self._conn.execute(
+                "UPDATE frontier SET not_before = ? WHERE url = ?", (self.clock() + delay, url)
+            )
+            logger.info(f"Retry {url} in {delay:.0f}s (attempt {attempts})")
+            return 0
+
+    def _unlease(self, url: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE frontier SET leased = 0 WHERE url = ?", (url,))
+
+    def _delete(self, url: str) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM frontier WHERE url = ?", (url,)).rowcount
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import httpx
+from loguru import logger
+
+from crawler.domain.web_page import UrlState, WebPage
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry, get_robots_registry
+
+
+class PageTooLargeError(Exception):
+    """ページがサイズ上限を超えた場合の例外。"""
+
+
+class TransientFetchError(Exception):
+    """5xx・429・408・通信エラーなど、時間をおけば取得できる可能性がある失敗の例外。"""
+
+
+# 時間をおけば成功する可能性があるステータスコード（5xxに加えて）
+TRANSIENT_STATUS_CODES = frozenset({408, 429})
+
+
+def is_transient_failure(exc: Exception) -> bool:
+    """取得の失敗が一時的なもの（再試行すれば成功する可能性がある）かどうか判定します。"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status in TRANSIENT_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+
+class WebPageRepository:
+    """技術ブログの記事などのWebページを条件付きGETで取得するリポジトリクラス。
+
+    前回取得時のETag/Last-Modifiedを送信し、変更がなければ304を受け取ることで
+    ボディの転送を省略します。ホストごとのレート制限とrobots.txtに従います。
+    """
+
+    DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+    ALLOWED_CONTENT_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        host_limiters: HostLimiters | None = None,
+        robots: RobotsRegistry | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """WebPageRepositoryインスタンスを初期化します。
+
+        Args:
+            client: HTTPリクエストに使用するAsyncClientインスタンス
+            host_limiters: ホストごとのレートリミッター。省略時はデフォルト設定を使用。
+            robots: robots.txtのレジストリ。省略時は登録済みのもの（なければメモリ上のみのもの）を使用。
+            max_bytes: 1ページあたりの最大サイズ(バイト)
+        """
+        self.client = client
+        self.host_limiters = host_limiters or HostLimiters()
+        self.robots = robots or get_robots_registry() or RobotsRegistry()
+        self.max_bytes = max_bytes
+
+    async def fetch(
+        self, state: UrlState, sem: asyncio.Semaphore, raise_transient: bool = False
+    ) -> WebPage | None:
+        """ページを条件付きGETで取得します。
+
+        Args:
+            state: 取得するURLの状態（前回取得時の検証子を含む）
+            sem: 並列実行数を制限するセマフォ
+            raise_transient: 一時的な失敗（5xx・429・408・通信エラー）の場合に、Noneを返す代わりに
+                `TransientFetchError` を送出するかどうか
+
+        Returns:
+            取得したページ。変更がない場合は `status_code` が304でボディが空のページ。
+            取得失敗・HTML以外・robots.txtで拒否された場合はNone
+
+        Raises:
+            TransientFetchError: `raise_transient=True` で、一時的な失敗の場合
+        """
+        url = state.url
+        if not await self.robots.can_fetch(self.client, url):
+            logger.info(f"Skip fetching {url}: disallowed by robots.txt")
+            return None
+
+        try:
+            async with (
+                sem,
+                self.host_limiters.get(url),
+                self.robots.delay_limiter(url),
+                self.client.stream(
+                    "GET", url, headers=state.conditional_headers(), follow_redirects=True
+                ) as resp,
+            ):
+                if resp.status_code == 304:
+                    return self._to_page(state, resp, "")
+                resp.raise_for_status()
+
+                content_type = resp.headers.get("Content-Type", "")
+                if content_type.split(";")[0].strip().lower() not in self.ALLOWED_CONTENT_TYPES:
+                    logger.info(f"Skip {url}: unexpected content type {content_type!r}")
+                    return None
+
+                body = bytearray()
+                async for chunk in resp.aiter_bytes(self.CHUNK_SIZE):
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        raise PageTooLargeError(f"exceeded {self.max_bytes} bytes")
+                text = body.decode(resp.encoding or "utf-8", errors="replace")
+                return self._to_page(state, resp, text)
+        except (httpx.HTTPError, PageTooLargeError) as e:
+            logger.warning(f"Failed to fetch {url}: {e!r}")
+            if raise_transient and is_transient_failure(e):
+                raise TransientFetchError(url) from e
+            return None
+
+    @staticmethod
+    def _to_page(state: UrlState, resp: httpx.Response, text: str) -> WebPage:
+        return WebPage(
+            url=state.url,
+            text=text,
+            status_code=resp.status_code,
+            content_type=resp.headers.get("Content-Type"),
+            etag=resp.headers.get("ETag", state.etag),
+            last_modified=resp.headers.get("Last-Modified", state.last_modified),
+            site=state.site,
+            lastmod=state.lastmod,
+            fetched_at=time.time(),
+        )
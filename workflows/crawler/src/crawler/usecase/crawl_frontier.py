@@ -0,0 +1,123 @@
+"""UseCase層: URLフロンティアからページを並列に取得するモジュール"""
+
+import asyncio
+import time
+from collections.abc import Sequence
+
+from loguru import logger
+
+from crawler.domain.repository import WebPageSink
+from crawler.domain.web_page import FrontierUrl, UrlState
+from crawler.repository.crawl_state_store import CrawlStateStore
+from crawler.repository.url_frontier import UrlFrontier
+from crawler.repository.web_page_repository import TransientFetchError, WebPageRepository
+from crawler.utils.deadline import Deadline, within
+
+
+class CrawlFrontier:
+    """`UrlFrontier` が払い出すURLを複数のワーカーで取得するユースケース。
+
+    フロンティアが同じホストのURLを同時に1件しか払い出さないため、ワーカー数を増やすと
+    ホストごとの間隔を守ったまま、多数のホストを並列に巡回できます。
+    """
+
+    DEFAULT_NUM_WORKERS = 100
+
+    def __init__(
+        self,
+        frontier: UrlFrontier,
+        page_repository: WebPageRepository,
+        state_store: CrawlStateStore,
+        sinks: Sequence[WebPageSink] = (),
+    ) -> None:
+        """CrawlFrontierインスタンスを初期化します。
+
+        Args:
+            frontier: 取得するURLを払い出すフロンティア
+            page_repository: ページを取得するリポジトリ
+            state_store: URLごとのクロール状態（条件付きGETの検証子）を保存するストア
+            sinks: 取得したページの書き込み先のリスト
+        """
+        self.frontier = frontier
+        self.page_repository = page_repository
+        self.state_store = state_store
+        self.sinks = sinks
+
+    async def execute(
+        self,
+        semaphore: asyncio.Semaphore,
+        num_workers: int = DEFAULT_NUM_WORKERS,
+        deadline: Deadline | None = None,
+    ) -> int:
+        """フロンティアが空になるまでページを取得します。
+
+        `deadline` を過ぎると新しいURLを払い出さずに終了します（ホストの間隔を待っている間も含む）。
+        取得中のページは最後まで処理し、残りのURLはフロンティアに残るため、
+        次回の実行で続きから取得されます。
+        URLごとの失敗（5xx・タイムアウト、シンクへの書き込みの失敗など）はログに記録して次のURLに進み、
+        失敗したURLはフロンティアが時間をおいて再び払い出します。304・恒久的な4xxは完了として扱います。
+
+        Args:
+            semaphore: 並列実行制限用セマフォ
+            num_workers: ワーカー数（同時に巡回するホスト数の上限）
+            deadline: 実行時間の予算から決まる締め切り。省略時はフロンティアが空になるまで取得する
+
+        Returns:
+            取得したページ数（304で未変更だったページは含まない）
+        """
+        start = time.perf_counter()
+        async with asyncio.TaskGroup() as tg:
+            workers = [
+                tg.create_task(self._worker(semaphore, deadline)) for _ in range(num_workers)
+            ]
+        fetched = sum(w.result() for w in workers)
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Crawled {fetched} pages in {elapsed:.1f}s ({fetched / max(elapsed, 1e-9):.1f} pages/s)"
+        )
+        return fetched
+
+    async def _worker(self, semaphore: asyncio.Semaphore, deadline: Deadline | None) -> int:
+        fetched = 0
+        while deadline is None or not deadline.expired:
+            try:
+                async with within(deadline):
+                    item = await self.frontier.lease()
+            except TimeoutError:
+                if deadline is None:
+                    raise
+                break
+            if item is None:
+                break
+            failed = True
+            try:
+                fetched += await self._crawl(item, semaphore)
+                failed = False
+            except TransientFetchError:
+                # ログはリポジトリで出力済み
+                pass
+            except Exception as e:
+                # 1件の失敗で他のワーカー（TaskGroup）を止めない
+                logger.warning(f"Failed to crawl {item.url}: {e!r}")
+            finally:
+                await self.frontier.release(item, failed=failed)
+        return fetched
+
+    async def _crawl(self, item: FrontierUrl, semaphore: asyncio.Semaphore) -> int:
+        state = await asyncio.to_thread(self.state_store.get, item.url)
+        if state is None:
+            state = UrlState(url=item.url, site=item.site, parent=item.parent)
+        state = state.model_copy(update={"lastmod": item.lastmod or state.lastmod})
+        page = await self.page_repository.fetch(state, semaphore, raise_transient=True)
+        if page is None:
+            return 0
+
+        # 書き込みに失敗したページを取得済みにしない（再試行が304で終わらない）よう、
+        # シンクへの書き込みを先に行う
+        if page.status_code != 304:
+            for sink in self.sinks:
+                await sink.write_pages([page])
+        synced = state.model_copy(update={"etag": page.etag, "last_modified": page.last_modified})
+        await asyncio.to_thread(self.state_store.mark_synced, [synced])
+        return 0 if page.status_code == 304 else 1
@@ -0,0 +1,302 @@
+"""UseCase層: ジョブキューを介して論文の取得・補完を実行するモジュール"""
+
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from typing import Any, Literal, cast
+
+from loguru import logger
+
+from crawler.domain.job import EnrichJobPayload, Job, JobKind, JobStatus, RetrieveJobPayload
+from crawler.domain.paper import Paper
+from crawler.domain.repository import PaperEnricher, PaperRetriever
+from crawler.repository.job_queue import SQLiteJobQueue
+from crawler.usecase.dedup_papers import DedupMode, DeduplicatePapers
+from crawler.usecase.fetch_papers import FetchRecSysPapers
+
+ConfName = Literal["recsys", "kdd", "wsdm", "www", "sigir", "cikm"]
+PapersCallback = Callable[[list[Paper]], Awaitable[None]]
+
+
+def retrieve_job_key(conf: str, year: int, page: int) -> str:
+    """論文取得ジョブの冪等性キーを生成します。"""
+    return f"retrieve:{conf}:{year}:{page}"
+
+
+def enrich_job_key(enricher: str, papers: list[Paper]) -> str:
+    """論文補完ジョブの冪等性キーを生成します。
+
+    DOIの集合から決まるため、同じバッチを再登録しても重複しません。
+    """
+    dois = sorted(p.doi for p in papers if p.doi)
+    digest = hashlib.sha1("\n".join(dois).encode(), usedforsecurity=False).hexdigest()
+    return f"enrich:{enricher}:{digest}"
+
+
+class DedupEnricher:
+    """ジョブキューを使わない実行と同じ重複排除・補完を、補完ジョブの1バッチに行うEnricher。
+
+    バッチ内の同じ論文（DOI・タイトルが同じ）をまとめて代表だけを `FetchRecSysPapers.enrich` で
+    補完し、結果を全ての出現に反映します。`FetchRecSysPapers` に `stats_store` を指定した場合は、
+    実績に応じた順序でEnricherを実行し、各Enricherには補完する項目が欠けている論文だけを渡します。
+    """
+
+    def __init__(self, fetch_papers: FetchRecSysPapers, dedup: DedupMode = "memory") -> None:
+        """DedupEnricherインスタンスを初期化します。
+
+        Args:
+            fetch_papers: 補完を行うユースケース
+            dedup: 同じ論文をまとめる方法
+        """
+        self.fetch_papers = fetch_papers
+        self.dedup = dedup
+
+    async def enrich_papers(
+        self,
+        papers: list[Paper],
+        semaphore: asyncio.Semaphore,
+        overwrite: bool = False,
+    ) -> list[Paper]:
+        """論文を重複を除いて補完します。
+
+        Args:
+            papers: 対象の論文リスト
+            semaphore: 並列実行制限用セマフォ
+            overwrite: 未使用（PaperEnricherプロトコルとの互換性のため）
+
+        Returns:
+            補完した論文リスト（全ての出現を含む）
+        """
+        groups = DeduplicatePapers(self.dedup).execute(papers)
+        await self.fetch_papers.enrich(groups.unique, semaphore)
+        groups.fan_out()
+        return papers
+
+
+class CrawlJobWorker:
+    """ジョブキューから作業単位をリースし、論文の取得・補完を行うワーカー。
+
+    (カンファレンス, 年, ページ) の取得ジョブは、DOIを持つ論文を `enrich_batch_size` 件ずつ
+    (Enricher, DOIバッチ) の補完ジョブに分割して登録します。補完ジョブは完了すると
+    Enricherチェーンの次の補完ジョブを登録し、最後のEnricherが完了した論文は
+    `on_papers` コールバックに渡されます。
+
+    全てのジョブは冪等性キーを持つため、同じジョブを再実行しても子ジョブは重複しません。
+    複数プロセスで同じキューファイルを共有すれば水平にスケールできます。
+    """
+
+    DEFAULT_ENRICH_BATCH_SIZE = 500
+    DEFAULT_POLL_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        queue: SQLiteJobQueue,
+        paper_retriever: PaperRetriever,
+        paper_enrichers: dict[str, PaperEnricher],
+        enrich_batch_size: int = DEFAULT_ENRICH_BATCH_SIZE,
+        on_papers: PapersCallback | None = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        """CrawlJobWorkerインスタンスを初期化します。
+
+        Args:
+            queue: ジョブキュー
+            paper_retriever: 論文一覧を取得するリポジトリ
+            paper_enrichers: Enricher名をキーとする補完リポジトリ（挿入順に適用される）
+            enrich_batch_size: 補完ジョブ1件あたりの論文数
+            on_papers: 全Enricherの適用が完了した論文を受け取るコールバック
+            poll_interval: 実行可能なジョブがない場合の待機間隔(秒)
+        """
+        self.queue = queue
+        self.paper_retriever = paper_retriever
+        self.paper_enrichers = paper_enrichers
+        self.enricher_chain = list(paper_enrichers)
+        self.enrich_batch_size = enrich_batch_size
+        self.on_papers = on_papers
+        self.poll_interval = poll_interval
+
+    async def enqueue_retrieval(
+        self,
+        conf: str,
+        years: Iterable[int],
+        page_size: int = 1000,
+        priorities: Mapping[int, int] | None = None,
+    ) -> int:
+        """指定したカンファレンス・年の取得ジョブ(先頭ページ)を登録します。
+
+        後続ページと補完ジョブは取得時に同じ優先度で登録されます。
+
+        Args:
+            conf: 対象カンファレンス名
+            years: 対象年
+            page_size: 1ページあたりの取得件数
+            priorities: 年をキーとする優先度。省略時は年（新しい年ほど先に実行する）
+
+        Returns:
+            新規に登録されたジョブ数
+        """
+        jobs = [
+            (
+                JobKind.RETRIEVE,
+                retrieve_job_key(conf, year, 0),
+                RetrieveJobPayload(conf=conf, year=year, page_size=page_size).model_dump(),
+                priorities[year] if priorities is not None else year,
+            )
+            for year in years
+        ]
+        return await self.queue.enqueue_many(jobs)
+
+    async def unfinished_units(self) -> list[tuple[str, int]]:
+        """前回までの実行からキューに残った取得ジョブの (カンファレンス, 年) を、実行される順に返します。"""
+        jobs = await self.queue.unfinished(JobKind.RETRIEVE)
+        payloads = [RetrieveJobPayload(**job.payload) for job in jobs]
+        return list(dict.fromkeys((payload.conf, payload.year) for payload in payloads))
+
+    async def prioritize_units(self, priorities: Mapping[tuple[str, int], int]) -> int:
+        """キューに残った取得ジョブの優先度を、(カンファレンス, 年) ごとの優先度に変更します。
+
+        Args:
+            priorities: (カンファレンス, 年) をキーとする優先度
+
+        Returns:
+            優先度を変更したジョブ数
+        """
+        updates = {}
+        for job in await self.queue.unfinished(JobKind.RETRIEVE):
+            payload = RetrieveJobPayload(**job.payload)
+            priority = priorities.get((payload.conf, payload.year))
+            if priority is not None:
+                updates[job.key] = priority
+        return await self.queue.set_priorities(updates)
+
+    async def run(
+        self,
+        semaphore: asyncio.Semaphore,
+        concurrency: int = 1,
+        stop_when_idle: bool = True,
+    ) -> int:
+        """ジョブを処理するループを実行します。
+
+        Args:
+            semaphore: 並列実行制限用セマフォ（リポジトリに渡される）
+            concurrency: 同時に処理するジョブ数
+            stop_when_idle: 実行待ち・実行中のジョブがなくなったら終了するかどうか
+
+        Returns:
+            このワーカーが処理したジョブ数
+        """
+        processed = 0
+
+        async def _loop() -> None:
+            nonlocal processed
+            while True:
+                jobs = await self.queue.lease(limit=1)
+                if not jobs:
+                    if stop_when_idle and await self._is_idle():
+                        return
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await self.process(jobs[0], semaphore)
+                processed += 1
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(concurrency):
+                tg.create_task(_loop())
+        return processed
+
+    async def _is_idle(self) -> bool:
+        counts = await self.queue.counts()
+        return counts[JobStatus.PENDING] == 0 and counts[JobStatus.LEASED] == 0
+
+    async def process(self, job: Job, semaphore: asyncio.Semaphore) -> None:
+        """リースした1件のジョブを実行し、結果をキューに記録します。
+
+        Args:
+            job: リースしたジョブ
+            semaphore: 並列実行制限用セマフォ
+        """
+        try:
+            if job.kind == JobKind.RETRIEVE:
+                await self._process_retrieve(job, RetrieveJobPayload(**job.payload), semaphore)
+            else:
+                await self._process_enrich(job, EnrichJobPayload(**job.payload), semaphore)
+        except Exception as e:
+            status = await self.queue.fail(job, repr(e))
+            logger.warning(f"Job {job.key} failed (attempt {job.attempts}, -> {status}): {e}")
+            return
+        await self.queue.complete(job)
+
+    async def _process_retrieve(
+        self, job: Job, payload: RetrieveJobPayload, semaphore: asyncio.Semaphore
+    ) -> None:
+        page = await self.paper_retriever.fetch_page(
+            conf=cast(ConfName, payload.conf),
+            year=payload.year,
+            h=payload.page_size,
+            f=payload.page * payload.page_size,
+            semaphore=semaphore,
+        )
+        papers = page.papers
+        logger.info(
+            f"Fetched {len(papers)} papers for {payload.conf} {payload.year} page {payload.page} "
+            f"({page.offset + page.hits}/{page.total} hits)"
+        )
+
+        children: list[tuple[JobKind, str, dict[str, Any], int]] = []
+        # パースできなかったヒットも数えるため、論文数ではなくヒット数で次のページの有無を判断する
+        if page.has_next:
+            next_payload = payload.model_copy(update={"page": payload.page + 1})
+            children.append(
+                (
+                    JobKind.RETRIEVE,
+                    retrieve_job_key(payload.conf, payload.year, next_payload.page),
+                    next_payload.model_dump(),
+                    job.priority,
+                )
+            )
+
+        # DOIのない論文は除外 (これ以降のEnrich処理でDOIが必要なため)
+        papers = [p for p in papers if p.doi is not None]
+        if papers and not self.enricher_chain:
+            await self._emit(papers)
+        elif papers:
+            first, *rest = self.enricher_chain
+            for i in range(0, len(papers), self.enrich_batch_size):
+                batch = papers[i : i + self.enrich_batch_size]
+                enrich_payload = EnrichJobPayload(enricher=first, papers=batch, next_enrichers=rest)
+                children.append(
+                    (
+                        JobKind.ENRICH,
+                        enrich_job_key(first, batch),
+                        enrich_payload.model_dump(),
+                        job.priority,
+                    )
+                )
+        await self.queue.enqueue_many(children)
+
+    async def _process_enrich(
+        self, job: Job, payload: EnrichJobPayload, semaphore: asyncio.Semaphore
+    ) -> None:
+        enricher = self.paper_enrichers.get(payload.enricher)
+        if enricher is None:
+            raise KeyError(f"Unknown enricher: {payload.enricher}")
+
+        logger.info(f"Enriching {len(payload.papers)} papers with {payload.enricher}...")
+        papers = await enricher.enrich_papers(payload.papers, semaphore=semaphore, overwrite=False)
+
+        if not payload.next_enrichers:
+            await self._emit(papers)
+            return
+
+        next_enricher, *rest = payload.next_enrichers
+        next_payload = EnrichJobPayload(enricher=next_enricher, papers=papers, next_enrichers=rest)
+        await self.queue.enqueue(
+            JobKind.ENRICH,
+            enrich_job_key(next_enricher, papers),
+            next_payload.model_dump(),
+            priority=job.priority,
+        )
+
+    async def _emit(self, papers: list[Paper]) -> None:
+        if self.on_papers is not None:
+            await self.on_papers(papers)
@@ -0,0 +1,152 @@
+"""UseCase層: 補完の前に、複数のカンファレンス・年の論文から同じ論文をまとめるモジュール"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Literal
+
+from loguru import logger
+
+from crawler.domain.paper import Paper, normalize_doi, title_hash
+from crawler.utils.bloom_filter import BloomFilter
+
+DedupMode = Literal["memory", "bloom", "off"]
+
+
+@dataclass
+class DuplicateGroups:
+    """同じ論文とみなした論文のグループ。
+
+    各グループの先頭の論文（代表）だけを補完し、`fan_out` で補完結果を残りの論文に反映します。
+
+    Attributes:
+        groups: 論文のグループ。先頭が代表
+    """
+
+    groups: list[list[Paper]]
+
+    @property
+    def unique(self) -> list[Paper]:
+        """各グループの代表の論文。"""
+        return [group[0] for group in self.groups]
+
+    @property
+    def num_duplicates(self) -> int:
+        """代表以外の論文の数（補完を省略できる論文の数）。"""
+        return sum(len(group) - 1 for group in self.groups)
+
+    def fan_out(self) -> None:
+        """代表の論文の補完結果（要約・PDFリンク）を同じグループの論文に反映します。"""
+        for canonical, *duplicates in self.groups:
+            for paper in duplicates:
+                if canonical.abstract and not paper.abstract:
+                    paper.abstract = canonical.abstract
+                paper.add_pdf_urls([canonical.pdf_url, *canonical.pdf_url_candidates])
+
+
+class DeduplicatePapers:
+    """正規化したDOIとタイトルのハッシュで、同じ論文をまとめるユースケース。
+
+    同じDOI、または同じタイトル（大文字小文字・空白・記号を無視）の論文を同じ論文とみなします。
+    併催ワークショップとジャーナル版のように、DOIが異なりタイトルが同じ論文もまとめます。
+    短いタイトル（"Keynote" など）は別の論文で重複しやすいため、タイトルでは比較しません。
+
+    - memory: 全てのキーを辞書に保持する
+    - bloom: 1回目の走査でキーをBloomフィルターに追加し、2回以上現れた（可能性のある）キーだけを
+      2回目の走査で辞書に保持する。大半の論文が重複しない大規模なバックフィルで、インデックスの
+      メモリを論文数ではなく重複数に比例させる。Bloomフィルターの偽陽性は辞書に保持するキーが
+      増えるだけで、結果はmemoryと同じになる
+    """
+
+    # タイトルで比較する論文の、正規化したタイトルの最小文字数
+    MIN_TITLE_CHARS = 20
+
+    def __init__(
+        self, mode: DedupMode = "memory", error_rate: float = BloomFilter.DEFAULT_ERROR_RATE
+    ) -> None:
+        """DeduplicatePapersインスタンスを初期化します。
+
+        Args:
+            mode: 重複の検出方法。"off" の場合は論文をまとめない
+            error_rate: bloomの場合のBloomフィルターの偽陽性率
+        """
+        self.mode = mode
+        self.error_rate = error_rate
+
+    def execute(self, papers: list[Paper]) -> DuplicateGroups:
+        """論文を同じ論文ごとのグループにまとめます。
+
+        各グループの代表には、同じグループの論文が既に持っている要約・PDFリンクをまとめます。
+
+        Args:
+            papers: 対象の論文リスト（複数のカンファレンス・年を含んでよい）
+
+        Returns:
+            論文のグループ。グループの順序と代表は、論文が最初に現れた順序に従う
+        """
+        if self.mode == "off":
+            return DuplicateGroups([[paper] for paper in papers])
+
+        # bloomの場合、キーは保持せずに走査のたびに計算する
+        candidates = self._repeated_keys(papers) if self.mode == "bloom" else None
+
+        # 同じキーを持つ論文を連結する（Union-Find）
+        parent = list(range(len(papers)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        first_seen: dict[str, int] = {}
+        for i, paper in enumerate(papers):
+            for key in self._keys(paper):
+                if candidates is not None and key not in candidates:
+                    continue
+                j = first_seen.setdefault(key, i)
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    # 先に現れた論文を代表にする
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        members: dict[int, list[Paper]] = {}
+        for i, paper in enumerate(papers):
+            members.setdefault(find(i), []).append(paper)
+        result = DuplicateGroups(list(members.values()))
+
+        for canonical, *duplicates in result.groups:
+            for paper in duplicates:
+                if paper.abstract and not canonical.abstract:
+                    canonical.abstract = paper.abstract
+                canonical.add_pdf_urls([paper.pdf_url, *paper.pdf_url_candidates])
+
+        if result.num_duplicates:
+            logger.info(
+                f"Deduplicated {len(papers)} papers into {len(result.groups)} unique works "
+                f"({result.num_duplicates} duplicates will not be enriched again)"
+            )
+        return result
+
+    def _keys(self, paper: Paper) -> Iterator[str]:
+        """論文の重複判定に使うキーを返します。"""
+        if paper.doi:
+            yield f"doi:{normalize_doi(paper.doi)}"
+        normalized_chars = sum(ch.isalnum() for ch in paper.title)
+        if normalized_chars >= self.MIN_TITLE_CHARS:
+            yield f"title:{title_hash(paper.title)}"
+
+    def _repeated_keys(self, papers: list[Paper]) -> BloomFilter:
+        """2回以上現れた（可能性のある）キーのBloomフィルターを返します。"""
+        # 論文ごとにDOIとタイトルの最大2つのキーがある
+        capacity = 2 * len(papers)
+        seen = BloomFilter(capacity, self.error_rate)
+        repeated = BloomFilter(capacity, self.error_rate)
+        for paper in papers:
+            for key in self._keys(paper):
+                if seen.add(key):
+                    repeated.add(key)
+        logger.debug(
+            f"Bloom filter for dedup: {len(seen)} keys, "
+            f"{seen.size_bytes + repeated.size_bytes} bytes"
+        )
+        return repeated
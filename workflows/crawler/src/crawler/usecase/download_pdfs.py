@@ -0,0 +1,51 @@
+"""UseCase層: 論文のPDFをダウンロードするモジュール"""
+
+import asyncio
+
+from loguru import logger
+
+from crawler.domain.paper import Paper
+from crawler.domain.pdf import PdfFile
+from crawler.repository.pdf_repository import PdfRepository
+
+
+class DownloadPaperPdfs:
+    """補完済みの論文の `pdf_url` からPDFをダウンロードするユースケース。"""
+
+    def __init__(self, pdf_repository: PdfRepository) -> None:
+        """DownloadPaperPdfsインスタンスを初期化します。
+
+        Args:
+            pdf_repository: PDFをダウンロード・保存するリポジトリ
+        """
+        self.pdf_repository = pdf_repository
+
+    async def execute(
+        self, papers: list[Paper], semaphore: asyncio.Semaphore
+    ) -> dict[str, PdfFile]:
+        """`pdf_url` を持つ論文のPDFをダウンロードします。
+
+        Args:
+            papers: 対象の論文リスト
+            semaphore: 並列実行制限用セマフォ
+
+        Returns:
+            DOIをキーとする保存済みPDFの辞書（取得できたもののみ）
+        """
+        targets = {p.doi: p.pdf_url for p in papers if p.pdf_url and p.doi}
+        if not targets:
+            return {}
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = {
+                doi: tg.create_task(self.pdf_repository.download(url, semaphore))
+                for doi, url in targets.items()
+            }
+
+        results = {doi: pdf for doi, task in tasks.items() if (pdf := task.result()) is not None}
+
+        logger.info(
+            f"Downloaded PDFs: {len(results)}/{len(targets)}, "
+            f"throughput: {self.pdf_repository.throughput_mb_per_s:.2f} MB/s"
+        )
+        return results
@@ -0,0 +1,159 @@
+"""UseCase層: クロールを始める前に、論文のプランのリクエスト数と時間を見積もるモジュール"""
+
+import math
+import statistics
+from collections.abc import Mapping
+
+from aiolimiter import AsyncLimiter
+from loguru import logger
+
+from crawler.configs.plan import PaperPlan
+from crawler.domain.paper import Paper, normalize_doi
+from crawler.domain.request_estimate import RequestEstimate, ServiceEstimate
+from crawler.repository.arxiv_repository import ArxivRepository
+from crawler.repository.negative_cache import NegativeCache
+from crawler.repository.paper_store import PaperStore
+from crawler.repository.semantic_scholar_repository import SemanticScholarRepository
+from crawler.repository.unpaywall_repository import UnpaywallRepository
+from crawler.usecase.fetch_papers import FetchRecSysPapers
+
+SERVICE_DBLP = "dblp"
+
+
+def venue_conference(venue: str) -> str:
+    """DBLPの掲載会場（"RecSys"・"WWW (Companion Volume)" など）からカンファレンス名を返します。"""
+    return venue.split(" ", 1)[0].casefold()
+
+
+class EstimateRequests:
+    """論文のプランが各サービスに送るリクエスト数と、レート制限に従って送り終えるまでの時間を
+    見積もるユースケース（ドライラン）。
+
+    ネットワークにはアクセスせず、次の情報から見積もります。
+
+    - 論文数: 前回までの実行で `PaperStore` に保存した (カンファレンス, 年) ごとの論文。
+      実績のない作業単位は、実績のある作業単位の中央値（なければ `DEFAULT_PAPERS_PER_UNIT`）を仮定する
+    - DBLP: 作業単位ごとに `FetchRecSysPapers.DBLP_PAGE_SIZE` 件ずつのページ数のリクエスト
+    - Semantic Scholar: 全ての論文を1つのバッチの列で問い合わせるため、`BATCH_SIZE` 件ごとに1リクエスト
+    - Unpaywall: 論文ごとに1リクエスト
+    - arXiv: 論文ごとにDOI検索とタイトル検索（フォールバック）の最大2リクエスト
+    - ネガティブキャッシュで見つからないと分かっている論文・検索クエリは問い合わせない
+
+    `PaperStore`・`NegativeCache` がない場合（初回の実行前など）は、実績・キャッシュなしとして見積もります。
+
+    `enricher_order = "yield"` では後のEnricherには埋まらなかった論文だけを渡すため、
+    2番目以降のEnricherの見積もりは上限になります。PDFリンクの確認とPDFのダウンロードは
+    補完の結果で配信元のホストが決まるため見積もりません。
+    """
+
+    DEFAULT_PAPERS_PER_UNIT = 200
+
+    def __init__(
+        self,
+        paper_store: PaperStore | None,
+        negative_cache: NegativeCache | None,
+        limiters: Mapping[str, AsyncLimiter],
+    ) -> None:
+        """EstimateRequestsインスタンスを初期化します。
+
+        Args:
+            paper_store: 前回までの実行で取得した論文のストア。Noneの場合は実績なし
+            negative_cache: 補完で見つからなかった論文のキャッシュ。Noneの場合はキャッシュなし
+            limiters: サービス名（dblp・semantic_scholar・unpaywall・arxiv）をキーとする
+                実行時に使うレートリミッター
+        """
+        self.paper_store = paper_store
+        self.negative_cache = negative_cache
+        self.limiters = limiters
+
+    async def execute(self, plans: Mapping[str, PaperPlan]) -> RequestEstimate:
+        """プランのリクエスト数と時間を見積もります。
+
+        Args:
+            plans: プラン名をキーとする論文のプラン
+
+        Returns:
+            サービスごとの見積もり
+        """
+        estimate = RequestEstimate(
+            services={
+                service: ServiceEstimate(
+                    service=service, max_rate=limiter.max_rate, time_period=limiter.time_period
+                )
+                for service, limiter in self.limiters.items()
+            }
+        )
+        for name, plan in plans.items():
+            await self._estimate_plan(name, plan, estimate)
+        return estimate
+
+    async def _estimate_plan(self, name: str, plan: PaperPlan, estimate: RequestEstimate) -> None:
+        units = [(conf, year) for conf in plan.conferences for year in plan.year_range]
+        known: dict[tuple[str, int], list[Paper]] = {}
+        if self.paper_store is not None:
+            for year in plan.year_range:
+                for paper in await self.paper_store.find_by_year(year):
+                    unit = (venue_conference(paper.venue), year)
+                    if unit[0] in plan.conferences:
+                        known.setdefault(unit, []).append(paper)
+
+        counts = [len(papers) for papers in known.values()]
+        assumed_per_unit = round(statistics.median(counts)) if counts else None
+        assumed_per_unit = assumed_per_unit or self.DEFAULT_PAPERS_PER_UNIT
+        assumed = [unit for unit in units if unit not in known]
+        estimate.assumed.extend(f"{name}: {conf} {year}" for conf, year in assumed)
+
+        # 重複を除いてから補完するため、同じDOIの論文は1回だけ数える
+        papers = [p for unit in units for p in known.get(unit, [])]
+        if plan.dedup != "off":
+            papers = list({normalize_doi(p.doi or ""): p for p in papers if p.doi}.values())
+        num_assumed = len(assumed) * assumed_per_unit
+        estimate.units += len(units)
+        estimate.papers += len(papers) + num_assumed
+        logger.debug(
+            f"Plan {name}: {len(papers)} known papers, {len(assumed)} units assume "
+            f"{assumed_per_unit} papers"
+        )
+
+        # 論文一覧は最後のページまで取得する（論文がなくても1リクエストは送る）
+        page_size = FetchRecSysPapers.DBLP_PAGE_SIZE
+        pages = sum(max(1, math.ceil(len(papers) / page_size)) for papers in known.values())
+        pages += len(assumed) * math.ceil(assumed_per_unit / page_size)
+        self._add(estimate, SERVICE_DBLP, items=len(units), cached=0, requests=pages)
+        dois = [p.doi for p in papers if p.doi]
+        for enricher in plan.enrichers:
+            match enricher:
+                case "semantic_scholar":
+                    cached = await self._cached(SemanticScholarRepository, dois)
+                    items = len(dois) + num_assumed
+                    requests = math.ceil((items - cached) / SemanticScholarRepository.BATCH_SIZE)
+                    self._add(estimate, enricher, items, cached, requests)
+                case "unpaywall":
+                    cached = await self._cached(UnpaywallRepository, dois)
+                    items = len(dois) + num_assumed
+                    self._add(estimate, enricher, items, cached, items - cached)
+                case "arxiv":
+                    queries = [q for p in papers for q in ArxivRepository.search_queries(p)]
+                    cached = await self._cached(ArxivRepository, queries)
+                    items = len(queries) + 2 * num_assumed
+                    self._add(estimate, enricher, items, cached, items - cached)
+
+    async def _cached(
+        self,
+        repository: type[SemanticScholarRepository | UnpaywallRepository | ArxivRepository],
+        identifiers: list[str],
+    ) -> int:
+        """ネガティブキャッシュで問い合わせを省略する識別子の数を返します。"""
+        if self.negative_cache is None:
+            return 0
+        lookup = await self.negative_cache.lookup(repository.NEGATIVE_CACHE_SOURCE, identifiers)
+        return len(lookup.known)
+
+    @staticmethod
+    def _add(
+        estimate: RequestEstimate, service: str, items: int, cached: int, requests: int
+    ) -> None:
+        service_estimate = estimate.services[service]
+        service_estimate.items += items
+        service_estimate.cached += cached
+        service_estimate.requests += requests
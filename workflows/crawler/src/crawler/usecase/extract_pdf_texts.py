@@ -0,0 +1,186 @@
+"""UseCase層: ダウンロード済みPDFからテキストを抽出するモジュール"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from loguru import logger
+
+from crawler.domain.pdf import PdfFile, PdfText
+from crawler.repository.paper_store import PaperStore
+from crawler.utils.pdf_text import ExtractionTimeoutError, extract_text, limit_memory
+from crawler.utils.process_pool import start_workers, terminate_workers
+
+
+class ExtractPdfTexts:
+    """PDFからテキストを抽出し、PaperStoreに保存するユースケース（RAG取り込み用）。
+
+    PDFの解析はCPUバウンドなため、`ProcessPoolExecutor` のワーカープロセスで実行します。
+    同時に投入するファイル数は（`execute` を並行に呼び出した場合も含めて）ワーカー数までで、
+    プールはワーカーの起動を待ってから使うため、タイムアウトはキュー待ち・起動の時間を含みません。
+    コア数に応じてワーカー数を増やせば、ほぼ線形にスループットが向上します。
+
+    - 1ファイルあたりの制限時間（ワーカー内のSIGALRM、応答がない場合は親側でワーカーを強制終了）
+    - ワーカーごとのメモリ上限（RLIMIT_AS）。ワーカーは `max_tasks_per_child` 件ごとに再起動
+    - 抽出結果は完了したものから順次ストアに書き込む
+    - 同じ内容(SHA-256)のPDFは1回だけ処理し、処理済み（解析の失敗を含む）のものはスキップ
+    - タイムアウト・ワーカーの異常終了は一時的な失敗として保存せず、次回の実行で再試行する
+    """
+
+    DEFAULT_TIMEOUT_SECONDS = 60.0
+    DEFAULT_MEMORY_LIMIT_BYTES = 2 * 1024 * 1024 * 1024
+    DEFAULT_MAX_TASKS_PER_CHILD = 100
+    # ワーカー内のタイムアウトが効かない場合（C拡張内で停止した場合など）の猶予
+    TIMEOUT_GRACE_SECONDS = 5.0
+
+    def __init__(
+        self,
+        paper_store: PaperStore,
+        max_workers: int | None = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        memory_limit_bytes: int | None = DEFAULT_MEMORY_LIMIT_BYTES,
+        max_tasks_per_child: int = DEFAULT_MAX_TASKS_PER_CHILD,
+    ) -> None:
+        """ExtractPdfTextsインスタンスを初期化します。
+
+        Args:
+            paper_store: 抽出結果の書き込み先
+            max_workers: ワーカープロセス数。省略時はCPUコア数
+            timeout: 1ファイルあたりの制限時間(秒)
+            memory_limit_bytes: ワーカープロセスあたりのメモリ上限(バイト)。Noneの場合は制限しない
+            max_tasks_per_child: ワーカープロセスを再起動するまでに処理するファイル数
+        """
+        self.paper_store = paper_store
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit_bytes = memory_limit_bytes
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = asyncio.Lock()
+        self._sem = asyncio.Semaphore(self.max_workers)
+
+    async def _get_executor(self) -> ProcessPoolExecutor:
+        async with self._executor_lock:
+            if self._executor is None:
+                # forkでは親プロセスのアドレス空間を引き継ぐため、メモリ上限を正しく適用できるspawnを使う
+                executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=limit_memory,
+                    initargs=(self.memory_limit_bytes,),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+                try:
+                    await start_workers(executor, self.max_workers)
+                except BaseException:
+                    terminate_workers(executor)
+                    raise
+                self._executor = executor
+            return self._executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor) -> None:
+        """応答しない・異常終了したワーカーを含むプールを破棄し、次回作り直します。"""
+        terminate_workers(executor)
+        # 同じプールで失敗した他のタスクが、作り直した新しいプールを破棄しないようにする
+        if self._executor is executor:
+            self._executor = None
+
+    def close(self) -> None:
+        """ワーカープロセスを終了します。"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def execute(self, pdfs: dict[str, PdfFile]) -> int:
+        """PDFからテキストを抽出してストアに書き込みます。
+
+        Args:
+            pdfs: DOIをキーとするダウンロード済みPDFの辞書
+
+        Returns:
+            新たに処理したPDFの数（解析の失敗を含み、次回に再試行する一時的な失敗を含まない）
+        """
+        # 同じ内容のPDFは1回だけ処理する
+        targets: dict[str, tuple[Path, list[str]]] = {}
+        for doi, pdf in pdfs.items():
+            targets.setdefault(pdf.sha256, (pdf.path, []))[1].append(doi)
+
+        processed = await self.paper_store.processed_pdf_hashes(targets)
+        pending = {sha: target for sha, target in targets.items() if sha not in processed}
+        if not pending:
+            return 0
+
+        tasks = [
+            asyncio.create_task(self._extract(sha, path, dois))
+            for sha, (path, dois) in pending.items()
+        ]
+        failed = 0
+        retried = 0
+        for next_done in asyncio.as_completed(tasks):
+            text = await next_done
+            if text is None:
+                retried += 1
+                continue
+            failed += text.error is not None
+            await self.paper_store.write_pdf_texts([text])
+
+        processed_now = len(pending) - retried
+        logger.info(
+            f"Extracted PDF texts: {processed_now - failed}/{len(pending)} "
+            f"(skipped {len(processed)} already processed, {retried} retried next run)"
+        )
+        return processed_now
+
+    async def _extract(self, sha256: str, path: Path, dois: list[str]) -> PdfText | None:
+        """1つのPDFからテキストを抽出します。
+
+        Returns:
+            抽出結果（解析の失敗を含む）。タイムアウト・ワーカーの異常終了の場合はNone
+        """
+        loop = asyncio.get_running_loop()
+        async with self._sem:
+            # 他のファイルがプールを破棄したために失敗した場合は、作り直したプールで1回だけ再実行する
+            for retry in (True, False):
+                executor: ProcessPoolExecutor | None = None
+                try:
+                    executor = await self._get_executor()
+                    future = loop.run_in_executor(executor, extract_text, str(path), self.timeout)
+                    text, offsets = await asyncio.wait_for(
+                        future, self.timeout + self.TIMEOUT_GRACE_SECONDS
+                    )
+                except ExtractionTimeoutError:
+                    reason = f"timed out after {self.timeout}s"
+                except TimeoutError:
+                    # ワーカー内のタイムアウトが効かない（C拡張内で停止した）ワーカーを終了させる
+                    reason = f"worker did not respond in {self.timeout}s"
+                    if executor is not None:
+                        self._reset_executor(executor)
+                except (BrokenProcessPool, asyncio.CancelledError) as e:
+                    # 破棄したプールの待機中のジョブは取り消される。このタスク自体の取り消しは伝える
+                    task = asyncio.current_task()
+                    if isinstance(e, asyncio.CancelledError) and task and task.cancelling():
+                        raise
+                    if retry and executor is not None and executor is not self._executor:
+                        continue
+                    reason = "worker process died"
+                    if executor is not None:
+                        self._reset_executor(executor)
+                except MemoryError:
+                    return self._failed(sha256, path, dois, "memory limit exceeded")
+                except Exception as e:
+                    return self._failed(sha256, path, dois, repr(e))
+                else:
+                    return PdfText(sha256=sha256, text=text, page_offsets=offsets, dois=dois)
+                break
+
+        logger.warning(f"Failed to extract text from {path}: {reason}, retrying next run")
+        return None
+
+    @staticmethod
+    def _failed(sha256: str, path: Path, dois: list[str], error: str) -> PdfText:
+        """解析できなかったPDFの結果を返します（処理済みとして保存し、再試行しない）。"""
+        logger.warning(f"Failed to extract text from {path}: {error}")
+        return PdfText(sha256=sha256, dois=dois, error=error)
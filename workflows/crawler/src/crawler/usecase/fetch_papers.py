@@ -1,28 +1,132 @@
 import asyncio
+import math
+import time
+from collections.abc import Sequence
+from typing import Literal
 
 from loguru import logger
 
+from crawler.domain.enrichment import EnricherStats
 from crawler.domain.paper import Paper
-from crawler.domain.repository import PaperEnricher, PaperRetriever
+from crawler.domain.repository import MeteredPaperEnricher, PaperEnricher, PaperRetriever
+from crawler.repository.enricher_stats_store import EnricherStatsStore
+from crawler.utils.deadline import Deadline, within
+
+
+def _relevant_stats(
+    enricher: PaperEnricher, history: Sequence[EnricherStats], keys: set[tuple[str, int]]
+) -> list[EnricherStats]:
+    """Enricherの実績のうち、対象の (掲載会場, 年)、同じ掲載会場、全体の順に見つかったものを返します。"""
+    venues = {venue for venue, _ in keys}
+    rows = [s for s in history if s.enricher == type(enricher).__name__]
+    for selected in (
+        [s for s in rows if (s.venue, s.year) in keys],
+        [s for s in rows if s.venue in venues],
+        rows,
+    ):
+        if sum(s.seconds for s in selected) > 0:
+            return selected
+    return []
+
+
+def order_enrichers(
+    enrichers: Sequence[PaperEnricher],
+    history: Sequence[EnricherStats],
+    keys: set[tuple[str, int]],
+) -> list[PaperEnricher]:
+    """過去の実績から、1秒あたりに埋める項目数が多い順にEnricherを並べ替えます。
+
+    並べ替えるのは `MeteredPaperEnricher` だけで、それ以外のEnricher（PDFリンクの確認など）は
+    元の位置のままです。実績は対象の (掲載会場, 年) のもの、なければ同じ掲載会場のもの、
+    なければ全ての実績を使います。実績のないEnricherは計測のため先に実行し、
+    同じ評価のEnricherは元の順序を保ちます。
+
+    Args:
+        enrichers: 設定された順序のEnricher
+        history: 記録済みの実績
+        keys: 補完する論文の (掲載会場, 年)
+
+    Returns:
+        並べ替えたEnricher
+    """
+
+    def fields_per_second(enricher: PaperEnricher) -> float:
+        rows = _relevant_stats(enricher, history, keys)
+        if not rows:
+            return math.inf
+        return sum(s.filled for s in rows) / sum(s.seconds for s in rows)
+
+    positions = [i for i, e in enumerate(enrichers) if isinstance(e, MeteredPaperEnricher)]
+    ranked = sorted((enrichers[i] for i in positions), key=lambda e: -fields_per_second(e))
+    ordered = list(enrichers)
+    for i, enricher in zip(positions, ranked, strict=True):
+        ordered[i] = enricher
+    return ordered
+
+
+def estimate_seconds_per_paper(
+    enricher: MeteredPaperEnricher,
+    history: Sequence[EnricherStats],
+    keys: set[tuple[str, int]],
+) -> float | None:
+    """過去の実績とレート制限から、Enricherが論文1件あたりにかかる秒数を見積もります。
+
+    実績の秒数を論文数で割った値と、実績のリクエスト数をレート制限で送るのに必要な秒数の
+    大きい方を返します（レート制限を実績の計測時より厳しくした場合にも見積もりが短くならないように）。
+
+    Args:
+        enricher: 対象のEnricher
+        history: 記録済みの実績
+        keys: 補完する論文の (掲載会場, 年)
+
+    Returns:
+        論文1件あたりの秒数。実績がない場合はNone
+    """
+    rows = _relevant_stats(enricher, history, keys)
+    papers = sum(s.papers for s in rows)
+    if not papers:
+        return None
+    measured = sum(s.seconds for s in rows) / papers
+    requests_per_paper = sum(s.requests for s in rows) / papers
+    rate = enricher.limiter.max_rate / enricher.limiter.time_period
+    return max(measured, requests_per_paper / rate)
 
 
 class FetchRecSysPapers:
-    """RecSysカンファレンスの論文情報を収集し、情報を充実させるユースケース。"""
+    """カンファレンス（デフォルトはRecSys）の論文情報を収集し、情報を充実させるユースケース。
+
+    Attributes:
+        deferred: 直前の `enrich` で、実行時間の予算内に補完できなかった論文
+    """
+
+    # DBLPの検索APIに1リクエストで要求する論文数。超える場合は次のページを続けて取得する
+    DBLP_PAGE_SIZE = 1000
 
     def __init__(
-        self, paper_retriever: PaperRetriever, paper_enrichers: list[PaperEnricher]
+        self,
+        paper_retriever: PaperRetriever,
+        paper_enrichers: list[PaperEnricher],
+        conf: Literal["recsys", "kdd", "wsdm", "www", "sigir", "cikm"] = "recsys",
+        stats_store: EnricherStatsStore | None = None,
     ) -> None:
         """FetchRecSysPapersインスタンスを初期化します。
 
         Args:
             paper_retriever: 論文一覧を取得するリポジトリ
             paper_enrichers: 論文情報を補完するリポジトリのリスト
+            conf: 対象のカンファレンス
+            stats_store: Enricherの実績を記録するストア。指定した場合、実績に応じてEnricherの順序を
+                入れ替え、各Enricherには補完する項目が欠けている論文だけを渡す。省略時は設定の順序で
+                全ての論文を補完する
         """
         self.paper_retriever = paper_retriever
         self.paper_enrichers = paper_enrichers
+        self.conf = conf
+        self.stats_store = stats_store
+        self.deferred: list[Paper] = []
 
     async def execute(self, year: int, semaphore: asyncio.Semaphore) -> list[Paper]:
-        """指定された年のRecSys論文を取得し、詳細情報を付与します。
+        """指定された年のカンファレンス論文を取得し、詳細情報を付与します。
 
         Args:
             year: 対象年
@@ -31,23 +135,179 @@ class FetchRecSysPapers:
         Returns:
             情報が付与された論文リスト
         """
+        papers = await self.fetch(year, semaphore)
+        if not papers:
+            return []
+        return await self.enrich(papers, semaphore)
+
+    async def fetch(self, year: int, semaphore: asyncio.Semaphore) -> list[Paper]:
+        """指定された年のカンファレンス論文の一覧を取得します（補完は行いません）。
+
+        複数のカンファレンス・年の論文をまとめて重複を除いてから補完する場合に、`enrich` と分けて使います。
+        1ページ（`DBLP_PAGE_SIZE` 件）に収まらない場合は、全てのヒットを取得するまでページを辿ります。
+
+        Args:
+            year: 対象年
+            semaphore: 並列実行制限用セマフォ
+
+        Returns:
+            DOIを持つ論文のリスト
+        """
         # 1. DBLPから論文一覧を取得
-        logger.info(f"Fetching RecSys {year} papers from DBLP...")
-        papers = await self.paper_retriever.fetch_papers(
-            conf="recsys", year=year, h=1000, semaphore=semaphore
-        )
+        logger.info(f"Fetching {self.conf} {year} papers from DBLP...")
+        papers: list[Paper] = []
+        offset = 0
+        while True:
+            page = await self.paper_retriever.fetch_page(
+                conf=self.conf, year=year, h=self.DBLP_PAGE_SIZE, f=offset, semaphore=semaphore
+            )
+            papers.extend(page.papers)
+            # パースできなかったヒットも数えるため、論文数ではなくヒット数で次のページの有無を判断する
+            if not page.has_next:
+                break
+            offset = page.offset + page.hits
         logger.info(f"Fetched {len(papers)} papers from DBLP")
 
         # DOIのない論文は除外 (これ以降のEnrich処理でDOIが必要なため)
-        papers = [p for p in papers if p.doi is not None]
-        if not papers:
-            return []
+        return [p for p in papers if p.doi is not None]
+
+    async def enrich(
+        self,
+        papers: list[Paper],
+        semaphore: asyncio.Semaphore,
+        deadline: Deadline | None = None,
+    ) -> list[Paper]:
+        """論文に各リポジトリの情報を順に補完します。
+
+        `stats_store` を指定した場合、安価で多くの項目を埋めるEnricherを先に実行し、後のEnricher
+        （1リクエスト/秒のarXivなど）には前のEnricherで埋まらなかった論文だけを渡します。
+        各Enricherのリクエスト数・秒数・埋めた項目数は (掲載会場, 年) ごとにストアに記録します。
+
+        `deadline` を指定した場合、各Enricherには実績から締め切りまでに終わると見積もった件数だけを
+        先頭から渡し、締め切りを過ぎたら中断します。渡さなかった論文と中断した論文は `deferred` に
+        記録します。優先する論文（新しい年など）を先頭に並べて渡してください。
+
+        Args:
+            papers: 対象の論文リスト
+            semaphore: 並列実行制限用セマフォ
+            deadline: 実行時間の予算から決まる締め切り。省略時は全ての論文を補完する
+
+        Returns:
+            情報が付与された論文リスト
+        """
+        deferred: dict[int, Paper] = {}
+        keys = {(p.venue, p.year) for p in papers}
+        history: list[EnricherStats] = []
+        enrichers = self.paper_enrichers
+        if self.stats_store is not None:
+            history = await asyncio.to_thread(self.stats_store.load)
+            enrichers = order_enrichers(self.paper_enrichers, history, keys)
+            logger.info(f"Enricher order: {[e.__class__.__name__ for e in enrichers]}")
 
         # 2. 各リポジトリで情報を補完
-        for paper_enricher in self.paper_enrichers:
-            logger.info(f"Enriching with {paper_enricher.__class__.__name__}...")
-            papers = await paper_enricher.enrich_papers(
-                papers, semaphore=semaphore, overwrite=False
+        records: list[EnricherStats] = []
+        for paper_enricher in enrichers:
+            name = paper_enricher.__class__.__name__
+            # 実績を記録する場合は、補完する項目が欠けている論文だけを渡す
+            metered = (
+                paper_enricher
+                if self.stats_store is not None and isinstance(paper_enricher, MeteredPaperEnricher)
+                else None
             )
+            targets = papers
+            missing: dict[int, list[str]] = {}
+            if metered is not None:
+                fields = metered.FILLED_FIELDS
+                missing = {id(p): [f for f in fields if not getattr(p, f)] for p in papers}
+                targets = [p for p in papers if missing[id(p)]]
+                if not targets:
+                    logger.info(f"Skip {name}: no papers are missing {fields}")
+                    continue
 
+            if deadline is not None:
+                capacity = self._capacity(paper_enricher, len(targets), history, keys, deadline)
+                if capacity < len(targets):
+                    logger.info(
+                        f"Time budget allows {capacity}/{len(targets)} papers for {name}, "
+                        "deferring the rest to the next run"
+                    )
+                    deferred.update((id(p), p) for p in targets[capacity:])
+                    targets = targets[:capacity]
+                if not targets:
+                    continue
+
+            logger.info(f"Enriching {len(targets)}/{len(papers)} papers with {name}...")
+            requests = metered.requests if metered is not None else 0
+            started = time.perf_counter()
+            try:
+                async with within(deadline):
+                    enriched = await paper_enricher.enrich_papers(
+                        targets, semaphore=semaphore, overwrite=False
+                    )
+            except TimeoutError:
+                if deadline is None:
+                    raise
+                logger.warning(f"{name} stopped at the time budget")
+                deferred.update((id(p), p) for p in targets if not missing or missing[id(p)])
+            else:
+                if targets is papers:
+                    papers = enriched
+            if metered is not None:
+                elapsed = time.perf_counter() - started
+                records.extend(
+                    self._stats(name, targets, missing, elapsed, metered.requests - requests)
+                )
+
+        if self.stats_store is not None:
+            await asyncio.to_thread(self.stats_store.add, records)
+        self.deferred = list(deferred.values())
         return papers
+
+    @staticmethod
+    def _capacity(
+        enricher: PaperEnricher,
+        num_targets: int,
+        history: Sequence[EnricherStats],
+        keys: set[tuple[str, int]],
+        deadline: Deadline,
+    ) -> int:
+        """締め切りまでにEnricherが補完できると見積もった論文数を返します。"""
+        if deadline.expired:
+            return 0
+        if not isinstance(enricher, MeteredPaperEnricher):
+            return num_targets
+        per_paper = estimate_seconds_per_paper(enricher, history, keys)
+        if not per_paper:
+            # 実績がなければ見積もれないため、締め切りで中断するまで補完する
+            return num_targets
+        return min(num_targets, int(deadline.remaining / per_paper))
+
+    @staticmethod
+    def _stats(
+        name: str,
+        targets: list[Paper],
+        missing: dict[int, list[str]],
+        elapsed: float,
+        num_requests: int,
+    ) -> list[EnricherStats]:
+        """補完前に欠けていた項目から、(掲載会場, 年) ごとの実績を集計します。"""
+        # (掲載会場, 年) ごとの論文数と埋めた項目数。時間とリクエスト数は論文数で按分する
+        counts: dict[tuple[str, int], list[int]] = {}
+        for paper in targets:
+            count = counts.setdefault((paper.venue, paper.year), [0, 0])
+            count[0] += 1
+            count[1] += sum(1 for f in missing[id(paper)] if getattr(paper, f))
+        filled = sum(c[1] for c in counts.values())
+        logger.info(f"{name} filled {filled} fields with {num_requests} requests in {elapsed:.1f}s")
+        return [
+            EnricherStats(
+                enricher=name,
+                venue=venue,
+                year=year,
+                papers=num_papers,
+                requests=round(num_requests * num_papers / len(targets)),
+                seconds=elapsed * num_papers / len(targets),
+                filled=num_filled,
+            )
+            for (venue, year), (num_papers, num_filled) in counts.items()
+        ]
@@ -0,0 +1,83 @@
+"""UseCase層: RSS/Atomフィードから技術ブログの新着記事を収集するモジュール"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from loguru import logger
+
+from crawler.configs.sites import SiteConfig
+from crawler.domain.feed import FeedEntry
+from crawler.repository.feed_repository import FeedRepository
+
+
+class PollFeeds:
+    """設定されたフィードのうち、ポーリング日時を過ぎたものを並列に取得するユースケース。"""
+
+    def __init__(self, feed_repository: FeedRepository) -> None:
+        """PollFeedsインスタンスを初期化します。
+
+        Args:
+            feed_repository: フィードを取得するリポジトリ
+        """
+        self.feed_repository = feed_repository
+
+    async def execute(
+        self,
+        sites: list[SiteConfig],
+        semaphore: asyncio.Semaphore,
+        force: bool = False,
+        on_entries: Callable[[list[FeedEntry]], Awaitable[object]] | None = None,
+    ) -> list[FeedEntry]:
+        """フィードをポーリングし、新規・更新された記事を返します。
+
+        フィードのポーリング状態は取得ごとに保存されるため、途中で中断される場合に備えて
+        `on_entries` を指定すると、取得したフィードの記事をフィードごとにすぐ受け取れます。
+
+        Args:
+            sites: 対象サイトの設定のリスト（`feed_urls` を持つもののみ対象）
+            semaphore: 並列実行制限用セマフォ
+            force: Trueの場合、次回のポーリング日時に関わらず全てのフィードを取得する
+            on_entries: 指定した場合、フィードごとに新規・更新された記事を渡して呼び出す関数
+
+        Returns:
+            新規・更新された記事のリスト（URLで重複排除済み）
+        """
+        feeds = {url: site.name for site in sites for url in site.feed_urls}
+        if not force:
+            due = await asyncio.gather(*(self.feed_repository.is_due(url) for url in feeds))
+            feeds = {url: name for (url, name), is_due in zip(feeds.items(), due) if is_due}
+        if not feeds:
+            return []
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(self._poll(url, semaphore, name, on_entries))
+                for url, name in feeds.items()
+            ]
+
+        entries: dict[str, FeedEntry] = {}
+        failed = 0
+        for task in tasks:
+            result = task.result()
+            if result is None:
+                failed += 1
+                continue
+            for entry in result:
+                entries.setdefault(entry.url, entry)
+
+        logger.info(
+            f"Polled {len(feeds)} feeds ({failed} failed): {len(entries)} new or updated entries"
+        )
+        return list(entries.values())
+
+    async def _poll(
+        self,
+        feed_url: str,
+        semaphore: asyncio.Semaphore,
+        site: str,
+        on_entries: Callable[[list[FeedEntry]], Awaitable[object]] | None,
+    ) -> list[FeedEntry] | None:
+        entries = await self.feed_repository.poll(feed_url, semaphore, site)
+        if entries and on_entries is not None:
+            await on_entries(entries)
+        return entries
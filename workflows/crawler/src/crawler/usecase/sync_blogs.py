@@ -0,0 +1,101 @@
+"""UseCase層: サイトマップから技術ブログの新規・更新記事を取得するモジュール"""
+
+import asyncio
+from collections.abc import Sequence
+
+from loguru import logger
+
+from crawler.configs.sites import SiteConfig
+from crawler.domain.repository import WebPageSink
+from crawler.domain.web_page import UrlState, WebPage
+from crawler.repository.crawl_state_store import CrawlStateStore
+from crawler.repository.sitemap_repository import SitemapRepository
+from crawler.repository.web_page_repository import WebPageRepository
+
+
+class SyncBlogSitemaps:
+    """サイトマップを差分で巡回し、前回の実行以降に追加・更新された記事だけを取得するユースケース。"""
+
+    def __init__(
+        self,
+        sitemap_repository: SitemapRepository,
+        page_repository: WebPageRepository,
+        state_store: CrawlStateStore,
+        sinks: Sequence[WebPageSink] = (),
+    ) -> None:
+        """SyncBlogSitemapsインスタンスを初期化します。
+
+        Args:
+            sitemap_repository: サイトマップを巡回するリポジトリ
+            page_repository: ページを取得するリポジトリ
+            state_store: URLごとのクロール状態を保存するストア
+            sinks: 取得した記事の書き込み先のリスト
+        """
+        self.sitemap_repository = sitemap_repository
+        self.page_repository = page_repository
+        self.state_store = state_store
+        self.sinks = sinks
+
+    async def execute(self, sites: list[SiteConfig], semaphore: asyncio.Semaphore) -> list[WebPage]:
+        """サイトごとに新規・更新された記事を取得します。
+
+        取得した記事はサイトごとにシンクに書き込んでから、取得（または304で未変更と確認）
+        できた記事を取得済みとして記録します。失敗した記事と、途中で中断されたサイトの記事は
+        次回の実行で再度取得します。
+
+        Args:
+            sites: 対象サイトの設定のリスト
+            semaphore: 並列実行制限用セマフォ
+
+        Returns:
+            取得した記事のリスト（未変更の記事は含まない）
+        """
+        pages: list[WebPage] = []
+        for site in sites:
+            pages.extend(await self._sync_site(site, semaphore))
+        return pages
+
+    async def _sync_site(self, site: SiteConfig, semaphore: asyncio.Semaphore) -> list[WebPage]:
+        sitemap_urls = [site.sitemap_url] if site.sitemap_url else []
+        if not sitemap_urls:
+            for start_url in site.start_urls:
+                sitemap_urls.extend(await self.sitemap_repository.discover_sitemaps(start_url))
+        if not sitemap_urls:
+            logger.info(f"Skip site {site.name}: no sitemap found")
+            return []
+
+        states: dict[str, UrlState] = {}
+        for sitemap_url in sitemap_urls:
+            for state in await self.sitemap_repository.changed_pages(
+                sitemap_url, semaphore, site.name
+            ):
+                states.setdefault(state.url, state)
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                (state, tg.create_task(self.page_repository.fetch(state, semaphore)))
+                for state in states.values()
+            ]
+
+        synced: list[UrlState] = []
+        fetched: list[WebPage] = []
+        for state, task in tasks:
+            page = task.result()
+            if page is None:
+                continue
+            synced.append(
+                state.model_copy(update={"etag": page.etag, "last_modified": page.last_modified})
+            )
+            if page.status_code != 304:
+                fetched.append(page)
+        # 書き込む前に中断された記事を取得済みにしないよう、シンクへの書き込みを先に行う
+        if fetched:
+            for sink in self.sinks:
+                await sink.write_pages(fetched)
+        await asyncio.to_thread(self.state_store.mark_synced, synced)
+
+        logger.info(
+            f"Site {site.name}: {len(fetched)} updated, "
+            f"{len(synced) - len(fetched)} not modified, {len(tasks) - len(synced)} failed"
+        )
+        return fetched
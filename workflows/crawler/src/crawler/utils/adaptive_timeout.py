@@ -0,0 +1,193 @@
+"""ホストごとのレイテンシに基づくタイムアウトの調整。
+
+共通のHTTPクライアントは全てのリクエストに同じタイムアウト（30秒）を使うため、普段は1秒以内に応答する
+ホストでも、応答しなくなったリクエストがセマフォの枠を30秒間占有します。
+
+`AdaptiveTimeouts` はホストごとに直近のレスポンス（ヘッダー受信まで）の所要時間を記録し、
+そのパーセンタイルの数倍を読み取りのタイムアウトとします。タイムアウトは下限・上限の範囲に収め、
+サンプルが少ない間はクライアントの既定値を使います。接続のタイムアウトはレイテンシと関係しないため、
+クライアントの設定（`connect_timeout`）で別に指定します。
+
+`AdaptiveTimeoutTransport` をクライアントのトランスポートとして使うと、全てのリクエストに適用されます。
+リクエストで個別に指定したタイムアウトの方が短い場合はそちらを優先します。
+"""
+
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import httpx
+
+
+@dataclass
+class _HostLatency:
+    samples: deque[float]
+    read_timeout: float | None = None
+    pending: int = 0
+
+
+@dataclass(frozen=True)
+class LatencyStats:
+    """ホストのレイテンシの統計。
+
+    Attributes:
+        samples: 記録したレスポンス数（直近 `window_size` 件まで）
+        p50: レイテンシの中央値(秒)
+        p99: レイテンシの99パーセンタイル(秒)
+        read_timeout: 現在の読み取りのタイムアウト(秒)。サンプルが少ない間はNone
+    """
+
+    samples: int
+    p50: float
+    p99: float
+    read_timeout: float | None
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """昇順に並んだ値のパーセンタイル（最近傍法）を返します。
+
+    Args:
+        sorted_values: 昇順に並んだ値（空でないこと）
+        q: 0から1の間の割合
+
+    Returns:
+        パーセンタイルの値
+    """
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class AdaptiveTimeouts:
+    """ホストごとのレイテンシのパーセンタイルから読み取りのタイムアウトを計算するクラス。"""
+
+    DEFAULT_PERCENTILE = 0.99
+    DEFAULT_MULTIPLIER = 3.0
+    DEFAULT_MIN_READ_TIMEOUT = 2.0
+    DEFAULT_MAX_READ_TIMEOUT = 30.0
+    DEFAULT_MIN_SAMPLES = 20
+    DEFAULT_WINDOW_SIZE = 200
+    # タイムアウトを再計算する間隔（新しいサンプル数）
+    UPDATE_INTERVAL = 10
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_PERCENTILE,
+        multiplier: float = DEFAULT_MULTIPLIER,
+        min_read_timeout: float = DEFAULT_MIN_READ_TIMEOUT,
+        max_read_timeout: float = DEFAULT_MAX_READ_TIMEOUT,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+    ) -> None:
+        """AdaptiveTimeoutsインスタンスを初期化します。
+
+        Args:
+            percentile: タイムアウトの基準にするレイテンシのパーセンタイル（0から1）
+            multiplier: パーセンタイルに掛ける倍率
+            min_read_timeout: 読み取りのタイムアウトの下限(秒)
+            max_read_timeout: 読み取りのタイムアウトの上限(秒)
+            min_samples: タイムアウトを調整するのに必要なサンプル数
+            window_size: パーセンタイルの計算に使う直近のサンプル数
+        """
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_read_timeout = min_read_timeout
+        self.max_read_timeout = max_read_timeout
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self._hosts: dict[str, _HostLatency] = {}
+
+    def _host(self, host: str) -> _HostLatency:
+        latency = self._hosts.get(host)
+        if latency is None:
+            latency = _HostLatency(samples=deque(maxlen=self.window_size))
+            self._hosts[host] = latency
+        return latency
+
+    def read_timeout(self, host: str) -> float | None:
+        """ホストの読み取りのタイムアウトを返します。サンプルが少ない間はNone。"""
+        latency = self._hosts.get(host)
+        return latency.read_timeout if latency is not None else None
+
+    def record(self, host: str, elapsed: float) -> None:
+        """レスポンスの所要時間を記録します。
+
+        タイムアウトしたリクエストもタイムアウトまでの時間を記録するため、ホストが遅くなると
+        タイムアウトは上限に向かって延びます。
+
+        Args:
+            host: リクエスト先のホスト
+            elapsed: リクエストの送信からレスポンスヘッダーの受信までの秒数
+        """
+        latency = self._host(host)
+        latency.samples.append(elapsed)
+        latency.pending += 1
+        if len(latency.samples) < self.min_samples:
+            return
+        if latency.read_timeout is not None and latency.pending < self.UPDATE_INTERVAL:
+            return
+        latency.pending = 0
+        value = percentile(sorted(latency.samples), self.percentile) * self.multiplier
+        latency.read_timeout = min(self.max_read_timeout, max(self.min_read_timeout, value))
+
+    def stats(self) -> dict[str, LatencyStats]:
+        """ホストごとのレイテンシの統計を返します。"""
+        result = {}
+        for host, latency in self._hosts.items():
+            if not latency.samples:
+                continue
+            values = sorted(latency.samples)
+            result[host] = LatencyStats(
+                samples=len(values),
+                p50=percentile(values, 0.5),
+                p99=percentile(values, 0.99),
+                read_timeout=latency.read_timeout,
+            )
+        return result
+
+
+class AdaptiveTimeoutTransport(httpx.AsyncBaseTransport):
+    """リクエストにホストごとの読み取りのタイムアウトを適用し、レイテンシを記録するトランスポート。"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        timeouts: AdaptiveTimeouts,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """AdaptiveTimeoutTransportインスタンスを初期化します。
+
+        Args:
+            transport: 実際にリクエストを送信するトランスポート
+            timeouts: ホストごとのタイムアウトを計算するインスタンス
+            clock: 経過時間の計測に使う関数（テスト用）
+        """
+        self.transport = transport
+        self.timeouts = timeouts
+        self.clock = clock
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """タイムアウトを調整してリクエストを送信します。"""
+        host = request.url.host
+        read_timeout = self.timeouts.read_timeout(host)
+        if read_timeout is not None:
+            timeout = dict(request.extensions.get("timeout", {}))
+            for key in ("read", "write"):
+                current = timeout.get(key)
+                if current is None or read_timeout < current:
+                    timeout[key] = read_timeout
+            request.extensions["timeout"] = timeout
+
+        started = self.clock()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except (httpx.ReadTimeout, httpx.WriteTimeout):
+            self.timeouts.record(host, self.clock() - started)
+            raise
+        self.timeouts.record(host, self.clock() - started)
+        return response
+
+    async def aclose(self) -> None:
+        """内部のトランスポートを閉じます。"""
+        await self.transport.aclose()
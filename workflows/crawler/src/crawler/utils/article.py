@@ -0,0 +1,281 @@
+"""HTMLから記事本文を抽出するモジュール（プロセスプールのワーカーで実行する）。
+
+標準ライブラリの `html.parser` でHTMLを1回走査し、ナビゲーション・ヘッダー・フッターなどの
+定型部分(boilerplate)を除いた本文・タイトル・公開日時・コードブロックを取り出します。
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+from crawler.utils.sitemap import normalize_lastmod
+
+# 中身を本文として扱わない要素
+SKIP_TAGS = frozenset(
+    {
+        "script",
+        "style",
+        "noscript",
+        "template",
+        "svg",
+        "nav",
+        "header",
+        "footer",
+        "aside",
+        "form",
+        "iframe",
+        "button",
+        "select",
+    }
+)
+# 段落の区切りとなる要素
+BLOCK_TAGS = frozenset(
+    {
+        "p",
+        "div",
+        "section",
+        "article",
+        "main",
+        "li",
+        "ul",
+        "ol",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "blockquote",
+        "pre",
+        "table",
+        "tr",
+        "td",
+        "th",
+        "figure",
+        "figcaption",
+        "dd",
+        "dt",
+        "br",
+        "hr",
+    }
+)
+VOID_TAGS = frozenset({"br", "hr", "img", "meta", "link", "input", "source", "wbr"})
+# 公開日時を表すmetaタグの属性値
+PUBLISHED_META = frozenset(
+    {"article:published_time", "og:published_time", "datepublished", "date", "pubdate"}
+)
+# リンク文字の割合がこれを超える段落はナビゲーション等とみなして除く
+MAX_LINK_DENSITY = 0.5
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ArticleContent(NamedTuple):
+    """HTMLから抽出した記事の内容。
+
+    Attributes:
+        title: タイトル（`og:title`、`<h1>`、`<title>` の順に採用）
+        published: 公開日時(UTCのISO 8601形式)
+        text: 本文
+        code_blocks: コードブロック
+    """
+
+    title: str | None
+    published: str | None
+    text: str
+    code_blocks: list[str]
+
+
+class _Block:
+    __slots__ = ("parts", "link_chars", "in_article", "in_main", "is_code")
+
+    def __init__(self, in_article: bool, in_main: bool, is_code: bool = False) -> None:
+        self.parts: list[str] = []
+        self.link_chars = 0
+        self.in_article = in_article
+        self.in_main = in_main
+        self.is_code = is_code
+
+    def text(self) -> str:
+        raw = "".join(self.parts)
+        return raw.strip("\n") if self.is_code else _WHITESPACE.sub(" ", raw).strip()
+
+
+class _ArticleParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.blocks: list[_Block] = []
+        self.code_blocks: list[str] = []
+        self.meta_title: str | None = None
+        self.h1: str | None = None
+        self.title: str | None = None
+        self.published: str | None = None
+        self._skip_depth = 0
+        self._article_depth = 0
+        self._main_depth = 0
+        self._pre_depth = 0
+        self._link_depth = 0
+        self._in_title = False
+        self._in_h1 = False
+        self._in_ld_json = False
+        self._title_parts: list[str] = []
+        self._h1_parts: list[str] = []
+        self._ld_json_parts: list[str] = []
+        self._block = self._new_block()
+
+    def _new_block(self, is_code: bool = False) -> _Block:
+        return _Block(self._article_depth > 0, self._main_depth > 0, is_code)
+
+    def _flush(self, is_code: bool = False) -> None:
+        if self._block.text():
+            self.blocks.append(self._block)
+        self._block = self._new_block(is_code)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attr = dict(attrs)
+        if tag == "meta":
+            self._handle_meta(attr)
+        elif tag == "time" and self.published is None:
+            self.published = normalize_lastmod(attr.get("datetime"))
+        elif tag == "script" and (attr.get("type") or "").lower() == "application/ld+json":
+            self._in_ld_json = True
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS and not self._skip_depth and not self._pre_depth:
+                self._flush()
+            return
+
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag == "title":
+            self._in_title = True
+        elif tag == "h1" and self.h1 is None:
+            self._in_h1 = True
+        elif tag == "article":
+            self._article_depth += 1
+        elif tag == "main":
+            self._main_depth += 1
+        elif tag == "a":
+            self._link_depth += 1
+
+        if self._skip_depth:
+            return
+        if tag == "pre":
+            if not self._pre_depth:
+                self._flush(is_code=True)
+            self._pre_depth += 1
+        elif tag in BLOCK_TAGS and not self._pre_depth:
+            self._flush()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in VOID_TAGS:
+            return
+        if tag == "script":
+            self._in_ld_json = False
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+            return
+        if tag == "title":
+            self._in_title = False
+            self.title = _clean("".join(self._title_parts))
+        elif tag == "h1" and self._in_h1:
+            self._in_h1 = False
+            self.h1 = _clean("".join(self._h1_parts))
+        elif tag == "a":
+            self._link_depth = max(self._link_depth - 1, 0)
+
+        if not self._skip_depth:
+            if tag == "pre" and self._pre_depth:
+                self._pre_depth -= 1
+                if not self._pre_depth:
+                    code = self._block.text()
+                    if code:
+                        self.code_blocks.append(code)
+                    self._flush()
+            elif tag in BLOCK_TAGS and not self._pre_depth:
+                self._flush()
+
+        # ブロックを確定してから本文の範囲を閉じる
+        if tag == "article":
+            self._article_depth = max(self._article_depth - 1, 0)
+            self._block = self._new_block()
+        elif tag == "main":
+            self._main_depth = max(self._main_depth - 1, 0)
+            self._block = self._new_block()
+
+    def handle_data(self, data: str) -> None:
+        if self._in_ld_json:
+            self._ld_json_parts.append(data)
+            return
+        if self._in_title:
+            self._title_parts.append(data)
+        if self._skip_depth:
+            return
+        if self._in_h1:
+            self._h1_parts.append(data)
+        self._block.parts.append(data)
+        if self._link_depth:
+            self._block.link_chars += len(data.strip())
+
+    def _handle_meta(self, attr: dict[str, str | None]) -> None:
+        key = (attr.get("property") or attr.get("name") or attr.get("itemprop") or "").lower()
+        content = attr.get("content")
+        if not content:
+            return
+        if key == "og:title" and self.meta_title is None:
+            self.meta_title = _clean(content)
+        elif key in PUBLISHED_META and self.published is None:
+            self.published = normalize_lastmod(content)
+
+    def ld_json_published(self) -> str | None:
+        """JSON-LD(schema.org)の `datePublished` を返します。"""
+        raw = "".join(self._ld_json_parts)
+        match = re.search(r'"datePublished"\s*:\s*("[^"]*")', raw)
+        if match is None:
+            return None
+        try:
+            return normalize_lastmod(json.loads(match.group(1)))
+        except ValueError:
+            return None
+
+
+def _clean(text: str) -> str | None:
+    return _WHITESPACE.sub(" ", text).strip() or None
+
+
+def _main_blocks(blocks: list[_Block]) -> list[_Block]:
+    """`<article>`、`<main>`、ページ全体の順に本文の範囲を選びます。"""
+    for selected in ([b for b in blocks if b.in_article], [b for b in blocks if b.in_main]):
+        if selected:
+            return selected
+    return blocks
+
+
+def extract_article(html: str) -> ArticleContent:
+    """HTMLから記事のタイトル・公開日時・本文・コードブロックを抽出します。
+
+    Args:
+        html: ページのHTML
+
+    Returns:
+        抽出した記事の内容
+    """
+    parser = _ArticleParser()
+    parser.feed(html)
+    parser.close()
+    parser._flush()
+
+    paragraphs = []
+    for block in _main_blocks(parser.blocks):
+        text = block.text()
+        if not block.is_code and block.link_chars > len(text) * MAX_LINK_DENSITY:
+            continue
+        paragraphs.append(text)
+
+    return ArticleContent(
+        title=parser.meta_title or parser.h1 or parser.title,
+        published=parser.ld_json_published() or parser.published,
+        text="\n\n".join(paragraphs),
+        code_blocks=parser.code_blocks,
+    )
@@ -0,0 +1,73 @@
+"""標準ライブラリのみで実装したBloomフィルター。
+
+要素そのものを保持せずに「追加済みかどうか」を判定する確率的なデータ構造です。偽陽性（追加していない
+要素を追加済みと判定すること）は `error_rate` 程度の確率で起こりますが、偽陰性は起こりません。
+1要素あたりのメモリは偽陽性率0.1%で約1.8バイトで、キーの文字列を保持する辞書・集合より大幅に小さくなります。
+"""
+
+import hashlib
+import math
+from collections.abc import Iterator
+
+
+class BloomFilter:
+    """文字列の集合を近似的に保持するBloomフィルター。"""
+
+    DEFAULT_ERROR_RATE = 0.001
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE) -> None:
+        """BloomFilterインスタンスを初期化します。
+
+        Args:
+            capacity: 追加する要素数の見込み。これを超えると偽陽性率が上がる
+            error_rate: `capacity` 個の要素を追加したときの偽陽性率（0から1）
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate must be between 0 and 1: {error_rate}")
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # 偽陽性率を最小にするビット数とハッシュ関数の数
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def __len__(self) -> int:
+        """追加した要素数（重複して追加したと判定された要素を除く）。"""
+        return self._count
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def size_bytes(self) -> int:
+        """ビット配列のバイト数。"""
+        return len(self._bits)
+
+    def add(self, item: str) -> bool:
+        """要素を追加します。
+
+        Returns:
+            追加前から含まれていた（と判定された）場合はTrue
+        """
+        bits = self._bits
+        present = True
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                present = False
+                bits[pos >> 3] |= mask
+        if not present:
+            self._count += 1
+        return present
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # 1つの128ビットのハッシュから2つの値を取り出し、k個のハッシュ関数を合成する（double hashing）
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % num_bits
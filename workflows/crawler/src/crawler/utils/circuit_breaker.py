@@ -0,0 +1,235 @@
+"""ホスト単位のサーキットブレーカー。
+
+Unpaywallなどの外部APIがタイムアウトや5xxを返し始めると、論文ごとのコルーチンがそれぞれ
+タイムアウトまで待ち続け、クロール全体が停滞します。サーキットブレーカーは直近のリクエストの
+失敗率（5xx・通信エラー・遅いレスポンス）を監視し、しきい値を超えたホストへのリクエストを
+一定時間即座に失敗させます。
+
+- closed: 通常の状態。直近 `window_size` 件の失敗率が `failure_rate_threshold` 以上になるとopenへ
+- open: リクエストを送らずに `CircuitOpenError` を送出する。`open_seconds` 秒後にhalf_openへ
+- half_open: `half_open_max_calls` 件だけ試行リクエストを送り、成功すればclosed、失敗すればopenへ
+
+`set_circuit_breakers` で登録すると、`http_utils` のリクエスト関数はホストごとのブレーカーを経由して送信します。
+"""
+
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Literal
+
+import httpx
+from loguru import logger
+
+from crawler.utils.host_limiter import host_of
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(ConnectionError):
+    """サーキットが開いているため、リクエストを送らずに失敗したことを表す例外。"""
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        """CircuitOpenErrorインスタンスを初期化します。
+
+        Args:
+            host: サーキットが開いているホスト
+            retry_after: 試行リクエストを再開するまでの秒数
+        """
+        super().__init__(f"Circuit for {host} is open, retry after {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """1つのホストへのリクエストの成否を監視し、状態を遷移させるクラス。"""
+
+    DEFAULT_FAILURE_RATE_THRESHOLD = 0.5
+    DEFAULT_SLOW_CALL_SECONDS = 10.0
+    DEFAULT_WINDOW_SIZE = 20
+    DEFAULT_MIN_CALLS = 10
+    DEFAULT_OPEN_SECONDS = 60.0
+    DEFAULT_HALF_OPEN_MAX_CALLS = 1
+
+    def __init__(
+        self,
+        host: str,
+        failure_rate_threshold: float = DEFAULT_FAILURE_RATE_THRESHOLD,
+        slow_call_seconds: float = DEFAULT_SLOW_CALL_SECONDS,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        open_seconds: float = DEFAULT_OPEN_SECONDS,
+        half_open_max_calls: int = DEFAULT_HALF_OPEN_MAX_CALLS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """CircuitBreakerインスタンスを初期化します。
+
+        Args:
+            host: 監視対象のホスト
+            failure_rate_threshold: サーキットを開く失敗率
+            slow_call_seconds: これより時間のかかったレスポンスは成功しても失敗として数える
+            window_size: 失敗率の計算に使う直近のリクエスト数
+            min_calls: 失敗率を判定するのに必要な最小のリクエスト数
+            open_seconds: サーキットを開いてから試行リクエストを送るまでの秒数
+            half_open_max_calls: half_openで同時に送る試行リクエストの数
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.host = host
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._state: CircuitState = "closed"
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """現在の状態。open_seconds を経過したopenはhalf_openとして返します。"""
+        if self._state == "open" and self.clock() - self._opened_at >= self.open_seconds:
+            self._state = "half_open"
+            self._half_open_calls = 0
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """試行リクエストを再開するまでの秒数。openでない場合は0。"""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - self.clock())
+
+    def allow_request(self) -> bool:
+        """リクエストを送ってよいかを返します。half_openの場合は試行リクエストの枠を確保します。"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        return False
+
+    def record_success(self, elapsed: float) -> None:
+        """レスポンスが返ったことを記録します。
+
+        Args:
+            elapsed: リクエストにかかった秒数
+        """
+        if elapsed >= self.slow_call_seconds:
+            logger.debug(f"Slow response from {self.host}: {elapsed:.1f}s")
+            self.record_failure()
+            return
+        if self._state == "half_open":
+            logger.info(f"Circuit for {self.host} closed")
+            self._state = "closed"
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """リクエストの失敗（5xx・通信エラー・遅いレスポンス）を記録します。"""
+        if self._state == "half_open":
+            self._open()
+            return
+        self._outcomes.append(False)
+        if self._state == "closed" and len(self._outcomes) >= self.min_calls:
+            failure_rate = self._outcomes.count(False) / len(self._outcomes)
+            if failure_rate >= self.failure_rate_threshold:
+                self._open()
+
+    def release(self) -> None:
+        """結果を記録せずに終わった（キャンセルされた）試行リクエストの枠を返します。"""
+        if self._state == "half_open" and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def _open(self) -> None:
+        logger.warning(f"Circuit for {self.host} opened for {self.open_seconds:.0f}s")
+        self._state = "open"
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+
+
+class CircuitBreakers:
+    """ホストごとにCircuitBreakerを割り当て、リクエストをブレーカー経由で送信するレジストリ。"""
+
+    def __init__(self, create_breaker: Callable[[str], CircuitBreaker] = CircuitBreaker) -> None:
+        """CircuitBreakersインスタンスを初期化します。
+
+        Args:
+            create_breaker: ホスト名を受け取り、そのホストのCircuitBreakerを作成する関数
+        """
+        self.create_breaker = create_breaker
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, url: str) -> CircuitBreaker:
+        """URL(またはホスト名)に対応するブレーカーを返します。
+
+        Args:
+            url: リクエスト先のURL、またはホスト名
+
+        Returns:
+            ホストに割り当てられたCircuitBreaker
+        """
+        host = host_of(url)
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self.create_breaker(host)
+            self._breakers[host] = breaker
+        return breaker
+
+    def is_open(self, url: str) -> bool:
+        """ホストのサーキットが開いている（リクエストを送れない）かを返します。"""
+        return self.get(url).state == "open"
+
+    async def call(self, url: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """ブレーカーを経由してリクエストを送信します。
+
+        Args:
+            url: リクエスト先のURL
+            send: リクエストを送信する関数
+
+        Returns:
+            HTTPレスポンス
+
+        Raises:
+            CircuitOpenError: サーキットが開いている場合
+            httpx.TransportError: 通信エラーが発生した場合
+        """
+        breaker = self.get(url)
+        if not breaker.allow_request():
+            raise CircuitOpenError(breaker.host, breaker.retry_after)
+
+        started = breaker.clock()
+        try:
+            response = await send()
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success(breaker.clock() - started)
+        return response
+
+
+_breakers: CircuitBreakers | None = None
+
+
+def set_circuit_breakers(breakers: CircuitBreakers | None) -> None:
+    """プロセス全体で使用するCircuitBreakersを登録します。Noneを渡すと解除します。"""
+    global _breakers
+    _breakers = breakers
+
+
+def get_circuit_breakers() -> CircuitBreakers | None:
+    """登録されているCircuitBreakersを返します。"""
+    return _breakers
+
+
+def is_circuit_open(url: str) -> bool:
+    """登録されたCircuitBreakersで、URLのホストのサーキットが開いているかを返します。"""
+    return _breakers is not None and _breakers.is_open(url)
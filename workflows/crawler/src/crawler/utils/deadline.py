@@ -0,0 +1,100 @@
+"""実行時間の予算（`--time-budget`）から計算した締め切り。
+
+夜間バッチのように実行できる時間が決まっている場合に、締め切りまでに終わる作業だけを始め、
+残りを次回の実行に持ち越すために使います。
+
+    deadline = Deadline(parse_duration("6h"))
+    async with within(deadline):
+        ...  # 締め切りを過ぎるとTimeoutErrorで中断される
+"""
+
+import asyncio
+import re
+import time
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)([hms]?)")
+_UNIT_SECONDS = {"h": 3600.0, "m": 60.0, "s": 1.0, "": 1.0}
+
+
+def parse_duration(text: str) -> float:
+    """時間の指定（"90"・"90m"・"1h30m" など）を秒数に変換します。
+
+    Args:
+        text: 時間の指定（単位はh・m・s。省略時は秒）
+
+    Returns:
+        秒数
+
+    Raises:
+        ValueError: 形式が不正な場合、または0秒以下の場合
+    """
+    text = text.strip().lower()
+    pos = 0
+    seconds = 0.0
+    while pos < len(text):
+        match = _DURATION_PART.match(text, pos)
+        if match is None:
+            raise ValueError(f"invalid duration: {text!r}")
+        seconds += float(match[1]) * _UNIT_SECONDS[match[2]]
+        pos = match.end()
+    if seconds <= 0:
+        raise ValueError(f"duration must be positive: {text!r}")
+    return seconds
+
+
+def format_duration(seconds: float) -> str:
+    """秒数を "1h30m"・"45s" のような表記に変換します（`parse_duration` の逆）。"""
+    total = round(seconds)
+    hours, rest = divmod(total, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
+
+
+class Deadline:
+    """実行開始時刻と予算の秒数から決まる締め切り。"""
+
+    def __init__(self, budget: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """Deadlineインスタンスを初期化します。
+
+        Args:
+            budget: 実行時間の予算(秒)
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.budget = budget
+        self.clock = clock
+        self.started = clock()
+
+    @property
+    def elapsed(self) -> float:
+        """開始からの経過秒数。"""
+        return self.clock() - self.started
+
+    @property
+    def remaining(self) -> float:
+        """締め切りまでの残り秒数（過ぎている場合は0）。"""
+        return max(0.0, self.budget - self.elapsed)
+
+    @property
+    def expired(self) -> bool:
+        """締め切りを過ぎたかどうか。"""
+        return self.remaining <= 0
+
+
+def within(deadline: Deadline | None) -> AbstractAsyncContextManager[object]:
+    """締め切りを過ぎたら `TimeoutError` で中断するコンテキストを返します。
+
+    Args:
+        deadline: 締め切り。Noneの場合は中断しない
+
+    Returns:
+        `async with` で使うコンテキスト
+    """
+    if deadline is None:
+        return nullcontext()
+    return asyncio.timeout(deadline.remaining)
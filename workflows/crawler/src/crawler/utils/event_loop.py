@@ -0,0 +1,50 @@
+"""イベントループの選択。
+
+クロールの所要時間はレート制限とネットワークの待ち時間で決まり、`benchmarks.event_loop` では
+uvloopの方が遅かったため、既定は標準のasyncioのイベントループです。
+uvloopは `uvloop` を明示した場合だけ使う任意の依存関係（`uv sync --extra uvloop`）で、
+インストールされていない環境やWindowsではasyncioにフォールバックします。
+"""
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any, Literal
+
+from loguru import logger
+
+EventLoopName = Literal["asyncio", "uvloop"]
+EVENT_LOOPS: tuple[EventLoopName, ...] = ("asyncio", "uvloop")
+
+
+def loop_factory(name: EventLoopName = "asyncio") -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """イベントループを作成する関数を返します。
+
+    Args:
+        name: イベントループの種類
+
+    Returns:
+        `asyncio.run` の `loop_factory` に渡す関数。標準のイベントループを使う場合はNone
+    """
+    if name == "asyncio":
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("uvloop is not installed, falling back to the asyncio event loop")
+        return None
+    return uvloop.new_event_loop
+
+
+def run_with_loop[T](main: Coroutine[Any, Any, T], loop: EventLoopName = "asyncio") -> T:
+    """指定したイベントループでコルーチンを実行します。
+
+    Args:
+        main: 実行するコルーチン
+        loop: イベントループの種類
+
+    Returns:
+        コルーチンの戻り値
+    """
+    factory = loop_factory(loop)
+    logger.debug(f"Using {'uvloop' if factory else 'asyncio'} event loop")
+    return asyncio.run(main, loop_factory=factory)
@@ -0,0 +1,86 @@
+"""RSS/Atomフィードを解析するモジュール。
+
+feedparserによる解析はCPUバウンドなため、asyncioのコードからは
+`asyncio.to_thread` 経由で呼び出してください。
+"""
+
+import calendar
+import time
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import feedparser
+
+from crawler.domain.feed import FeedEntry
+
+# 更新頻度の推定に使う直近のエントリ数
+RECENT_ENTRIES = 10
+
+
+def _to_timestamp(value: time.struct_time | None) -> float | None:
+    # feedparserは日時をUTCのstruct_timeに正規化している
+    return float(calendar.timegm(value)) if value else None
+
+
+def parse_feed(
+    content: bytes, feed_url: str, site: str | None = None
+) -> tuple[list[FeedEntry], list[float]]:
+    """フィードを解析し、エントリと各エントリの公開日時を返します。
+
+    Args:
+        content: フィードのレスポンスボディ
+        feed_url: フィードのURL（相対URLの解決に使用）
+        site: サイト名
+
+    Returns:
+        (エントリのリスト, 公開日時(UNIX時間)のリスト) のタプル
+
+    Raises:
+        ValueError: フィードとして解析できない場合
+    """
+    parsed = feedparser.parse(content, response_headers={"content-location": feed_url})
+    if parsed.bozo and not parsed.entries:
+        raise ValueError(f"invalid feed: {parsed.get('bozo_exception')!r}")
+
+    entries: list[FeedEntry] = []
+    timestamps: list[float] = []
+    for entry in parsed.entries:
+        url = entry.get("link")
+        if not url:
+            continue
+        ts = _to_timestamp(entry.get("published_parsed") or entry.get("updated_parsed"))
+        if ts is not None:
+            timestamps.append(ts)
+        entries.append(
+            FeedEntry(
+                url=url,
+                title=entry.get("title"),
+                published=datetime.fromtimestamp(ts, UTC).isoformat() if ts is not None else None,
+                summary=entry.get("summary"),
+                feed_url=feed_url,
+                site=site,
+            )
+        )
+    return entries, timestamps
+
+
+def estimate_interval(
+    timestamps: Sequence[float], default: float, min_interval: float, max_interval: float
+) -> float:
+    """エントリの公開日時から平均の投稿間隔を推定します。
+
+    Args:
+        timestamps: エントリの公開日時(UNIX時間)
+        default: 推定できない（エントリが2件未満）場合の間隔
+        min_interval: 間隔の下限(秒)
+        max_interval: 間隔の上限(秒)
+
+    Returns:
+        推定したポーリング間隔(秒)
+    """
+    recent = sorted(timestamps, reverse=True)[:RECENT_ENTRIES]
+    if len(recent) < 2 or recent[0] == recent[-1]:
+        interval = default
+    else:
+        interval = (recent[0] - recent[-1]) / (len(recent) - 1)
+    return min(max(interval, min_interval), max_interval)
@@ -0,0 +1,127 @@
+"""ホスト単位のリトライ制御。
+
+`http_utils` のリトライは、コルーチンごとに待機・再送するとホスト全体では協調しません。
+429を受けたコルーチン以外は送信を続け、待機を終えたコルーチンは一斉に再送します。
+また、障害中のホストには全てのリクエストのリトライが重なり、負荷を増幅させます。
+
+`HostBackoff` はホストごとに次の状態を共有します。
+
+- 一時停止: 429の `Retry-After` を受けると、そのホストへの全てのリクエストを期限まで止める。
+  再開時は少しずつずらして送信する
+- リトライ予算: 成功したリクエスト数に対する比率（`budget_ratio`）でリトライの回数を制限する。
+  成功1件ごとに `budget_ratio` 回分が貯まり、リトライ1回ごとに1回分を使う
+
+`set_host_backoff` で登録すると、`http_utils` のリクエスト関数はこれらを適用します。
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from loguru import logger
+
+from crawler.utils.host_limiter import host_of
+
+
+@dataclass
+class _HostState:
+    paused_until: float = 0.0
+    retry_tokens: float = 0.0
+
+
+class HostBackoff:
+    """ホストごとの一時停止とリトライ予算を管理するクラス。"""
+
+    DEFAULT_BUDGET_RATIO = 0.2
+    DEFAULT_MIN_RETRIES = 10
+    DEFAULT_MAX_RETRIES = 100
+    # 一時停止の解除後に送信をずらす最大秒数（一時停止の長さの1割まで）
+    MAX_RESUME_JITTER_SECONDS = 5.0
+
+    def __init__(
+        self,
+        budget_ratio: float = DEFAULT_BUDGET_RATIO,
+        min_retries: int = DEFAULT_MIN_RETRIES,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """HostBackoffインスタンスを初期化します。
+
+        Args:
+            budget_ratio: 成功したリクエスト1件あたりに許可するリトライの回数
+            min_retries: 成功したリクエストがなくても許可するリトライの回数（予算の初期値）
+            max_retries: 貯めておけるリトライの回数の上限
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.budget_ratio = budget_ratio
+        self.min_retries = min_retries
+        self.max_retries = max_retries
+        self.clock = clock
+        self._hosts: dict[str, _HostState] = {}
+
+    def _state(self, url: str) -> _HostState:
+        host = host_of(url)
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(retry_tokens=float(self.min_retries))
+            self._hosts[host] = state
+        return state
+
+    def pause(self, url: str, seconds: float) -> None:
+        """ホストへのリクエストを一時停止します。既により長く停止している場合は何もしません。
+
+        Args:
+            url: リクエスト先のURL、またはホスト名
+            seconds: 停止する秒数
+        """
+        state = self._state(url)
+        until = self.clock() + seconds
+        if until > state.paused_until:
+            logger.info(f"Pausing requests to {host_of(url)} for {seconds:.1f}s")
+            state.paused_until = until
+
+    def paused_for(self, url: str) -> float:
+        """ホストの一時停止が解除されるまでの秒数を返します。停止していない場合は0。"""
+        return max(0.0, self._state(url).paused_until - self.clock())
+
+    async def wait(self, url: str) -> None:
+        """ホストが一時停止中であれば、解除されるまで待機します。
+
+        解除と同時に全てのコルーチンが送信しないよう、待機時間に一時停止の長さに応じたゆらぎを加えます。
+
+        Args:
+            url: リクエスト先のURL
+        """
+        # 待機中に一時停止が延長されることがあるため、解除されるまで繰り返す
+        while (remaining := self.paused_for(url)) > 0:
+            jitter = random.uniform(0, min(self.MAX_RESUME_JITTER_SECONDS, remaining * 0.1))
+            await asyncio.sleep(remaining + jitter)
+
+    def record_success(self, url: str) -> None:
+        """成功したリクエストを記録し、リトライ予算を貯めます。"""
+        state = self._state(url)
+        state.retry_tokens = min(float(self.max_retries), state.retry_tokens + self.budget_ratio)
+
+    def try_retry(self, url: str) -> bool:
+        """リトライ予算を1回分使います。予算が残っていない場合はFalseを返します。"""
+        state = self._state(url)
+        if state.retry_tokens < 1:
+            return False
+        state.retry_tokens -= 1
+        return True
+
+
+_backoff: HostBackoff | None = None
+
+
+def set_host_backoff(backoff: HostBackoff | None) -> None:
+    """プロセス全体で使用するHostBackoffを登録します。Noneを渡すと解除します。"""
+    global _backoff
+    _backoff = backoff
+
+
+def get_host_backoff() -> HostBackoff | None:
+    """登録されているHostBackoffを返します。"""
+    return _backoff
@@ -0,0 +1,68 @@
+"""ホスト単位のレートリミッターを管理するモジュール。"""
+
+from urllib.parse import urlsplit
+
+from aiolimiter import AsyncLimiter
+
+
+def host_of(url: str) -> str:
+    """URLからホスト名(小文字)を取り出します。ホスト名が渡された場合はそのまま返します。"""
+    if "://" not in url:
+        return url.lower()
+    return (urlsplit(url).hostname or "").lower()
+
+
+class HostLimiters:
+    """ホストごとにAsyncLimiterを割り当てるレジストリ。
+
+    PDFのダウンロードのように接続先ホストが事前に分からない処理のため、
+    初めて見たホストには既定のレートでリミッターを作成します。
+    既知のAPIホストは `set` でリポジトリと同じリミッターを登録することで、
+    同じホストへのリクエストが同じレート制限を共有します。
+    """
+
+    DEFAULT_MAX_RATE = 1.0
+    DEFAULT_TIME_PERIOD = 1.0
+
+    def __init__(
+        self,
+        default_max_rate: float = DEFAULT_MAX_RATE,
+        default_time_period: float = DEFAULT_TIME_PERIOD,
+    ) -> None:
+        """HostLimitersインスタンスを初期化します。
+
+        Args:
+            default_max_rate: 未登録ホストの `time_period` あたりの最大リクエスト数
+            default_time_period: 未登録ホストのレート計測期間(秒)
+        """
+        self.default_max_rate = default_max_rate
+        self.default_time_period = default_time_period
+        self._limiters: dict[str, AsyncLimiter] = {}
+
+    def get(self, url: str) -> AsyncLimiter:
+        """URL(またはホスト名)に対応するリミッターを返します。
+
+        Args:
+            url: リクエスト先のURL、またはホスト名
+
+        Returns:
+            ホストに割り当てられたAsyncLimiter
+        """
+        host = host_of(url)
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = AsyncLimiter(self.default_max_rate, self.default_time_period)
+            self._limiters[host] = limiter
+        return limiter
+
+    def set(self, url: str, limiter: AsyncLimiter) -> None:
+        """ホストにリミッターを登録します。
+
+        Args:
+            url: リクエスト先のURL、またはホスト名
+            limiter: 割り当てるAsyncLimiter
+        """
+        self._limiters[host_of(url)] = limiter
+
+    def __contains__(self, url: str) -> bool:
+        return host_of(url) in self._limiters
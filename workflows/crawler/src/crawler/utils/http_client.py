@@ -2,6 +2,8 @@
 
 import httpx
 
+from crawler.utils.adaptive_timeout import AdaptiveTimeouts, AdaptiveTimeoutTransport
+
 
 def create_http_client(
     base_url: str = "",
@@ -10,6 +12,8 @@ def create_http_client(
     max_connections: int = 100,
     max_keepalive_connections: int = 20,
     keepalive_expiry: float = 5.0,
+    connect_timeout: float | None = None,
+    adaptive_timeouts: AdaptiveTimeouts | None = None,
 ) -> httpx.AsyncClient:
     """Create a configured httpx.AsyncClient instance.
 
@@ -20,6 +24,8 @@ def create_http_client(
         max_connections: Maximum number of concurrent connections
         max_keepalive_connections: Maximum number of keep-alive connections
         keepalive_expiry: Keep-alive expiry time in seconds
+        connect_timeout: Connect timeout in seconds. Defaults to ``timeout``
+        adaptive_timeouts: If given, read timeouts are tightened per host from observed latency
 
     Returns:
         Configured AsyncClient instance
@@ -29,9 +35,15 @@ def create_http_client(
         max_keepalive_connections=max_keepalive_connections,
         keepalive_expiry=keepalive_expiry,
     )
+    transport = None
+    if adaptive_timeouts is not None:
+        transport = AdaptiveTimeoutTransport(
+            httpx.AsyncHTTPTransport(limits=limits), adaptive_timeouts
+        )
     return httpx.AsyncClient(
         base_url=base_url,
         headers=headers or {},
-        timeout=timeout,
+        timeout=httpx.Timeout(timeout, connect=connect_timeout or timeout),
         limits=limits,
+        transport=transport,
     )
@@ -1,14 +1,28 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
 from typing import Any, NoReturn
 
 import httpx
+from aiolimiter import AsyncLimiter
 from loguru import logger
 from tenacity import (
     RetryCallState,
     retry,
-    retry_if_result,
     stop_after_attempt,
     wait_random_exponential,
 )
+from tenacity.stop import stop_base
+
+from crawler.utils.circuit_breaker import CircuitOpenError, get_circuit_breakers
+from crawler.utils.host_backoff import get_host_backoff
+from crawler.utils.robots import get_robots_registry
+
+# サーバー側の一時的な障害を表すステータスコード（冪等なリクエストのみリトライする）
+TRANSIENT_STATUS_CODES = frozenset({502, 503, 504})
+# リクエストがサーバーに届いていないことが確実な通信エラー（冪等でないリクエストもリトライできる）
+UNSENT_REQUEST_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
 
 
 def is_rate_limit(resp: httpx.Response) -> bool:
@@ -16,15 +30,73 @@ def is_rate_limit(resp: httpx.Response) -> bool:
     return resp.status_code == 429
 
 
+def is_retryable_response(resp: httpx.Response, idempotent: bool = True) -> bool:
+    """レスポンスがリトライ対象（429、または冪等なリクエストの502/503/504）かどうか判定します。"""
+    return is_rate_limit(resp) or (idempotent and resp.status_code in TRANSIENT_STATUS_CODES)
+
+
+def is_transient_error(exc: BaseException, idempotent: bool = True) -> bool:
+    """例外がリトライ対象の一時的な通信エラーかどうか判定します。
+
+    接続の確立前に失敗した場合は常にリトライ対象とし、送信後のタイムアウトや切断は
+    冪等なリクエストのみリトライ対象とします。サーキットが開いている場合はリトライしません。
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, UNSENT_REQUEST_ERRORS):
+        return True
+    return idempotent and isinstance(exc, httpx.TransportError)
+
+
+def parse_retry_after(value: str, now: datetime | None = None) -> float | None:
+    """Retry-Afterヘッダーの値を待機秒数に変換します。
+
+    Args:
+        value: delay-seconds（例: `120`）またはHTTP-date（例: `Wed, 21 Oct 2015 07:28:00 GMT`）
+        now: HTTP-dateとの差を計算する現在時刻。省略時は現在のUTC時刻
+
+    Returns:
+        待機秒数（過去の日時の場合は0）。解釈できない場合はNone
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - (now or datetime.now(UTC))).total_seconds())
+
+
+def _request_url(retry_state: RetryCallState) -> str:
+    """retry_stateからリクエストURLを取り出します。"""
+    if retry_state.kwargs and "url" in retry_state.kwargs:
+        return str(retry_state.kwargs["url"])
+    if len(retry_state.args) > 1:
+        return str(retry_state.args[1])
+    return "unknown"
+
+
 def log_and_raise_final_error(retry_state: RetryCallState) -> NoReturn:
-    """リトライ回数超過時のエラーハンドリングを行います。"""
+    """リトライ回数超過・リトライ予算切れ時のエラーハンドリングを行います。"""
     attempt = retry_state.attempt_number
     if retry_state.outcome is None:
         raise ValueError("Retry state has no outcome")
+    if retry_state.outcome.failed:
+        logger.error(
+            f"Request failed after {attempt} attempts: {retry_state.outcome.exception()!r}, "
+            f"url: {_request_url(retry_state)}"
+        )
+        # 最後の例外を再送出する
+        retry_state.outcome.result()
+        raise RuntimeError("Retry exhausted but the last attempt did not raise")
     last_response: httpx.Response = retry_state.outcome.result()
 
     logger.error(
-        f"Rate limit exceeded after {attempt} attempts: {last_response}, url: {last_response.url}"
+        f"Request failed after {attempt} attempts: {last_response}, url: {last_response.url}"
     )
 
     last_response.raise_for_status()
@@ -37,52 +109,157 @@ def before_log(retry_state: RetryCallState) -> None:
     attempt = retry_state.attempt_number
 
     if attempt == 1:
-        # retry_stateから安全にURLを取得
-        if retry_state.kwargs and "url" in retry_state.kwargs:
-            url = retry_state.kwargs["url"]
-        elif len(retry_state.args) > 1:
-            url = retry_state.args[1]
-        else:
-            url = "unknown"
-        logger.info(f"Starting request to URL: {url}")
+        logger.info(f"Starting request to URL: {_request_url(retry_state)}")
     else:
         if retry_state.outcome is None:
             logger.warning("Retry state has no outcome")
             return
+        if retry_state.outcome.failed:
+            logger.info(
+                f"Attempt {attempt - 1} failed with {retry_state.outcome.exception()!r}, retrying..."
+            )
+            return
         last_response = retry_state.outcome.result()
         logger.info(
             f"Attempt {attempt - 1} failed with status {last_response.status_code}, retrying..."
         )
 
 
+def retry_if_transient(idempotent: bool) -> Callable[[RetryCallState], bool]:
+    """429・一時的な障害のレスポンスや通信エラーをリトライ対象とする条件を返します。
+
+    Args:
+        idempotent: リクエストが冪等かどうかの既定値。呼び出し時の `idempotent` 引数で上書きされる
+    """
+
+    def predicate(retry_state: RetryCallState) -> bool:
+        outcome = retry_state.outcome
+        if outcome is None:
+            return False
+        is_idempotent = bool(retry_state.kwargs.get("idempotent", idempotent))
+        if outcome.failed:
+            exc = outcome.exception()
+            return exc is not None and is_transient_error(exc, is_idempotent)
+        return is_retryable_response(outcome.result(), is_idempotent)
+
+    return predicate
+
+
+class stop_if_retry_budget_exhausted(stop_base):
+    """HostBackoffが登録されている場合、ホストのリトライ予算を1回分使い、予算切れであれば停止する条件。"""
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        backoff = get_host_backoff()
+        if backoff is None:
+            return False
+        url = _request_url(retry_state)
+        if backoff.try_retry(url):
+            return False
+        logger.warning(f"Retry budget exhausted for {url}, giving up")
+        return True
+
+
 def wait_retry_after(retry_state: RetryCallState) -> float:
     """Retry-Afterヘッダーを考慮した待機時間を計算します。
 
-    Retry-Afterヘッダーが存在し、その値が数値形式（delay-seconds）である場合は
-    その値を待機時間として使用します。HTTP-date形式のRetry-After値は現在
-    サポートしておらず、その場合はValueErrorとして扱われ、指数バックオフに
-    フォールバックします。Retry-Afterヘッダーが存在しない場合も同様に
-    指数バックオフを使用します。
+    429・503のレスポンスにRetry-Afterヘッダー（delay-seconds、またはHTTP-date形式）がある場合は
+    その値を待機時間として使用し、それ以外は指数バックオフを使用します。
+    HostBackoffが登録されている場合、429ではホスト全体のリクエストを待機時間だけ一時停止し、
+    このコルーチンも一時停止の解除を待ってから（送信前に）再送します。
+    """
+    wait_time = wait_random_exponential(multiplier=0.5, min=1, max=10)(retry_state)
+    outcome = retry_state.outcome
+    if outcome is None or outcome.failed:
+        return wait_time
+
+    result = outcome.result()
+    if not isinstance(result, httpx.Response):
+        return wait_time
+    if result.status_code in (429, 503):
+        retry_after = result.headers.get("Retry-After")
+        if retry_after:
+            parsed = parse_retry_after(retry_after)
+            if parsed is None:
+                logger.warning(f"Invalid Retry-After header: {retry_after}")
+            else:
+                logger.debug(f"Waiting for {parsed}s (Retry-After)")
+                wait_time = parsed
+
+    backoff = get_host_backoff()
+    if backoff is not None and is_rate_limit(result):
+        backoff.pause(_request_url(retry_state), wait_time)
+        return 0.0
+    return wait_time
+
+
+async def _wait_for_host(
+    url: str,
+    semaphore: asyncio.Semaphore | None = None,
+    limiter: AsyncLimiter | None = None,
+) -> None:
+    """HostBackoffが登録されている場合、ホストの一時停止が解除されるまで待機し、
+    レートリミッターの枠とセマフォを取得します。
+
+    一時停止中のホストを待つ間に他のホストへのリクエストを止めないよう、セマフォは一時停止の
+    解除後に取得します。レートリミッターの枠も解除後に取得するため、解除と同時に待機していた
+    コルーチンが一斉に送信せず、レート制限に従って送信されます。
+    取得を待つ間に一時停止された場合は、セマフォを返して待ち直します。
+    """
+    backoff = get_host_backoff()
+    while True:
+        if backoff is not None:
+            await backoff.wait(url)
+        if limiter is not None:
+            await limiter.acquire()
+        if semaphore is not None:
+            await semaphore.acquire()
+        if backoff is None or backoff.paused_for(url) <= 0:
+            return
+        if semaphore is not None:
+            semaphore.release()
+
+
+async def _send_within(
+    semaphore: asyncio.Semaphore | None,
+    limiter: AsyncLimiter | None,
+    client: httpx.AsyncClient,
+    url: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+) -> httpx.Response:
+    """ホストの一時停止の解除を待ち、セマフォを保持している間だけrobots.txtの確認と送信を行います。
+
+    リトライの各試行で呼び出されるため、再送のたびにレートリミッターの枠を1つ使います。
     """
-    if retry_state.outcome is not None:
-        result = retry_state.outcome.result()
-        if isinstance(result, httpx.Response) and result.status_code == 429:
-            retry_after = result.headers.get("Retry-After")
-            if retry_after:
-                try:
-                    wait_time = float(retry_after)
-                    logger.debug(f"Waiting for {wait_time}s (Retry-After)")
-                    return wait_time
-                except ValueError:
-                    logger.warning(f"Invalid Retry-After header: {retry_after}")
+    await _wait_for_host(url, semaphore, limiter)
+    try:
+        await _apply_robots(client, url)
+        return await _send(url, send)
+    finally:
+        if semaphore is not None:
+            semaphore.release()
 
-    return wait_random_exponential(multiplier=0.5, min=1, max=10)(retry_state)
+
+async def _apply_robots(client: httpx.AsyncClient, url: str) -> None:
+    """RobotsRegistryが登録されている場合、robots.txtの確認とクロール間隔の待機を行います。"""
+    registry = get_robots_registry()
+    if registry is not None:
+        await registry.acquire(client, url)
+
+
+async def _send(url: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+    """登録されたサーキットブレーカーを経由してリクエストを送信し、成功をリトライ予算に記録します。"""
+    breakers = get_circuit_breakers()
+    response = await (send() if breakers is None else breakers.call(url, send))
+    backoff = get_host_backoff()
+    if backoff is not None and response.status_code < 400:
+        backoff.record_success(url)
+    return response
 
 
 @retry(
-    stop=stop_after_attempt(5),
+    stop=stop_after_attempt(5) | stop_if_retry_budget_exhausted(),
     wait=wait_retry_after,
-    retry=retry_if_result(is_rate_limit),
+    retry=retry_if_transient(idempotent=False),
     before=before_log,
     retry_error_callback=log_and_raise_final_error,
 )
@@ -92,8 +269,19 @@ async def post_with_retry(
     params: dict[str, Any],
     json: dict[str, Any],
     headers: dict[str, str] | None = None,
+    idempotent: bool = False,
+    semaphore: asyncio.Semaphore | None = None,
+    limiter: AsyncLimiter | None = None,
 ) -> httpx.Response:
-    """指数バックオフとRate Limitリトライ付きでPOSTリクエストを送信します。
+    """指数バックオフとリトライ付きでPOSTリクエストを送信します。
+
+    429は常にリトライします。接続前の通信エラーも常にリトライし、502/503/504や送信後の通信エラーは
+    `idempotent=True` の場合のみリトライします。
+
+    `semaphore` を指定すると、送信の間だけセマフォを取得し、リトライの待機やホストの一時停止の
+    解除を待つ間は保持しません（呼び出し元でセマフォを取得したまま呼び出さないでください）。
+    `limiter` を指定すると、再送を含む試行ごとにホストの一時停止の解除後に枠を1つ取得します
+    （呼び出し元でリミッターを取得しないでください）。
 
     Args:
         client: HTTPX非同期クライアント
@@ -101,27 +289,39 @@ async def post_with_retry(
         params: クエリパラメータ
         json: JSONボディ
         headers: リクエストヘッダー（オプション）
+        idempotent: 検索APIのように再送しても副作用のないリクエストかどうか
+        semaphore: 並列実行制限用セマフォ（オプション）
+        limiter: 試行ごとに枠を取得するレートリミッター（オプション）
 
     Returns:
         HTTPレスポンス
 
     Raises:
-        httpx.HTTPStatusError: 429以外のHTTPエラーが発生した場合
+        httpx.HTTPStatusError: リトライ対象外のHTTPエラー、またはリトライしても失敗した場合
+        httpx.TransportError: リトライ対象外の通信エラー、またはリトライしても失敗した場合
         ValueError: リトライ状態が不正な場合
+        PermissionError: robots.txtでクロールが拒否されている場合
+        CircuitOpenError: ホストのサーキットが開いている場合
     """
-    response = await client.post(url, params=params, json=json, headers=headers)
-    # 200 OK: 成功、429: Rate limit（リトライ対象）
+    response = await _send_within(
+        semaphore,
+        limiter,
+        client,
+        url,
+        lambda: client.post(url, params=params, json=json, headers=headers),
+    )
+    # 200 OK: 成功、429・一時的な障害: リトライ対象
     # それ以外のステータスコードは即座にエラーとして扱う
-    if response.status_code not in (200, 429):
+    if response.status_code != 200 and not is_retryable_response(response, idempotent):
         response.raise_for_status()
 
     return response
 
 
 @retry(
-    stop=stop_after_attempt(5),
+    stop=stop_after_attempt(5) | stop_if_retry_budget_exhausted(),
     wait=wait_retry_after,
-    retry=retry_if_result(is_rate_limit),
+    retry=retry_if_transient(idempotent=True),
     before=before_log,
     retry_error_callback=log_and_raise_final_error,
 )
@@ -130,26 +330,38 @@ async def get_with_retry(
     url: str,
     params: dict[str, Any] | None = None,
     headers: dict[str, str] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    limiter: AsyncLimiter | None = None,
 ) -> httpx.Response:
-    """指数バックオフとRate Limitリトライ付きでGETリクエストを送信します。
+    """指数バックオフとリトライ付きでGETリクエストを送信します。
+
+    429、502/503/504、通信エラー（タイムアウト・接続エラー）をリトライします。
+    `semaphore`・`limiter` の扱いは `post_with_retry` と同じです。
 
     Args:
         client: HTTPX非同期クライアント
         url: リクエストURL
         params: クエリパラメータ（オプション）
         headers: リクエストヘッダー（オプション）
+        semaphore: 並列実行制限用セマフォ（オプション）
+        limiter: 試行ごとに枠を取得するレートリミッター（オプション）
 
     Returns:
         HTTPレスポンス
 
     Raises:
-        httpx.HTTPStatusError: 429以外のHTTPエラーが発生した場合
+        httpx.HTTPStatusError: リトライ対象外のHTTPエラー、またはリトライしても失敗した場合
+        httpx.TransportError: リトライしても通信エラーが続いた場合
         ValueError: リトライ状態が不正な場合
+        PermissionError: robots.txtでクロールが拒否されている場合
+        CircuitOpenError: ホストのサーキットが開いている場合
     """
-    response = await client.get(url, params=params, headers=headers)
-    # 200 OK: 成功、429: Rate limit（リトライ対象）
+    response = await _send_within(
+        semaphore, limiter, client, url, lambda: client.get(url, params=params, headers=headers)
+    )
+    # 200 OK: 成功、429・一時的な障害: リトライ対象
     # それ以外のステータスコードは即座にエラーとして扱う
-    if response.status_code not in (200, 429):
+    if response.status_code != 200 and not is_retryable_response(response):
         response.raise_for_status()
 
     return response
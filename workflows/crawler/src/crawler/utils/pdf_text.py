@@ -0,0 +1,74 @@
+"""PDFからテキストを抽出するモジュール。
+
+この関数群は `ProcessPoolExecutor` のワーカープロセス内で実行されることを想定しています。
+PDFの解析はCPUバウンドなため、asyncioのイベントループと同じプロセスで実行すると
+クロール全体が停止してしまいます。
+"""
+
+import resource
+import signal
+from pathlib import Path
+from types import FrameType
+
+PAGE_SEPARATOR = "\n"
+
+
+class ExtractionTimeoutError(Exception):
+    """抽出が制限時間を超えた場合の例外。"""
+
+
+def limit_memory(max_bytes: int | None) -> None:
+    """ワーカープロセスのアドレス空間の上限を設定します（プロセスプールの `initializer` 用）。
+
+    巨大・不正なPDFでメモリを使い果たした場合、ワーカー内で `MemoryError` となり、
+    親プロセスやほかのワーカーには影響しません。
+
+    Args:
+        max_bytes: 上限(バイト)。Noneの場合は制限しない
+    """
+    if max_bytes is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        max_bytes = min(max_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, hard))
+
+
+def _raise_timeout(signum: int, frame: FrameType | None) -> None:
+    raise ExtractionTimeoutError()
+
+
+def extract_text(path: str | Path, timeout: float | None = None) -> tuple[str, list[int]]:
+    """PDFの全ページのテキストを抽出します。
+
+    Args:
+        path: PDFファイルのパス
+        timeout: 制限時間(秒)。SIGALRMで中断するため、メインスレッドからのみ指定できます
+
+    Returns:
+        (ページを改行で連結したテキスト, 各ページの開始位置) のタプル
+
+    Raises:
+        ExtractionTimeoutError: 制限時間を超えた場合
+    """
+    # pypdfはワーカープロセスでのみ必要なため、遅延インポートする
+    from pypdf import PdfReader
+
+    if timeout:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        reader = PdfReader(path)
+        pages: list[str] = []
+        offsets: list[int] = []
+        position = 0
+        for page in reader.pages:
+            page_text = page.extract_text() or ""
+            offsets.append(position)
+            pages.append(page_text)
+            position += len(page_text) + len(PAGE_SEPARATOR)
+        return PAGE_SEPARATOR.join(pages), offsets
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
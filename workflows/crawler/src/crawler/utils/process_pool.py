@@ -0,0 +1,37 @@
+"""PDF・記事の抽出に使うワーカープロセスのプール（`ProcessPoolExecutor`）の補助関数。"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+async def start_workers(executor: ProcessPoolExecutor, num_workers: int) -> None:
+    """全てのワーカープロセスを起動し、初期化（`initializer`）を終えるまで待ちます。
+
+    spawnのワーカーは起動に時間がかかるため、ジョブを投入する前に呼び出して、
+    起動の時間がジョブの制限時間に含まれないようにします。
+
+    Args:
+        executor: 作成したばかりのプール
+        num_workers: プールの `max_workers`
+    """
+    loop = asyncio.get_running_loop()
+    # アイドルのワーカーがなければ投入ごとに1つずつ起動するため、ワーカー数だけ投入する
+    await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(num_workers)))
+
+
+def terminate_workers(executor: ProcessPoolExecutor) -> None:
+    """ワーカープロセスを強制終了し、プールを破棄します。
+
+    `shutdown(wait=False)` だけでは応答しないワーカー（C拡張内で停止した場合など）が
+    残り続けるため、終了させてから破棄します。実行中・待機中のジョブは失敗します。
+
+    Args:
+        executor: 破棄するプール
+    """
+    # shutdownはプロセスの参照を消すため、先に取り出しておく
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
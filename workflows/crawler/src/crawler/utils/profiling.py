@@ -0,0 +1,355 @@
+"""クロールのプロファイリング。
+
+クロールが遅い原因がCPU・レート制限の待機・ネットワークのどれにあるかを調べるためのプロファイラーです。
+いずれも標準ライブラリのみで実装し、1回の実行につき1つのレポートファイルを出力します。
+
+- `cpu`: 全スレッドのスタックを一定間隔でサンプリングし、flamegraph.pl / speedscope で
+  読み込めるfolded形式（`frame;frame;frame count`）で出力します。
+  イベントループの待機は `select` のフレームとして現れるため、CPU時間との比率で
+  ネットワーク・レート制限の待ちが支配的かどうかを判断できます
+- `memory`: `tracemalloc` でステージの開始・終了時のスナップショットを取り、
+  ステージごとのメモリ増加量と割り当て元の上位を出力します
+- `loop`: イベントループの遅延（スリープの超過時間）のパーセンタイルと、
+  asyncioのデバッグモードが検出した遅いコールバックをJSONで出力します
+
+    async with create_profiler("cpu", Path("data/profiles")) as profiler:
+        with profiler.stage("recsys"):
+            ...
+"""
+
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType, TracebackType
+from typing import Literal, Self
+
+from loguru import logger
+
+ProfileMode = Literal["cpu", "memory", "loop"]
+PROFILE_MODES: tuple[ProfileMode, ...] = ("cpu", "memory", "loop")
+
+
+class Profiler:
+    """プロファイラーの基底クラス。何も計測しません。
+
+    `async with` で計測を開始・終了し、終了時に `report_path` にレポートを書き込みます。
+    `stage` で囲んだ区間はステージとして記録されます（記録するかどうかはプロファイラーによる）。
+    """
+
+    SUFFIX = ""
+
+    def __init__(self, output_dir: str | Path | None = None, name: str = "profile") -> None:
+        """Profilerインスタンスを初期化します。
+
+        Args:
+            output_dir: レポートの出力先ディレクトリ。Noneの場合は出力しない
+            name: レポートのファイル名の接頭辞
+        """
+        self.report_path: Path | None = None
+        if output_dir is not None:
+            timestamp = time.strftime("%Y%m%d-%H%M%S")
+            self.report_path = Path(output_dir) / f"{name}-{timestamp}{self.SUFFIX}"
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        report = self.stop()
+        if self.report_path is not None and report:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            self.report_path.write_text(report)
+            logger.info(f"Wrote profile report to {self.report_path}")
+
+    def start(self) -> None:
+        """計測を開始します。"""
+
+    def stop(self) -> str:
+        """計測を終了し、レポートの内容を返します。"""
+        return ""
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """ステージの区間を記録します。
+
+        Args:
+            name: ステージ名
+        """
+        yield
+
+
+class SamplingProfiler(Profiler):
+    """全スレッドのスタックを一定間隔でサンプリングするプロファイラー。
+
+    サンプリングは別スレッドで行うため、計測対象のコードを変更せず、オーバーヘッドも
+    サンプリング間隔に比例する程度に抑えられます。スタックの根元にはスレッド名を置くため、
+    `asyncio.to_thread` で実行したSQLiteの処理などもイベントループと区別して集計されます。
+    """
+
+    SUFFIX = ".folded"
+    DEFAULT_INTERVAL_SECONDS = 0.005
+
+    def __init__(
+        self,
+        output_dir: str | Path | None = None,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+    ) -> None:
+        """SamplingProfilerインスタンスを初期化します。
+
+        Args:
+            output_dir: レポートの出力先ディレクトリ。Noneの場合は出力しない
+            interval: サンプリング間隔(秒)
+        """
+        super().__init__(output_dir, name="cpu")
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        total = sum(self.samples.values())
+        logger.info(f"Collected {total} stack samples every {self.interval * 1000:.1f} ms")
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self.samples[_fold(names.get(ident, str(ident)), frame)] += 1
+
+
+def _fold(thread_name: str, frame: FrameType | None) -> str:
+    """スタックを根元から順に `;` で連結したfolded形式の文字列に変換します。"""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", code.co_filename)
+        frames.append(f"{module}:{code.co_qualname}".replace(";", ":").replace(" ", "_"))
+        frame = frame.f_back
+    frames.append(thread_name.replace(";", ":").replace(" ", "_"))
+    return ";".join(reversed(frames))
+
+
+class MemoryProfiler(Profiler):
+    """`tracemalloc` でステージごとのメモリ割り当てを記録するプロファイラー。
+
+    ステージの開始・終了時のスナップショットの差分を記録します。並行に実行されるステージの
+    差分には、同じ期間に他のステージが割り当てたメモリも含まれます。
+    """
+
+    SUFFIX = ".txt"
+    DEFAULT_FRAMES = 10
+    DEFAULT_TOP = 15
+
+    def __init__(
+        self,
+        output_dir: str | Path | None = None,
+        frames: int = DEFAULT_FRAMES,
+        top: int = DEFAULT_TOP,
+    ) -> None:
+        """MemoryProfilerインスタンスを初期化します。
+
+        Args:
+            output_dir: レポートの出力先ディレクトリ。Noneの場合は出力しない
+            frames: 割り当てごとに記録するスタックの深さ
+            top: ステージごとに出力する割り当て元の件数
+        """
+        super().__init__(output_dir, name="memory")
+        self.frames = frames
+        self.top = top
+        self.sections: list[str] = []
+        self._started_here = False
+
+    def start(self) -> None:
+        self._started_here = not tracemalloc.is_tracing()
+        if self._started_here:
+            tracemalloc.start(self.frames)
+
+    def stop(self) -> str:
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_here:
+            tracemalloc.stop()
+        header = f"Traced memory: current {_mib(current)}, peak {_mib(peak)}\n"
+        return header + "".join(self.sections)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        before = _snapshot()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = _snapshot().compare_to(before, "lineno")
+            growth = sum(stat.size_diff for stat in stats)
+            lines = [
+                f"\n== {name}: {elapsed:.2f}s, {'+' if growth >= 0 else '-'}{_mib(abs(growth))}"
+            ]
+            lines += [f"  {stat}" for stat in stats[: self.top]]
+            self.sections.append("\n".join(lines) + "\n")
+            logger.debug(f"Stage {name}: memory {_mib(growth)} in {elapsed:.2f}s")
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+
+
+def _mib(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+class LoopLagMonitor(Profiler):
+    """イベントループの遅延と遅いコールバックを記録するプロファイラー。
+
+    一定間隔でスリープし、指定した時間からの超過分をループの遅延として記録します。
+    また、asyncioのデバッグモードを有効にし、`slow_callback` 秒を超えてループを
+    ブロックしたコールバックを記録します。イベントループ内で開始してください。
+    """
+
+    SUFFIX = ".json"
+    DEFAULT_INTERVAL_SECONDS = 0.05
+    DEFAULT_SLOW_CALLBACK_SECONDS = 0.1
+    MAX_SLOW_CALLBACKS = 100
+
+    def __init__(
+        self,
+        output_dir: str | Path | None = None,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        slow_callback: float = DEFAULT_SLOW_CALLBACK_SECONDS,
+    ) -> None:
+        """LoopLagMonitorインスタンスを初期化します。
+
+        Args:
+            output_dir: レポートの出力先ディレクトリ。Noneの場合は出力しない
+            interval: 遅延を計測する間隔(秒)
+            slow_callback: 遅いコールバックとして記録する実行時間(秒)
+        """
+        super().__init__(output_dir, name="loop")
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self.lags: list[float] = []
+        self.slow_callbacks: list[tuple[float, str]] = []
+        self._task: asyncio.Task[None] | None = None
+        self._handler = _SlowCallbackHandler(self.slow_callbacks)
+        self._prev_debug = False
+        self._prev_slow_callback = 0.0
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._prev_debug = loop.get_debug()
+        self._prev_slow_callback = loop.slow_callback_duration
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback
+        logging.getLogger("asyncio").addHandler(self._handler)
+        self._task = loop.create_task(self._watch())
+
+    def stop(self) -> str:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        loop = asyncio.get_running_loop()
+        loop.set_debug(self._prev_debug)
+        loop.slow_callback_duration = self._prev_slow_callback
+        logging.getLogger("asyncio").removeHandler(self._handler)
+
+        slowest = sorted(self.slow_callbacks, reverse=True)[: self.MAX_SLOW_CALLBACKS]
+        lag = _percentiles(self.lags)
+        report = {
+            "interval": self.interval,
+            "samples": len(self.lags),
+            "lag": lag,
+            "slow_callback_threshold": self.slow_callback,
+            "slow_callbacks": len(self.slow_callbacks),
+            "slowest_callbacks": [
+                {"duration": duration, "callback": callback} for duration, callback in slowest
+            ],
+        }
+        logger.info(
+            f"Event loop lag p99 {lag['p99'] * 1000:.1f} ms, max {lag['max'] * 1000:.1f} ms, "
+            f"{len(self.slow_callbacks)} slow callbacks"
+        )
+        return json.dumps(report, indent=2, ensure_ascii=False) + "\n"
+
+    async def _watch(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - started - self.interval, 0.0))
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """asyncioのデバッグモードが出力する遅いコールバックの警告を集めるハンドラー。"""
+
+    def __init__(self, records: list[tuple[float, str]]) -> None:
+        super().__init__(logging.WARNING)
+        self.records = records
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # "Executing <Handle ...> took 0.123 seconds"
+        if record.msg.startswith("Executing") and isinstance(record.args, tuple):
+            handle, duration = record.args
+            if isinstance(duration, float):
+                self.records.append((duration, str(handle)))
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    if len(values) == 1:
+        return {"p50": values[0], "p95": values[0], "p99": values[0], "max": values[0]}
+    q = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": q[49], "p95": q[94], "p99": q[98], "max": max(values)}
+
+
+def create_profiler(mode: ProfileMode | None, output_dir: str | Path) -> Profiler:
+    """モードに対応するプロファイラーを作成します。
+
+    Args:
+        mode: プロファイリングのモード。Noneの場合は何も計測しない
+        output_dir: レポートの出力先ディレクトリ
+
+    Returns:
+        プロファイラー
+    """
+    match mode:
+        case "cpu":
+            return SamplingProfiler(output_dir)
+        case "memory":
+            return MemoryProfiler(output_dir)
+        case "loop":
+            return LoopLagMonitor(output_dir)
+        case None:
+            return Profiler()
@@ -0,0 +1,254 @@
+"""プロセス全体で共有するrobots.txtのレジストリ。
+
+ホスト(オリジン)ごとにrobots.txtを1回だけ取得し、本文をSQLiteにTTL付きで保存します。
+TTL内であれば次回以降の実行でもrobots.txtを再取得しないため、
+行儀のよいクロールのために追加のリクエストは発生しません。
+
+`set_robots_registry` でレジストリを登録すると、`http_utils` のリクエスト関数は
+送信前に `can_fetch` を確認し、robots.txtの `Crawl-delay` / `Request-rate` に基づく
+ホストごとのレート制限を自動的に適用します。
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+from aiolimiter import AsyncLimiter
+from loguru import logger
+
+from crawler.utils.host_limiter import host_of
+from crawler.utils.robot_guard import RobotGuard
+from crawler.utils.sqlite import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS robots_txt (
+    origin TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class _Entry:
+    guard: RobotGuard
+    expires_at: float
+
+
+class RobotsRegistry:
+    """オリジンごとのRobotGuardをキャッシュし、robots.txtに基づくクロール可否と間隔を提供するクラス。"""
+
+    DEFAULT_USER_AGENT = "ArchilogBot"
+    DEFAULT_TTL_SECONDS = 24 * 60 * 60
+    # 取得に失敗した場合（通信エラー・5xx・429）は全拒否として扱い、保存せずに短い間隔で再取得する
+    DEFAULT_ERROR_TTL_SECONDS = 10 * 60
+
+    def __init__(
+        self,
+        cache_path: str | Path | None = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        error_ttl: float = DEFAULT_ERROR_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """RobotsRegistryインスタンスを初期化します。
+
+        Args:
+            cache_path: robots.txtを保存するSQLiteファイルのパス。Noneの場合はメモリ上のみ
+            user_agent: robots.txtの判定に使用するUser-Agent名
+            ttl: robots.txtを再取得するまでの秒数
+            error_ttl: 取得に失敗した場合に再取得するまでの秒数
+            clock: 現在時刻を返す関数（テスト用）
+        """
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.clock = clock
+        self._entries: dict[str, _Entry] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._limiters: dict[str, AsyncLimiter] = {}
+        self._conn = connect(cache_path) if cache_path is not None else None
+        if self._conn is not None:
+            self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+    def close(self) -> None:
+        """キャッシュの接続を閉じます。"""
+        if self._conn is not None:
+            self._conn.close()
+
+    async def guard(self, client: httpx.AsyncClient, url: str) -> RobotGuard:
+        """URLのオリジンに対応するロード済みのRobotGuardを返します。
+
+        メモリ上・ディスク上のキャッシュがTTL内であればそれを使用し、
+        なければrobots.txtを取得します。
+
+        Args:
+            client: robots.txtの取得に使用するAsyncClientインスタンス
+            url: 対象のURL
+
+        Returns:
+            ロード済みのRobotGuard
+        """
+        origin = _origin_of(url)
+        entry = self._entries.get(origin)
+        if entry is not None and entry.expires_at > self.clock():
+            return entry.guard
+
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(origin)
+            if entry is None or entry.expires_at <= self.clock():
+                entry = await self._load(client, origin)
+                self._entries[origin] = entry
+                self._update_limiter(entry.guard)
+        return entry.guard
+
+    async def can_fetch(self, client: httpx.AsyncClient, url: str) -> bool:
+        """robots.txtに基づいてURLを取得してよいか判定します。
+
+        Args:
+            client: robots.txtの取得に使用するAsyncClientインスタンス
+            url: 判定するURL
+
+        Returns:
+            取得してよい場合はTrue
+        """
+        return (await self.guard(client, url)).can_fetch(url)
+
+    def delay_limiter(self, url: str) -> AbstractAsyncContextManager[None]:
+        """robots.txtの `Crawl-delay` / `Request-rate` に基づくホストのレートリミッターを返します。
+
+        指定がないホスト、またはrobots.txtが未ロードのホストでは何もしないコンテキストを返します。
+
+        Args:
+            url: リクエスト先のURL
+
+        Returns:
+            `async with` で使用するレートリミッター
+        """
+        return self._limiters.get(host_of(url)) or nullcontext()
+
+    async def crawl_interval(self, client: httpx.AsyncClient, url: str) -> float | None:
+        """robots.txtで指定されたホストへのリクエスト間隔(秒)を返します。
+
+        `Request-rate` を優先し、なければ `Crawl-delay` を使用します。
+
+        Args:
+            client: robots.txtの取得に使用するAsyncClientインスタンス
+            url: 対象のURL
+
+        Returns:
+            リクエスト間隔(秒)。指定がない場合はNone
+        """
+        return _interval_of(await self.guard(client, url))
+
+    async def acquire(self, client: httpx.AsyncClient, url: str) -> None:
+        """URLへのリクエスト前に、robots.txtの確認とクロール間隔の待機を行います。
+
+        Args:
+            client: robots.txtの取得に使用するAsyncClientインスタンス
+            url: リクエスト先のURL
+
+        Raises:
+            PermissionError: robots.txtでクロールが拒否されている場合
+        """
+        if not await self.can_fetch(client, url):
+            raise PermissionError(f"Crawling {url} is not allowed by robots.txt")
+        async with self.delay_limiter(url):
+            pass
+
+    async def _load(self, client: httpx.AsyncClient, origin: str) -> _Entry:
+        guard = RobotGuard(origin, user_agent=self.user_agent)
+        cached = await asyncio.to_thread(self._read_cache, origin)
+        if cached is not None:
+            status, body, fetched_at = cached
+            if fetched_at + self.ttl > self.clock():
+                guard.parse_response(status, body)
+                return _Entry(guard, fetched_at + self.ttl)
+
+        try:
+            resp = await client.get(guard.robots_txt_url, timeout=RobotGuard.FETCH_TIMEOUT_SECONDS)
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to load robots.txt for {origin}: {e!r}")
+            guard.parse_response(503, "")
+            return _Entry(guard, self.clock() + self.error_ttl)
+
+        if resp.status_code >= 500 or resp.status_code == 429:
+            # サーバー側の一時的な障害は通信エラーと同様に扱い、全拒否を1日保存しない
+            logger.warning(f"Failed to load robots.txt for {origin}: HTTP {resp.status_code}")
+            guard.parse_response(resp.status_code, "")
+            return _Entry(guard, self.clock() + self.error_ttl)
+
+        body = resp.text if resp.status_code == 200 else ""
+        guard.parse_response(resp.status_code, body)
+        now = self.clock()
+        await asyncio.to_thread(self._write_cache, origin, resp.status_code, body, now)
+        return _Entry(guard, now + self.ttl)
+
+    def _update_limiter(self, guard: RobotGuard) -> None:
+        """robots.txtのクロール間隔の指定をホストのレートリミッターに反映します。"""
+        host = host_of(guard.base_url)
+        delay = guard.get_crawl_delay()
+        request_rate = guard.parser.request_rate(guard.user_agent)
+        if request_rate is not None and request_rate.requests > 0:
+            self._limiters[host] = AsyncLimiter(request_rate.requests, request_rate.seconds)
+        elif delay:
+            self._limiters[host] = AsyncLimiter(1, float(delay))
+        else:
+            self._limiters.pop(host, None)
+            return
+        logger.debug(f"Applied robots.txt crawl delay for {host}")
+
+    def _read_cache(self, origin: str) -> tuple[int, str, float] | None:
+        if self._conn is None:
+            return None
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT status, body, fetched_at FROM robots_txt WHERE origin = ?", (origin,)
+            ).fetchone()
+        return (row["status"], row["body"], row["fetched_at"]) if row else None
+
+    def _write_cache(self, origin: str, status: int, body: str, fetched_at: float) -> None:
+        if self._conn is None:
+            return
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO robots_txt (origin, status, body, fetched_at)"
+                " VALUES (?, ?, ?, ?)",
+                (origin, status, body, fetched_at),
+            )
+
+
+def _interval_of(guard: RobotGuard) -> float | None:
+    request_rate = guard.parser.request_rate(guard.user_agent)
+    if request_rate is not None and request_rate.requests > 0:
+        return request_rate.seconds / request_rate.requests
+    delay = guard.get_crawl_delay()
+    return float(delay) if delay else None
+
+
+def _origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+_registry: RobotsRegistry | None = None
+
+
+def set_robots_registry(registry: RobotsRegistry | None) -> None:
+    """プロセス全体で使用するRobotsRegistryを登録します（Noneで解除）。"""
+    global _registry
+    _registry = registry
+
+
+def get_robots_registry() -> RobotsRegistry | None:
+    """登録されているRobotsRegistryを返します。未登録の場合はNone。"""
+    return _registry
@@ -0,0 +1,109 @@
+"""サイトマップ(XML)をストリーミングで解析するモジュール。
+
+サイトマップは1ファイルあたり最大5万URL・50MBになるため、DOM全体を構築せず
+`iterparse` で要素を1つずつ処理し、処理済みの要素は破棄してメモリ使用量を一定に保ちます。
+"""
+
+import gzip
+import re
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from typing import IO, Literal, NamedTuple
+
+import defusedxml.ElementTree as ET
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# W3C Datetimeの精度を下げた形式（"YYYY"・"YYYY-MM"）
+_PARTIAL_DATE = re.compile(r"(\d{4})(?:-(\d{2}))?")
+
+
+class SitemapItem(NamedTuple):
+    """サイトマップの1エントリ。
+
+    Attributes:
+        kind: サイトマップインデックスの子サイトマップ("sitemap")か、ページ("url")か
+        loc: URL
+        lastmod: 正規化した最終更新日時(UTCのISO 8601形式)。指定がない・不正な場合はNone
+    """
+
+    kind: Literal["sitemap", "url"]
+    loc: str
+    lastmod: str | None
+
+
+def normalize_lastmod(value: str | None) -> str | None:
+    """W3C Datetime形式の `<lastmod>` をUTCのISO 8601形式に正規化します。
+
+        正規化後の文字列は辞書順の比較で日時の前後を判定できます。年・年月だけの形式
+    （"2024"・"2024-01"）はその期間の先頭（1月1日・1日の0時）とみなします。
+
+        Args:
+            value: `<lastmod>` の値（例: "2024-01-02", "2024-01-02T10:00:00+09:00", "2024-01"）
+
+        Returns:
+            正規化した日時。解析できない場合はNone
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        if match := _PARTIAL_DATE.fullmatch(value):
+            parsed = datetime(int(match[1]), int(match[2] or 1), 1)
+        else:
+            parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC).isoformat()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(source: IO[bytes]) -> Iterator[SitemapItem]:
+    """サイトマップまたはサイトマップインデックスのエントリを順に返します。
+
+    gzip圧縮されたサイトマップ（`sitemap.xml.gz`）は先頭のマジックバイトで判定して展開します。
+
+    Args:
+        source: サイトマップのバイナリストリーム（シーク可能であること）
+
+    Yields:
+        サイトマップのエントリ
+
+    Raises:
+        xml.etree.ElementTree.ParseError: XMLとして不正な場合
+        defusedxml.DefusedXmlException: エンティティ展開などの危険な構造を含む場合
+    """
+    head = source.read(2)
+    source.seek(0)
+    stream: IO[bytes] | gzip.GzipFile = (
+        gzip.GzipFile(fileobj=source, mode="rb") if head == GZIP_MAGIC else source
+    )
+
+    root = None
+    depth = 0
+    loc: str | None = None
+    lastmod: str | None = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        name = _local_name(elem.tag)
+        if depth == 2 and name == "loc":
+            # 拡張（<image:loc> など）の入れ子の要素は無視する
+            loc = (elem.text or "").strip()
+        elif depth == 2 and name == "lastmod":
+            lastmod = normalize_lastmod(elem.text)
+        elif depth == 1 and name in ("url", "sitemap"):
+            if loc:
+                yield SitemapItem("url" if name == "url" else "sitemap", loc, lastmod)
+            loc = lastmod = None
+            # 処理済みの要素を破棄してメモリ使用量を一定に保つ
+            root.clear()
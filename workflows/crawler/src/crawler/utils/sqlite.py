@@ -0,0 +1,52 @@
+"""SQLiteの接続設定を共通化するユーティリティ。"""
+
+import sqlite3
+from collections.abc import Mapping
+from pathlib import Path
+
+# 他プロセスが書き込み中の場合に待機する最大時間(ミリ秒)
+BUSY_TIMEOUT_MS = 5000
+
+
+def connect(path: str | Path, read_only: bool = False) -> sqlite3.Connection:
+    """WALモードを有効にしたSQLite接続を作成します。
+
+    WALモードでは書き込み中でも読み取りがブロックされないため、
+    複数ワーカー・複数プロセスから同じファイルを安全に共有できます。
+    接続は `asyncio.to_thread` 経由で別スレッドから使われる前提のため、
+    `check_same_thread=False` を指定します（排他は呼び出し側で行います）。
+
+    Args:
+        path: SQLiteファイルのパス。":memory:" も指定可能
+        read_only: 読み取り専用で開くかどうか
+
+    Returns:
+        設定済みのsqlite3.Connection
+    """
+    if read_only:
+        uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+    else:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WALではNORMALでもクラッシュ時の整合性は保たれる(直近のコミットのみ失われ得る)
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def add_missing_columns(conn: sqlite3.Connection, table: str, columns: Mapping[str, str]) -> None:
+    """テーブルに存在しない列を追加します（以前のバージョンで作成したファイルの移行用）。
+
+    Args:
+        conn: SQLite接続
+        table: テーブル名
+        columns: 列名をキーとする列の定義（例: `{"attempts": "INTEGER NOT NULL DEFAULT 0"}`）
+    """
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
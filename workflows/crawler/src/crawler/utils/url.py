@@ -0,0 +1,63 @@
+"""URLの正規化を行うモジュール。"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# 同じページを指すURLの重複を避けるため除去するトラッキング用のクエリパラメータ
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "source"})
+TRACKING_PREFIXES = ("utm_",)
+
+
+def _is_tracking(key: str) -> bool:
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def _remove_dot_segments(path: str) -> str:
+    output: list[str] = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(output) > 1:
+                output.pop()
+        elif segment != ".":
+            output.append(segment)
+    if path.endswith(("/.", "/..")):
+        output.append("")
+    return "/".join(output)
+
+
+def canonicalize_url(url: str) -> str:
+    """同じページを指すURLが同じ文字列になるよう正規化します。
+
+    - スキームとホスト名を小文字にし、既定のポート番号を除去
+    - フラグメントとトラッキング用のクエリパラメータ（`utm_*` など）を除去し、残りをキーでソート
+    - パスの `.` / `..` を解決し、空のパスを "/" にする
+
+    Args:
+        url: 正規化するURL
+
+    Returns:
+        正規化したURL
+
+    Raises:
+        ValueError: http(s)の絶対URLでない場合
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        raise ValueError(f"not an absolute http(s) URL: {url!r}")
+
+    netloc = parts.hostname.lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{userinfo}@{netloc}"
+
+    path = _remove_dot_segments(parts.path) or "/"
+    query = urlencode(
+        sorted(
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)
+        )
+    )
+    return urlunsplit((scheme, netloc, path, query, ""))
@@ -0,0 +1,34 @@
+"""固定数のワーカーで要素を処理するワーカープール。
+
+要素ごとにタスクを作成すると、同時に存在するコルーチン（とそのフレーム・クロージャ）の数が要素数に
+比例し、その大半はセマフォやレートリミッターを待つだけになります。ワーカープールでは `num_workers` 個の
+ワーカーが共有のキュー（イテレーター）から要素を順に取り出して処理するため、要素数が増えても
+メモリ使用量とスケジューリングのコストは一定です。
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+
+
+async def run_in_pool[T](
+    items: Iterable[T], handle: Callable[[T], Awaitable[None]], num_workers: int
+) -> None:
+    """要素を `num_workers` 個のワーカーで並行に処理します。
+
+    いずれかの処理で例外が発生した場合は、TaskGroupと同様に他のワーカーをキャンセルして例外を送出します。
+
+    Args:
+        items: 処理する要素
+        handle: 1つの要素を処理するコルーチン関数
+        num_workers: ワーカー数（同時に処理する要素数の上限）
+    """
+    # asyncioのワーカーはnext()の途中で切り替わらないため、イテレーターをそのままキューとして共有できる
+    queue = iter(items)
+
+    async def worker() -> None:
+        for item in queue:
+            await handle(item)
+
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(num_workers):
+            tg.create_task(worker())
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from crawler.configs.plan import BlogPlan, CrawlConfig, PaperPlan, load_config
+
+CONFIG = """
+[crawl]
+user_agent = "TestBot/1.0"
+
+[crawl.rate_limits.dblp]
+max_rate = 2
+
+[crawl.rate_limits."arxiv.org"]
+max_rate = 1
+time_period = 3
+
+[plans.recsys]
+kind = "papers"
+conferences = ["recsys", "kdd"]
+years = [2020, 2022]
+enrichers = ["arxiv", "pdf_link_checker"]
+sinks = ["sqlite"]
+
+[plans.blogs]
+kind = "blogs"
+sites = ["zenn"]
+
+[sites.zenn]
+feed_urls = ["https://zenn.dev/feed"]
+
+[sites.qiita]
+feed_urls = ["https://qiita.com/popular-items/feed"]
+"""
+
+
+def write_config(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / "config.toml"
+    path.write_text(text)
+    return path
+
+
+def test_load_config(tmp_path: Path) -> None:
+    config = load_config(write_config(tmp_path, CONFIG))
+
+    assert config.user_agent == "TestBot/1.0"
+    assert config.rate_limits["dblp"].max_rate == 2
+    assert config.rate_limits["arxiv.org"].time_period == 3
+
+    papers = config.plans["recsys"]
+    assert isinstance(papers, PaperPlan)
+    assert papers.conferences == ["recsys", "kdd"]
+    # 年の範囲は両端を含む
+    assert list(papers.year_range) == [2020, 2021, 2022]
+    assert papers.enrichers == ["arxiv", "pdf_link_checker"]
+    assert papers.sinks == ["sqlite"]
+    # PDFの代替候補を全てのEnricherから集めるため、既定は設定どおりの順序
+    assert papers.enricher_order == "fixed"
+
+    blogs = config.plans["blogs"]
+    assert isinstance(blogs, BlogPlan)
+    assert [site.name for site in config.plan_sites(blogs)] == ["zenn"]
+    # 対象サイトを省略した場合は全てのサイト
+    assert [site.name for site in config.plan_sites(BlogPlan(kind="blogs"))] == ["zenn", "qiita"]
+
+
+def test_select_plans(tmp_path: Path) -> None:
+    config = load_config(write_config(tmp_path, CONFIG))
+
+    assert list(config.select_plans()) == ["recsys", "blogs"]
+    assert list(config.select_plans(["blogs"])) == ["blogs"]
+    with pytest.raises(KeyError, match="unknown"):
+        config.select_plans(["missing"])
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [
+        {"kind": "papers", "years": [2025, 2020]},
+        {"kind": "papers", "years": [2020, 2021], "enrichers": ["google"]},
+        {"kind": "papers", "years": [2020, 2021], "download_pdfs": False},
+        {"kind": "papers", "years": [2020, 2021], "concurrency": 0},
+        {"kind": "blogs", "sites": ["unknown"]},
+        {"kind": "videos"},
+    ],
+)
+def test_invalid_plan(plan: dict[str, object]) -> None:
+    with pytest.raises(ValidationError):
+        CrawlConfig(plans={"plan": plan})  # type: ignore[dict-item]
+
+
+def test_event_loop_has_no_auto_alias() -> None:
+    """イベントループはasyncio・uvloopのどちらかを明示し、既定はasyncioであること"""
+    assert CrawlConfig().event_loop == "asyncio"
+    with pytest.raises(ValidationError):
+        CrawlConfig(event_loop="auto")  # type: ignore[arg-type]
@@ -0,0 +1,61 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+
+class FakeClock:
+    """`clock` 引数に渡す、テストから `now` を進める時計。"""
+
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_pdf(pages: list[str]) -> bytes:
+    """各ページに1行のテキストを持つ最小限のPDFを生成します。"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R"
+            " /Resources << /Font << /F1 3 0 R >> >> >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+@pytest.fixture
+def make_pdf(tmp_path: Path) -> Callable[[str, list[str]], Path]:
+    """テキストを含むPDFファイルを `tmp_path` 配下に作成するファクトリ。"""
+
+    def _make(name: str, pages: list[str]) -> Path:
+        path = tmp_path / name
+        path.write_bytes(build_pdf(pages))
+        return path
+
+    return _make
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """テストごとに新しい `FakeClock`。"""
+    return FakeClock()
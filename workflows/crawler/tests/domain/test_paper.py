@@ -1,7 +1,7 @@
 import pytest
 from pydantic import ValidationError
 
-from crawler.domain.paper import Paper
+from crawler.domain.paper import Paper, normalize_doi, title_hash
 
 
 def test_paper_creation_with_all_fields() -> None:
@@ -257,3 +257,50 @@ def test_paper_inequality() -> None:
     )
 
     assert paper1 != paper2
+
+
+@pytest.mark.parametrize(
+    "doi",
+    [
+        "10.1145/ABC.123",
+        " 10.1145/abc.123 ",
+        "https://doi.org/10.1145/abc.123",
+        "http://dx.doi.org/10.1145/ABC.123",
+        "doi:10.1145/abc.123",
+    ],
+)
+def test_normalize_doi(doi: str) -> None:
+    """表記揺れのあるDOIが同じ値に正規化されることをテスト"""
+    assert normalize_doi(doi) == "10.1145/abc.123"
+
+
+def test_title_hash_ignores_case_and_punctuation() -> None:
+    """大文字小文字や記号の違いを無視してタイトルをハッシュ化することをテスト"""
+    assert title_hash("Attention Is All You Need!") == title_hash("attention is all you need")
+    assert title_hash("Attention Is All You Need") != title_hash("Attention Is Not All You Need")
+
+
+def test_add_pdf_urls_keeps_alternatives() -> None:
+    """既存のpdf_urlは維持され、新しいURLは重複なく代替候補に追加されることをテスト"""
+    paper = Paper(title="T", authors=[], year=2025, venue="RecSys")
+
+    paper.add_pdf_urls(["https://a/1.pdf", None, "https://a/2.pdf"])
+    paper.add_pdf_urls(["https://a/2.pdf", "https://a/1.pdf", "https://a/3.pdf"])
+    assert paper.pdf_url == "https://a/1.pdf"
+    assert paper.pdf_url_candidates == ["https://a/2.pdf", "https://a/3.pdf"]
+
+    paper.add_pdf_urls(["https://a/3.pdf"], overwrite=True)
+    assert paper.pdf_url == "https://a/3.pdf"
+    assert paper.pdf_url_candidates == ["https://a/1.pdf", "https://a/2.pdf"]
+
+
+def test_add_pdf_urls_resets_checked_state() -> None:
+    """新しいリンクでpdf_urlを置き換えると、リンク切れの確認が未実施に戻ることをテスト"""
+    paper = Paper(title="T", authors=[], year=2025, venue="RecSys", pdf_url_checked=True)
+
+    paper.add_pdf_urls([None])
+    assert paper.pdf_url_checked
+
+    paper.add_pdf_urls(["https://a/1.pdf"])
+    assert paper.pdf_url == "https://a/1.pdf"
+    assert not paper.pdf_url_checked
@@ -143,7 +143,12 @@ async def test_arxiv_rate_limit(
         url: str,
         params: dict[str, str] | None = None,
         headers: dict[str, str] | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+        limiter: AsyncLimiter | None = None,
     ) -> httpx.Response:
+        # 本物と同様に、送信の前にリミッターの枠を取得する
+        assert limiter is repo.limiter
+        await limiter.acquire()
         call_times.append(asyncio.get_running_loop().time())
         return httpx.Response(200, text=xml)
 
@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from crawler.repository.carry_over_store import CarryOverStore
+from tests.conftest import FakeClock
+
+
+def test_replace_keeps_first_deferral_order(tmp_path: Path, clock: FakeClock) -> None:
+    store = CarryOverStore(tmp_path / "carry_over.db", clock=clock)
+    try:
+        assert store.load("recsys") == []
+        store.replace("recsys", [("recsys", 2012), ("recsys", 2011)])
+        assert store.load("recsys") == [("recsys", 2012), ("recsys", 2011)]
+
+        # 以前から持ち越している作業単位は、新たに持ち越した作業単位より先に返す
+        clock.now += 10
+        store.replace("recsys", [("kdd", 2024), ("recsys", 2011)])
+        assert store.load("recsys") == [("recsys", 2011), ("kdd", 2024)]
+        assert store.load("other") == []
+
+        store.replace("recsys", [])
+        assert store.load("recsys") == []
+    finally:
+        store.close()
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from crawler.domain.web_page import UrlState
+from crawler.repository.crawl_state_store import CrawlStateStore
+
+SITEMAP = "https://example.com/sitemap.xml"
+
+
+def page(url: str, lastmod: str | None) -> UrlState:
+    return UrlState(url=url, parent=SITEMAP, site="example", lastmod=lastmod)
+
+
+def test_pending_pages_tracks_lastmod(tmp_path: Path) -> None:
+    store = CrawlStateStore(tmp_path / "state.db")
+    store.discover(
+        [page("https://example.com/a", "2024-01-01"), page("https://example.com/b", None)]
+    )
+
+    assert {s.url for s in store.pending_pages(SITEMAP)} == {
+        "https://example.com/a",
+        "https://example.com/b",
+    }
+
+    store.mark_synced(
+        [page("https://example.com/a", "2024-01-01").model_copy(update={"etag": '"v1"'})]
+    )
+    store.mark_synced([page("https://example.com/b", None)])
+    assert store.pending_pages(SITEMAP) == []
+
+    # 再発見しても取得状態は保持され、lastmodが更新されたページだけが返される
+    store.discover(
+        [page("https://example.com/a", "2024-02-01"), page("https://example.com/b", None)]
+    )
+    pending = store.pending_pages(SITEMAP)
+    assert [s.url for s in pending] == ["https://example.com/a"]
+    assert pending[0].etag == '"v1"'
+    assert pending[0].synced_lastmod == "2024-01-01"
+
+    # 取得し直したページは、前回の取得状態を引き継いだままでも取得済みになる
+    store.mark_synced(pending)
+    assert store.pending_pages(SITEMAP) == []
+    store.close()
+
+
+def test_state_is_persisted(tmp_path: Path) -> None:
+    store = CrawlStateStore(tmp_path / "state.db")
+    store.discover([UrlState(url="https://example.com/child.xml", kind="sitemap", parent=SITEMAP)])
+    store.close()
+
+    reopened = CrawlStateStore(tmp_path / "state.db")
+    children = reopened.children(SITEMAP, "sitemap")
+    assert [c.url for c in children] == ["https://example.com/child.xml"]
+    assert reopened.get("https://example.com/missing") is None
+    reopened.close()
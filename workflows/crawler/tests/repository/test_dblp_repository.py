@@ -80,6 +80,24 @@ def test_parse_papers_valid(
     assert papers[1].doi is None
 
 
+def test_parse_page_counts_unparsed_hits(
+    mock_client: httpx.AsyncClient, mock_dblp_response_data: dict[str, Any]
+) -> None:
+    """パースできなかったヒットもページのヒット数に数えること"""
+    mock_dblp_response_data["result"]["hits"]["@total"] = "5"
+    mock_dblp_response_data["result"]["hits"]["@sent"] = "3"
+    mock_dblp_response_data["result"]["hits"]["hit"].append({"info": {"title": "No venue"}})
+    repo = DBLPRepository(mock_client)
+
+    page = repo._parse_page(mock_dblp_response_data, offset=0)
+
+    assert len(page.papers) == 2
+    assert page.hits == 3
+    assert page.total == 5
+    assert page.has_next
+    assert not repo._parse_page(mock_dblp_response_data, offset=2).has_next
+
+
 def test_parse_papers_no_hits(mock_client: httpx.AsyncClient) -> None:
     """ヒットなしの場合のパーステスト"""
     repo = DBLPRepository(mock_client)
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from crawler.domain.enrichment import EnricherStats
+from crawler.repository.enricher_stats_store import EnricherStatsStore
+
+
+def test_add_accumulates_per_enricher_venue_and_year(tmp_path: Path) -> None:
+    store = EnricherStatsStore(tmp_path / "stats.db")
+    try:
+        assert store.load() == []
+        store.add(
+            [
+                EnricherStats(
+                    enricher="ArxivRepository",
+                    venue="RecSys",
+                    year=2024,
+                    papers=10,
+                    requests=20,
+                    seconds=20.0,
+                    filled=4,
+                ),
+                EnricherStats(enricher="ArxivRepository", venue="KDD", year=2024, papers=1),
+            ]
+        )
+        store.add(
+            [
+                EnricherStats(
+                    enricher="ArxivRepository",
+                    venue="RecSys",
+                    year=2024,
+                    papers=5,
+                    requests=10,
+                    seconds=12.0,
+                    filled=4,
+                ),
+            ]
+        )
+        store.add([])
+
+        stats = {(s.venue, s.year): s for s in store.load()}
+        assert stats[("RecSys", 2024)] == EnricherStats(
+            enricher="ArxivRepository",
+            venue="RecSys",
+            year=2024,
+            papers=15,
+            requests=30,
+            seconds=32.0,
+            filled=8,
+        )
+        assert stats[("RecSys", 2024)].fields_per_second == 0.25
+        assert stats[("KDD", 2024)].fields_per_second is None
+    finally:
+        store.close()
@@ -0,0 +1,140 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+
+from crawler.repository.crawl_state_store import CrawlStateStore
+from crawler.repository.feed_repository import FeedRepository
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry
+
+FEED_URL = "https://blog.example.com/feed"
+HOUR = 60 * 60
+
+
+def rss(items: dict[str, str]) -> str:
+    entries = "".join(
+        f"<item><link>https://blog.example.com{path}</link><pubDate>{date}</pubDate></item>"
+        for path, date in items.items()
+    )
+    return f'<rss version="2.0"><channel><title>Blog</title>{entries}</channel></rss>'
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FeedServer:
+    def __init__(self) -> None:
+        self.feed = rss(
+            {
+                "/a": "Mon, 01 Jan 2024 00:00:00 GMT",
+                "/b": "Mon, 01 Jan 2024 02:00:00 GMT",
+                "/c": "Mon, 01 Jan 2024 04:00:00 GMT",
+            }
+        )
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        self.requests.append(request)
+        etag = f'"{hash(self.feed)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, text=self.feed, headers={"ETag": etag})
+
+
+@pytest.fixture
+def semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(5)
+
+
+@pytest.fixture
+def server() -> FeedServer:
+    return FeedServer()
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def repo(tmp_path: Path, server: FeedServer, clock: Clock) -> FeedRepository:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return FeedRepository(
+        client,
+        CrawlStateStore(tmp_path / "state.db"),
+        host_limiters=HostLimiters(default_max_rate=100),
+        robots=RobotsRegistry(),
+        clock=clock,
+    )
+
+
+async def test_poll_returns_new_entries_and_schedules_by_frequency(
+    repo: FeedRepository, server: FeedServer, clock: Clock, semaphore: asyncio.Semaphore
+) -> None:
+    entries = await repo.poll(FEED_URL, semaphore, site="blog")
+
+    assert entries is not None
+    assert sorted(e.url for e in entries) == [
+        "https://blog.example.com/a",
+        "https://blog.example.com/b",
+        "https://blog.example.com/c",
+    ]
+    schedule = repo.state_store.feed_schedule(FEED_URL)
+    assert schedule is not None
+    # 2時間おきに投稿されているフィードは2時間後に再取得する
+    assert schedule.interval == 2 * HOUR
+    assert schedule.next_poll_at == clock.now + 2 * HOUR
+    assert not await repo.is_due(FEED_URL)
+
+    clock.now += 2 * HOUR
+    assert await repo.is_due(FEED_URL)
+
+
+async def test_poll_uses_conditional_get_and_backs_off(
+    repo: FeedRepository, server: FeedServer, clock: Clock, semaphore: asyncio.Semaphore
+) -> None:
+    """変更がなければ304で済ませ、ポーリング間隔を延ばすこと"""
+    entries = await repo.poll(FEED_URL, semaphore)
+    assert entries is not None
+    repo.state_store.mark_synced(
+        repo.state_store.children(FEED_URL, "page"),
+    )
+
+    assert await repo.poll(FEED_URL, semaphore) == []
+    assert server.requests[-1].headers["If-None-Match"]
+    schedule = repo.state_store.feed_schedule(FEED_URL)
+    assert schedule is not None
+    assert schedule.interval == 2 * HOUR * FeedRepository.BACKOFF_FACTOR
+
+    # 記事が追加されると、追加分だけを返す
+    server.feed = rss(
+        {
+            "/b": "Mon, 01 Jan 2024 02:00:00 GMT",
+            "/c": "Mon, 01 Jan 2024 04:00:00 GMT",
+            "/d": "Mon, 01 Jan 2024 05:00:00 GMT",
+        }
+    )
+    entries = await repo.poll(FEED_URL, semaphore)
+    assert entries is not None
+    assert [e.url for e in entries] == ["https://blog.example.com/d"]
+
+
+async def test_poll_failure_keeps_interval(
+    repo: FeedRepository, server: FeedServer, clock: Clock, semaphore: asyncio.Semaphore
+) -> None:
+    server.feed = "<html>maintenance"
+
+    assert await repo.poll(FEED_URL, semaphore) is None
+    schedule = repo.state_store.feed_schedule(FEED_URL)
+    assert schedule is not None
+    assert schedule.etag is None
+    assert schedule.next_poll_at == clock.now + FeedRepository.DEFAULT_INTERVAL_SECONDS
@@ -0,0 +1,163 @@
+from pathlib import Path
+
+import pytest
+
+from crawler.domain.job import JobKind, JobStatus
+from crawler.repository.job_queue import SQLiteJobQueue
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path: Path, clock: FakeClock) -> SQLiteJobQueue:
+    return SQLiteJobQueue(tmp_path / "jobs.db", visibility_timeout=60, max_attempts=2, clock=clock)
+
+
+async def test_enqueue_is_idempotent(queue: SQLiteJobQueue) -> None:
+    """同じキーのジョブは一度しか登録されないこと"""
+    assert await queue.enqueue(JobKind.RETRIEVE, "k1", {"a": 1}) is True
+    assert await queue.enqueue(JobKind.RETRIEVE, "k1", {"a": 2}) is False
+
+    counts = await queue.counts()
+    assert counts[JobStatus.PENDING] == 1
+
+
+async def test_lease_by_priority(queue: SQLiteJobQueue) -> None:
+    """優先度の高いジョブから順にリースされること"""
+    await queue.enqueue(JobKind.RETRIEVE, "low", {}, priority=1)
+    await queue.enqueue(JobKind.RETRIEVE, "high", {}, priority=10)
+
+    jobs = await queue.lease(limit=2)
+
+    assert [j.key for j in jobs] == ["high", "low"]
+    assert all(j.attempts == 1 and j.lease_token for j in jobs)
+    # リース中のジョブは再取得されない
+    assert await queue.lease() == []
+
+
+async def test_lease_filter_by_kind(queue: SQLiteJobQueue) -> None:
+    await queue.enqueue(JobKind.RETRIEVE, "r", {})
+    await queue.enqueue(JobKind.ENRICH, "e", {})
+
+    jobs = await queue.lease(limit=5, kind=JobKind.ENRICH)
+
+    assert [j.key for j in jobs] == ["e"]
+
+
+async def test_unfinished_and_set_priorities(queue: SQLiteJobQueue) -> None:
+    """未完了のジョブをリース順に返し、優先度を変更できること"""
+    await queue.enqueue(JobKind.RETRIEVE, "done", {}, priority=10)
+    await queue.enqueue(JobKind.RETRIEVE, "leased", {}, priority=5)
+    await queue.enqueue(JobKind.RETRIEVE, "pending", {}, priority=1)
+    await queue.enqueue(JobKind.ENRICH, "enrich", {}, priority=20)
+    [done] = await queue.lease(kind=JobKind.RETRIEVE)
+    await queue.complete(done)
+    await queue.lease(kind=JobKind.RETRIEVE)
+
+    assert [j.key for j in await queue.unfinished(JobKind.RETRIEVE)] == ["leased", "pending"]
+    assert await queue.set_priorities({"pending": 100, "done": 100}) == 1
+    assert [j.key for j in await queue.unfinished()] == ["pending", "enrich", "leased"]
+    # 一覧を返すだけでリースはしない
+    [job] = await queue.lease()
+    assert job.key == "pending"
+
+
+async def test_complete(queue: SQLiteJobQueue) -> None:
+    await queue.enqueue(JobKind.RETRIEVE, "k", {"conf": "recsys"})
+    [job] = await queue.lease()
+
+    assert job.payload == {"conf": "recsys"}
+    assert await queue.complete(job) is True
+    counts = await queue.counts()
+    assert counts[JobStatus.DONE] == 1
+
+
+async def test_visibility_timeout_releases_job(queue: SQLiteJobQueue, clock: FakeClock) -> None:
+    """リース期限切れのジョブが再取得でき、古いリースでは完了できないこと"""
+    await queue.enqueue(JobKind.RETRIEVE, "k", {})
+    [stale] = await queue.lease()
+
+    clock.now += 61
+    [job] = await queue.lease()
+
+    assert job.id == stale.id
+    assert job.attempts == 2
+    assert await queue.complete(stale) is False
+    assert await queue.complete(job) is True
+
+
+async def test_extend_lease(queue: SQLiteJobQueue, clock: FakeClock) -> None:
+    await queue.enqueue(JobKind.RETRIEVE, "k", {})
+    [job] = await queue.lease()
+
+    clock.now += 50
+    assert await queue.extend_lease(job) is True
+    clock.now += 50
+
+    assert await queue.lease() == []
+
+
+async def test_fail_retries_with_backoff_then_dead_letters(
+    queue: SQLiteJobQueue, clock: FakeClock
+) -> None:
+    """失敗したジョブはバックオフ後に再実行され、最大試行回数でFAILEDになること"""
+    await queue.enqueue(JobKind.RETRIEVE, "k", {})
+    [job] = await queue.lease()
+
+    assert await queue.fail(job, "boom") == JobStatus.PENDING
+    # バックオフ中は取得できない
+    assert await queue.lease() == []
+
+    clock.now += SQLiteJobQueue.BACKOFF_MAX_SECONDS
+    [job] = await queue.lease()
+    assert job.attempts == 2
+
+    assert await queue.fail(job, "boom") == JobStatus.FAILED
+    clock.now += SQLiteJobQueue.BACKOFF_MAX_SECONDS
+    assert await queue.lease() == []
+    counts = await queue.counts()
+    assert counts[JobStatus.FAILED] == 1
+
+
+async def test_persistence(tmp_path: Path, clock: FakeClock) -> None:
+    """プロセスを跨いでジョブが保持されること"""
+    path = tmp_path / "jobs.db"
+    first = SQLiteJobQueue(path, clock=clock)
+    await first.enqueue(JobKind.RETRIEVE, "k", {"year": 2025})
+    first.close()
+
+    second = SQLiteJobQueue(path, clock=clock)
+    [job] = await second.lease()
+    assert job.payload == {"year": 2025}
+
+
+async def test_done_job_can_be_enqueued_again_after_ttl(tmp_path: Path, clock: FakeClock) -> None:
+    """完了から `done_ttl` を過ぎたジョブは同じキーで再登録できること（実行待ち・失敗は除く）"""
+    queue = SQLiteJobQueue(tmp_path / "jobs.db", done_ttl=100, clock=clock)
+    await queue.enqueue(JobKind.RETRIEVE, "done", {"run": 1})
+    await queue.enqueue(JobKind.RETRIEVE, "pending", {"run": 1}, priority=-1)
+    [job] = await queue.lease()
+    await queue.complete(job)
+
+    # 期限内は無視される
+    clock.now += 50
+    assert await queue.enqueue(JobKind.RETRIEVE, "done", {"run": 2}) is False
+
+    clock.now += 50
+    assert await queue.enqueue(JobKind.RETRIEVE, "done", {"run": 2}) is True
+    assert await queue.enqueue(JobKind.RETRIEVE, "pending", {"run": 2}) is False
+    [job] = await queue.lease()
+    assert job.key == "done"
+    assert job.payload == {"run": 2}
+    assert job.attempts == 1
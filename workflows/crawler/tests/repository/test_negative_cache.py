@@ -0,0 +1,193 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from aiolimiter import AsyncLimiter
+
+from crawler.domain.paper import Paper
+from crawler.repository.arxiv_repository import ArxivRepository
+from crawler.repository.negative_cache import NegativeCache, normalize_identifier
+from crawler.repository.semantic_scholar_repository import SemanticScholarRepository
+from crawler.repository.unpaywall_repository import UnpaywallRepository
+
+DAY = 24 * 60 * 60
+
+EMPTY_FEED = '<feed xmlns="http://www.w3.org/2005/Atom"></feed>'
+ENTRY_FEED = """<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <title>Found Paper</title>
+    <summary>Abstract</summary>
+    <link title="pdf" href="https://arxiv.org/pdf/2401.00001" rel="related"/>
+  </entry>
+</feed>"""
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(10)
+
+
+def test_normalize_identifier() -> None:
+    assert normalize_identifier(" 10.1145/ABC ") == "10.1145/abc"
+    assert (
+        normalize_identifier('ti:"Deep  Learning\nfor RecSys"') == 'ti:"deep learning for recsys"'
+    )
+
+
+async def test_misses_expire_with_decaying_ttl(tmp_path: Path) -> None:
+    clock = Clock()
+    cache = NegativeCache(tmp_path / "negative.db", ttl=DAY, max_ttl=3 * DAY, clock=clock)
+    try:
+        lookup = await cache.lookup("unpaywall", ["10.1/A"])
+        assert not lookup.known
+        lookup.add_miss("10.1/A")
+        await cache.update(lookup)
+
+        # 大文字・小文字の違いは同じ識別子として扱う
+        assert (await cache.lookup("unpaywall", ["10.1/a"])).is_known("10.1/A")
+        assert not (await cache.lookup("arxiv", ["10.1/a"])).known
+
+        clock.now += DAY
+        lookup = await cache.lookup("unpaywall", ["10.1/A"])
+        assert not lookup.known
+        lookup.add_miss("10.1/A")
+        await cache.update(lookup)
+
+        # 2回目のミスはTTLが2倍になる
+        clock.now += 1.5 * DAY
+        assert (await cache.lookup("unpaywall", ["10.1/A"])).known
+        clock.now += DAY
+        assert not (await cache.lookup("unpaywall", ["10.1/A"])).known
+
+        assert cache.ttl_for(1) == DAY
+        assert cache.ttl_for(2) == 2 * DAY
+        assert cache.ttl_for(10) == 3 * DAY
+    finally:
+        cache.close()
+
+
+async def test_hit_resets_misses(tmp_path: Path) -> None:
+    clock = Clock()
+    cache = NegativeCache(tmp_path / "negative.db", ttl=DAY, clock=clock)
+    try:
+        for _ in range(3):
+            lookup = await cache.lookup("arxiv", ["doi:10.1/a"])
+            lookup.add_miss("doi:10.1/a")
+            await cache.update(lookup)
+            clock.now += 10 * DAY
+
+        lookup = await cache.lookup("arxiv", ["doi:10.1/a"])
+        lookup.add_hit("doi:10.1/a")
+        await cache.update(lookup)
+
+        lookup = await cache.lookup("arxiv", ["doi:10.1/a"])
+        lookup.add_miss("doi:10.1/a")
+        await cache.update(lookup)
+        clock.now += 1.5 * DAY
+        assert not (await cache.lookup("arxiv", ["doi:10.1/a"])).known
+    finally:
+        cache.close()
+
+
+async def test_unpaywall_skips_known_404(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404)
+        return httpx.Response(
+            200, json={"doi": "10.1/found", "best_oa_location": {"url_for_pdf": "https://a/p.pdf"}}
+        )
+
+    cache = NegativeCache(tmp_path / "negative.db")
+    papers = [
+        Paper(title="A", authors=[], year=2024, venue="RecSys", doi="10.1/missing"),
+        Paper(title="B", authors=[], year=2024, venue="RecSys", doi="10.1/found"),
+    ]
+    try:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            repo = UnpaywallRepository(client, AsyncLimiter(100, 1), negative_cache=cache)
+            await repo.enrich_papers(papers, semaphore)
+            assert len(requested) == 2
+
+            requested.clear()
+            await repo.enrich_papers(papers, semaphore)
+            assert requested == ["/v2/10.1/found"]
+        assert papers[1].pdf_url == "https://a/p.pdf"
+    finally:
+        cache.close()
+
+
+async def test_arxiv_skips_known_doi_and_title_queries(
+    tmp_path: Path, semaphore: asyncio.Semaphore
+) -> None:
+    queries: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = request.url.params["search_query"]
+        queries.append(query)
+        return httpx.Response(200, text=ENTRY_FEED if query == 'ti:"Found Paper"' else EMPTY_FEED)
+
+    cache = NegativeCache(tmp_path / "negative.db")
+    papers = [
+        Paper(title="Missing Paper", authors=[], year=2024, venue="RecSys", doi="10.1/missing"),
+        Paper(title="Found Paper", authors=[], year=2024, venue="RecSys", doi="10.1/found"),
+    ]
+    try:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            repo = ArxivRepository(client, AsyncLimiter(100, 1), negative_cache=cache)
+            await repo.enrich_papers(papers, semaphore)
+            assert len(queries) == 4
+
+            # 0件だったDOI検索はスキップし、タイトルで見つかる論文のタイトル検索だけを送る
+            queries.clear()
+            await repo.enrich_papers(papers, semaphore)
+            assert queries == ['ti:"Found Paper"']
+        assert papers[1].pdf_url == "https://arxiv.org/pdf/2401.00001"
+    finally:
+        cache.close()
+
+
+async def test_semantic_scholar_excludes_null_items_from_batches(
+    tmp_path: Path, semaphore: asyncio.Semaphore
+) -> None:
+    batches: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)["ids"]
+        batches.append(payload)
+        return httpx.Response(
+            200,
+            json=[
+                {"externalIds": {"DOI": "10.1/found"}, "abstract": "Abstract"}
+                if i == "DOI:10.1/found"
+                else None
+                for i in payload
+            ],
+        )
+
+    cache = NegativeCache(tmp_path / "negative.db")
+    papers = [
+        Paper(title="A", authors=[], year=2024, venue="RecSys", doi="10.1/missing"),
+        Paper(title="B", authors=[], year=2024, venue="RecSys", doi="10.1/found"),
+    ]
+    try:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            repo = SemanticScholarRepository(client, AsyncLimiter(100, 1), negative_cache=cache)
+            await repo.enrich_papers(papers, semaphore)
+            await repo.enrich_papers(papers, semaphore)
+        assert batches == [["DOI:10.1/missing", "DOI:10.1/found"], ["DOI:10.1/found"]]
+        assert papers[1].abstract == "Abstract"
+    finally:
+        cache.close()
@@ -0,0 +1,281 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from crawler.domain.article import Article
+from crawler.domain.paper import Paper
+from crawler.domain.pdf import PdfText
+from crawler.repository.paper_store import PaperStore, PaperStoreWriteError
+
+
+def make_paper(i: int, **kwargs: object) -> Paper:
+    data: dict[str, object] = {
+        "title": f"Paper {i}",
+        "authors": ["Author A", "著者B"],
+        "year": 2024,
+        "venue": "RecSys",
+        "doi": f"10.1145/TEST.{i}",
+    }
+    data.update(kwargs)
+    return Paper(**data)  # type: ignore[arg-type]
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    return tmp_path / "papers.db"
+
+
+async def test_write_and_read(db_path: Path) -> None:
+    """書き込んだ論文が正規化DOIで取得できること"""
+    async with PaperStore(db_path) as store:
+        await store.write_papers([make_paper(1, abstract="abs"), make_paper(2, year=2025)])
+        await store.flush()
+
+        paper = await store.get("https://doi.org/10.1145/test.1")
+        assert paper is not None
+        assert paper.title == "Paper 1"
+        assert paper.authors == ["Author A", "著者B"]
+        assert paper.abstract == "abs"
+        assert paper.doi == "10.1145/test.1"
+
+        assert [p.title for p in await store.find_by_venue_year("RecSys", 2025)] == ["Paper 2"]
+        assert [p.title for p in await store.find_by_year(2025)] == ["Paper 2"]
+        assert [p.title for p in await store.find_by_title("paper  1")] == ["Paper 1"]
+        assert await store.count() == 2
+
+
+async def test_upsert_does_not_clobber_with_none(db_path: Path) -> None:
+    """再書き込み時、既存のオプションフィールドがNoneで上書きされないこと"""
+    async with PaperStore(db_path) as store:
+        await store.write_papers([make_paper(1, abstract="abs")])
+        await store.flush()
+        await store.write_papers([make_paper(1, title="Renamed", pdf_url="https://x/1.pdf")])
+        await store.flush()
+
+        paper = await store.get("10.1145/test.1")
+        assert paper is not None
+        assert paper.title == "Renamed"
+        assert paper.abstract == "abs"
+        assert paper.pdf_url == "https://x/1.pdf"
+        assert await store.count() == 1
+
+
+async def test_checked_dead_pdf_url_is_not_restored(db_path: Path) -> None:
+    """リンク切れを確認してNoneにしたPDFリンクが、保存済みのリンクで補われないこと"""
+    async with PaperStore(db_path) as store:
+        await store.write_papers(
+            [
+                make_paper(
+                    1,
+                    pdf_url="https://x/dead.pdf",
+                    pdf_url_candidates=["https://y/dead.pdf"],
+                )
+            ]
+        )
+        await store.flush()
+        saved = await store.get("10.1145/test.1")
+        assert saved is not None
+        assert saved.pdf_url_candidates == ["https://y/dead.pdf"]
+        assert not saved.pdf_url_checked
+
+        await store.write_papers([make_paper(1, pdf_url_checked=True)])
+        await store.flush()
+        paper = await store.get("10.1145/test.1")
+        assert paper is not None
+        assert paper.pdf_url is None
+        assert paper.pdf_url_candidates == []
+        assert paper.pdf_url_checked
+
+        # リンク切れを確認しない書き込みは確認結果を消さない
+        await store.write_papers([make_paper(1, title="Renamed")])
+        await store.flush()
+        paper = await store.get("10.1145/test.1")
+        assert paper is not None
+        assert paper.pdf_url is None
+        assert paper.pdf_url_checked
+
+        # 確認していない新しいリンクは未確認として保存する
+        await store.write_papers([make_paper(1, pdf_url="https://z/new.pdf")])
+        await store.flush()
+        paper = await store.get("10.1145/test.1")
+        assert paper is not None
+        assert paper.pdf_url == "https://z/new.pdf"
+        assert not paper.pdf_url_checked
+
+
+async def test_opens_store_without_pdf_url_columns(db_path: Path) -> None:
+    """PDFリンクの候補・確認状態の列がない既存のファイルを移行して開けること"""
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE papers (doi TEXT PRIMARY KEY, title TEXT NOT NULL, "
+        "title_hash TEXT NOT NULL, authors TEXT NOT NULL, year INTEGER NOT NULL, "
+        "venue TEXT NOT NULL, type TEXT, ee TEXT, pdf_url TEXT, abstract TEXT, "
+        "updated_at REAL NOT NULL) WITHOUT ROWID"
+    )
+    conn.execute(
+        "INSERT INTO papers VALUES ('10.1145/test.1', 'Paper 1', 'h', '[]', 2024, 'RecSys', "
+        "NULL, NULL, 'https://x/1.pdf', NULL, 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    async with PaperStore(db_path) as store:
+        paper = await store.get("10.1145/test.1")
+
+    assert paper is not None
+    assert paper.pdf_url == "https://x/1.pdf"
+    assert paper.pdf_url_candidates == []
+    assert not paper.pdf_url_checked
+
+
+async def test_group_commit_batches_writes(db_path: Path) -> None:
+    """キューに溜まった論文がmax_batch_size件ずつまとめてコミットされること"""
+    store = PaperStore(db_path, max_batch_size=100)
+    batches: list[int] = []
+    original = store._upsert
+
+    def spy(batch: list[Paper | PdfText | Article]) -> None:
+        batches.append(len(batch))
+        original(batch)
+
+    store._upsert = spy  # type: ignore[method-assign]
+    # ライター起動前にキューへ積むことで、まとめて取り出されることを確認する
+    for i in range(250):
+        store._queue.put_nowait(make_paper(i))
+    store.start()
+    await store.close()
+
+    assert batches == [100, 100, 50]
+
+
+async def test_skips_papers_without_doi(db_path: Path) -> None:
+    async with PaperStore(db_path) as store:
+        await store.write_papers([make_paper(1, doi=None)])
+        await store.flush()
+        assert await store.count() == 0
+
+
+async def test_existing_dois(db_path: Path) -> None:
+    async with PaperStore(db_path) as store:
+        await store.write_papers([make_paper(i) for i in range(3)])
+        await store.flush()
+
+        found = await store.existing_dois(["10.1145/TEST.0", "doi:10.1145/test.2", "10.1/none"])
+        assert found == {"10.1145/test.0", "10.1145/test.2"}
+
+
+async def test_get_many(db_path: Path) -> None:
+    async with PaperStore(db_path) as store:
+        await store.write_papers([make_paper(i, abstract=f"abstract {i}") for i in range(3)])
+        await store.flush()
+
+        found = await store.get_many(["10.1145/TEST.1", "10.1/none"])
+        assert list(found) == ["10.1145/test.1"]
+        assert found["10.1145/test.1"].abstract == "abstract 1"
+
+
+async def test_indexes_and_wal(db_path: Path) -> None:
+    async with PaperStore(db_path):
+        pass
+
+    conn = sqlite3.connect(db_path)
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(papers)")}
+    assert {"idx_papers_venue_year", "idx_papers_title_hash"} <= indexes
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+async def test_read_only_reader(db_path: Path) -> None:
+    """参照専用のストアが書き込み中のストアと並行して読み取れること"""
+    async with PaperStore(db_path) as writer:
+        await writer.write_papers([make_paper(1)])
+        await writer.flush()
+
+        async with PaperStore(db_path, read_only=True) as reader:
+            assert await reader.count() == 1
+            with pytest.raises(RuntimeError):
+                await reader.write_papers([make_paper(2)])
+
+
+async def test_pdf_texts(db_path: Path) -> None:
+    """PDFのテキストがSHA-256で保存され、DOIから参照できること"""
+    async with PaperStore(db_path) as store:
+        await store.write_pdf_texts(
+            [
+                PdfText(sha256="aaa", text="p1\np2", page_offsets=[0, 3], dois=["10.1/X"]),
+                PdfText(sha256="bbb", error="timed out", dois=["10.1/y"]),
+            ]
+        )
+        await store.flush()
+
+        assert await store.processed_pdf_hashes(["aaa", "bbb", "ccc"]) == {"aaa", "bbb"}
+        text = await store.get_paper_text("https://doi.org/10.1/x")
+        assert text is not None
+        assert text.sha256 == "aaa"
+        assert text.page(1) == "p2"
+        assert text.dois == ["10.1/x"]
+        assert await store.get_paper_text("10.1/z") is None
+
+
+async def test_write_and_get_article(tmp_path: Path) -> None:
+    article = Article(
+        url="https://blog.example.com/a",
+        content_hash="abc",
+        site="blog",
+        title="記事",
+        text="本文",
+        code_blocks=["print(1)"],
+    )
+    async with PaperStore(tmp_path / "papers.db") as store:
+        await store.write_articles([article])
+        await store.flush()
+
+        assert await store.get_article(article.url) == article
+        assert await store.article_hashes([article.url, "https://blog.example.com/b"]) == {
+            article.url: "abc"
+        }
+
+
+async def test_locked_database_is_retried(db_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch.object(PaperStore, "RETRY_DELAY_SECONDS", 0.0)
+    async with PaperStore(db_path) as store:
+        upsert = store._upsert
+        calls = 0
+
+        def locked_once(batch: list[Paper | PdfText | Article]) -> None:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise sqlite3.OperationalError("database is locked")
+            upsert(batch)
+
+        mocker.patch.object(store, "_upsert", side_effect=locked_once)
+        await store.write_papers([make_paper(0)])
+        await store.flush()
+
+        assert calls == 2
+        assert await store.count() == 1
+
+
+async def test_write_failure_is_raised_from_flush(db_path: Path, mocker: MockerFixture) -> None:
+    """書き込めなかったバッチはflushで送出し、ライタータスクは次のバッチの書き込みを続けること"""
+    async with PaperStore(db_path) as store:
+        upsert = store._upsert
+        calls = 0
+
+        def failing_upsert(batch: list[Paper | PdfText | Article]) -> None:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ValueError("broken record")
+            upsert(batch)
+
+        mocker.patch.object(store, "_upsert", side_effect=failing_upsert)
+        await store.write_papers([make_paper(0)])
+        with pytest.raises(PaperStoreWriteError, match="broken record"):
+            await store.flush()
+
+        await store.write_papers([make_paper(1)])
+        await store.flush()
+        assert await store.count() == 1
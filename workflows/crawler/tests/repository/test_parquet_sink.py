@@ -0,0 +1,109 @@
+import os
+import time
+from pathlib import Path
+
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from crawler.domain.paper import Paper
+from crawler.repository.parquet_sink import ParquetPaperSink, open_paper_dataset
+
+
+def make_papers(n: int, venue: str = "RecSys", year: int = 2024) -> list[Paper]:
+    return [
+        Paper(
+            title=f"{venue} {year} #{i}",
+            authors=["Author A", "Author B"],
+            year=year,
+            venue=venue,
+            doi=f"10.1145/{year}.{i}",
+            type="Conference and Workshop Papers",
+        )
+        for i in range(n)
+    ]
+
+
+async def test_write_partitioned_dataset(tmp_path: Path) -> None:
+    """venue・yearでパーティション分割されたデータセットが書き込まれること"""
+    async with ParquetPaperSink(tmp_path) as sink:
+        await sink.write_papers(make_papers(3, "RecSys", 2024))
+        await sink.write_papers(make_papers(2, "ACM Trans. Recomm. Syst.", 2025))
+
+    files = sorted(p.relative_to(tmp_path).parent.as_posix() for p in tmp_path.rglob("*.parquet"))
+    assert files == ["venue=ACM%20Trans.%20Recomm.%20Syst./year=2025", "venue=RecSys/year=2024"]
+    # 一時ファイルは残らない
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    dataset = open_paper_dataset(tmp_path)
+    table = dataset.to_table(filter=ds.field("year") == 2025)
+    assert table.num_rows == 2
+    assert set(table.column("venue").to_pylist()) == {"ACM Trans. Recomm. Syst."}
+
+    rows = dataset.to_table(filter=ds.field("venue") == "RecSys").to_pylist()
+    assert Paper(**rows[0]) in make_papers(3, "RecSys", 2024)
+
+
+async def test_row_groups_and_dictionary_encoding(tmp_path: Path) -> None:
+    """row_group_size件ごとにRow Groupが作られ、辞書エンコーディングが使われること"""
+    async with ParquetPaperSink(tmp_path, row_group_size=2) as sink:
+        await sink.write_papers(make_papers(3))
+        # バッファ済みの1件と合わせてRow Groupが埋まる
+        await sink.write_papers(make_papers(1))
+
+    [path] = tmp_path.rglob("*.parquet")
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_rows == 4
+    assert metadata.num_row_groups == 2
+
+    columns = {
+        metadata.row_group(0).column(i).path_in_schema: metadata.row_group(0).column(i)
+        for i in range(metadata.num_columns)
+    }
+    for name in ("venue", "type", "authors.list.element"):
+        assert "RLE_DICTIONARY" in columns[name].encodings
+    assert "RLE_DICTIONARY" not in columns["title"].encodings
+
+
+async def test_rerun_overwrites_partition(tmp_path: Path) -> None:
+    """再実行時は同じパーティションの過去のファイルが置き換えられること"""
+    async with ParquetPaperSink(tmp_path) as sink:
+        await sink.write_papers(make_papers(3))
+    async with ParquetPaperSink(tmp_path) as sink:
+        await sink.write_papers(make_papers(2))
+
+    assert len(list(tmp_path.rglob("*.parquet"))) == 1
+    assert open_paper_dataset(tmp_path).count_rows() == 2
+
+
+async def test_append_mode_keeps_previous_files(tmp_path: Path) -> None:
+    async with ParquetPaperSink(tmp_path) as sink:
+        await sink.write_papers(make_papers(3))
+    async with ParquetPaperSink(tmp_path, overwrite_partitions=False) as sink:
+        await sink.write_papers(make_papers(2))
+
+    assert open_paper_dataset(tmp_path).count_rows() == 5
+
+
+async def test_close_without_writes(tmp_path: Path) -> None:
+    sink = ParquetPaperSink(tmp_path / "papers")
+    await sink.close()
+
+    assert not (tmp_path / "papers").exists()
+
+
+async def test_stale_tmp_files_are_removed_on_start(tmp_path: Path) -> None:
+    """異常終了した実行の一時ファイルを開始時に削除し、更新中の可能性があるものは残すこと"""
+    partition = tmp_path / "venue=RecSys" / "year=2024"
+    partition.mkdir(parents=True)
+    stale = partition / ".part-crashed.parquet.tmp"
+    recent = partition / ".part-running.parquet.tmp"
+    stale.write_bytes(b"partial")
+    recent.write_bytes(b"partial")
+    old = time.time() - ParquetPaperSink.STALE_TMP_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    async with ParquetPaperSink(tmp_path):
+        pass
+
+    assert not stale.exists()
+    assert recent.exists()
@@ -0,0 +1,204 @@
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+
+import httpx
+import pytest
+
+from crawler.domain.paper import Paper
+from crawler.repository.pdf_link_checker import PdfLinkChecker
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry
+
+Handler = Callable[[httpx.Request], httpx.Response]
+
+PDF_HEADERS = {"Content-Type": "application/pdf"}
+
+
+@pytest.fixture
+def semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(5)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_checker(tmp_path: Path, handler: Handler, clock: Clock | None = None) -> PdfLinkChecker:
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(200, text="User-agent: *\nDisallow: /private/\n")
+        return handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    return PdfLinkChecker(
+        client,
+        tmp_path / "links.db",
+        host_limiters=HostLimiters(default_max_rate=100),
+        clock=clock or Clock(),
+        robots=RobotsRegistry(),
+    )
+
+
+def make_paper(pdf_url: str | None, candidates: list[str] | None = None) -> Paper:
+    return Paper(
+        title="T",
+        authors=[],
+        year=2024,
+        venue="RecSys",
+        doi="10.1/x",
+        pdf_url=pdf_url,
+        pdf_url_candidates=candidates or [],
+    )
+
+
+async def test_head_and_range_probe(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    """HEADで判定できない場合は先頭のRange GETでマジックバイトを確認すること"""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        match request.url.path:
+            case "/head-ok.pdf":
+                return httpx.Response(200, headers=PDF_HEADERS)
+            case "/no-head.pdf":
+                if request.method == "HEAD":
+                    return httpx.Response(405)
+                return httpx.Response(206, content=b"%PDF-1.7\n", headers=PDF_HEADERS)
+            case "/landing.pdf":
+                return httpx.Response(200, text="<html></html>")
+            case _:
+                return httpx.Response(404)
+
+    checker = make_checker(tmp_path, handler)
+    results = await checker.check_urls(
+        [
+            "https://a.example/head-ok.pdf",
+            "https://a.example/no-head.pdf",
+            "https://a.example/landing.pdf",
+            "https://a.example/gone.pdf",
+        ],
+        semaphore,
+    )
+
+    assert results == {
+        "https://a.example/head-ok.pdf": True,
+        "https://a.example/no-head.pdf": True,
+        "https://a.example/landing.pdf": False,
+        "https://a.example/gone.pdf": False,
+    }
+    range_requests = [r for r in requests if r.method == "GET"]
+    assert {r.url.path for r in range_requests} == {"/no-head.pdf", "/landing.pdf"}
+    assert all(r.headers["Range"] == "bytes=0-1023" for r in range_requests)
+
+
+async def test_results_are_cached_with_ttl(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    """確認結果がキャッシュされ、TTLを過ぎると再確認されること"""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(404)
+
+    clock = Clock()
+    checker = make_checker(tmp_path, handler, clock)
+    url = "https://a.example/gone.pdf"
+
+    assert await checker.is_alive(url, semaphore) is False
+    assert await checker.is_alive(url, semaphore) is False
+    assert calls == 1
+
+    clock.now += PdfLinkChecker.DEFAULT_DEAD_TTL_SECONDS + 1
+    assert await checker.is_alive(url, semaphore) is False
+    assert calls == 2
+
+
+async def test_network_errors_are_not_cached(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        raise httpx.ConnectError("refused")
+
+    checker = make_checker(tmp_path, handler)
+
+    assert await checker.is_alive("https://a.example/a.pdf", semaphore) is None
+    assert await checker.is_alive("https://a.example/a.pdf", semaphore) is None
+    assert calls == 2
+
+
+async def test_respects_robots_txt(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, headers=PDF_HEADERS)
+
+    checker = make_checker(tmp_path, handler)
+
+    assert await checker.is_alive("https://a.example/private/a.pdf", semaphore) is None
+    assert requests == []
+
+
+async def test_enrich_falls_back_to_candidates(
+    tmp_path: Path, semaphore: asyncio.Semaphore
+) -> None:
+    """pdf_urlがリンク切れの場合、有効な代替候補に置き換えられること"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "alive.example":
+            return httpx.Response(200, headers=PDF_HEADERS)
+        return httpx.Response(404)
+
+    checker = make_checker(tmp_path, handler)
+    ok = make_paper("https://alive.example/1.pdf")
+    fallback = make_paper(
+        "https://dead.example/2.pdf",
+        [
+            "https://dead.example/3.pdf",
+            "https://alive.example/4.pdf",
+            "https://alive.example/5.pdf",
+        ],
+    )
+    dead = make_paper("https://dead.example/6.pdf")
+    no_pdf = make_paper(None)
+
+    await checker.enrich_papers([ok, fallback, dead, no_pdf], semaphore)
+
+    assert ok.pdf_url == "https://alive.example/1.pdf"
+    assert fallback.pdf_url == "https://alive.example/4.pdf"
+    assert fallback.pdf_url_candidates == ["https://alive.example/5.pdf"]
+    assert dead.pdf_url is None
+    assert no_pdf.pdf_url is None
+    assert ok.pdf_url_checked and fallback.pdf_url_checked and dead.pdf_url_checked
+    assert not no_pdf.pdf_url_checked
+
+
+@pytest.mark.parametrize("status", [403, 429, 503])
+async def test_transient_statuses_are_unknown(
+    tmp_path: Path, semaphore: asyncio.Semaphore, status: int
+) -> None:
+    """403・429・5xxはリンク切れとせず、キャッシュせずに既存のpdf_urlを残すこと"""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(status)
+
+    checker = make_checker(tmp_path, handler)
+    paper = make_paper("https://a.example/1.pdf", ["https://a.example/2.pdf"])
+
+    await checker.enrich_papers([paper], semaphore)
+    assert paper.pdf_url == "https://a.example/1.pdf"
+    assert paper.pdf_url_candidates == ["https://a.example/2.pdf"]
+
+    # HEADとRange GETの2リクエストで、結果はキャッシュされない
+    assert await checker.is_alive("https://a.example/1.pdf", semaphore) is None
+    assert calls == 4
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from crawler.repository.pdf_repository import PdfRepository
+
+PDF_BODY = b"%PDF-1.7\n" + b"x" * 200_000 + b"\n%%EOF"
+
+Handler = Callable[[httpx.Request], httpx.Response]
+
+
+class FailingStream(httpx.AsyncByteStream):
+    """途中まで送信した後に切断されるレスポンスボディ。"""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self.data
+        raise httpx.ReadError("connection reset")
+
+
+@pytest.fixture
+def semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(5)
+
+
+def make_repo(
+    tmp_path: Path, handler: Handler, max_bytes: int = PdfRepository.DEFAULT_MAX_BYTES
+) -> PdfRepository:
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(200, text="User-agent: *\nDisallow: /private/\n")
+        return handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    return PdfRepository(client, tmp_path / "pdfs", max_bytes=max_bytes)
+
+
+def pdf_response(body: bytes = PDF_BODY, **headers: str) -> httpx.Response:
+    return httpx.Response(
+        200, content=body, headers={"Content-Type": "application/pdf", "ETag": '"v1"', **headers}
+    )
+
+
+async def test_download_and_cache(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    """PDFがSHA-256のパスに保存され、2回目はリクエストせずに返ること"""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return pdf_response()
+
+    repo = make_repo(tmp_path, handler)
+    pdf = await repo.download("https://example.com/a.pdf", semaphore)
+
+    digest = hashlib.sha256(PDF_BODY).hexdigest()
+    assert pdf is not None
+    assert pdf.sha256 == digest
+    assert pdf.path == tmp_path / "pdfs" / "objects" / digest[:2] / f"{digest}.pdf"
+    assert pdf.path.read_bytes() == PDF_BODY
+    assert pdf.downloaded_bytes == len(PDF_BODY)
+    assert repo.throughput_mb_per_s > 0
+
+    cached = await repo.download("https://example.com/a.pdf", semaphore)
+    assert cached is not None
+    assert cached.sha256 == digest
+    assert cached.downloaded_bytes == 0
+    assert len(requests) == 1
+
+
+async def test_same_content_is_stored_once(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    repo = make_repo(tmp_path, lambda _: pdf_response())
+
+    a = await repo.download("https://example.com/a.pdf", semaphore)
+    b = await repo.download("https://mirror.example.org/b.pdf", semaphore)
+
+    assert a is not None and b is not None
+    assert a.path == b.path
+    assert len(list((tmp_path / "pdfs" / "objects").rglob("*.pdf"))) == 1
+    assert not list((tmp_path / "pdfs" / "partial").iterdir())
+
+
+async def test_resume_with_range_request(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    """切断された場合、取得済みの続きからRangeリクエストで再開すること"""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "application/pdf", "ETag": '"v1"'},
+                stream=FailingStream(PDF_BODY[: PdfRepository.CHUNK_SIZE * 2]),
+            )
+        start = int(request.headers["Range"].removeprefix("bytes=").rstrip("-"))
+        return httpx.Response(
+            206,
+            content=PDF_BODY[start:],
+            headers={
+                "Content-Type": "application/pdf",
+                "Content-Range": f"bytes {start}-{len(PDF_BODY) - 1}/{len(PDF_BODY)}",
+            },
+        )
+
+    repo = make_repo(tmp_path, handler)
+    pdf = await repo.download("https://example.com/a.pdf", semaphore)
+
+    assert pdf is not None
+    assert pdf.sha256 == hashlib.sha256(PDF_BODY).hexdigest()
+    assert pdf.path.read_bytes() == PDF_BODY
+    assert requests[1].headers["Range"] == f"bytes={PdfRepository.CHUNK_SIZE * 2}-"
+    assert requests[1].headers["If-Range"] == '"v1"'
+    # 2回目に転送したのは残りの部分のみ
+    assert pdf.downloaded_bytes == len(PDF_BODY) - PdfRepository.CHUNK_SIZE * 2
+
+
+async def test_restart_when_range_ignored(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    """サーバーがRangeを無視して200を返した場合は最初から取得し直すこと"""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "application/pdf", "ETag": '"v1"'},
+                stream=FailingStream(PDF_BODY[:1000]),
+            )
+        return pdf_response()
+
+    repo = make_repo(tmp_path, handler)
+    pdf = await repo.download("https://example.com/a.pdf", semaphore)
+
+    assert pdf is not None
+    assert pdf.path.read_bytes() == PDF_BODY
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, text="<html></html>", headers={"Content-Type": "text/html"}),
+        httpx.Response(
+            200, content=b"<html></html>", headers={"Content-Type": "application/octet-stream"}
+        ),
+        httpx.Response(404),
+    ],
+)
+async def test_rejects_non_pdf(
+    tmp_path: Path, semaphore: asyncio.Semaphore, response: httpx.Response
+) -> None:
+    repo = make_repo(tmp_path, lambda _: response)
+
+    assert await repo.download("https://example.com/a.pdf", semaphore) is None
+    assert not list((tmp_path / "pdfs" / "partial").iterdir())
+
+
+async def test_rejects_too_large(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    repo = make_repo(tmp_path, lambda _: pdf_response(), max_bytes=1000)
+
+    assert await repo.download("https://example.com/a.pdf", semaphore) is None
+    assert not list((tmp_path / "pdfs" / "partial").iterdir())
+
+
+async def test_respects_robots_txt(tmp_path: Path, semaphore: asyncio.Semaphore) -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return pdf_response()
+
+    repo = make_repo(tmp_path, handler)
+
+    assert await repo.download("https://example.com/private/a.pdf", semaphore) is None
+    assert requests == []
+
+
+@pytest.mark.parametrize("url", ["https://[::1/a.pdf", "https://exa\x00mple.com/a.pdf"])
+async def test_invalid_url_returns_none(
+    tmp_path: Path, semaphore: asyncio.Semaphore, url: str
+) -> None:
+    """不正なURLは例外を送出せず、その論文だけNoneを返すこと"""
+    repo = make_repo(tmp_path, lambda _: pdf_response())
+
+    assert await repo.download(url, semaphore) is None
+    assert await repo.download("https://example.com/a.pdf", semaphore) is not None
+
+
+async def test_corrupt_partial_meta_is_discarded(
+    tmp_path: Path, semaphore: asyncio.Semaphore
+) -> None:
+    """部分ファイルのメタデータが壊れている場合はNoneを返し、次の試行で最初から取得すること"""
+    url = "https://example.com/a.pdf"
+    repo = make_repo(tmp_path, lambda _: pdf_response())
+    partial = repo._partial_path(url)
+    partial.write_bytes(PDF_BODY[:100])
+    partial.with_suffix(".json").write_text("{broken")
+
+    assert await repo.download(url, semaphore) is None
+    assert not partial.exists()
+
+    pdf = await repo.download(url, semaphore)
+    assert pdf is not None
+    assert pdf.path.read_bytes() == PDF_BODY
+
+
+async def test_disk_error_returns_none(
+    tmp_path: Path, semaphore: asyncio.Semaphore, mocker: MockerFixture
+) -> None:
+    """保存先への書き込みに失敗した場合は例外を送出せず、Noneを返すこと"""
+    repo = make_repo(tmp_path, lambda _: pdf_response())
+    mocker.patch.object(repo, "_commit", side_effect=OSError(28, "No space left on device"))
+
+    assert await repo.download("https://example.com/a.pdf", semaphore) is None
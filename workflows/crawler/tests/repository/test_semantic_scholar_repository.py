@@ -1,8 +1,10 @@
 import asyncio
+import json
 from typing import Any
 
 import httpx
 import pytest
+from aiolimiter import AsyncLimiter
 from pytest_mock import MockerFixture
 
 from crawler.domain.paper import Paper
@@ -148,3 +150,50 @@ async def test_fetch_call_args(
     # call_args[1] is keyword args: params, json, headers
     # headers is NOT passed
     assert "headers" not in call_args[1]
+
+
+async def test_requests_union_of_missing_fields(semaphore: asyncio.Semaphore) -> None:
+    """欠けている項目の和集合を1つのバッチで要求し、既にPDFリンクがある論文の候補も集める"""
+    requests: list[tuple[str, list[str]]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ids = json.loads(request.content)["ids"]
+        requests.append((request.url.params["fields"], ids))
+        return httpx.Response(
+            200,
+            json=[
+                {
+                    "externalIds": {"DOI": i.removeprefix("DOI:")},
+                    "abstract": "Abstract",
+                    "openAccessPdf": {"url": f"https://s2/{i}.pdf"},
+                }
+                for i in ids
+            ],
+        )
+
+    papers = [
+        Paper(title="A", authors=[], year=2024, venue="", doi="10.1/a"),
+        Paper(title="B", authors=[], year=2024, venue="", doi="10.1/b", abstract="Known"),
+        Paper(title="C", authors=[], year=2024, venue="", doi="10.1/c", pdf_url="https://c.pdf"),
+    ]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        repo = SemanticScholarRepository(client, AsyncLimiter(100, 1))
+        await repo.enrich_papers(papers, semaphore)
+
+        assert requests == [
+            ("externalIds,abstract,openAccessPdf", ["DOI:10.1/a", "DOI:10.1/b", "DOI:10.1/c"])
+        ]
+        assert papers[0].abstract == "Abstract"
+        assert papers[0].pdf_url == "https://s2/DOI:10.1/a.pdf"
+        assert papers[1].abstract == "Known"
+        assert papers[1].pdf_url == "https://s2/DOI:10.1/b.pdf"
+        assert papers[2].abstract == "Abstract"
+        assert papers[2].pdf_url == "https://c.pdf"
+        assert papers[2].pdf_url_candidates == ["https://s2/DOI:10.1/c.pdf"]
+        assert repo.batches == 1
+        assert repo.response_bytes > 0
+
+        # 全ての論文に要約がある場合は、PDFリンクだけを要求する
+        requests.clear()
+        await repo.enrich_papers(papers, semaphore)
+        assert [fields for fields, _ in requests] == ["externalIds,openAccessPdf"]
@@ -0,0 +1,139 @@
+import asyncio
+import gzip
+from pathlib import Path
+
+import httpx
+import pytest
+
+from crawler.repository.crawl_state_store import CrawlStateStore
+from crawler.repository.sitemap_repository import SitemapRepository
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry
+
+BASE = "https://blog.example.com"
+
+
+def urlset(pages: dict[str, str]) -> bytes:
+    entries = "".join(
+        f"<url><loc>{BASE}{path}</loc><lastmod>{lastmod}</lastmod></url>"
+        for path, lastmod in pages.items()
+    )
+    return (
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+    ).encode()
+
+
+def sitemap_index(children: dict[str, str]) -> bytes:
+    entries = "".join(
+        f"<sitemap><loc>{BASE}{path}</loc><lastmod>{lastmod}</lastmod></sitemap>"
+        for path, lastmod in children.items()
+    )
+    return (
+        f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+    ).encode()
+
+
+class BlogServer:
+    """ETagによる条件付きGETに対応したサイトマップのモックサーバー。"""
+
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {
+            "/sitemap.xml": sitemap_index(
+                {"/posts-2023.xml.gz": "2024-01-01", "/posts-2024.xml": "2024-03-01"}
+            ),
+            "/posts-2023.xml.gz": gzip.compress(urlset({"/old": "2023-06-01"})),
+            "/posts-2024.xml": urlset({"/a": "2024-02-01", "/b": "2024-03-01"}),
+        }
+        self.requests: list[str] = []
+
+    def etag(self, path: str) -> str:
+        return f'"{hash(self.files[path])}"'
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/robots.txt":
+            return httpx.Response(200, text=f"User-agent: *\nSitemap: {BASE}/sitemap.xml\n")
+        self.requests.append(path)
+        if path not in self.files:
+            return httpx.Response(404)
+        if request.headers.get("If-None-Match") == self.etag(path):
+            return httpx.Response(304)
+        return httpx.Response(200, content=self.files[path], headers={"ETag": self.etag(path)})
+
+
+@pytest.fixture
+def semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(5)
+
+
+@pytest.fixture
+def server() -> BlogServer:
+    return BlogServer()
+
+
+@pytest.fixture
+def repo(tmp_path: Path, server: BlogServer) -> SitemapRepository:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return SitemapRepository(
+        client,
+        CrawlStateStore(tmp_path / "state.db"),
+        host_limiters=HostLimiters(default_max_rate=100),
+        robots=RobotsRegistry(),
+    )
+
+
+async def test_discover_sitemaps(repo: SitemapRepository) -> None:
+    assert await repo.discover_sitemaps(BASE) == [f"{BASE}/sitemap.xml"]
+
+
+async def test_only_changed_pages_are_returned(
+    repo: SitemapRepository, server: BlogServer, semaphore: asyncio.Semaphore
+) -> None:
+    """2回目以降は、未変更のサイトマップを取得せず、追加・更新されたページだけを返すこと"""
+    first = await repo.changed_pages(f"{BASE}/sitemap.xml", semaphore, site="blog")
+    assert sorted(p.url for p in first) == [f"{BASE}/a", f"{BASE}/b", f"{BASE}/old"]
+    assert {p.site for p in first} == {"blog"}
+    repo.state_store.mark_synced(first)
+
+    # 変更なし: インデックスは304、子サイトマップはlastmodが同じため取得しない
+    server.requests.clear()
+    assert await repo.changed_pages(f"{BASE}/sitemap.xml", semaphore) == []
+    assert server.requests == ["/sitemap.xml"]
+
+    # 2024年のサイトマップで /b が更新され、/c が追加された
+    server.files["/posts-2024.xml"] = urlset(
+        {"/a": "2024-02-01", "/b": "2024-04-01", "/c": "2024-04-02"}
+    )
+    server.files["/sitemap.xml"] = sitemap_index(
+        {"/posts-2023.xml.gz": "2024-01-01", "/posts-2024.xml": "2024-04-02"}
+    )
+    server.requests.clear()
+    changed = await repo.changed_pages(f"{BASE}/sitemap.xml", semaphore)
+
+    assert [p.url for p in changed] == [f"{BASE}/c", f"{BASE}/b"]
+    assert server.requests == ["/sitemap.xml", "/posts-2024.xml"]
+
+
+async def test_unsynced_pages_are_returned_again(
+    repo: SitemapRepository, server: BlogServer, semaphore: asyncio.Semaphore
+) -> None:
+    """取得済みとして記録されなかったページは、サイトマップが未変更でも再度返されること"""
+    first = await repo.changed_pages(f"{BASE}/sitemap.xml", semaphore)
+    repo.state_store.mark_synced([p for p in first if p.url != f"{BASE}/a"])
+
+    again = await repo.changed_pages(f"{BASE}/sitemap.xml", semaphore)
+    assert [p.url for p in again] == [f"{BASE}/a"]
+
+
+async def test_invalid_sitemap_is_refetched(
+    repo: SitemapRepository, server: BlogServer, semaphore: asyncio.Semaphore
+) -> None:
+    """解析に失敗したサイトマップの検証子は記録せず、次回は全体を取得すること"""
+    server.files["/sitemap.xml"] = b"<sitemapindex><sitemap>"
+
+    assert await repo.changed_pages(f"{BASE}/sitemap.xml", semaphore) == []
+    assert repo.state_store.get(f"{BASE}/sitemap.xml") is None
+
+    server.files["/sitemap.xml"] = sitemap_index({"/posts-2024.xml": "2024-03-01"})
+    pages = await repo.changed_pages(f"{BASE}/sitemap.xml", semaphore)
+    assert sorted(p.url for p in pages) == [f"{BASE}/a", f"{BASE}/b"]
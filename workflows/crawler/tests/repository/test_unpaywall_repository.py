@@ -71,6 +71,47 @@ class TestUnpaywallRepository:
         assert result.doi == "10.1145/test"
         assert result.pdf_url == "https://example.com/paper.pdf"
 
+    async def test_oa_locations_are_kept_as_candidates(
+        self, mock_client: httpx.AsyncClient, semaphore: asyncio.Semaphore, mocker: MockerFixture
+    ) -> None:
+        """best_oa_location以外のoa_locationsが代替候補として保持されること。"""
+        from crawler.domain.paper import Paper
+        from crawler.repository.unpaywall_repository import UnpaywallRepository
+
+        repo = UnpaywallRepository(mock_client)
+        fetched = repo._parse_paper(
+            {
+                "doi": "10.1145/test",
+                "title": "Test Paper",
+                "best_oa_location": {"url_for_pdf": "https://a.example/best.pdf"},
+                "oa_locations": [
+                    {"url_for_pdf": "https://a.example/best.pdf"},
+                    {"url_for_pdf": None, "url": "https://a.example/landing"},
+                    {"url_for_pdf": "https://b.example/mirror.pdf"},
+                ],
+            }
+        )
+        assert fetched is not None
+        assert fetched.pdf_url == "https://a.example/best.pdf"
+        assert fetched.pdf_url_candidates == ["https://b.example/mirror.pdf"]
+
+        paper = Paper(
+            title="Test Paper",
+            authors=[],
+            year=2024,
+            venue="RecSys",
+            doi="10.1145/test",
+            pdf_url="https://s2.example/x.pdf",
+        )
+        mocker.patch.object(repo, "fetch_by_doi", return_value=fetched)
+        await repo.enrich_papers([paper], semaphore)
+
+        assert paper.pdf_url == "https://s2.example/x.pdf"
+        assert paper.pdf_url_candidates == [
+            "https://a.example/best.pdf",
+            "https://b.example/mirror.pdf",
+        ]
+
     async def test_fetch_paper_not_found(
         self,
         mock_client: httpx.AsyncClient,
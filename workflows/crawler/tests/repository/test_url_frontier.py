@@ -0,0 +1,205 @@
+import asyncio
+import sqlite3
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from crawler.domain.web_page import FrontierUrl
+from crawler.repository.url_frontier import UrlFrontier
+from crawler.utils.robots import RobotsRegistry
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "slow.example" and request.url.path == "/robots.txt":
+        return httpx.Response(200, text="User-agent: *\nRequest-rate: 5/1\nDisallow: /private/\n")
+    return httpx.Response(404)
+
+
+@pytest.fixture
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def make_frontier(path: Path, client: httpx.AsyncClient, min_delay: float = 0.0) -> UrlFrontier:
+    return UrlFrontier(path, client, robots=RobotsRegistry(), min_delay=min_delay)
+
+
+async def drain(frontier: UrlFrontier) -> list[str]:
+    urls = []
+    while (item := await frontier.lease()) is not None:
+        urls.append(item.url)
+        await frontier.release(item)
+    return urls
+
+
+async def test_add_canonicalizes_and_dedupes(tmp_path: Path, client: httpx.AsyncClient) -> None:
+    frontier = make_frontier(tmp_path / "frontier.db", client)
+
+    added = await frontier.add(
+        [
+            FrontierUrl(url="https://A.example/x?utm_source=feed"),
+            FrontierUrl(url="https://a.example/x#top"),
+            FrontierUrl(url="https://a.example/y", priority=-1),
+            FrontierUrl(url="not a url"),
+        ]
+    )
+
+    assert added == 2
+    assert len(frontier) == 2
+    # 優先度の小さいURLから払い出す
+    assert await drain(frontier) == ["https://a.example/y", "https://a.example/x"]
+    # 処理済みのURLは再登録しない
+    assert await frontier.add([FrontierUrl(url="https://a.example/x")]) == 0
+
+
+async def test_updated_lastmod_is_requeued(tmp_path: Path, client: httpx.AsyncClient) -> None:
+    frontier = make_frontier(tmp_path / "frontier.db", client)
+    await frontier.add([FrontierUrl(url="https://a.example/x", lastmod="2024-01-01")])
+    await drain(frontier)
+
+    assert await frontier.add([FrontierUrl(url="https://a.example/x", lastmod="2024-01-01")]) == 0
+    assert await frontier.add([FrontierUrl(url="https://a.example/x", lastmod="2024-02-01")]) == 1
+
+
+async def test_queue_is_persisted(tmp_path: Path, client: httpx.AsyncClient) -> None:
+    """払い出し中に終了したURLも含め、未処理のURLは次回の起動時に払い出されること"""
+    frontier = make_frontier(tmp_path / "frontier.db", client)
+    await frontier.add(
+        [FrontierUrl(url="https://a.example/1"), FrontierUrl(url="https://b.example/1")]
+    )
+    leased = await frontier.lease()
+    assert leased is not None
+    frontier.close()
+
+    reopened = make_frontier(tmp_path / "frontier.db", client)
+    assert sorted(await drain(reopened)) == ["https://a.example/1", "https://b.example/1"]
+
+
+async def test_politeness_per_host(tmp_path: Path, client: httpx.AsyncClient) -> None:
+    """同じホストは同時に1件だけ、Request-rateの間隔を空けて払い出し、他のホストは並列に払い出すこと"""
+    frontier = make_frontier(tmp_path / "frontier.db", client, min_delay=0.05)
+    await frontier.add(
+        [FrontierUrl(url=f"https://slow.example/{i}") for i in range(3)]
+        + [FrontierUrl(url="https://slow.example/private/x")]
+        + [FrontierUrl(url=f"https://fast{i}.example/") for i in range(20)]
+    )
+
+    starts: dict[str, list[float]] = {}
+    active: dict[str, int] = {}
+    max_active: dict[str, int] = {}
+    fetched: list[str] = []
+
+    async def worker() -> None:
+        while (item := await frontier.lease()) is not None:
+            host = httpx.URL(item.url).host
+            starts.setdefault(host, []).append(time.monotonic())
+            active[host] = active.get(host, 0) + 1
+            max_active[host] = max(max_active.get(host, 0), active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+            fetched.append(item.url)
+            await frontier.release(item)
+
+    start = time.monotonic()
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(10):
+            tg.create_task(worker())
+    elapsed = time.monotonic() - start
+
+    # robots.txtで拒否されたURLは払い出さない
+    assert "https://slow.example/private/x" not in fetched
+    assert len(fetched) == 23
+    assert max(max_active.values()) == 1
+    gaps = [b - a for a, b in zip(starts["slow.example"], starts["slow.example"][1:])]
+    assert len(gaps) == 2
+    assert all(gap >= 0.2 for gap in gaps)
+    # 20個のホストは並列に処理され、全体は遅いホストの間隔で律速される
+    assert elapsed < 1.0
+    assert len(frontier) == 0
+
+
+async def test_failed_lease_returns_host(
+    tmp_path: Path, client: httpx.AsyncClient, mocker: MockerFixture
+) -> None:
+    """払い出し中に例外が起きても、ホストとURLが払い出し中のまま残らないこと"""
+    frontier = make_frontier(tmp_path / "frontier.db", client)
+    await frontier.add([FrontierUrl(url="https://a.example/1")])
+    can_fetch = mocker.patch.object(
+        frontier.robots, "can_fetch", side_effect=httpx.ConnectError("boom")
+    )
+
+    with pytest.raises(httpx.ConnectError):
+        await frontier.lease()
+
+    can_fetch.side_effect = None
+    can_fetch.return_value = True
+    assert await drain(frontier) == ["https://a.example/1"]
+
+
+async def test_failed_release_returns_host(
+    tmp_path: Path, client: httpx.AsyncClient, mocker: MockerFixture
+) -> None:
+    frontier = make_frontier(tmp_path / "frontier.db", client)
+    await frontier.add(
+        [FrontierUrl(url="https://a.example/1"), FrontierUrl(url="https://a.example/2")]
+    )
+    item = await frontier.lease()
+    assert item is not None
+    mocker.patch.object(frontier.robots, "crawl_interval", side_effect=RuntimeError("boom"))
+
+    with pytest.raises(RuntimeError):
+        await frontier.release(item)
+
+    mocker.stopall()
+    assert await drain(frontier) == ["https://a.example/2"]
+
+
+async def test_failed_url_is_retried_with_backoff(
+    tmp_path: Path, client: httpx.AsyncClient
+) -> None:
+    """失敗したURLはバックオフの後に再び払い出し、上限回数に達したら破棄して再登録できるようにすること"""
+    frontier = UrlFrontier(
+        tmp_path / "frontier.db", client, robots=RobotsRegistry(), min_delay=0.0, retry_delay=0.1
+    )
+    url = "https://a.example/1"
+    await frontier.add([FrontierUrl(url=url)])
+
+    leased_at = []
+    for _ in range(UrlFrontier.MAX_ATTEMPTS):
+        item = await frontier.lease()
+        assert item is not None
+        assert item.url == url
+        leased_at.append(time.monotonic())
+        await frontier.release(item, failed=True)
+
+    # 失敗するたびに待機時間を2倍にする
+    gaps = [b - a for a, b in zip(leased_at, leased_at[1:], strict=False)]
+    assert gaps[0] >= 0.1
+    assert gaps[1] >= 0.2
+    assert await frontier.lease() is None
+    assert len(frontier) == 0
+    assert await frontier.add([FrontierUrl(url=url)]) == 1
+
+
+async def test_opens_frontier_without_retry_columns(
+    tmp_path: Path, client: httpx.AsyncClient
+) -> None:
+    """再試行の列がない以前のファイルも、列を追加して開けること"""
+    path = tmp_path / "frontier.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE frontier (url TEXT PRIMARY KEY, host TEXT NOT NULL, priority INTEGER NOT NULL,"
+        " site TEXT, parent TEXT, lastmod TEXT, enqueued_at REAL NOT NULL,"
+        " leased INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID"
+    )
+    conn.execute(
+        "INSERT INTO frontier (url, host, priority, enqueued_at) VALUES (?, ?, 0, 0)",
+        ("https://a.example/1", "a.example"),
+    )
+    conn.commit()
+    conn.close()
+
+    assert await drain(make_frontier(path, client)) == ["https://a.example/1"]
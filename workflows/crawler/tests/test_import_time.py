@@ -0,0 +1,91 @@
+"""CLIとワーカープロセスの起動時間のテスト。
+
+新しいインタープリタでモジュールを読み込み、`sys.modules` に読み込まれたモジュールを調べます。
+プロセスプールのワーカーは起動のたびに読み込みの時間を支払うため、重い依存関係を読み込んだら失敗させます。
+
+読み込み時間は `python -X importtime` の累積時間で計測します。環境によってばらつくため、
+開発環境での計測値の数倍の予算を設け、重い依存関係を誤って読み込んだような大きな退行だけを検出します。
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).parents[1] / "src"
+
+# 計測のばらつきを抑えるため、複数回計測した最小値を予算と比較する
+REPEAT = 3
+
+# 重い依存関係。プランが使うリポジトリを作成するまで読み込まない
+HEAVY_MODULES = {"httpx", "pyarrow", "pypdf", "feedparser", "tenacity", "defusedxml", "aiolimiter"}
+
+
+def imported_modules(module: str) -> set[str]:
+    """新しいインタープリタでモジュールを読み込み、`sys.modules` のモジュール名の集合を返します。"""
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def import_seconds(module: str) -> float:
+    """新しいインタープリタでのモジュールの読み込み時間(秒、`-X importtime` の累積時間)を返します。"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # "import time: self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        _, _, rest = line.partition("import time:")
+        fields = rest.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1_000_000
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+@pytest.mark.parametrize(
+    ("module", "budget"),
+    [
+        # 開発環境では約0.3秒・0.01秒・0.03秒
+        ("crawler.main", 1.5),
+        ("crawler.utils.pdf_text", 0.3),
+        ("crawler.utils.article", 0.3),
+    ],
+)
+def test_import_time_budget(module: str, budget: float) -> None:
+    elapsed = min(import_seconds(module) for _ in range(REPEAT))
+
+    assert elapsed <= budget, f"importing {module} took {elapsed:.3f}s (budget {budget}s)"
+
+
+@pytest.mark.parametrize(
+    ("module", "forbidden"),
+    [
+        # CLI: 設定の読み込みとプランの選択に必要なものだけを読み込む
+        ("crawler.main", HEAVY_MODULES),
+        # ワーカープロセスで実行する抽出処理
+        ("crawler.utils.pdf_text", HEAVY_MODULES | {"pydantic", "loguru"}),
+        ("crawler.utils.article", HEAVY_MODULES - {"defusedxml"} | {"pydantic", "loguru"}),
+    ],
+)
+def test_no_heavy_imports(module: str, forbidden: set[str]) -> None:
+    imported = imported_modules(module)
+
+    assert module in imported
+    assert not forbidden & imported, f"{module} eagerly imports {sorted(forbidden & imported)}"
+
+
+def test_repository_package_is_lazy() -> None:
+    imported = imported_modules("crawler.repository")
+
+    assert not {name for name in imported if name.startswith("crawler.repository.")}
+    assert not HEAVY_MODULES & imported
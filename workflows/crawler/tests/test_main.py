@@ -0,0 +1,329 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from crawler.configs.plan import BlogPlan, CrawlConfig, PaperPlan, RateLimit
+from crawler.configs.sites import SiteConfig
+from crawler.domain.paper import Paper
+from crawler.main import cli, estimate_requests, prioritize_units, restore_papers, run
+from crawler.repository import PaperStore
+from crawler.utils.profiling import MemoryProfiler
+
+BASE = "https://blog.example.com"
+FEED = f"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>blog</title>
+<item><title>Post</title><link>{BASE}/post</link>
+<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate></item>
+</channel></rss>"""
+SITEMAP = f"""<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>{BASE}/page</loc><lastmod>2024-01-01</lastmod></url>
+</urlset>"""
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path == "/robots.txt":
+        return httpx.Response(200, text="User-agent: *\nAllow: /\n")
+    if path == "/sitemap.xml":
+        return httpx.Response(200, text=SITEMAP)
+    if path == "/feed":
+        return httpx.Response(200, text=FEED, headers={"Content-Type": "application/rss+xml"})
+    return httpx.Response(
+        200,
+        text=f"<html><head><title>{path}</title></head><body><article><p>{path}</p></article></body></html>",
+        headers={"Content-Type": "text/html"},
+    )
+
+
+async def test_run_blog_plan(tmp_path: Path) -> None:
+    config = CrawlConfig(
+        data_dir=str(tmp_path),
+        rate_limits={"blog.example.com": {"max_rate": 100}},  # type: ignore[dict-item]
+        plans={"blogs": BlogPlan(kind="blogs", num_workers=2)},
+        sites={
+            "blog": SiteConfig(
+                name="blog", sitemap_url=f"{BASE}/sitemap.xml", feed_urls=[f"{BASE}/feed"]
+            )
+        },
+    )
+
+    profiler = MemoryProfiler(tmp_path / "profiles")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await run(config, ["blogs"], client=client, profiler=profiler)
+
+    # サイトマップとフィードで見つけた記事の本文が保存される
+    async with PaperStore(tmp_path / "papers.db") as store:
+        for path in ("/page", "/post"):
+            article = await store.get_article(f"{BASE}{path}")
+            assert article is not None
+            assert article.site == "blog"
+
+    # プランのステージごとにメモリの割り当てが記録される
+    assert profiler.report_path is not None
+    report = profiler.report_path.read_text()
+    for stage in ("blogs/sitemaps", "blogs/feeds", "blogs/frontier"):
+        assert f"== {stage}:" in report
+
+
+async def test_run_defers_blog_stages_after_time_budget(tmp_path: Path) -> None:
+    config = CrawlConfig(
+        data_dir=str(tmp_path),
+        plans={"blogs": BlogPlan(kind="blogs")},
+        sites={"blog": SiteConfig(name="blog", sitemap_url=f"{BASE}/sitemap.xml")},
+    )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        report = await run(config, ["blogs"], client=client, time_budget=1e-9)
+
+    assert report is not None
+    assert report.budget == 1e-9
+    assert report.plans["blogs"].deferred == ["sitemaps", "feeds"]
+    assert len(list((tmp_path / "coverage").glob("coverage-*.json"))) == 1
+
+
+def dblp_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/robots.txt":
+        return httpx.Response(200, text="User-agent: *\nAllow: /\n")
+    hits = [
+        {"info": {"title": f"P{i}", "year": "2024", "venue": "RecSys", "doi": f"10.1/{i}"}}
+        for i in range(3)
+    ]
+    return httpx.Response(
+        200, json={"result": {"hits": {"@total": "3", "@sent": "3", "hit": hits}}}
+    )
+
+
+async def test_run_paper_plan_with_job_queue(tmp_path: Path) -> None:
+    config = CrawlConfig(
+        data_dir=str(tmp_path),
+        plans={
+            "recsys": PaperPlan(
+                years=(2024, 2024),
+                enrichers=[],
+                sinks=["sqlite"],
+                download_pdfs=False,
+                extract_pdf_texts=False,
+                job_queue=True,
+            )
+        },
+    )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(dblp_handler)) as client:
+        report = await run(config, ["recsys"], client=client)
+
+    assert report is not None
+    assert report.plans["recsys"].papers == 3
+    assert report.plans["recsys"].deferred == []
+    assert (tmp_path / "jobs" / "recsys.db").exists()
+    async with PaperStore(tmp_path / "papers.db") as store:
+        assert len(await store.find_by_year(2024)) == 3
+
+
+async def test_job_queue_runs_append_to_parquet_partition(tmp_path: Path) -> None:
+    """ジョブキュー経由の実行が、同じパーティションに前回の実行が書いた論文を残すこと"""
+    from crawler.repository.parquet_sink import open_paper_dataset
+
+    calls = 0
+
+    def paged_handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        if request.url.path == "/robots.txt":
+            return httpx.Response(200, text="User-agent: *\nAllow: /\n")
+        calls += 1
+        hit = {
+            "info": {
+                "title": f"P{calls}",
+                "year": "2024",
+                "venue": "RecSys",
+                "doi": f"10.1/{calls}",
+            }
+        }
+        return httpx.Response(
+            200, json={"result": {"hits": {"@total": "1", "@sent": "1", "hit": [hit]}}}
+        )
+
+    plan = PaperPlan(
+        conferences=["recsys"],
+        years=(2024, 2024),
+        enrichers=[],
+        sinks=["parquet"],
+        download_pdfs=False,
+        extract_pdf_texts=False,
+        job_queue=True,
+    )
+    config = CrawlConfig(data_dir=str(tmp_path), plans={"first": plan, "second": plan})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(paged_handler)) as client:
+        await run(config, ["first"], client=client)
+        await run(config, ["second"], client=client)
+
+    table = open_paper_dataset(tmp_path / "papers").to_table()
+    assert sorted(table.column("doi").to_pylist()) == ["10.1/1", "10.1/2"]
+
+
+async def test_job_queue_resumes_remaining_units_first(tmp_path: Path) -> None:
+    """前回の実行でキューに残った作業単位を、新しい年の作業単位より先に処理すること"""
+    from crawler.domain.job import JobKind, RetrieveJobPayload
+    from crawler.repository import SQLiteJobQueue
+    from crawler.usecase.crawl_jobs import retrieve_job_key
+
+    # 2023年の2ページ目を取得する前に終わった実行を再現する
+    queue = SQLiteJobQueue(tmp_path / "jobs" / "recsys.db")
+    payload = RetrieveJobPayload(conf="recsys", year=2023, page=1)
+    await queue.enqueue(JobKind.RETRIEVE, retrieve_job_key("recsys", 2023, 1), payload.model_dump())
+    queue.close()
+
+    years: list[str] = []
+
+    def recording_handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/robots.txt":
+            years.append(request.url.params["query"].split("year:")[1].rstrip(":"))
+        return dblp_handler(request)
+
+    config = CrawlConfig(
+        data_dir=str(tmp_path),
+        plans={
+            "recsys": PaperPlan(
+                years=(2023, 2024),
+                enrichers=[],
+                sinks=["sqlite"],
+                download_pdfs=False,
+                extract_pdf_texts=False,
+                job_queue=True,
+                job_workers=1,
+            )
+        },
+    )
+    async with httpx.AsyncClient(transport=httpx.MockTransport(recording_handler)) as client:
+        await run(config, ["recsys"], client=client)
+
+    # 残った2023年（先頭ページを含む）を先に、新しい作業単位の2024年を後に取得する
+    assert years == ["2023", "2023", "2024"]
+
+
+def test_prioritize_units() -> None:
+    units = [("recsys", 2022), ("recsys", 2023), ("kdd", 2022), ("kdd", 2023)]
+    assert prioritize_units(units, []) == [
+        ("recsys", 2023),
+        ("kdd", 2023),
+        ("recsys", 2022),
+        ("kdd", 2022),
+    ]
+    # 持ち越した作業単位を先に処理し、プランから外れた作業単位は無視する
+    assert prioritize_units(units, [("kdd", 2022), ("www", 2024)]) == [
+        ("kdd", 2022),
+        ("recsys", 2023),
+        ("kdd", 2023),
+        ("recsys", 2022),
+    ]
+
+
+async def test_restore_papers(tmp_path: Path) -> None:
+    """保存済みの補完結果を、欠けている項目にだけ反映すること"""
+    async with PaperStore(tmp_path / "papers.db") as store:
+        await store.write_papers(
+            [
+                Paper(
+                    title="A",
+                    authors=[],
+                    year=2024,
+                    venue="RecSys",
+                    doi="10.1/A",
+                    abstract="saved",
+                    pdf_url="https://a.example/saved.pdf",
+                )
+            ]
+        )
+        await store.flush()
+        papers = [
+            Paper(
+                title="A",
+                authors=[],
+                year=2024,
+                venue="RecSys",
+                doi="10.1/a",
+                pdf_url="https://a.example/new.pdf",
+            ),
+            Paper(title="B", authors=[], year=2024, venue="RecSys", doi="10.1/b"),
+        ]
+
+        assert await restore_papers(store, papers) == 1
+
+    assert papers[0].abstract == "saved"
+    assert papers[0].pdf_url == "https://a.example/new.pdf"
+    assert papers[1].abstract is None
+
+
+async def test_restore_papers_keeps_checked_dead_link(tmp_path: Path) -> None:
+    """リンク切れを確認済みの論文には、以前のPDFリンクを復元しないこと"""
+    async with PaperStore(tmp_path / "papers.db") as store:
+        await store.write_papers(
+            [
+                Paper(
+                    title="A",
+                    authors=[],
+                    year=2024,
+                    venue="RecSys",
+                    doi="10.1/a",
+                    pdf_url="https://a.example/dead.pdf",
+                )
+            ]
+        )
+        await store.write_papers(
+            [
+                Paper(
+                    title="A",
+                    authors=[],
+                    year=2024,
+                    venue="RecSys",
+                    doi="10.1/a",
+                    abstract="saved",
+                    pdf_url_checked=True,
+                )
+            ]
+        )
+        await store.flush()
+        papers = [Paper(title="A", authors=[], year=2024, venue="RecSys", doi="10.1/a")]
+
+        assert await restore_papers(store, papers) == 1
+
+    assert papers[0].abstract == "saved"
+    assert papers[0].pdf_url is None
+    assert papers[0].pdf_url_checked
+
+
+async def test_estimate_requests_uses_configured_rate_limits(tmp_path: Path) -> None:
+    config = CrawlConfig(
+        data_dir=str(tmp_path),
+        rate_limits={"arxiv": RateLimit(max_rate=2)},
+        plans={
+            "recsys": PaperPlan(years=(2024, 2024), enrichers=["arxiv"]),
+            "blogs": BlogPlan(kind="blogs"),
+        },
+    )
+
+    estimate = await estimate_requests(config)
+
+    # 技術ブログのプランは見積もらず、リクエストも送らない
+    assert estimate is not None
+    assert estimate.units == 1
+    arxiv = estimate.services["arxiv"]
+    assert arxiv.max_rate == 2
+    assert arxiv.requests == 2 * estimate.papers
+    assert estimate.bottleneck is arxiv
+    # 見積もりではストア・キャッシュのファイルを作らない
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_estimate_requests_without_paper_plans(tmp_path: Path) -> None:
+    config = CrawlConfig(data_dir=str(tmp_path), plans={"blogs": BlogPlan(kind="blogs")})
+    assert await estimate_requests(config) is None
+
+
+def test_cli_rejects_unknown_plan(tmp_path: Path) -> None:
+    path = tmp_path / "config.toml"
+    path.write_text('[plans.blogs]\nkind = "blogs"\n')
+
+    with pytest.raises(SystemExit):
+        cli(["missing", "--config", str(path)])
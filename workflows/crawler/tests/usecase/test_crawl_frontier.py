@@ -0,0 +1,171 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+
+from crawler.domain.web_page import FrontierUrl, WebPage
+from crawler.repository.crawl_state_store import CrawlStateStore
+from crawler.repository.url_frontier import UrlFrontier
+from crawler.repository.web_page_repository import WebPageRepository
+from crawler.usecase.crawl_frontier import CrawlFrontier
+from crawler.utils.deadline import Deadline
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self.pages: list[WebPage] = []
+
+    async def write_pages(self, pages: list[WebPage]) -> None:
+        self.pages.extend(pages)
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/robots.txt":
+        return httpx.Response(404)
+    if request.url.path == "/broken":
+        return httpx.Response(500)
+    if request.headers.get("If-None-Match") == '"v1"':
+        return httpx.Response(304)
+    return httpx.Response(
+        200, text="<html></html>", headers={"Content-Type": "text/html", "ETag": '"v1"'}
+    )
+
+
+async def test_crawl_until_frontier_is_empty(tmp_path: Path) -> None:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    robots = RobotsRegistry()
+    frontier = UrlFrontier(
+        tmp_path / "frontier.db", client, robots=robots, min_delay=0.0, retry_delay=0.0
+    )
+    store = CrawlStateStore(tmp_path / "state.db")
+    sink = ListSink()
+    usecase = CrawlFrontier(
+        frontier,
+        WebPageRepository(client, host_limiters=HostLimiters(default_max_rate=100), robots=robots),
+        store,
+        sinks=[sink],
+    )
+    urls = ["https://a.example/1", "https://a.example/2", "https://b.example/broken"]
+    await frontier.add(FrontierUrl(url=u, site="blog", lastmod="2024-01-01") for u in urls)
+
+    assert await usecase.execute(asyncio.Semaphore(5), num_workers=3) == 2
+    assert sorted(p.url for p in sink.pages) == urls[:2]
+    state = store.get("https://a.example/1")
+    assert state is not None
+    assert state.etag == '"v1"'
+    assert state.synced_lastmod == "2024-01-01"
+    assert store.get("https://b.example/broken") is None
+
+    # 更新されたページは条件付きGETで取得し、304ならシンクに渡さない
+    await frontier.add([FrontierUrl(url=urls[0], lastmod="2024-02-01")])
+    assert await usecase.execute(asyncio.Semaphore(5), num_workers=3) == 0
+    assert len(sink.pages) == 2
+
+
+async def test_expired_deadline_leaves_urls_in_frontier(tmp_path: Path) -> None:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    robots = RobotsRegistry()
+    frontier = UrlFrontier(tmp_path / "frontier.db", client, robots=robots, min_delay=0.0)
+    usecase = CrawlFrontier(
+        frontier,
+        WebPageRepository(client, host_limiters=HostLimiters(default_max_rate=100), robots=robots),
+        CrawlStateStore(tmp_path / "state.db"),
+    )
+    await frontier.add([FrontierUrl(url="https://a.example/1")])
+
+    now = [0.0]
+    deadline = Deadline(1.0, clock=lambda: now[0])
+    now[0] = 2.0
+    assert await usecase.execute(asyncio.Semaphore(5), num_workers=2, deadline=deadline) == 0
+    assert len(frontier) == 1
+
+    # 次回の実行で残りのURLを取得する
+    assert await usecase.execute(asyncio.Semaphore(5), num_workers=2) == 1
+    assert len(frontier) == 0
+
+
+async def test_failed_url_does_not_stop_other_workers(tmp_path: Path) -> None:
+    class FailingSink(ListSink):
+        async def write_pages(self, pages: list[WebPage]) -> None:
+            if pages[0].url.endswith("/bad"):
+                raise RuntimeError("boom")
+            await super().write_pages(pages)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    robots = RobotsRegistry()
+    frontier = UrlFrontier(
+        tmp_path / "frontier.db", client, robots=robots, min_delay=0.0, retry_delay=0.0
+    )
+    sink = FailingSink()
+    usecase = CrawlFrontier(
+        frontier,
+        WebPageRepository(client, host_limiters=HostLimiters(default_max_rate=100), robots=robots),
+        CrawlStateStore(tmp_path / "state.db"),
+        sinks=[sink],
+    )
+    urls = ["https://a.example/bad", "https://a.example/1", "https://b.example/1"]
+    await frontier.add(FrontierUrl(url=u) for u in urls)
+
+    assert await usecase.execute(asyncio.Semaphore(5), num_workers=2) == 2
+    assert sorted(p.url for p in sink.pages) == urls[1:]
+    # 書き込みに失敗したURLは再試行し、上限回数に達したら破棄する
+    assert len(frontier) == 0
+
+
+async def test_deadline_stops_waiting_for_host(tmp_path: Path) -> None:
+    """ホストの間隔を待っている間に締め切りを過ぎた場合も、待たずに終了すること"""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    robots = RobotsRegistry()
+    frontier = UrlFrontier(tmp_path / "frontier.db", client, robots=robots, min_delay=30.0)
+    usecase = CrawlFrontier(
+        frontier,
+        WebPageRepository(client, host_limiters=HostLimiters(default_max_rate=100), robots=robots),
+        CrawlStateStore(tmp_path / "state.db"),
+    )
+    await frontier.add(FrontierUrl(url=f"https://a.example/{i}") for i in range(2))
+
+    async with asyncio.timeout(5):
+        fetched = await usecase.execute(asyncio.Semaphore(5), num_workers=2, deadline=Deadline(0.2))
+    assert fetched == 1
+    assert len(frontier) == 1
+
+
+async def test_transient_failure_is_retried(tmp_path: Path) -> None:
+    """503・タイムアウトで失敗したURLは破棄せず、バックオフの後に再取得すること"""
+    requests: list[str] = []
+
+    def flaky(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        requests.append(request.url.path)
+        if request.url.path == "/timeout" and requests.count("/timeout") == 1:
+            raise httpx.ReadTimeout("timed out", request=request)
+        if request.url.path == "/unavailable" and requests.count("/unavailable") == 1:
+            return httpx.Response(503)
+        if request.url.path == "/gone":
+            return httpx.Response(404)
+        return httpx.Response(200, text="<html></html>", headers={"Content-Type": "text/html"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(flaky))
+    robots = RobotsRegistry()
+    frontier = UrlFrontier(
+        tmp_path / "frontier.db", client, robots=robots, min_delay=0.0, retry_delay=0.1
+    )
+    sink = ListSink()
+    usecase = CrawlFrontier(
+        frontier,
+        WebPageRepository(client, host_limiters=HostLimiters(default_max_rate=100), robots=robots),
+        CrawlStateStore(tmp_path / "state.db"),
+        sinks=[sink],
+    )
+    urls = ["https://a.example/unavailable", "https://b.example/timeout", "https://c.example/gone"]
+    await frontier.add(FrontierUrl(url=u) for u in urls)
+
+    async with asyncio.timeout(5):
+        assert await usecase.execute(asyncio.Semaphore(5), num_workers=3) == 2
+    assert sorted(p.url for p in sink.pages) == urls[:2]
+    # 恒久的な4xxは再試行しない
+    assert sorted(requests) == ["/gone", "/timeout", "/timeout", "/unavailable", "/unavailable"]
+    assert len(frontier) == 0
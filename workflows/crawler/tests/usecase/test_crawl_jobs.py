@@ -0,0 +1,200 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from crawler.domain.job import JobStatus
+from crawler.domain.paper import Paper, PaperPage
+from crawler.repository.job_queue import SQLiteJobQueue
+from crawler.usecase.crawl_jobs import CrawlJobWorker, DedupEnricher
+from crawler.usecase.fetch_papers import FetchRecSysPapers
+
+
+@pytest.fixture
+def semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(5)
+
+
+@pytest.fixture
+def queue(tmp_path: Path) -> SQLiteJobQueue:
+    return SQLiteJobQueue(tmp_path / "jobs.db")
+
+
+def make_papers(n: int, year: int = 2024) -> list[Paper]:
+    return [
+        Paper(title=f"P{i}", authors=[], year=year, venue="RecSys", doi=f"10.1145/{year}.{i}")
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def mock_retriever(mocker: MockerFixture) -> MagicMock:
+    repo = mocker.MagicMock()
+    repo.fetch_page = mocker.AsyncMock()
+    return repo
+
+
+def make_enricher(mocker: MockerFixture, field: str) -> MagicMock:
+    async def enrich(
+        papers: list[Paper], semaphore: asyncio.Semaphore, overwrite: bool = False
+    ) -> list[Paper]:
+        for p in papers:
+            setattr(p, field, f"{field}:{p.doi}")
+        return papers
+
+    repo = mocker.MagicMock()
+    repo.enrich_papers = mocker.AsyncMock(side_effect=enrich)
+    return repo
+
+
+async def test_run_retrieves_and_enriches_in_chain(
+    queue: SQLiteJobQueue,
+    mock_retriever: MagicMock,
+    semaphore: asyncio.Semaphore,
+    mocker: MockerFixture,
+) -> None:
+    """取得ジョブがバッチ単位の補完ジョブに分割され、チェーン順に適用されること"""
+    papers = [*make_papers(5), Paper(title="NoDOI", authors=[], year=2024, venue="RecSys")]
+    mock_retriever.fetch_page.return_value = PaperPage(papers=papers, hits=6, total=6)
+    s2 = make_enricher(mocker, "abstract")
+    unpaywall = make_enricher(mocker, "pdf_url")
+    emitted: list[Paper] = []
+
+    async def on_papers(papers: list[Paper]) -> None:
+        emitted.extend(papers)
+
+    worker = CrawlJobWorker(
+        queue,
+        paper_retriever=mock_retriever,
+        paper_enrichers={"s2": s2, "unpaywall": unpaywall},
+        enrich_batch_size=2,
+        on_papers=on_papers,
+    )
+    assert await worker.enqueue_retrieval("recsys", [2024], page_size=10) == 1
+
+    processed = await worker.run(semaphore, concurrency=2)
+
+    # 1 retrieve + 3 batches * 2 enrichers
+    assert processed == 7
+    mock_retriever.fetch_page.assert_awaited_once_with(
+        conf="recsys", year=2024, h=10, f=0, semaphore=semaphore
+    )
+    assert s2.enrich_papers.await_count == 3
+    assert unpaywall.enrich_papers.await_count == 3
+    assert sorted(p.title for p in emitted) == [f"P{i}" for i in range(5)]
+    assert all(p.abstract and p.pdf_url for p in emitted)
+    counts = await queue.counts()
+    assert counts[JobStatus.DONE] == 7
+
+
+async def test_full_page_enqueues_next_page(
+    queue: SQLiteJobQueue,
+    mock_retriever: MagicMock,
+    semaphore: asyncio.Semaphore,
+) -> None:
+    """ヒットの総数に達していない場合は次のページの取得ジョブが登録されること"""
+    # 1ページ目はパースできなかったヒットがあり、論文数はページサイズより少ない
+    mock_retriever.fetch_page.side_effect = [
+        PaperPage(papers=make_papers(1), offset=0, hits=2, total=3),
+        PaperPage(papers=make_papers(1), offset=2, hits=1, total=3),
+    ]
+    worker = CrawlJobWorker(queue, paper_retriever=mock_retriever, paper_enrichers={})
+    await worker.enqueue_retrieval("recsys", [2024], page_size=2)
+
+    await worker.run(semaphore)
+
+    offsets = [c.kwargs["f"] for c in mock_retriever.fetch_page.await_args_list]
+    assert offsets == [0, 2]
+
+
+async def test_failed_job_is_retried(
+    queue: SQLiteJobQueue,
+    mock_retriever: MagicMock,
+    semaphore: asyncio.Semaphore,
+) -> None:
+    """例外が発生したジョブは失敗として記録され、バックオフ後に再実行されること"""
+    mock_retriever.fetch_page.side_effect = RuntimeError("boom")
+    worker = CrawlJobWorker(queue, paper_retriever=mock_retriever, paper_enrichers={})
+    await worker.enqueue_retrieval("recsys", [2024])
+    [job] = await queue.lease()
+
+    await worker.process(job, semaphore)
+
+    counts = await queue.counts()
+    assert counts[JobStatus.PENDING] == 1
+    assert counts[JobStatus.DONE] == 0
+
+
+async def test_enqueue_retrieval_prioritizes_newer_years(
+    queue: SQLiteJobQueue, mock_retriever: MagicMock
+) -> None:
+    worker = CrawlJobWorker(queue, paper_retriever=mock_retriever, paper_enrichers={})
+    await worker.enqueue_retrieval("recsys", range(2020, 2023))
+    # 再登録は無視される
+    assert await worker.enqueue_retrieval("recsys", range(2020, 2023)) == 0
+
+    jobs = await queue.lease(limit=3)
+
+    assert [j.payload["year"] for j in jobs] == [2022, 2021, 2020]
+
+
+async def test_enqueue_retrieval_with_priorities(
+    queue: SQLiteJobQueue, mock_retriever: MagicMock
+) -> None:
+    worker = CrawlJobWorker(queue, paper_retriever=mock_retriever, paper_enrichers={})
+    await worker.enqueue_retrieval(
+        "recsys", range(2020, 2023), priorities={2020: 3, 2021: 1, 2022: 2}
+    )
+
+    jobs = await queue.lease(limit=3)
+
+    assert [j.payload["year"] for j in jobs] == [2020, 2022, 2021]
+
+
+async def test_unfinished_units_are_prioritized(
+    queue: SQLiteJobQueue, mock_retriever: MagicMock
+) -> None:
+    """キューに残った取得ジョブの作業単位を返し、その優先度を変更できること"""
+    worker = CrawlJobWorker(queue, paper_retriever=mock_retriever, paper_enrichers={})
+    await worker.enqueue_retrieval("recsys", range(2020, 2023))
+    [done] = await queue.lease()
+    await queue.complete(done)
+
+    assert await worker.unfinished_units() == [("recsys", 2021), ("recsys", 2020)]
+    assert await worker.prioritize_units({("recsys", 2020): 5000, ("recsys", 2022): 5000}) == 1
+    assert await worker.unfinished_units() == [("recsys", 2020), ("recsys", 2021)]
+
+
+async def test_dedup_enricher_enriches_each_paper_once(
+    queue: SQLiteJobQueue,
+    mock_retriever: MagicMock,
+    semaphore: asyncio.Semaphore,
+    mocker: MockerFixture,
+) -> None:
+    """補完ジョブのバッチ内の同じ論文は1回だけ補完され、結果が全ての出現に反映されること"""
+    papers = [
+        *make_papers(2),
+        Paper(title="P0", authors=[], year=2024, venue="RecSys Workshop", doi="10.1145/2024.0"),
+    ]
+    mock_retriever.fetch_page.return_value = PaperPage(papers=papers, hits=3, total=3)
+    s2 = make_enricher(mocker, "abstract")
+    emitted: list[Paper] = []
+
+    async def on_papers(batch: list[Paper]) -> None:
+        emitted.extend(batch)
+
+    enricher = DedupEnricher(FetchRecSysPapers(mock_retriever, [s2]))
+    worker = CrawlJobWorker(
+        queue, mock_retriever, {"enrich": enricher}, on_papers=on_papers, poll_interval=0.01
+    )
+    await worker.enqueue_retrieval("recsys", [2024])
+    await worker.run(semaphore)
+
+    assert [p.doi for p in s2.enrich_papers.call_args.args[0]] == [
+        "10.1145/2024.0",
+        "10.1145/2024.1",
+    ]
+    assert len(emitted) == 3
+    assert all(p.abstract == f"abstract:{p.doi}" for p in emitted)
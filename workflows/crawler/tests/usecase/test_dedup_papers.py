@@ -0,0 +1,72 @@
+import pytest
+
+from crawler.domain.paper import Paper
+from crawler.usecase.dedup_papers import DeduplicatePapers, DedupMode
+
+
+def make_paper(title: str, doi: str | None, venue: str = "RecSys", year: int = 2024) -> Paper:
+    return Paper(title=title, authors=[], year=year, venue=venue, doi=doi)
+
+
+@pytest.mark.parametrize("mode", ["memory", "bloom"])
+def test_groups_papers_by_doi_and_title(mode: DedupMode) -> None:
+    papers = [
+        make_paper("Deep Learning for Recommender Systems", "10.1145/1"),
+        make_paper("Another Unrelated Paper Title", "10.1145/2"),
+        # 大文字小文字の違うDOI（別の年のストリーム）
+        make_paper("Deep learning for recommender systems", "10.1145/1", year=2025),
+        # DOIが異なりタイトルが同じジャーナル版
+        make_paper("Deep Learning for Recommender Systems.", "10.1145/3", venue="TORS"),
+        # 短いタイトルはタイトルでは比較しない
+        make_paper("Keynote", "10.1145/4"),
+        make_paper("Keynote", "10.1145/5"),
+    ]
+
+    groups = DeduplicatePapers(mode).execute(papers)
+
+    assert [[p.doi for p in group] for group in groups.groups] == [
+        ["10.1145/1", "10.1145/1", "10.1145/3"],
+        ["10.1145/2"],
+        ["10.1145/4"],
+        ["10.1145/5"],
+    ]
+    assert groups.unique == [papers[0], papers[1], papers[4], papers[5]]
+    assert groups.num_duplicates == 2
+
+
+def test_title_match_merges_groups_joined_by_doi() -> None:
+    papers = [
+        make_paper("Workshop Version Of The Paper", "10.1/a"),
+        make_paper("Journal Version Of The Paper", "10.1/b"),
+        # DOIは1件目と、タイトルは2件目と一致する
+        make_paper("Journal Version Of The Paper", "10.1/A"),
+    ]
+    groups = DeduplicatePapers().execute(papers)
+    assert groups.groups == [papers]
+
+
+def test_fan_out_copies_enrichment_to_duplicates() -> None:
+    papers = [
+        make_paper("Deep Learning for Recommender Systems", "10.1145/1"),
+        make_paper("Deep Learning for Recommender Systems", "10.1145/1", year=2025),
+    ]
+    papers[1].pdf_url = "https://known/1.pdf"
+
+    groups = DeduplicatePapers().execute(papers)
+    # 代表の論文には重複した論文が既に持っている情報をまとめる
+    assert papers[0].pdf_url == "https://known/1.pdf"
+
+    papers[0].abstract = "Abstract"
+    papers[0].add_pdf_urls(["https://s2/1.pdf"])
+    groups.fan_out()
+
+    assert papers[1].abstract == "Abstract"
+    assert papers[1].pdf_url == "https://known/1.pdf"
+    assert papers[1].pdf_url_candidates == ["https://s2/1.pdf"]
+
+
+def test_off_keeps_every_paper() -> None:
+    papers = [make_paper("Same Title For Both Papers", "10.1/a") for _ in range(2)]
+    groups = DeduplicatePapers("off").execute(papers)
+    assert groups.unique == papers
+    assert groups.num_duplicates == 0
@@ -0,0 +1,124 @@
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+
+import pytest
+from aiolimiter import AsyncLimiter
+from pytest_mock import MockerFixture
+
+from crawler.configs.plan import PaperPlan
+from crawler.domain.paper import Paper
+from crawler.repository.arxiv_repository import ArxivRepository
+from crawler.repository.negative_cache import NegativeCache
+from crawler.repository.paper_store import PaperStore
+from crawler.usecase.estimate_requests import EstimateRequests, venue_conference
+from crawler.usecase.fetch_papers import FetchRecSysPapers
+
+
+def make_paper(i: int, venue: str = "RecSys", year: int = 2023) -> Paper:
+    return Paper(
+        title=f"Paper {i}", authors=["A"], year=year, venue=venue, doi=f"10.1145/{venue}.{i}"
+    )
+
+
+@pytest.fixture
+async def paper_store(tmp_path: Path) -> AsyncIterator[PaperStore]:
+    async with PaperStore(tmp_path / "papers.db") as store:
+        await store.write_papers([make_paper(i) for i in range(10)])
+        await store.write_papers([make_paper(i, venue="KDD") for i in range(4)])
+        await store.flush()
+        yield store
+
+
+@pytest.fixture
+def negative_cache(tmp_path: Path) -> Iterator[NegativeCache]:
+    cache = NegativeCache(tmp_path / "negative_cache.db")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def limiters() -> dict[str, AsyncLimiter]:
+    return {
+        "dblp": AsyncLimiter(1, 1),
+        "semantic_scholar": AsyncLimiter(1, 1),
+        "unpaywall": AsyncLimiter(10, 1),
+        "arxiv": AsyncLimiter(1, 3),
+    }
+
+
+def test_venue_conference() -> None:
+    assert venue_conference("RecSys") == "recsys"
+    assert venue_conference("WWW (Companion Volume)") == "www"
+
+
+async def test_execute_counts_requests_per_service(
+    paper_store: PaperStore, negative_cache: NegativeCache, limiters: dict[str, AsyncLimiter]
+) -> None:
+    # arXivのDOI検索が0件だった論文を記録しておく
+    lookup = await negative_cache.lookup(ArxivRepository.NEGATIVE_CACHE_SOURCE, [])
+    for query in ArxivRepository.search_queries(make_paper(0))[:1]:
+        lookup.add_miss(query)
+    await negative_cache.update(lookup)
+
+    plan = PaperPlan(
+        conferences=["recsys"],
+        years=(2023, 2023),
+        enrichers=["semantic_scholar", "unpaywall", "arxiv"],
+    )
+    estimate = await EstimateRequests(paper_store, negative_cache, limiters).execute({"p": plan})
+
+    assert estimate.units == 1
+    assert estimate.papers == 10
+    assert estimate.assumed == []
+    services = estimate.services
+    assert services["dblp"].requests == 1
+    assert services["semantic_scholar"].requests == 1
+    assert services["unpaywall"].requests == 10
+    # DOI検索とタイトル検索の上限から、キャッシュ済みのクエリを除く
+    assert services["arxiv"].items == 20
+    assert services["arxiv"].requests == 19
+    assert services["arxiv"].cache_hit_rate == pytest.approx(0.05)
+    assert services["arxiv"].seconds == pytest.approx(57)
+    assert estimate.bottleneck is not None
+    assert estimate.bottleneck.service == "arxiv"
+    assert estimate.seconds == pytest.approx(1 + 1 + 1 + 57)
+
+
+async def test_execute_assumes_papers_for_new_units(
+    paper_store: PaperStore, negative_cache: NegativeCache, limiters: dict[str, AsyncLimiter]
+) -> None:
+    plan = PaperPlan(conferences=["recsys", "kdd"], years=(2023, 2024), enrichers=["unpaywall"])
+    estimate = await EstimateRequests(paper_store, negative_cache, limiters).execute({"p": plan})
+
+    # 2024年は実績がないため、実績のある作業単位の中央値（10件と4件）を仮定する
+    assert estimate.units == 4
+    assert estimate.assumed == ["p: recsys 2024", "p: kdd 2024"]
+    assert estimate.papers == 14 + 2 * 7
+    assert estimate.services["dblp"].requests == 4
+    assert estimate.services["unpaywall"].requests == 28
+    assert estimate.services["semantic_scholar"].requests == 0
+
+
+async def test_execute_defaults_without_history(limiters: dict[str, AsyncLimiter]) -> None:
+    plan = PaperPlan(conferences=["wsdm"], years=(2024, 2024), enrichers=["semantic_scholar"])
+    estimate = await EstimateRequests(None, None, limiters).execute({"p": plan})
+
+    assert estimate.papers == EstimateRequests.DEFAULT_PAPERS_PER_UNIT
+    assert estimate.services["semantic_scholar"].requests == 1
+
+
+async def test_execute_counts_dblp_pages(
+    paper_store: PaperStore,
+    negative_cache: NegativeCache,
+    limiters: dict[str, AsyncLimiter],
+    mocker: MockerFixture,
+) -> None:
+    """DBLPのリクエスト数を、作業単位ごとの論文一覧のページ数で見積もること"""
+    mocker.patch.object(FetchRecSysPapers, "DBLP_PAGE_SIZE", 4)
+    plan = PaperPlan(conferences=["recsys", "kdd"], years=(2023, 2023), enrichers=[])
+
+    estimate = await EstimateRequests(paper_store, negative_cache, limiters).execute({"p": plan})
+
+    # RecSysの10件は3ページ、KDDの4件は1ページ
+    assert estimate.services["dblp"].requests == 4
+    assert estimate.warnings == []
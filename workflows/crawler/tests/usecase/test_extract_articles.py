@@ -0,0 +1,70 @@
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from crawler.domain.web_page import WebPage
+from crawler.repository.paper_store import PaperStore
+from crawler.usecase.extract_articles import ExtractArticles
+
+
+@pytest.fixture
+async def store(tmp_path: Path) -> AsyncIterator[PaperStore]:
+    async with PaperStore(tmp_path / "papers.db") as store:
+        yield store
+
+
+def page(url: str, body: str, status_code: int = 200) -> WebPage:
+    return WebPage(url=url, text=body, status_code=status_code, site="blog")
+
+
+async def test_extract_and_skip_unchanged(store: PaperStore) -> None:
+    """ワーカープロセスで抽出した記事が保存され、HTMLが変わっていないページは再抽出しないこと"""
+    usecase = ExtractArticles(store, max_workers=2)
+    try:
+        pages = [
+            page("https://blog.example.com/a", "<article><h1>A</h1><p>alpha</p></article>"),
+            page("https://blog.example.com/b", "<p>beta</p>"),
+            page("https://blog.example.com/c", "", status_code=304),
+        ]
+        assert await usecase.execute(pages) == 2
+        await store.flush()
+
+        article = await store.get_article("https://blog.example.com/a")
+        assert article is not None
+        assert article.title == "A"
+        assert article.text == "A\n\nalpha"
+        assert article.site == "blog"
+        assert usecase.throughput > 0
+
+        # 内容が同じページはスキップし、変わったページだけを再抽出する
+        pages[1] = page("https://blog.example.com/b", "<p>beta v2</p>")
+        await usecase.write_pages(pages)
+        await store.flush()
+        updated = await store.get_article("https://blog.example.com/b")
+        assert updated is not None
+        assert updated.text == "beta v2"
+        assert await usecase.execute(pages) == 0
+    finally:
+        usecase.close()
+
+
+async def test_timeout_is_not_saved(store: PaperStore, mocker: MockerFixture) -> None:
+    """タイムアウトした抽出はワーカーを終了させ、結果を保存しないこと（次回に再抽出する）"""
+    usecase = ExtractArticles(store, max_workers=1, timeout=0.05)
+    executor = ThreadPoolExecutor(max_workers=1)
+    mocker.patch.object(usecase, "_get_executor", return_value=executor)
+    reset = mocker.patch.object(usecase, "_reset_executor")
+    mocker.patch(
+        "crawler.usecase.extract_articles.extract_article", side_effect=lambda _: time.sleep(0.5)
+    )
+    try:
+        assert await usecase.execute([page("https://blog.example.com/a", "<p>a</p>")]) == 0
+        await store.flush()
+        assert await store.get_article("https://blog.example.com/a") is None
+        reset.assert_called_once_with(executor)
+    finally:
+        executor.shutdown()
@@ -0,0 +1,87 @@
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from crawler.domain.pdf import PdfFile
+from crawler.repository.paper_store import PaperStore
+from crawler.usecase.extract_pdf_texts import ExtractPdfTexts
+from crawler.utils.pdf_text import ExtractionTimeoutError
+
+
+@pytest.fixture
+async def store(tmp_path: Path) -> AsyncIterator[PaperStore]:
+    async with PaperStore(tmp_path / "papers.db") as store:
+        yield store
+
+
+def pdf_file(path: Path, sha256: str) -> PdfFile:
+    return PdfFile(url=f"https://example.com/{path.name}", sha256=sha256, path=path, size=1)
+
+
+async def test_extract_and_skip_processed(
+    store: PaperStore, tmp_path: Path, make_pdf: Callable[[str, list[str]], Path]
+) -> None:
+    """ワーカープロセスで抽出した結果が保存され、処理済みのPDFはスキップされること"""
+    shared = make_pdf("shared.pdf", ["Shared", "PDF"])
+    other = make_pdf("other.pdf", ["Other"])
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.4\nbroken")
+    pdfs = {
+        "10.1/a": pdf_file(shared, "sha-shared"),
+        "10.1/b": pdf_file(shared, "sha-shared"),
+        "10.1/c": pdf_file(other, "sha-other"),
+        "10.1/d": pdf_file(broken, "sha-broken"),
+    }
+
+    usecase = ExtractPdfTexts(store, max_workers=2, timeout=30)
+    try:
+        assert await usecase.execute(pdfs) == 3
+        await store.flush()
+
+        text = await store.get_paper_text("10.1/b")
+        assert text is not None
+        assert text.text == "Shared\nPDF"
+        assert text.page_offsets == [0, 7]
+        assert text.dois == ["10.1/a", "10.1/b"]
+
+        failed = await store.get_pdf_text("sha-broken")
+        assert failed is not None
+        assert failed.error is not None
+
+        # 2回目は全て処理済みのためワーカーに投入されない
+        assert await usecase.execute(pdfs) == 0
+    finally:
+        usecase.close()
+
+
+async def test_transient_failures_are_retried_next_run(
+    store: PaperStore,
+    tmp_path: Path,
+    make_pdf: Callable[[str, list[str]], Path],
+    mocker: MockerFixture,
+) -> None:
+    """タイムアウトした抽出は保存せず、次回の実行で再試行すること"""
+    pdfs = {"10.1/a": pdf_file(make_pdf("a.pdf", ["A"]), "sha-a")}
+    usecase = ExtractPdfTexts(store, max_workers=1, timeout=1)
+    executor = ThreadPoolExecutor(max_workers=1)
+    mocker.patch.object(usecase, "_get_executor", mocker.AsyncMock(return_value=executor))
+    extract = mocker.patch(
+        "crawler.usecase.extract_pdf_texts.extract_text", side_effect=ExtractionTimeoutError()
+    )
+    try:
+        assert await usecase.execute(pdfs) == 0
+        await store.flush()
+        assert await store.get_pdf_text("sha-a") is None
+
+        extract.side_effect = None
+        extract.return_value = ("A", [0])
+        assert await usecase.execute(pdfs) == 1
+        await store.flush()
+        text = await store.get_pdf_text("sha-a")
+        assert text is not None
+        assert text.text == "A"
+    finally:
+        executor.shutdown()
@@ -1,11 +1,17 @@
 import asyncio
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
+from aiolimiter import AsyncLimiter
 from pytest_mock import MockerFixture
 
-from crawler.domain.paper import Paper
-from crawler.usecase.fetch_papers import FetchRecSysPapers
+from crawler.domain.enrichment import EnricherStats
+from crawler.domain.paper import Paper, PaperPage
+from crawler.repository.enricher_stats_store import EnricherStatsStore
+from crawler.usecase.fetch_papers import FetchRecSysPapers, order_enrichers
+from crawler.utils.deadline import Deadline
+from tests.conftest import FakeClock
 
 
 @pytest.fixture
@@ -16,7 +22,7 @@ def semaphore() -> asyncio.Semaphore:
 @pytest.fixture
 def mock_dblp_repo(mocker: MockerFixture) -> MagicMock:
     repo = mocker.MagicMock()
-    repo.fetch_papers = mocker.AsyncMock()
+    repo.fetch_page = mocker.AsyncMock()
     return repo
 
 
@@ -62,7 +68,9 @@ async def test_execute_flow(
         ),
         Paper(title="P2", authors=[], year=2024, venue="RecSys", doi=None),  # No DOI
     ]
-    mock_dblp_repo.fetch_papers.return_value = initial_papers
+    mock_dblp_repo.fetch_page.return_value = PaperPage(
+        papers=initial_papers, offset=0, hits=2, total=2
+    )
 
     # 2. Enrich後の期待値 (モックが加工するわけではないが、フローの確認)
     # S2 Enrichment
@@ -93,8 +101,8 @@ async def test_execute_flow(
     # 検証
 
     # 1. DBLP Fetch (conf="recsys", year=2024, h=1000)
-    mock_dblp_repo.fetch_papers.assert_called_once_with(
-        conf="recsys", year=2024, h=1000, semaphore=semaphore
+    mock_dblp_repo.fetch_page.assert_called_once_with(
+        conf="recsys", year=2024, h=1000, f=0, semaphore=semaphore
     )
 
     # 中間でDOIがない論文はフィルタリングされるべき (main.pyのロジックを踏襲)
@@ -118,3 +126,204 @@ async def test_execute_flow(
 
     # Result should be the final enriched papers
     assert result == arxiv_enriched
+
+
+async def test_fetch_follows_pages(mock_dblp_repo: MagicMock, semaphore: asyncio.Semaphore) -> None:
+    """1ページに収まらない論文一覧は、ヒット数が総数に達するまでページを辿ること"""
+
+    def paper(i: int) -> Paper:
+        return Paper(title=f"P{i}", authors=[], year=2024, venue="RecSys", doi=f"10.1/{i}")
+
+    # 2ページ目はパースできなかったヒットを含むため、論文数はヒット数より少ない
+    mock_dblp_repo.fetch_page.side_effect = [
+        PaperPage(papers=[paper(0), paper(1)], offset=0, hits=2, total=5),
+        PaperPage(papers=[paper(2)], offset=2, hits=2, total=5),
+        PaperPage(papers=[paper(4)], offset=4, hits=1, total=5),
+    ]
+    usecase = FetchRecSysPapers(paper_retriever=mock_dblp_repo, paper_enrichers=[])
+    usecase.DBLP_PAGE_SIZE = 2
+
+    papers = await usecase.fetch(2024, semaphore)
+
+    assert [p.title for p in papers] == ["P0", "P1", "P2", "P4"]
+    assert [call.kwargs["f"] for call in mock_dblp_repo.fetch_page.call_args_list] == [0, 2, 4]
+
+
+class FakeEnricher:
+    """`MeteredPaperEnricher` を満たす、指定した項目を埋めるEnricher。"""
+
+    def __init__(self, fields: tuple[str, ...], fills: set[str], calls: list[str]) -> None:
+        self.FILLED_FIELDS = fields
+        self.requests = 0
+        self.limiter = AsyncLimiter(1000, 1)
+        self.fills = fills
+        self.calls = calls
+        self.received: list[list[str]] = []
+
+    async def enrich_papers(
+        self, papers: list[Paper], semaphore: asyncio.Semaphore, overwrite: bool = False
+    ) -> list[Paper]:
+        self.calls.append(self.__class__.__name__)
+        self.received.append([p.title for p in papers])
+        for paper in papers:
+            self.requests += 1
+            if paper.title in self.fills:
+                for field in self.FILLED_FIELDS:
+                    if not getattr(paper, field):
+                        setattr(paper, field, f"{field} of {paper.title}")
+        return papers
+
+
+class SlowEnricher(FakeEnricher):
+    pass
+
+
+class FastEnricher(FakeEnricher):
+    pass
+
+
+class LinkChecker:
+    def __init__(self, calls: list[str]) -> None:
+        self.calls = calls
+
+    async def enrich_papers(
+        self, papers: list[Paper], semaphore: asyncio.Semaphore, overwrite: bool = False
+    ) -> list[Paper]:
+        self.calls.append("LinkChecker")
+        return papers
+
+
+def test_order_enrichers_prefers_fields_per_second() -> None:
+    calls: list[str] = []
+    slow = SlowEnricher(("abstract",), set(), calls)
+    fast = FastEnricher(("pdf_url",), set(), calls)
+    checker = LinkChecker(calls)
+    history = [
+        EnricherStats(enricher="SlowEnricher", venue="RecSys", year=2024, seconds=10, filled=5),
+        EnricherStats(enricher="FastEnricher", venue="RecSys", year=2024, seconds=1, filled=5),
+        # 他の年の実績は、同じ年の実績がある場合は使わない
+        EnricherStats(enricher="SlowEnricher", venue="RecSys", year=2023, seconds=1, filled=100),
+    ]
+
+    assert order_enrichers([slow, fast, checker], history, {("RecSys", 2024)}) == [
+        fast,
+        slow,
+        checker,
+    ]
+    # 同じ年の実績がなければ同じ掲載会場の実績を使う
+    assert order_enrichers([slow, fast, checker], history, {("RecSys", 2025)}) == [
+        slow,
+        fast,
+        checker,
+    ]
+    # 実績のないEnricherは先に実行し、同じ評価の場合は設定の順序を保つ
+    assert order_enrichers([fast, slow], [], {("KDD", 2024)}) == [fast, slow]
+    assert order_enrichers([fast, slow], history[:1], {("RecSys", 2024)}) == [fast, slow]
+
+
+async def test_enrich_passes_residue_and_records_stats(
+    tmp_path: Path, mock_dblp_repo: MagicMock, semaphore: asyncio.Semaphore
+) -> None:
+    papers = [
+        Paper(title="A", authors=[], year=2024, venue="RecSys", doi="10.1/a"),
+        Paper(title="B", authors=[], year=2024, venue="RecSys", doi="10.1/b"),
+        Paper(title="C", authors=[], year=2023, venue="RecSys", doi="10.1/c", pdf_url="x"),
+    ]
+    calls: list[str] = []
+    fast = FastEnricher(("pdf_url",), {"A"}, calls)
+    slow = SlowEnricher(("abstract", "pdf_url"), {"B"}, calls)
+    checker = LinkChecker(calls)
+    store = EnricherStatsStore(tmp_path / "stats.db")
+    try:
+        usecase = FetchRecSysPapers(mock_dblp_repo, [fast, slow, checker], stats_store=store)
+        await usecase.enrich(papers, semaphore)
+
+        assert calls == ["FastEnricher", "SlowEnricher", "LinkChecker"]
+        # PDFリンクが既にある論文はPDFリンクだけを補完するEnricherに渡さない
+        assert fast.received == [["A", "B"]]
+        assert slow.received == [["A", "B", "C"]]
+        assert papers[1].abstract == "abstract of B"
+
+        stats = {(s.enricher, s.year): s for s in store.load()}
+        assert stats[("FastEnricher", 2024)].filled == 1
+        assert stats[("FastEnricher", 2024)].requests == 2
+        assert ("FastEnricher", 2023) not in stats
+        assert stats[("SlowEnricher", 2024)].filled == 2
+        assert stats[("SlowEnricher", 2023)].papers == 1
+
+        # 全ての項目が埋まった論文は渡さず、対象がなければ実行しない
+        papers[0].abstract = "abstract"
+        papers[2].abstract = "abstract"
+        fast.received.clear()
+        slow.received.clear()
+        await usecase.enrich(papers, semaphore)
+        assert fast.received == []
+        assert slow.received == []
+    finally:
+        store.close()
+
+
+async def test_enrich_defers_papers_beyond_time_budget(
+    tmp_path: Path, mock_dblp_repo: MagicMock, semaphore: asyncio.Semaphore, clock: FakeClock
+) -> None:
+    papers = [Paper(title=t, authors=[], year=2024, venue="RecSys", doi=f"10.1/{t}") for t in "ABC"]
+    calls: list[str] = []
+    fast = FastEnricher(("pdf_url",), set(), calls)
+    slow = SlowEnricher(("abstract",), set(), calls)
+    store = EnricherStatsStore(tmp_path / "stats.db")
+    # FastEnricherは論文1件に1秒かかる。SlowEnricherは実績がないため見積もれない
+    store.add(
+        [EnricherStats(enricher="FastEnricher", venue="RecSys", year=2024, papers=10, seconds=10)]
+    )
+    deadline = Deadline(2.5, clock=clock)
+    try:
+        usecase = FetchRecSysPapers(mock_dblp_repo, [fast, slow], stats_store=store)
+        await usecase.enrich(papers, semaphore, deadline)
+        assert fast.received == [["A", "B"]]
+        assert slow.received == [["A", "B", "C"]]
+        assert [p.title for p in usecase.deferred] == ["C"]
+
+        # 締め切りを過ぎたら、どのEnricherにも論文を渡さない
+        clock.now += 3
+        fast.received.clear()
+        slow.received.clear()
+        await usecase.enrich(papers, semaphore, deadline)
+        assert fast.received == []
+        assert slow.received == []
+        assert [p.title for p in usecase.deferred] == ["A", "B", "C"]
+    finally:
+        store.close()
+
+
+async def test_enrich_stops_at_deadline(
+    mock_dblp_repo: MagicMock, semaphore: asyncio.Semaphore
+) -> None:
+    papers = [Paper(title="A", authors=[], year=2024, venue="RecSys", doi="10.1/a")]
+
+    class HangingEnricher:
+        async def enrich_papers(
+            self, papers: list[Paper], semaphore: asyncio.Semaphore, overwrite: bool = False
+        ) -> list[Paper]:
+            await asyncio.sleep(10)
+            return papers
+
+    usecase = FetchRecSysPapers(mock_dblp_repo, [HangingEnricher()])
+    assert await usecase.enrich(papers, semaphore, Deadline(0.01)) == papers
+    assert usecase.deferred == papers
+
+
+async def test_enrich_raises_timeout_without_deadline(
+    mock_dblp_repo: MagicMock, semaphore: asyncio.Semaphore
+) -> None:
+    """締め切りがない場合、Enricherのタイムアウトを持ち越しとして扱わずに送出すること"""
+    papers = [Paper(title="A", authors=[], year=2024, venue="RecSys", doi="10.1/a")]
+
+    class TimingOutEnricher:
+        async def enrich_papers(
+            self, papers: list[Paper], semaphore: asyncio.Semaphore, overwrite: bool = False
+        ) -> list[Paper]:
+            raise TimeoutError
+
+    usecase = FetchRecSysPapers(mock_dblp_repo, [TimingOutEnricher()])
+    with pytest.raises(TimeoutError):
+        await usecase.enrich(papers, semaphore)
@@ -0,0 +1,52 @@
+import asyncio
+
+from pytest_mock import MockerFixture
+
+from crawler.configs.sites import SiteConfig
+from crawler.domain.feed import FeedEntry
+from crawler.repository.feed_repository import FeedRepository
+from crawler.usecase.poll_feeds import PollFeeds
+
+
+async def test_polls_only_due_feeds(mocker: MockerFixture) -> None:
+    repo = mocker.Mock(spec=FeedRepository)
+    repo.is_due = mocker.AsyncMock(side_effect=lambda url: url != "https://b.example/feed")
+    repo.poll = mocker.AsyncMock(
+        side_effect=lambda url, sem, site: (
+            None if url == "https://c.example/feed" else [FeedEntry(url="https://a.example/1")]
+        )
+    )
+    sites = [
+        SiteConfig(name="a", feed_urls=["https://a.example/feed"]),
+        SiteConfig(name="b", feed_urls=["https://b.example/feed", "https://c.example/feed"]),
+        SiteConfig(name="d", sitemap_url="https://d.example/sitemap.xml"),
+    ]
+
+    entries = await PollFeeds(repo).execute(sites, asyncio.Semaphore(5))
+
+    assert entries == [FeedEntry(url="https://a.example/1")]
+    polled = sorted(call.args[0] for call in repo.poll.call_args_list)
+    assert polled == ["https://a.example/feed", "https://c.example/feed"]
+
+
+async def test_entries_are_passed_per_feed(mocker: MockerFixture) -> None:
+    """フィードごとに取得した記事をすぐにon_entriesへ渡すこと"""
+    repo = mocker.Mock(spec=FeedRepository)
+    repo.is_due = mocker.AsyncMock(return_value=True)
+    repo.poll = mocker.AsyncMock(
+        side_effect=lambda url, sem, site: (
+            [] if site == "b" else [FeedEntry(url=url.replace("feed", "1"))]
+        )
+    )
+    sites = [
+        SiteConfig(name="a", feed_urls=["https://a.example/feed"]),
+        SiteConfig(name="b", feed_urls=["https://b.example/feed"]),
+    ]
+    received: list[list[FeedEntry]] = []
+
+    async def on_entries(entries: list[FeedEntry]) -> None:
+        received.append(entries)
+
+    await PollFeeds(repo).execute(sites, asyncio.Semaphore(5), on_entries=on_entries)
+
+    assert received == [[FeedEntry(url="https://a.example/1")]]
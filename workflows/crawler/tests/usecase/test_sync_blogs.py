@@ -0,0 +1,125 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+
+from crawler.configs.sites import SiteConfig, load_sites
+from crawler.domain.web_page import WebPage
+from crawler.repository.crawl_state_store import CrawlStateStore
+from crawler.repository.sitemap_repository import SitemapRepository
+from crawler.repository.web_page_repository import WebPageRepository
+from crawler.usecase.sync_blogs import SyncBlogSitemaps
+from crawler.utils.host_limiter import HostLimiters
+from crawler.utils.robots import RobotsRegistry
+
+BASE = "https://blog.example.com"
+SITEMAP = f"""<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>{BASE}/a</loc><lastmod>2024-01-01</lastmod></url>
+<url><loc>{BASE}/b</loc><lastmod>2024-01-02</lastmod></url>
+<url><loc>{BASE}/broken</loc><lastmod>2024-01-03</lastmod></url>
+</urlset>"""
+
+
+class BlogServer:
+    def __init__(self) -> None:
+        self.sitemap = SITEMAP
+        self.page_requests: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/robots.txt":
+            return httpx.Response(200, text=f"Sitemap: {BASE}/sitemap.xml\n")
+        if path == "/sitemap.xml":
+            return httpx.Response(200, text=self.sitemap)
+        self.page_requests.append(path)
+        if path == "/broken":
+            return httpx.Response(500)
+        if request.headers.get("If-None-Match") == f'"{path}"':
+            return httpx.Response(304, headers={"ETag": f'"{path}"'})
+        return httpx.Response(
+            200,
+            text=f"<html>{path}</html>",
+            headers={"Content-Type": "text/html; charset=utf-8", "ETag": f'"{path}"'},
+        )
+
+
+class ListSink:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.pages: list[WebPage] = []
+
+    async def write_pages(self, pages: list[WebPage]) -> None:
+        if self.fail:
+            raise RuntimeError("boom")
+        self.pages.extend(pages)
+
+
+def make_usecase(
+    tmp_path: Path, server: BlogServer, sinks: list[ListSink] | None = None
+) -> SyncBlogSitemaps:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    store = CrawlStateStore(tmp_path / "state.db")
+    host_limiters = HostLimiters(default_max_rate=100)
+    robots = RobotsRegistry()
+    return SyncBlogSitemaps(
+        SitemapRepository(client, store, host_limiters=host_limiters, robots=robots),
+        WebPageRepository(client, host_limiters=host_limiters, robots=robots),
+        store,
+        sinks=sinks or [],
+    )
+
+
+async def test_sync_fetches_only_changed_pages(tmp_path: Path) -> None:
+    server = BlogServer()
+    usecase = make_usecase(tmp_path, server)
+    # sitemap_urlがない場合はrobots.txtに記載されたサイトマップを使う
+    sites = [SiteConfig(name="blog", start_urls=[BASE])]
+    sem = asyncio.Semaphore(5)
+
+    pages = await usecase.execute(sites, sem)
+    assert sorted(p.url for p in pages) == [f"{BASE}/a", f"{BASE}/b"]
+    assert {p.site for p in pages} == {"blog"}
+
+    # 2回目は取得に失敗したページだけを再取得する
+    server.page_requests.clear()
+    assert await usecase.execute(sites, sem) == []
+    assert server.page_requests == ["/broken"]
+
+    # 更新日時が変わったページは条件付きGETで取得し、304なら結果に含めない
+    server.sitemap = SITEMAP.replace(
+        f"{BASE}/a</loc><lastmod>2024-01-01", f"{BASE}/a</loc><lastmod>2024-02-01"
+    )
+    server.page_requests.clear()
+    assert await usecase.execute(sites, sem) == []
+    assert sorted(server.page_requests) == ["/a", "/broken"]
+
+
+async def test_pages_are_synced_only_after_sinks(tmp_path: Path) -> None:
+    """シンクへの書き込みに失敗したサイトの記事は取得済みにせず、次回の実行で再取得すること"""
+    server = BlogServer()
+    sink = ListSink(fail=True)
+    usecase = make_usecase(tmp_path, server, sinks=[sink])
+    sites = [SiteConfig(name="blog", sitemap_url=f"{BASE}/sitemap.xml")]
+    sem = asyncio.Semaphore(5)
+
+    with pytest.raises(RuntimeError):
+        await usecase.execute(sites, sem)
+
+    sink.fail = False
+    pages = await usecase.execute(sites, sem)
+    assert sorted(p.url for p in sink.pages) == sorted(p.url for p in pages)
+    assert sorted(p.url for p in pages) == [f"{BASE}/a", f"{BASE}/b"]
+
+
+def test_load_sites(tmp_path: Path) -> None:
+    path = tmp_path / "config.toml"
+    path.write_text(
+        '[sites.netflix]\nsitemap_url = "https://netflixtechblog.com/sitemap.xml"\n\n'
+        "[sites.arxiv]\nstart_urls = []\n"
+    )
+
+    sites = load_sites(path)
+
+    assert sites["netflix"].sitemap_url == "https://netflixtechblog.com/sitemap.xml"
+    assert sites["arxiv"] == SiteConfig(name="arxiv")
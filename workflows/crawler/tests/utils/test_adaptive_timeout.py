@@ -0,0 +1,78 @@
+import httpx
+import pytest
+
+from crawler.utils.adaptive_timeout import AdaptiveTimeouts, AdaptiveTimeoutTransport, percentile
+from crawler.utils.http_client import create_http_client
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_percentile() -> None:
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([3.0], 0.99) == 3.0
+
+
+def test_read_timeout_follows_latency_within_bounds() -> None:
+    timeouts = AdaptiveTimeouts(
+        multiplier=3.0, min_read_timeout=2.0, max_read_timeout=30.0, min_samples=20
+    )
+    for _ in range(19):
+        timeouts.record("api.example.com", 1.0)
+    # サンプルが少ない間はクライアントの既定値を使う
+    assert timeouts.read_timeout("api.example.com") is None
+
+    timeouts.record("api.example.com", 1.0)
+    assert timeouts.read_timeout("api.example.com") == 3.0
+    assert timeouts.read_timeout("other.example.com") is None
+
+    fast = AdaptiveTimeouts(min_samples=1)
+    fast.record("fast.example.com", 0.01)
+    assert fast.read_timeout("fast.example.com") == fast.min_read_timeout
+    fast.record("slow.example.com", 60.0)
+    assert fast.read_timeout("slow.example.com") == fast.max_read_timeout
+
+
+async def test_transport_applies_per_host_read_timeout() -> None:
+    clock = Clock()
+    timeouts = AdaptiveTimeouts(min_samples=5)
+    sent: list[dict[str, float | None]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(dict(request.extensions["timeout"]))
+        clock.now += 0.5
+        return httpx.Response(200)
+
+    transport = AdaptiveTimeoutTransport(httpx.MockTransport(handler), timeouts, clock=clock)
+    async with httpx.AsyncClient(
+        transport=transport, timeout=httpx.Timeout(30.0, connect=5.0)
+    ) as client:
+        for _ in range(5):
+            await client.get("https://api.example.com/a")
+        await client.get("https://api.example.com/a")
+        # 個別に指定したより短いタイムアウトはそのまま使う
+        await client.get("https://api.example.com/a", timeout=1.0)
+        await client.get("https://other.example.com/a")
+
+    assert sent[0]["read"] == 30.0
+    assert sent[5] == {"connect": 5.0, "read": 2.0, "write": 2.0, "pool": 30.0}
+    assert sent[6]["read"] == 1.0
+    assert sent[7]["read"] == 30.0
+    stats = timeouts.stats()["api.example.com"]
+    assert stats.samples == 7
+    assert stats.p99 == pytest.approx(0.5)
+
+
+async def test_create_http_client_with_separate_connect_timeout() -> None:
+    async with create_http_client(
+        timeout=30.0, connect_timeout=5.0, adaptive_timeouts=AdaptiveTimeouts()
+    ) as client:
+        assert client.timeout.connect == 5.0
+        assert client.timeout.read == 30.0
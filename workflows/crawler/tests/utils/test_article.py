@@ -0,0 +1,58 @@
+from crawler.utils.article import extract_article
+
+HTML = """<!DOCTYPE html>
+<html><head>
+<title>記事タイトル | Example Tech Blog</title>
+<meta property="og:title" content="記事タイトル">
+<script type="application/ld+json">
+{"@type": "BlogPosting", "datePublished": "2024-03-01T10:00:00+09:00"}
+</script>
+<script>var tracking = "ignored";</script>
+<style>body { color: red; }</style>
+</head>
+<body>
+<header><nav><a href="/">Home</a> <a href="/about">About</a></nav></header>
+<div class="sidebar"><a href="/1">Related 1</a> <a href="/2">Related 2</a></div>
+<article>
+  <h1>記事タイトル</h1>
+  <p>推薦システムの
+     <a href="/x">評価</a>について説明します。</p>
+  <pre><code>def f(x):
+    return x &lt; 1
+</code></pre>
+  <ul class="share"><li><a href="/share/x">X</a></li><li><a href="/share/fb">Facebook</a></li></ul>
+  <p>まとめです。</p>
+</article>
+<footer>Copyright</footer>
+</body></html>
+"""
+
+
+def test_extract_article() -> None:
+    """定型部分を除いた本文とメタデータを抽出すること"""
+    content = extract_article(HTML)
+
+    assert content.title == "記事タイトル"
+    assert content.published == "2024-03-01T01:00:00+00:00"
+    assert content.code_blocks == ["def f(x):\n    return x < 1"]
+    assert content.text == (
+        "記事タイトル\n\n推薦システムの 評価について説明します。\n\n"
+        "def f(x):\n    return x < 1\n\nまとめです。"
+    )
+
+
+def test_extract_without_article_element() -> None:
+    """<article> がない場合は <main>、それもなければページ全体から本文を選ぶこと"""
+    html = """<html><head><title>T</title>
+    <meta name="date" content="2024-01-02"></head><body>
+    <nav>menu</nav><main><p>main text</p></main><p>outside</p></body></html>"""
+
+    content = extract_article(html)
+
+    assert content.title == "T"
+    assert content.published == "2024-01-02T00:00:00+00:00"
+    assert content.text == "main text"
+
+    body_only = extract_article("<body><p>a</p><div>b<br>c</div><time datetime='x'></time></body>")
+    assert body_only.text == "a\n\nb\n\nc"
+    assert body_only.published is None
@@ -0,0 +1,26 @@
+import pytest
+
+from crawler.utils.bloom_filter import BloomFilter
+
+
+def test_added_items_are_always_found() -> None:
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"doi:10.1/{i}")
+    assert all(f"doi:10.1/{i}" in bloom for i in range(1000))
+    assert bloom.add("doi:10.1/0")
+
+
+def test_false_positive_rate_is_close_to_target() -> None:
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"member:{i}")
+    false_positives = sum(f"other:{i}" in bloom for i in range(10_000))
+    assert false_positives / 10_000 < 0.02
+    # 1要素あたり約1.2バイト（偽陽性率1%）
+    assert bloom.size_bytes < 10_000 * 1.3
+
+
+def test_rejects_invalid_error_rate() -> None:
+    with pytest.raises(ValueError):
+        BloomFilter(10, error_rate=0)
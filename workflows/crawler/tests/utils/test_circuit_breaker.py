@@ -0,0 +1,141 @@
+import asyncio
+import functools
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from aiolimiter import AsyncLimiter
+from pytest_mock import MockerFixture
+
+from crawler.domain.paper import Paper
+from crawler.repository.unpaywall_repository import UnpaywallRepository
+from crawler.utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+    set_circuit_breakers,
+)
+from crawler.utils.http_utils import get_with_retry
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FlakyServer:
+    """指定したステータスを返し、リクエスト数を記録するモックサーバー。"""
+
+    def __init__(self, status: int = 500) -> None:
+        self.status = status
+        self.requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return httpx.Response(self.status, json={"doi": request.url.path.removeprefix("/v2/")})
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def breakers(clock: Clock) -> Iterator[CircuitBreakers]:
+    breakers = CircuitBreakers(
+        functools.partial(CircuitBreaker, window_size=4, min_calls=4, open_seconds=30, clock=clock)
+    )
+    set_circuit_breakers(breakers)
+    yield breakers
+    set_circuit_breakers(None)
+
+
+def test_state_transitions(clock: Clock) -> None:
+    """失敗率でopenになり、open_seconds後のhalf_openの試行結果でclosed/openに戻ること"""
+    breaker = CircuitBreaker(
+        "example.com", window_size=4, min_calls=4, open_seconds=30, clock=clock
+    )
+    for _ in range(2):
+        breaker.record_success(0.1)
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow_request() is False
+    assert breaker.retry_after == 30
+
+    clock.now += 30
+    assert breaker.state == "half_open"
+    assert breaker.allow_request() is True
+    # 試行リクエストは1件ずつ
+    assert breaker.allow_request() is False
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now += 30
+    assert breaker.allow_request() is True
+    breaker.record_success(0.1)
+    assert breaker.state == "closed"
+
+
+def test_slow_responses_count_as_failures(clock: Clock) -> None:
+    breaker = CircuitBreaker("example.com", slow_call_seconds=5, min_calls=3, clock=clock)
+    for _ in range(3):
+        breaker.record_success(6.0)
+    assert breaker.state == "open"
+
+
+async def test_requests_fail_fast_while_open(breakers: CircuitBreakers) -> None:
+    server = FlakyServer()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+        for _ in range(4):
+            with pytest.raises(httpx.HTTPStatusError):
+                await get_with_retry(client, "https://api.example.com/a")
+        with pytest.raises(CircuitOpenError):
+            await get_with_retry(client, "https://api.example.com/a")
+        # 他のホストには影響しない
+        with pytest.raises(httpx.HTTPStatusError):
+            await get_with_retry(client, "https://other.example.com/a")
+
+    assert server.requests == 5
+    assert breakers.is_open("api.example.com")
+    assert not breakers.is_open("other.example.com")
+
+
+async def test_transport_errors_open_circuit(
+    breakers: CircuitBreakers, mocker: MockerFixture
+) -> None:
+    """タイムアウトのリトライでサーキットが開くと、それ以上リトライしないこと"""
+    mocker.patch("asyncio.sleep", new_callable=mocker.AsyncMock)
+    attempts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(CircuitOpenError):
+            await get_with_retry(client, "https://api.example.com/a")
+
+    assert attempts == 4
+    assert breakers.is_open("https://api.example.com/b")
+
+
+async def test_enricher_skips_remaining_papers(
+    breakers: CircuitBreakers, mocker: MockerFixture
+) -> None:
+    """サーキットが開いた後は、残りの論文にリクエストを送らないこと"""
+    mocker.patch("asyncio.sleep", new_callable=mocker.AsyncMock)
+    server = FlakyServer(503)
+    papers = [
+        Paper(title=f"Paper {i}", authors=[], year=2024, venue="RecSys", doi=f"10.1/{i}")
+        for i in range(50)
+    ]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+        repo = UnpaywallRepository(client, AsyncLimiter(1000))
+        await repo.enrich_papers(papers, asyncio.Semaphore(1))
+
+    assert server.requests == 4
+    assert all(p.pdf_url is None for p in papers)
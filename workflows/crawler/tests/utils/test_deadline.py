@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from crawler.utils.deadline import Deadline, format_duration, parse_duration, within
+from tests.conftest import FakeClock
+
+
+def test_parse_duration() -> None:
+    assert parse_duration("90") == 90
+    assert parse_duration("90s") == 90
+    assert parse_duration("90m") == 90 * 60
+    assert parse_duration("1h30m") == 90 * 60
+    assert parse_duration(" 1.5H ") == 90 * 60
+    for invalid in ("", "0", "1d", "h", "-1h"):
+        with pytest.raises(ValueError):
+            parse_duration(invalid)
+
+
+def test_format_duration() -> None:
+    assert format_duration(45.4) == "45s"
+    assert format_duration(303) == "5m03s"
+    assert format_duration(90 * 60) == "1h30m"
+    assert parse_duration(format_duration(5400)) == 5400
+
+
+def test_deadline_remaining(clock: FakeClock) -> None:
+    deadline = Deadline(60, clock=clock)
+    assert deadline.remaining == 60
+    assert not deadline.expired
+
+    clock.now += 45
+    assert deadline.elapsed == 45
+    assert deadline.remaining == 15
+
+    clock.now += 30
+    assert deadline.remaining == 0
+    assert deadline.expired
+
+
+async def test_within_cancels_at_deadline() -> None:
+    with pytest.raises(TimeoutError):
+        async with within(Deadline(0.01)):
+            await asyncio.sleep(1)
+
+    # 締め切りがなければ中断しない
+    async with within(None):
+        await asyncio.sleep(0)
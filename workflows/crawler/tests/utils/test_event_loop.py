@@ -0,0 +1,30 @@
+import asyncio
+import sys
+
+import pytest
+
+from crawler.utils.event_loop import loop_factory, run_with_loop
+
+
+async def loop_class_name() -> str:
+    return type(asyncio.get_running_loop()).__module__
+
+
+def test_asyncio_loop() -> None:
+    assert loop_factory("asyncio") is None
+    assert run_with_loop(loop_class_name()).startswith("asyncio")
+
+
+def test_uvloop_loop() -> None:
+    uvloop = pytest.importorskip("uvloop")
+
+    assert loop_factory("uvloop") is uvloop.new_event_loop
+    assert run_with_loop(loop_class_name(), "uvloop").startswith("uvloop")
+
+
+def test_fallback_without_uvloop(monkeypatch: pytest.MonkeyPatch) -> None:
+    # uvloopがインストールされていない環境を再現する
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+
+    assert loop_factory("uvloop") is None
+    assert run_with_loop(loop_class_name(), "uvloop").startswith("asyncio")
@@ -0,0 +1,57 @@
+import pytest
+
+from crawler.utils.feed import estimate_interval, parse_feed
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Blog</title>
+<item><title>B</title><link>https://blog.example.com/b</link>
+  <pubDate>Tue, 02 Jan 2024 09:00:00 +0900</pubDate><description>bbb</description></item>
+<item><title>A</title><link>https://blog.example.com/a</link>
+  <pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate></item>
+<item><title>no link</title></item>
+</channel></rss>
+"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Blog</title>
+<entry><title>A</title><link href="/a"/><id>a</id><updated>2024-01-01T00:00:00Z</updated></entry>
+</feed>
+"""
+
+
+def test_parse_rss() -> None:
+    entries, timestamps = parse_feed(RSS, "https://blog.example.com/feed", site="blog")
+
+    assert [e.url for e in entries] == ["https://blog.example.com/b", "https://blog.example.com/a"]
+    assert entries[0].published == "2024-01-02T00:00:00+00:00"
+    assert entries[0].summary == "bbb"
+    assert entries[0].site == "blog"
+    assert timestamps == [1704153600.0, 1704067200.0]
+
+
+def test_parse_atom_resolves_relative_links() -> None:
+    entries, _ = parse_feed(ATOM, "https://blog.example.com/feed.atom")
+
+    assert [e.url for e in entries] == ["https://blog.example.com/a"]
+    assert entries[0].feed_url == "https://blog.example.com/feed.atom"
+
+
+def test_parse_invalid_feed() -> None:
+    with pytest.raises(ValueError):
+        parse_feed(b"<html><body>not a feed", "https://blog.example.com/feed")
+
+
+@pytest.mark.parametrize(
+    ("timestamps", "expected"),
+    [
+        ([0.0, 3600.0, 7200.0], 3600.0),
+        ([0.0, 60.0], 600.0),  # 下限
+        ([0.0, 10 * 86400.0], 86400.0),  # 上限
+        ([100.0], 1800.0),  # 推定できない場合はデフォルト
+    ],
+)
+def test_estimate_interval(timestamps: list[float], expected: float) -> None:
+    assert (
+        estimate_interval(timestamps, default=1800.0, min_interval=600.0, max_interval=86400.0)
+        == expected
+    )
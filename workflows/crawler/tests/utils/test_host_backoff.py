@@ -0,0 +1,141 @@
+import asyncio
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from aiolimiter import AsyncLimiter
+from pytest_mock import MockerFixture
+
+from crawler.utils.host_backoff import HostBackoff, set_host_backoff
+from crawler.utils.http_utils import get_with_retry
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(mocker: MockerFixture) -> Clock:
+    """asyncio.sleepで進む時計"""
+    clock = Clock()
+
+    async def sleep(seconds: float) -> None:
+        clock.now += seconds
+
+    mocker.patch("asyncio.sleep", side_effect=sleep)
+    return clock
+
+
+@pytest.fixture
+def unset_backoff() -> Iterator[None]:
+    yield
+    set_host_backoff(None)
+
+
+def test_retry_budget_is_earned_by_successes() -> None:
+    backoff = HostBackoff(budget_ratio=0.5, min_retries=1)
+    assert backoff.try_retry("https://example.com/a") is True
+    assert backoff.try_retry("https://example.com/a") is False
+    # ホストごとに独立
+    assert backoff.try_retry("https://other.example.com/a") is True
+
+    backoff.record_success("https://example.com/b")
+    backoff.record_success("https://example.com/c")
+    assert backoff.try_retry("https://example.com/a") is True
+
+
+async def test_rate_limit_pauses_whole_host(clock: Clock, unset_backoff: None) -> None:
+    """429のRetry-Afterで、同じホストへの他のリクエストも一時停止すること"""
+    backoff = HostBackoff(clock=clock)
+    set_host_backoff(backoff)
+    sent: list[tuple[str, float]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append((request.url.path, clock.now))
+        if len(sent) == 1:
+            return httpx.Response(429, headers={"Retry-After": "30"})
+        return httpx.Response(200)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await get_with_retry(client, "https://api.example.com/a")
+        assert backoff.paused_for("api.example.com") == 0
+        backoff.pause("api.example.com", 10)
+        await get_with_retry(client, "https://api.example.com/b")
+        await get_with_retry(client, "https://other.example.com/c")
+
+    retry_at, b_at, c_at = (at for _, at in sent[1:])
+    assert retry_at >= 1_030
+    assert b_at >= retry_at + 10
+    # 他のホストは一時停止しない
+    assert c_at == b_at
+
+
+async def test_retries_stop_when_budget_is_exhausted(clock: Clock, unset_backoff: None) -> None:
+    set_host_backoff(HostBackoff(budget_ratio=0.1, min_retries=2, clock=clock))
+    requests = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal requests
+        requests += 1
+        return httpx.Response(503)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await get_with_retry(client, "https://api.example.com/a")
+        assert requests == 3
+        # 予算を使い切った後はリトライしない
+        with pytest.raises(httpx.HTTPStatusError):
+            await get_with_retry(client, "https://api.example.com/b")
+        assert requests == 4
+
+
+async def test_paused_host_does_not_hold_semaphore(unset_backoff: None) -> None:
+    """一時停止の解除を待つ間はセマフォを保持せず、他のホストへのリクエストを止めないこと"""
+    set_host_backoff(HostBackoff())
+    sent: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.url.host)
+        if sent == ["slow.example"]:
+            return httpx.Response(429, headers={"Retry-After": "1"})
+        return httpx.Response(200)
+
+    sem = asyncio.Semaphore(1)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        slow = asyncio.create_task(get_with_retry(client, "https://slow.example/a", semaphore=sem))
+        await asyncio.sleep(0.05)
+        async with asyncio.timeout(0.5):
+            await get_with_retry(client, "https://fast.example/b", semaphore=sem)
+        await slow
+
+    assert sent == ["slow.example", "fast.example", "slow.example"]
+    assert not sem.locked()
+
+
+async def test_resumed_requests_follow_rate_limit(unset_backoff: None) -> None:
+    """一時停止の解除後は、再送を含めて試行ごとにリミッターの枠を取得し、一斉に送信しないこと"""
+    set_host_backoff(HostBackoff())
+    loop = asyncio.get_running_loop()
+    sent: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(loop.time())
+        if len(sent) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.3"})
+        return httpx.Response(200)
+
+    limiter = AsyncLimiter(1, 0.1)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await asyncio.gather(
+            *(get_with_retry(client, f"https://example.com/{i}", limiter=limiter) for i in range(5))
+        )
+
+    # 429を受けたリクエストの再送を含め、5件が1件ずつ0.1秒間隔で送信される
+    resumed = sent[1:]
+    assert len(resumed) == 5
+    assert resumed[0] - sent[0] >= 0.3
+    assert all(b - a >= 0.09 for a, b in zip(resumed, resumed[1:], strict=False))
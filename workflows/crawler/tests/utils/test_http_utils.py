@@ -1,10 +1,17 @@
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
 from typing import NoReturn
 
 import httpx
 import pytest
 from pytest_mock import MockerFixture
 
-from crawler.utils.http_utils import get_with_retry, is_rate_limit, post_with_retry
+from crawler.utils.http_utils import (
+    get_with_retry,
+    is_rate_limit,
+    parse_retry_after,
+    post_with_retry,
+)
 
 
 @pytest.mark.asyncio
@@ -194,3 +201,78 @@ async def test_retry_after_header_missing_fallback(mocker: MockerFixture) -> Non
     wait_time = call_args[0][0]
     # Default exp backoff min=1, max=10
     assert 1.0 <= wait_time <= 10.0
+
+
+def test_parse_retry_after() -> None:
+    now = datetime(2015, 10, 21, 7, 27, 0, tzinfo=UTC)
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=now) == 60.0
+    # 過去の日時は待機しない
+    assert parse_retry_after("Wed, 21 Oct 2015 07:00:00 GMT", now=now) == 0.0
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.asyncio
+async def test_retry_after_http_date(mocker: MockerFixture) -> None:
+    mock_sleep = mocker.patch("asyncio.sleep", new_callable=mocker.AsyncMock)
+    retry_at = format_datetime(datetime.now(UTC) + timedelta(seconds=30), usegmt=True)
+    responses = iter([httpx.Response(429, headers={"Retry-After": retry_at}), httpx.Response(200)])
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda _: next(responses)))
+
+    response = await get_with_retry(client, "http://test.com")
+
+    assert response.status_code == 200
+    wait_time = mock_sleep.await_args[0][0]
+    assert 25 <= wait_time <= 30
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "failure",
+    [httpx.Response(503), httpx.ReadTimeout("timed out"), httpx.ConnectError("refused")],
+    ids=["503", "read_timeout", "connect_error"],
+)
+async def test_get_retries_transient_failures(
+    mocker: MockerFixture, failure: httpx.Response | httpx.TransportError
+) -> None:
+    mocker.patch("asyncio.sleep", new_callable=mocker.AsyncMock)
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        return httpx.Response(200)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    response = await get_with_retry(client, "http://test.com")
+
+    assert response.status_code == 200
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_post_retries_only_unsent_requests_unless_idempotent(mocker: MockerFixture) -> None:
+    """冪等でないPOSTは、送信後のタイムアウトをリトライしないこと"""
+    mocker.patch("asyncio.sleep", new_callable=mocker.AsyncMock)
+    mock_client = mocker.AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post.side_effect = httpx.ReadTimeout("timed out")
+
+    with pytest.raises(httpx.ReadTimeout):
+        await post_with_retry(mock_client, "http://test.com", {}, {})
+    assert mock_client.post.call_count == 1
+
+    mock_client.post.reset_mock()
+    mock_client.post.side_effect = [httpx.ConnectError("refused"), httpx.Response(200)]
+    response = await post_with_retry(mock_client, "http://test.com", {}, {})
+    assert response.status_code == 200
+    assert mock_client.post.call_count == 2
+
+    mock_client.post.reset_mock()
+    mock_client.post.side_effect = [httpx.ReadTimeout("timed out"), httpx.Response(200)]
+    response = await post_with_retry(mock_client, "http://test.com", {}, {}, idempotent=True)
+    assert response.status_code == 200
+    assert mock_client.post.call_count == 2
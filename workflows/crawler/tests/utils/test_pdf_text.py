@@ -0,0 +1,40 @@
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from crawler.domain.pdf import PdfText
+from crawler.utils.pdf_text import ExtractionTimeoutError, extract_text
+
+
+def test_extract_text_with_page_offsets(make_pdf: Callable[[str, list[str]], Path]) -> None:
+    """全ページのテキストと各ページの開始位置が返ること"""
+    path = make_pdf("a.pdf", ["Hello page one", "Second page", "Third"])
+
+    text, offsets = extract_text(path, timeout=10)
+
+    assert text == "Hello page one\nSecond page\nThird"
+    assert offsets == [0, 15, 27]
+    pdf_text = PdfText(sha256="x", text=text, page_offsets=offsets)
+    assert pdf_text.num_pages == 3
+    assert [pdf_text.page(i) for i in range(3)] == ["Hello page one", "Second page", "Third"]
+
+
+def test_extract_text_rejects_broken_pdf(tmp_path: Path) -> None:
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4\nnot really a pdf")
+
+    with pytest.raises(Exception):
+        extract_text(path)
+
+
+def test_extract_text_timeout(mocker: MockerFixture, tmp_path: Path) -> None:
+    """制限時間を超えた場合にExtractionTimeoutErrorとなること"""
+    mocker.patch("pypdf.PdfReader", side_effect=lambda _: time.sleep(5))
+
+    start = time.monotonic()
+    with pytest.raises(ExtractionTimeoutError):
+        extract_text(tmp_path / "slow.pdf", timeout=0.1)
+    assert time.monotonic() - start < 1
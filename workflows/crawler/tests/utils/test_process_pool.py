@@ -0,0 +1,26 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from crawler.utils.process_pool import start_workers, terminate_workers
+
+
+async def test_terminate_workers_kills_hung_workers() -> None:
+    executor = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    await start_workers(executor, 2)
+    processes = list(executor._processes.values())
+    assert len(processes) == 2
+
+    hung = asyncio.get_running_loop().run_in_executor(executor, time.sleep, 60)
+    await asyncio.sleep(0.1)
+    terminate_workers(executor)
+
+    with pytest.raises((BrokenProcessPool, asyncio.CancelledError)):
+        await asyncio.wait_for(hung, 10)
+    for process in processes:
+        process.join(5)
+        assert not process.is_alive()
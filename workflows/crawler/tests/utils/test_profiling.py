@@ -0,0 +1,79 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from crawler.utils.profiling import (
+    LoopLagMonitor,
+    MemoryProfiler,
+    Profiler,
+    SamplingProfiler,
+    create_profiler,
+)
+
+
+def busy_loop(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+async def test_sampling_profiler_writes_folded_stacks(tmp_path: Path) -> None:
+    async with SamplingProfiler(tmp_path, interval=0.001) as profiler:
+        busy_loop(0.2)
+
+    assert profiler.report_path is not None
+    lines = profiler.report_path.read_text().splitlines()
+    # folded形式: スレッド名から始まり `;` で連結したスタックと、サンプル数
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.startswith("MainThread;")
+    assert any("test_profiling:busy_loop" in line for line in lines)
+
+
+async def test_memory_profiler_records_stages(tmp_path: Path) -> None:
+    async with MemoryProfiler(tmp_path) as profiler:
+        with profiler.stage("allocate"):
+            data = [bytes(1024) for _ in range(2000)]
+        with profiler.stage("idle"):
+            pass
+
+    assert profiler.report_path is not None
+    report = profiler.report_path.read_text()
+    assert report.startswith("Traced memory:")
+    assert "== allocate:" in report
+    assert "== idle:" in report
+    assert "test_profiling.py" in report.split("== idle:")[0]
+    assert len(data) == 2000
+
+
+async def test_loop_lag_monitor_detects_blocking_callbacks(tmp_path: Path) -> None:
+    loop = asyncio.get_running_loop()
+    async with LoopLagMonitor(tmp_path, interval=0.01, slow_callback=0.05) as monitor:
+        await asyncio.sleep(0.05)
+        # イベントループをブロックする
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+
+    assert not loop.get_debug()
+    assert monitor.report_path is not None
+    report = json.loads(monitor.report_path.read_text())
+    assert report["samples"] > 0
+    assert report["lag"]["max"] >= 0.1
+    assert report["slow_callbacks"] >= 1
+    assert report["slowest_callbacks"][0]["duration"] >= 0.2
+
+
+async def test_create_profiler(tmp_path: Path) -> None:
+    assert isinstance(create_profiler("cpu", tmp_path), SamplingProfiler)
+    assert isinstance(create_profiler("memory", tmp_path), MemoryProfiler)
+    assert isinstance(create_profiler("loop", tmp_path), LoopLagMonitor)
+
+    # モードを指定しない場合は何も出力しない
+    async with create_profiler(None, tmp_path) as profiler:
+        with profiler.stage("noop"):
+            pass
+    assert type(profiler) is Profiler
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,141 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+from aiolimiter import AsyncLimiter
+
+from crawler.utils.http_utils import get_with_retry
+from crawler.utils.robots import RobotsRegistry, set_robots_registry
+
+ROBOTS_TXT = """
+User-agent: *
+Disallow: /private/
+Crawl-delay: 3
+"""
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RobotsServer:
+    """robots.txtへのリクエスト数を記録するモックサーバー。"""
+
+    def __init__(self, robots_txt: str = ROBOTS_TXT) -> None:
+        self.robots_txt = robots_txt
+        self.robots_requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            self.robots_requests += 1
+            return httpx.Response(200, text=self.robots_txt)
+        return httpx.Response(200, json={})
+
+
+@pytest.fixture
+def server() -> RobotsServer:
+    return RobotsServer()
+
+
+@pytest.fixture
+def client(server: RobotsServer) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(server))
+
+
+@pytest.fixture
+def unset_registry() -> Iterator[None]:
+    yield
+    set_robots_registry(None)
+
+
+async def test_rules_are_cached_per_origin(client: httpx.AsyncClient, server: RobotsServer) -> None:
+    registry = RobotsRegistry()
+
+    assert await registry.can_fetch(client, "https://example.com/public/a") is True
+    assert await registry.can_fetch(client, "https://example.com/private/a") is False
+    assert await registry.can_fetch(client, "https://other.example/private/a") is False
+    assert server.robots_requests == 2
+
+
+async def test_rules_are_persisted_with_ttl(
+    tmp_path: Path, client: httpx.AsyncClient, server: RobotsServer
+) -> None:
+    """ディスクに保存したrobots.txtがTTL内であれば、次回の実行で再取得されないこと"""
+    clock = Clock()
+    first = RobotsRegistry(tmp_path / "robots.db", clock=clock)
+    await first.can_fetch(client, "https://example.com/a")
+    first.close()
+
+    second = RobotsRegistry(tmp_path / "robots.db", clock=clock)
+    assert await second.can_fetch(client, "https://example.com/private/a") is False
+    assert server.robots_requests == 1
+
+    clock.now += RobotsRegistry.DEFAULT_TTL_SECONDS + 1
+    await second.can_fetch(client, "https://example.com/a")
+    assert server.robots_requests == 2
+
+
+async def test_crawl_delay_sets_host_limiter(client: httpx.AsyncClient) -> None:
+    """Crawl-delayがホストのレートリミッターに反映されること"""
+    registry = RobotsRegistry()
+    await registry.guard(client, "https://example.com/")
+
+    limiter = registry.delay_limiter("https://example.com/a")
+    assert isinstance(limiter, AsyncLimiter)
+    assert limiter.max_rate == 1
+    assert limiter.time_period == 3.0
+    assert not isinstance(registry.delay_limiter("https://unknown.example/"), AsyncLimiter)
+
+
+async def test_fetch_error_disallows_without_persisting(tmp_path: Path) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    registry = RobotsRegistry(tmp_path / "robots.db")
+
+    assert await registry.can_fetch(client, "https://example.com/a") is False
+    assert registry._read_cache("https://example.com") is None
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+async def test_server_error_is_retried_after_error_ttl(tmp_path: Path, status: int) -> None:
+    """5xx・429のrobots.txtは全拒否とし、保存せずにerror_ttl後に再取得すること"""
+    requests = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal requests
+        requests += 1
+        return httpx.Response(status)
+
+    clock = Clock()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    registry = RobotsRegistry(tmp_path / "robots.db", clock=clock)
+
+    assert await registry.can_fetch(client, "https://example.com/a") is False
+    assert registry._read_cache("https://example.com") is None
+    await registry.can_fetch(client, "https://example.com/b")
+    assert requests == 1
+
+    clock.now += RobotsRegistry.DEFAULT_ERROR_TTL_SECONDS + 1
+    await registry.can_fetch(client, "https://example.com/a")
+    assert requests == 2
+
+
+@pytest.mark.usefixtures("unset_registry")
+async def test_http_utils_check_registered_registry(
+    client: httpx.AsyncClient, server: RobotsServer
+) -> None:
+    """登録したレジストリに従い、拒否されたURLへのリクエストがPermissionErrorとなること"""
+    set_robots_registry(RobotsRegistry(ttl=60))
+
+    resp = await get_with_retry(client, "https://example.com/public/a")
+    assert resp.status_code == 200
+    with pytest.raises(PermissionError):
+        await get_with_retry(client, "https://example.com/private/a")
+    assert server.robots_requests == 1
@@ -0,0 +1,91 @@
+import gzip
+import io
+import tracemalloc
+
+import pytest
+from defusedxml import DefusedXmlException
+
+from crawler.utils.sitemap import SitemapItem, iter_sitemap, normalize_lastmod
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>https://example.com/a</loc>
+    <lastmod>2024-01-02T10:00:00+09:00</lastmod>
+    <image:image><image:loc>https://example.com/a.png</image:loc></image:image>
+  </url>
+  <url><loc> https://example.com/b </loc></url>
+</urlset>
+"""
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/posts.xml.gz</loc><lastmod>2024-01-02</lastmod></sitemap>
+</sitemapindex>
+"""
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2024-01-02", "2024-01-02T00:00:00+00:00"),
+        ("2024-01-02T10:00:00+09:00", "2024-01-02T01:00:00+00:00"),
+        ("2024-01-02T01:00:00Z", "2024-01-02T01:00:00+00:00"),
+        # 精度を下げた形式は期間の先頭とみなす
+        ("2024-03", "2024-03-01T00:00:00+00:00"),
+        ("2024", "2024-01-01T00:00:00+00:00"),
+        ("2024-13", None),
+        ("invalid", None),
+        (None, None),
+    ],
+)
+def test_normalize_lastmod(value: str | None, expected: str | None) -> None:
+    assert normalize_lastmod(value) == expected
+
+
+def test_iter_urlset() -> None:
+    """拡張要素の <image:loc> を無視してページのURLと更新日時を返すこと"""
+    items = list(iter_sitemap(io.BytesIO(URLSET)))
+
+    assert items == [
+        SitemapItem("url", "https://example.com/a", "2024-01-02T01:00:00+00:00"),
+        SitemapItem("url", "https://example.com/b", None),
+    ]
+
+
+def test_iter_gzipped_index() -> None:
+    items = list(iter_sitemap(io.BytesIO(gzip.compress(INDEX))))
+
+    assert items == [
+        SitemapItem("sitemap", "https://example.com/posts.xml.gz", "2024-01-02T00:00:00+00:00")
+    ]
+
+
+def test_rejects_entity_expansion() -> None:
+    body = b"""<?xml version="1.0"?>
+<!DOCTYPE urlset [<!ENTITY a "aaaa">]>
+<urlset><url><loc>&a;</loc></url></urlset>
+"""
+    with pytest.raises(DefusedXmlException):
+        list(iter_sitemap(io.BytesIO(body)))
+
+
+def test_memory_is_constant() -> None:
+    """URL数が多くても、処理済みの要素を破棄してメモリ使用量が増えないこと"""
+    entry = b"<url><loc>https://example.com/p/%d</loc><lastmod>2024-01-02</lastmod></url>"
+    body = (
+        b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + b"".join(entry % i for i in range(50_000))
+        + b"</urlset>"
+    )
+
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in iter_sitemap(io.BytesIO(body)))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count == 50_000
+    assert peak < 2 * 1024 * 1024
@@ -0,0 +1,27 @@
+import pytest
+
+from crawler.utils.url import canonicalize_url
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("HTTPS://Blog.Example.com", "https://blog.example.com/"),
+        ("https://blog.example.com:443/a#section", "https://blog.example.com/a"),
+        ("http://blog.example.com:8080/a", "http://blog.example.com:8080/a"),
+        ("https://blog.example.com/a/./b/../c", "https://blog.example.com/a/c"),
+        (
+            "https://blog.example.com/a?utm_source=x&b=2&a=1&fbclid=y",
+            "https://blog.example.com/a?a=1&b=2",
+        ),
+        ("https://blog.example.com/a?q=", "https://blog.example.com/a?q="),
+    ],
+)
+def test_canonicalize_url(url: str, expected: str) -> None:
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("url", ["mailto:a@example.com", "/relative", "ftp://example.com/a"])
+def test_canonicalize_rejects_non_http(url: str) -> None:
+    with pytest.raises(ValueError):
+        canonicalize_url(url)
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from crawler.utils.worker_pool import run_in_pool
+
+
+async def test_processes_all_items_with_bounded_concurrency() -> None:
+    processed: list[int] = []
+    running = 0
+    max_running = 0
+
+    async def handle(item: int) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0)
+        processed.append(item)
+        running -= 1
+
+    await run_in_pool(range(1000), handle, num_workers=8)
+
+    assert sorted(processed) == list(range(1000))
+    assert max_running == 8
+
+
+async def test_number_of_tasks_does_not_grow_with_items() -> None:
+    task_counts: list[int] = []
+
+    async def handle(item: int) -> None:
+        task_counts.append(len(asyncio.all_tasks()))
+        await asyncio.sleep(0)
+
+    await run_in_pool(range(10_000), handle, num_workers=4)
+
+    # テスト本体のタスクとワーカー
+    assert max(task_counts) == 5
+
+
+async def test_error_cancels_other_workers() -> None:
+    processed: list[int] = []
+
+    async def handle(item: int) -> None:
+        if item == 3:
+            raise ValueError("boom")
+        await asyncio.sleep(0)
+        processed.append(item)
+
+    with pytest.raises(ExceptionGroup):
+        await run_in_pool(range(100), handle, num_workers=2)
+    assert len(processed) < 100